@@ -64,7 +64,8 @@ setup(
     install_requires=get_requirements(),
     entry_points={
         'console_scripts': [
-            'apache-search = tools.apache_search.shell:run'
+            'apache-search = tools.apache_search.shell:run',
+            'apache-search-client = tools.apache_search.client:run'
         ]
     }
 )
@@ -0,0 +1,385 @@
+""" Module for serving the synthetic Apache directory tree from the local
+    HTTP server, used by the benchmarks.
+
+    Pages look like the Apache httpd mod_autoindex fancy index: html
+    table by default, and preformatted text for the F=1 query parameter.
+    Responses have ETag and Last-Modified headers, and conditional
+    requests are answered with 304.
+
+    Classes:
+        - MirrorTree
+        - MirrorServer
+
+    Functions:
+        - _serve
+"""
+import hashlib
+import multiprocessing
+import time
+
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+
+SERVER_HEADER = 'Apache/2.4.29 (Ubuntu)'
+MTIME = '2019-03-16 11:46'
+LAST_MODIFIED = formatdate(1552736760, usegmt=True)
+
+TABLE_HEAD = (
+    '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 3.2 Final//EN">\n<html>\n'
+    '<head>\n<title>Index of {path}</title>\n</head>\n<body>\n'
+    '<h1>Index of {path}</h1>\n<table>\n'
+    '<tr><th valign="top"><img src="/icons/blank.gif" alt="[ICO]"></th>'
+    '<th><a href="?C=N;O=D">Name</a></th>'
+    '<th><a href="?C=M;O=A">Last modified</a></th>'
+    '<th><a href="?C=S;O=A">Size</a></th>'
+    '<th><a href="?C=D;O=A">Description</a></th></tr>\n'
+    '<tr><th colspan="5"><hr></th></tr>\n'
+    '<tr><td valign="top"><img src="/icons/back.gif" alt="[PARENTDIR]">'
+    '</td><td><a href="../">Parent Directory</a></td><td>&nbsp;</td>'
+    '<td align="right">  - </td><td>&nbsp;</td></tr>\n'
+)
+TABLE_ROW = (
+    '<tr><td valign="top"><img src="/icons/{icon}.gif" alt="{alt}"></td>'
+    '<td><a href="{name}">{name}</a></td>'
+    '<td align="right">{mtime}  </td><td align="right">{size}</td>'
+    '<td>&nbsp;</td></tr>\n'
+)
+TABLE_TAIL = (
+    '<tr><th colspan="5"><hr></th></tr>\n</table>\n'
+    '<address>Apache/2.4.29 (Ubuntu) Server</address>\n</body></html>\n'
+)
+PRE_HEAD = (
+    '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 3.2 Final//EN">\n<html>\n'
+    '<head>\n<title>Index of {path}</title>\n</head>\n<body>\n'
+    '<h1>Index of {path}</h1>\n'
+    '<pre><img src="/icons/blank.gif" alt="Icon "> '
+    '<a href="?C=N;O=D">Name</a>                    '
+    '<a href="?C=M;O=A">Last modified</a>      '
+    '<a href="?C=S;O=A">Size</a>  <a href="?C=D;O=A">Description</a>'
+    '<hr><img src="/icons/back.gif" alt="[PARENTDIR]"> '
+    '<a href="../">Parent Directory</a>                             -   \n'
+)
+PRE_ROW = (
+    '<img src="/icons/{icon}.gif" alt="{alt}"> '
+    '<a href="{name}">{name}</a>{padding} {mtime}  {size:>4}  \n'
+)
+PRE_TAIL = (
+    '<hr></pre>\n<address>Apache/2.4.29 (Ubuntu) Server</address>\n'
+    '</body></html>\n'
+)
+
+
+class MirrorTree:
+    """ Class for the synthetic directory tree: every directory above
+        the given depth has the same number of subdirectories and files.
+        Directory names are "dir-N/", file names are "file-N.tar.gz".
+    """
+    def __init__(self, breadth=3, depth=3, entries=50):
+        """ Constructor method for MirrorTree class.
+
+            Args:
+                breadth(int): number of subdirectories in every directory,
+                              except the deepest ones
+                depth(int): number of directory levels below the root
+                entries(int): number of files in every directory
+        """
+        self.breadth = breadth
+        self.depth = depth
+        self.entries = entries
+
+    @property
+    def pages(self):
+        """ Get the number of directories in the tree, root included.
+
+            Returns:
+                pages(int): number of directories
+        """
+        return sum(self.breadth ** level for level in range(self.depth + 1))
+
+    @property
+    def files(self):
+        """ Get the number of files in the tree.
+
+            Returns:
+                files(int): number of files
+        """
+        return self.pages * self.entries
+
+    @property
+    def rows(self):
+        """ Get the number of listing rows with files and directories,
+            in all directories of the tree.
+
+            Returns:
+                rows(int): number of rows
+        """
+        return self.files + self.pages - 1
+
+    def listing(self, path):
+        """ Get the listing of the directory.
+
+            Args:
+                path(str): directory path, e.g. /dir-0/dir-1/
+
+            Returns:
+                listing(tuple): (dirs, files) tuple - list of directory
+                                names, and list of (name, size) tuples;
+                                None if the directory does not exist
+        """
+        parts = [part for part in path.split('/') if part]
+        if len(parts) > self.depth:
+            return None
+        for part in parts:
+            if not part.startswith('dir-') \
+                    or not part[4:].isdigit() \
+                    or int(part[4:]) >= self.breadth:
+                return None
+
+        dirs = list()
+        if len(parts) < self.depth:
+            dirs = [f'dir-{index}/' for index in range(self.breadth)]
+        files = [(f'file-{index}.tar.gz', _file_size(index))
+                 for index in range(self.entries)]
+        return dirs, files
+
+    def render(self, path, preformatted=False):
+        """ Render the Apache fancy index page of the directory.
+
+            Args:
+                path(str): directory path
+                preformatted(bool): if True, render the preformatted text
+                                    listing (F=1), html table otherwise
+
+            Returns:
+                page(str): page html code, or None if the directory
+                           does not exist
+        """
+        listing = self.listing(path)
+        if listing is None:
+            return None
+        dirs, files = listing
+
+        rows = [('folder', '[DIR]', name, '-') for name in dirs]
+        rows += [('compressed', '[   ]', name, size) for name, size in files]
+        if preformatted:
+            lines = [PRE_HEAD.format(path=path)]
+            lines += [PRE_ROW.format(icon=icon, alt=alt, name=name,
+                                     padding=' ' * max(1, 24 - len(name)),
+                                     mtime=MTIME, size=size)
+                      for icon, alt, name, size in rows]
+            lines.append(PRE_TAIL)
+        else:
+            lines = [TABLE_HEAD.format(path=path)]
+            lines += [TABLE_ROW.format(icon=icon, alt=alt, name=name,
+                                       mtime=MTIME, size=size)
+                      for icon, alt, name, size in rows]
+            lines.append(TABLE_TAIL)
+        return ''.join(lines)
+
+
+class MirrorServer:
+    """ Class for the local HTTP server, serving the synthetic tree
+        from the separate process, so the server does not share memory
+        and the interpreter lock with the measured code. Can be used
+        as a context manager.
+    """
+    def __init__(self, tree, latency=0.0):
+        """ Constructor method for MirrorServer class.
+
+            Args:
+                tree(MirrorTree): served directory tree
+                latency(float): delay of every response, in seconds
+        """
+        self.tree = tree
+        self.latency = latency
+        self._requests = multiprocessing.Value('q', 0)
+        self._bytes_sent = multiprocessing.Value('q', 0)
+        self._address = None
+        self._process = None
+
+    @property
+    def url(self):
+        """ Get the URL of the tree root.
+
+            Returns:
+                url(str): root URL, with trailing slash
+        """
+        host, port = self._address
+        return f'http://{host}:{port}/'
+
+    @property
+    def requests(self):
+        """ Get the number of requests served so far.
+
+            Returns:
+                requests(int): number of requests
+        """
+        return self._requests.value
+
+    @property
+    def bytes_sent(self):
+        """ Get the number of response body bytes sent so far.
+
+            Returns:
+                bytes_sent(int): number of bytes
+        """
+        return self._bytes_sent.value
+
+    def start(self):
+        """ Start the server process on the free local port.
+
+            Returns:
+                self(MirrorServer): started server
+        """
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve,
+            args=(self.tree, self.latency, self._requests, self._bytes_sent,
+                  child_conn)
+        )
+        self._process.daemon = True
+        self._process.start()
+        self._address = parent_conn.recv()
+        return self
+
+    def stop(self):
+        """ Stop the server process."""
+        self._process.terminate()
+        self._process.join()
+
+    def __enter__(self):
+        """ Start the server in the context.
+
+            Returns:
+                self(MirrorServer): started server
+        """
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """ Stop the server after the context."""
+        self.stop()
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    """ HTTP server handling every connection in a separate thread,
+        counting the served requests.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, tree, latency, requests, bytes_sent):
+        """ Constructor method for _ThreadingHTTPServer class.
+
+            Args:
+                address(tuple): (host, port) tuple to listen on
+                tree(MirrorTree): served directory tree
+                latency(float): delay of every response, in seconds
+                requests(multiprocessing.Value): served requests counter
+                bytes_sent(multiprocessing.Value): sent bytes counter
+        """
+        super().__init__(address, _MirrorHandler)
+        self.tree = tree
+        self.latency = latency
+        self._requests = requests
+        self._bytes_sent = bytes_sent
+
+    def record(self, size):
+        """ Count the served request.
+
+            Args:
+                size(int): response body size in bytes
+        """
+        with self._requests.get_lock():
+            self._requests.value += 1
+        with self._bytes_sent.get_lock():
+            self._bytes_sent.value += size
+
+
+class _MirrorHandler(BaseHTTPRequestHandler):
+    """ Request handler serving pages of the mirror tree."""
+    protocol_version = 'HTTP/1.1'
+
+    def version_string(self):
+        """ Get the Server header value.
+
+            Returns:
+                server(str): Apache server version
+        """
+        return SERVER_HEADER
+
+    def do_GET(self):
+        """ Serve the directory listing page."""
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        url = urlsplit(self.path)
+        preformatted = parse_qs(url.query).get('F') == ['1']
+        page = self.server.tree.render(url.path, preformatted=preformatted)
+        if page is None:
+            self._send(404, b'Not Found', 'text/plain')
+            return
+
+        body = page.encode('utf-8')
+        etag = '"{}"'.format(hashlib.md5(body).hexdigest())
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, b'', None, etag)
+            return
+        self._send(200, body, 'text/html;charset=UTF-8', etag)
+
+    def _send(self, status_code, body, content_type, etag=None):
+        """ Send the response.
+
+            Args:
+                status_code(int): response status code
+                body(bytes): response body
+                content_type(str): Content-Type header value
+                etag(str): ETag header value
+        """
+        self.send_response(status_code)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', LAST_MODIFIED)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.record(len(body))
+
+    def log_message(self, *args):
+        """ Do not log the requests."""
+
+
+def _serve(tree, latency, requests, bytes_sent, conn):
+    """ Run the mirror server until the process is terminated.
+
+        Args:
+            tree(MirrorTree): served directory tree
+            latency(float): delay of every response, in seconds
+            requests(multiprocessing.Value): served requests counter
+            bytes_sent(multiprocessing.Value): sent bytes counter
+            conn(multiprocessing.Connection): connection used to send
+                                              the server address back
+    """
+    server = _ThreadingHTTPServer(('127.0.0.1', 0), tree, latency,
+                                  requests, bytes_sent)
+    conn.send(server.server_address[:2])
+    conn.close()
+    server.serve_forever()
+
+
+def _file_size(index):
+    """ Get the listed size of the file, in Apache fancy index format.
+
+        Args:
+            index(int): file index in the directory
+
+        Returns:
+            size(str): file size, e.g. 120, 4.0K, 2.5M
+    """
+    sizes = ['120', '4.0K', '56K', '2.5M', '1.1G']
+    return sizes[index % len(sizes)]
@@ -0,0 +1,247 @@
+""" Module for running the apache-search benchmarks against the synthetic
+    Apache mirror, served locally - no network access is needed.
+
+    Usage:
+        python -m tools.apache_search.benchmarks.run --breadth 4 --depth 3
+
+    Functions:
+        - run_benchmarks
+        - main
+        - _measure
+        - _bench_page_files
+        - _bench_page_subpages
+        - _bench_recursive
+        - _bench_cli
+"""
+import gc
+import time
+import tracemalloc
+
+from functools import partial
+
+import click
+
+from click.testing import CliRunner
+from tabulate import tabulate
+
+from tools.apache_search.benchmarks.mirror import MirrorServer
+from tools.apache_search.benchmarks.mirror import MirrorTree
+from tools.apache_search.src.cli.apache_search import apache_search
+from tools.apache_search.src.page import Page
+from tools.apache_search.src.page_search import iter_recursive_page_search
+
+
+BENCHMARK_NAMES = ('page_files', 'page_subpages', 'recursive', 'cli')
+RESULT_HEADERS = ['Benchmark', 'Time [s]', 'Pages/s', 'Rows/s',
+                  'Peak memory [MB]']
+
+
+def run_benchmarks(tree, latency=0.0, jobs=1, repeat=3, memory=True,
+                   names=BENCHMARK_NAMES, parse_processes=None):
+    """ Run the benchmarks against the local mirror of the given tree.
+
+        Every benchmark is run the given number of times, and the best time
+        is reported. Peak memory is measured in the separate run, as memory
+        tracing slows the code down.
+
+        Args:
+            tree(MirrorTree): served directory tree
+            latency(float): delay of every response, in seconds
+            jobs(int): number of directories fetched at once by
+                       the recursive benchmarks
+            repeat(int): number of timed runs of every benchmark
+            memory(bool): if True, peak memory is measured
+            names(iterable): names of the benchmarks to run
+            parse_processes(int): number of processes parsing the pages
+                                  in the recursive benchmarks; pages are
+                                  parsed by the fetching threads if None
+
+        Returns:
+            results(list): list of dictionaries with keys: name, time,
+                           pages, rows, peak_memory
+    """
+    benchmarks = {
+        'page_files': _bench_page_files,
+        'page_subpages': _bench_page_subpages,
+        'recursive': partial(_bench_recursive, jobs=jobs,
+                             parse_processes=parse_processes),
+        'cli': partial(_bench_cli, jobs=jobs,
+                       parse_processes=parse_processes),
+    }
+
+    results = list()
+    with MirrorServer(tree, latency=latency) as server:
+        for name in names:
+            benchmark = partial(benchmarks[name], server.url)
+            pages, rows, elapsed = _measure(benchmark, server, repeat)
+            peak_memory = None
+            if memory:
+                tracemalloc.start()
+                benchmark()
+                _, peak_memory = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+            results.append({
+                'name': name,
+                'time': elapsed,
+                'pages': pages,
+                'rows': rows,
+                'peak_memory': peak_memory
+            })
+    return results
+
+
+def _measure(benchmark, server, repeat):
+    """ Run the benchmark several times, and get its best time.
+
+        Args:
+            benchmark(callable): benchmark function, returning the number
+                                 of parsed rows
+            server(MirrorServer): mirror server, counting the requests
+            repeat(int): number of runs
+
+        Returns:
+            pages(int): number of pages fetched in one run
+            rows(int): number of rows parsed in one run
+            elapsed(float): best time of the run, in seconds
+    """
+    best = None
+    pages = rows = 0
+    for _ in range(repeat):
+        gc.collect()
+        requests_before = server.requests
+        start = time.perf_counter()
+        rows = benchmark()
+        elapsed = time.perf_counter() - start
+        pages = server.requests - requests_before
+        if best is None or elapsed < best:
+            best = elapsed
+    return pages, rows, best
+
+
+def _bench_page_files(url):
+    """ Benchmark of Page.files for the tree root.
+
+        Args:
+            url(str): root URL of the mirror
+
+        Returns:
+            rows(int): number of parsed rows
+    """
+    page = Page(url)
+    return len(page.files) + len(page.subpages)
+
+
+def _bench_page_subpages(url):
+    """ Benchmark of Page.subpages for the tree root.
+
+        Args:
+            url(str): root URL of the mirror
+
+        Returns:
+            rows(int): number of parsed rows
+    """
+    page = Page(url)
+    return len(page.subpages) + len(page.files)
+
+
+def _bench_recursive(url, jobs=1, parse_processes=None):
+    """ Benchmark of recursive_page_search for the whole tree,
+        without the listing cache.
+
+        Args:
+            url(str): root URL of the mirror
+            jobs(int): number of directories fetched at once
+            parse_processes(int): number of processes parsing the pages
+
+        Returns:
+            rows(int): number of parsed rows - files and directories
+    """
+    rows = 0
+    dirs = set()
+    for file_data in iter_recursive_page_search(
+            url, jobs=jobs, parse_processes=parse_processes):
+        rows += 1
+        dirs.add(file_data['url'].rsplit('/', 1)[0])
+    return rows + max(0, len(dirs) - 1)
+
+
+def _bench_cli(url, jobs=1, parse_processes=None):
+    """ Benchmark of apache-search --recursive for the whole tree,
+        without the listing cache, output rendering included.
+
+        Args:
+            url(str): root URL of the mirror
+            jobs(int): number of directories fetched at once
+            parse_processes(int): number of processes parsing the pages
+
+        Returns:
+            rows(int): number of printed file rows
+
+        Raises:
+            RuntimeError: if the command fails
+    """
+    args = ['--recursive', '--no-cache', '--jobs', str(jobs), url]
+    if parse_processes:
+        args += ['--parse-processes', str(parse_processes)]
+    result = CliRunner().invoke(apache_search, args)
+    if result.exit_code != 0:
+        raise RuntimeError(f'apache-search failed: {result.output}')
+    return result.output.count('.tar.gz')
+
+
+@click.command('apache-search-benchmark')
+@click.option('--breadth', type=click.IntRange(min=0), default=3,
+              show_default=True,
+              help='Number of subdirectories in every directory.')
+@click.option('--depth', type=click.IntRange(min=0), default=3,
+              show_default=True,
+              help='Number of directory levels below the root.')
+@click.option('--entries', type=click.IntRange(min=0), default=200,
+              show_default=True, help='Number of files in every directory.')
+@click.option('--latency', type=click.FloatRange(min=0), default=0.0,
+              show_default=True,
+              help='Delay of every response, in seconds.')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1,
+              show_default=True,
+              help='Number of directories fetched at once.')
+@click.option('--parse-processes', type=click.IntRange(min=1), default=None,
+              help='Number of processes parsing the pages in the recursive '
+                   'benchmarks.')
+@click.option('--repeat', type=click.IntRange(min=1), default=3,
+              show_default=True, help='Number of timed runs.')
+@click.option('--no-memory', is_flag=True, default=False,
+              help='Do not measure the peak memory.')
+@click.option('--benchmark', 'names', multiple=True,
+              type=click.Choice(BENCHMARK_NAMES),
+              help='Benchmark to run, all by default. '
+                   'Can be given multiple times.')
+def main(breadth, depth, entries, latency, jobs, parse_processes, repeat,
+         no_memory, names):
+    """ Run apache-search benchmarks against the synthetic Apache mirror,
+        served from the local HTTP server.
+    """
+    tree = MirrorTree(breadth=breadth, depth=depth, entries=entries)
+    click.echo(f'>>>> Mirror: {tree.pages} directories, {tree.files} files')
+
+    results = run_benchmarks(tree, latency=latency, jobs=jobs, repeat=repeat,
+                             memory=not no_memory,
+                             names=names or BENCHMARK_NAMES,
+                             parse_processes=parse_processes)
+
+    table = list()
+    for result in results:
+        peak_memory = result['peak_memory']
+        table.append([
+            result['name'],
+            round(result['time'], 4),
+            round(result['pages'] / result['time'], 1),
+            round(result['rows'] / result['time'], 1),
+            round(peak_memory / 1024 / 1024, 2)
+            if peak_memory is not None else None
+        ])
+    click.echo(tabulate(table, headers=RESULT_HEADERS))
+
+
+if __name__ == '__main__':
+    main()
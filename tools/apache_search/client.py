@@ -0,0 +1,127 @@
+""" Module responsible for running the application through the daemon,
+    started by: apache-search daemon.
+
+    Arguments are sent to the daemon, and the output of the command is
+    written as it comes. Without the running daemon, or if the socket
+    is not owned by the current user, the command is run in this process.
+    Only the standard library is imported before connecting, so the client
+    starts fast.
+
+    Functions:
+        - run
+        - _connect
+        - _forward
+        - _iter_frames
+"""
+import json
+import os
+import socket
+import sys
+
+from tools.apache_search.src.ipc import EXIT
+from tools.apache_search.src.ipc import REQUEST
+from tools.apache_search.src.ipc import STDERR
+from tools.apache_search.src.ipc import STDOUT
+from tools.apache_search.src.ipc import default_socket_path
+from tools.apache_search.src.ipc import is_user_socket
+from tools.apache_search.src.ipc import recv_frame
+from tools.apache_search.src.ipc import send_frame
+
+
+def run():
+    """ Run the command through the daemon, and exit with its exit code."""
+    try:
+        connection = _connect(default_socket_path())
+    except PermissionError:
+        # The private socket directory was taken by another user.
+        connection = None
+    if connection is None:
+        # The application is imported only without the daemon,
+        # as this import is the startup cost the daemon saves.
+        from tools.apache_search.shell import run as run_locally
+        run_locally()
+        return
+
+    with connection:
+        code = _forward(connection, sys.argv[1:])
+    sys.exit(code)
+
+
+def _connect(socket_path):
+    """ Connect to the daemon socket, only if it is owned by the current
+        user, so the arguments are not sent to the daemon of other user.
+
+        Args:
+            socket_path(str): path to the Unix socket
+
+        Returns:
+            connection(socket.socket): connected socket, or None if
+                                       the daemon is not running, or
+                                       the socket is not owned by
+                                       the current user
+    """
+    if not is_user_socket(socket_path):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except OSError:
+        connection.close()
+        return None
+    return connection
+
+
+def _forward(connection, args):
+    """ Send the command arguments to the daemon, and write the output
+        of the command until it exits.
+
+        Args:
+            connection(socket.socket): socket connected to the daemon
+            args(list): command line arguments
+
+        Returns:
+            code(int): exit code of the command
+    """
+    request = {
+        'args': args,
+        'cwd': os.getcwd(),
+        'encoding': sys.stdout.encoding,
+        'errors': sys.stdout.errors
+    }
+    outputs = {STDOUT: sys.stdout, STDERR: sys.stderr}
+    try:
+        for kind, payload in _iter_frames(connection, request):
+            if kind == EXIT:
+                return int(payload)
+            if kind in outputs:
+                outputs[kind].flush()
+                outputs[kind].buffer.write(payload)
+                outputs[kind].buffer.flush()
+    except KeyboardInterrupt:
+        return 130
+
+    sys.stderr.write('>> ERR >> Daemon closed the connection.\n')
+    return 1
+
+
+def _iter_frames(connection, request):
+    """ Send the request to the daemon, and yield the frames
+        of the answer.
+
+        Args:
+            connection(socket.socket): socket connected to the daemon
+            request(dict): request with the keys: args, cwd, encoding,
+                           errors
+
+        Yields:
+            frame(tuple): (kind, payload) tuple; no more frames
+                          after the connection is lost
+    """
+    try:
+        send_frame(connection, REQUEST, json.dumps(request).encode('utf-8'))
+        frame = recv_frame(connection)
+        while frame is not None:
+            yield frame
+            frame = recv_frame(connection)
+    except OSError:
+        return
@@ -7,13 +7,13 @@ import sys
 
 from click import echo
 
-from tools.apache_search.src.cli.apache_search import apache_search
+from tools.apache_search.src.cli.main import main
 
 
 def run():
     """ Start the application and handle exceptions. """
     try:
-        apache_search()
+        main()
     except Exception:
         exc_type, exc_value, _ = sys.exc_info()
         echo('>> ERR >> {}: {}'.format(exc_type.__name__, exc_value))
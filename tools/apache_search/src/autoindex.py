@@ -0,0 +1,316 @@
+""" Module for parsing directory listings straight from the page text,
+    without building the BeautifulSoup tree.
+
+    Supported listings:
+        - Apache fancy index, as html table (F=2) or preformatted text (F=1)
+        - nginx autoindex, as html, json or xml
+
+    Every listing is turned into rows, described in the same way as
+    the Apache html table row: "img alt" values and text values of cells.
+
+    Classes:
+        - AutoindexParser
+
+    Functions:
+        - classify_alts
+        - parse_json_listing
+        - parse_xml_listing
+"""
+import json
+import re
+
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from html import unescape
+from xml.etree import ElementTree
+
+
+DIR_ALT = '[DIR]'
+FILE_ALT = '[   ]'
+PARENT_ALT = '[PARENTDIR]'
+SKIPPED_ALTS = ('[ICO]', PARENT_ALT, DIR_ALT)
+
+APACHE_DATETIME_FORMAT = '%Y-%m-%d %H:%M'
+NGINX_DATETIME_FORMAT = '%d-%b-%Y %H:%M'
+XML_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+START_REGEX = re.compile(r'<(tr|pre)[\s>]', re.I)
+ROW_REGEX = re.compile(r'<tr[\s>].*?</tr\s*>', re.S | re.I)
+ROW_START_REGEX = re.compile(r'<tr[\s>]', re.I)
+CELL_REGEX = re.compile(r'<td[^>]*>(.*?)</td\s*>', re.S | re.I)
+PRE_END_REGEX = re.compile(r'</pre\s*>', re.I)
+PRE_LINE_REGEX = re.compile(r'\n|<hr[^>]*>', re.I)
+LINK_REGEX = re.compile(
+    r'<a\s[^>]*?href="([^"]*)"[^>]*>(.*?)</a\s*>(.*)', re.S | re.I
+)
+ALT_REGEX = re.compile(r'<img[^>]*?\salt="([^"]*\[[A-Z ]+\][^"]*)"', re.I)
+NGINX_DATETIME_REGEX = re.compile(r'\d{2}-[A-Za-z]{3}-\d{4} \d{2}:\d{2}\Z')
+TAG_REGEX = re.compile(r'<[^>]*>')
+COLUMNS_REGEX = re.compile(r'\s{2,}')
+
+
+class AutoindexParser:
+    """ Incremental parser for the directory listing html page.
+        Page text can be fed in chunks, as it arrives from the server;
+        only the unfinished table row or text line is kept between chunks.
+
+        The listing layout is recognised by the first "tr" or "pre" tag:
+        Apache html table, or preformatted text used by Apache fancy index
+        (F=1) and nginx.
+
+        Each parsed row is a tuple of:
+        - alt_values: list of "img alt" values found in the row cells
+        - text_vals: list of stripped text values of the row cells,
+                     the same as BeautifulSoup would give for table rows
+    """
+    def __init__(self):
+        """ Constructor method for AutoindexParser class."""
+        self._buffer = ''
+        self._layout = None
+        self._recognised = False
+
+    @property
+    def recognised(self):
+        """ Check if the page was recognised as the directory listing,
+            which means at least one table row with cells, or one text
+            line with a link was found.
+
+            Returns:
+                self._recognised(bool): True if the layout is recognised
+        """
+        return self._recognised
+
+    def feed(self, text):
+        """ Parse the next chunk of the page text.
+
+            Args:
+                text(str): chunk of the page html code
+
+            Returns:
+                rows(list): list of (alt_values, text_vals) tuples,
+                            for every row completed in this chunk
+        """
+        self._buffer += text
+        if self._layout is None:
+            self._find_layout()
+        if self._layout == 'tr':
+            return self._feed_table()
+        if self._layout == 'pre':
+            return self._feed_pre()
+        return list()
+
+    def _find_layout(self):
+        """ Look for the beginning of the listing, to find its layout.
+            Page content before the listing is dropped.
+        """
+        start = START_REGEX.search(self._buffer)
+        if not start:
+            # Keep the tail, which can be the beginning of the listing tag.
+            self._buffer = self._buffer[-len('<pre'):]
+            return
+
+        self._buffer = self._buffer[start.start():]
+        tag_end = self._buffer.find('>')
+        if tag_end == -1:
+            return
+
+        self._layout = start.group(1).lower()
+        if self._layout == 'pre':
+            self._buffer = self._buffer[tag_end + 1:]
+
+    def _feed_table(self):
+        """ Parse all completed html table rows from the buffer.
+
+            Returns:
+                rows(list): list of (alt_values, text_vals) tuples
+        """
+        rows = list()
+        position = 0
+        for row_match in ROW_REGEX.finditer(self._buffer):
+            position = row_match.end()
+            row = self._parse_row(row_match.group())
+            if row is not None:
+                rows.append(row)
+
+        rest = self._buffer[position:]
+        row_start = ROW_START_REGEX.search(rest)
+        if row_start:
+            self._buffer = rest[row_start.start():]
+        else:
+            # Keep the tail, which can be the beginning of the next row tag.
+            self._buffer = rest[-len('<tr'):]
+        return rows
+
+    def _feed_pre(self):
+        """ Parse all completed lines of the preformatted listing
+            from the buffer.
+
+            Returns:
+                rows(list): list of (alt_values, text_vals) tuples
+        """
+        pre_end = PRE_END_REGEX.search(self._buffer)
+        if pre_end:
+            lines = PRE_LINE_REGEX.split(self._buffer[:pre_end.start()])
+            self._buffer = ''
+            self._layout = 'end'
+        else:
+            lines = PRE_LINE_REGEX.split(self._buffer)
+            self._buffer = lines.pop()
+
+        rows = list()
+        for line in lines:
+            row = self._parse_line(line)
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def _parse_row(self, row_html):
+        """ Parse single html table row to get alt and text values
+            of its cells.
+
+            Args:
+                row_html(str): html code of the table row
+
+            Returns:
+                row(tuple): (alt_values, text_vals) tuple, or None
+                            if the row has no table cells
+        """
+        cells = CELL_REGEX.findall(row_html)
+        if not cells:
+            return None
+        self._recognised = True
+
+        alt_values = list()
+        text_vals = list()
+        for cell in cells:
+            alt_match = ALT_REGEX.search(cell)
+            if alt_match:
+                alt_values.append(unescape(alt_match.group(1)))
+
+            text = unescape(TAG_REGEX.sub('', cell))
+            if text:
+                text_vals.append(text.strip())
+        return alt_values, text_vals
+
+    def _parse_line(self, line_html):
+        """ Parse single line of the preformatted listing, in format:
+            [<img alt="...">] <a href="...">name</a>  datetime  size  [desc]
+
+            Lines without "img alt" (nginx) get the alt value made from
+            the link, as directory links end with slash.
+
+            Args:
+                line_html(str): html code of the listing line
+
+            Returns:
+                row(tuple): (alt_values, text_vals) tuple, or None
+                            if the line has no link or it is the header
+                            with sorting links
+        """
+        link_match = LINK_REGEX.search(line_html)
+        if not link_match:
+            return None
+        href, name_html, rest_html = link_match.groups()
+        if href.startswith('?'):
+            return None
+        self._recognised = True
+
+        alt_match = ALT_REGEX.search(line_html[:link_match.start()])
+        if alt_match:
+            alt_values = [unescape(alt_match.group(1))]
+        elif href == '../':
+            alt_values = [PARENT_ALT]
+        elif href.endswith('/'):
+            alt_values = [DIR_ALT]
+        else:
+            alt_values = [FILE_ALT]
+
+        text_vals = [unescape(TAG_REGEX.sub('', name_html)).strip()]
+        rest = unescape(TAG_REGEX.sub('', rest_html)).strip()
+        for column in COLUMNS_REGEX.split(rest):
+            if NGINX_DATETIME_REGEX.match(column):
+                column = datetime.strptime(
+                    column, NGINX_DATETIME_FORMAT
+                ).strftime(APACHE_DATETIME_FORMAT)
+            text_vals.append(column)
+        return alt_values, text_vals
+
+
+def classify_alts(alt_values):
+    """ Decide if the row describes a file, a directory or neither
+        of them, by the "img alt" values found in the row.
+
+        Args:
+            alt_values(list): "img alt" values of the row cells
+
+        Returns:
+            target(str): "files", "dirs" or None if row should be skipped
+    """
+    if DIR_ALT in alt_values:
+        return 'dirs'
+    if any(alt not in SKIPPED_ALTS for alt in alt_values):
+        return 'files'
+    return None
+
+
+def parse_json_listing(text):
+    """ Parse the nginx autoindex listing in json format:
+        [{"name": "...", "type": "directory|file", "mtime": "...",
+          "size": 123}, ...]
+
+        Args:
+            text(str): json listing
+
+        Returns:
+            rows(list): list of (alt_values, text_vals) tuples
+    """
+    rows = list()
+    for entry in json.loads(text):
+        mtime = parsedate_to_datetime(entry['mtime'])
+        rows.append(_make_row(
+            entry['name'],
+            entry['type'] == 'directory',
+            mtime.strftime(APACHE_DATETIME_FORMAT),
+            entry.get('size')
+        ))
+    return rows
+
+
+def parse_xml_listing(text):
+    """ Parse the nginx autoindex listing in xml format:
+        <list><directory mtime="...">name</directory>
+        <file mtime="..." size="123">name</file></list>
+
+        Args:
+            text(str): xml listing
+
+        Returns:
+            rows(list): list of (alt_values, text_vals) tuples
+    """
+    rows = list()
+    for element in ElementTree.fromstring(text):
+        mtime = datetime.strptime(element.get('mtime'), XML_DATETIME_FORMAT)
+        rows.append(_make_row(
+            element.text,
+            element.tag == 'directory',
+            mtime.strftime(APACHE_DATETIME_FORMAT),
+            element.get('size')
+        ))
+    return rows
+
+
+def _make_row(name, is_dir, mtime, size):
+    """ Make the row from the machine readable listing entry.
+
+        Args:
+            name(str): file or directory name
+            is_dir(bool): True for directories
+            mtime(str): last modification date in Apache format
+            size(int): file size in bytes, None for directories
+
+        Returns:
+            row(tuple): (alt_values, text_vals) tuple
+    """
+    if is_dir:
+        return [DIR_ALT], [f'{name}/', mtime]
+    return [FILE_ALT], [name, mtime, str(size)]
@@ -0,0 +1,364 @@
+""" Module for storing parsed directory listings on disk, between runs.
+
+    The daemon keeps the caches open between the commands (keep_caches),
+    with the recently used listings also in memory.
+
+    Classes:
+        - ListingCache
+
+    Functions:
+        - default_cache_dir
+        - open_cache
+        - keep_caches
+        - dump_items
+        - load_items
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from tools.apache_search.src.entry import DirEntry
+from tools.apache_search.src.entry import FileEntry
+from tools.apache_search.src.entry import make_entry
+
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+# After exceeding the size cap, entries are evicted down to this part
+# of the cap, so the eviction does not run on every store.
+EVICTION_RATIO = 0.9
+DEFAULT_MEMORY_ITEMS = 10000
+# Caches kept open by keep_caches, by the directory and the size cap,
+# and the number of listings they keep in memory; None if not kept.
+_KEPT_CACHES = None
+
+
+class ListingCache:
+    """ Class for caching parsed directory listings on disk, keyed by URL.
+        Every entry keeps the file and subpage records together with
+        the ETag and Last-Modified validators of the response, used
+        to send conditional requests.
+
+        The total size of entries is capped; least recently used
+        entries are evicted first.
+
+        Optionally, the given number of recently used entries is also kept
+        in memory, already parsed, so they are not read from disk again.
+    """
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_SIZE,
+                 memory_items=0):
+        """ Constructor method for ListingCache class.
+
+            Args:
+                cache_dir(str): path to the cache directory, created
+                                with the first stored entry
+                max_size(int): maximum total size of entries in bytes
+                memory_items(int): number of entries kept in memory
+        """
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+        self._memory_items = memory_items
+        self._memory = OrderedDict()
+        self._size = None
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """ Get the cached listing of the given url.
+
+            Args:
+                url(str): full URL to the directory
+
+            Returns:
+                entry(dict): dictionary with keys: etag, last_modified,
+                             files, subpages; or None if not cached
+        """
+        entry = self._memory_get(url)
+        if entry is not None:
+            return entry
+
+        entry_path = self._entry_path(url)
+        try:
+            with open(entry_path, 'r') as entry_file:
+                entry = json.load(entry_file)
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('url') != url:
+            return None
+        entry['files'] = load_items(entry['files'])
+        entry['subpages'] = load_items(entry['subpages'])
+        self._memory_put(url, entry)
+        return entry
+
+    def put(self, url, etag, last_modified, files, subpages):
+        """ Store the listing of the given url.
+
+            Args:
+                url(str): full URL to the directory
+                etag(str): ETag header value of the response
+                last_modified(str): Last-Modified header value
+                files(list): list of dictionaries - file data
+                subpages(list): list of dictionaries - directory data
+        """
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'files': dump_items(files),
+            'subpages': dump_items(subpages)
+        }
+        entry_data = json.dumps(entry)
+
+        entry_path = self._entry_path(url)
+        with self._lock:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            size = self._get_size() - _file_size(entry_path)
+
+            tmp_fd, tmp_path = tempfile.mkstemp(dir=self._cache_dir,
+                                                suffix='.tmp')
+            with os.fdopen(tmp_fd, 'w') as tmp_file:
+                tmp_file.write(entry_data)
+            os.replace(tmp_path, entry_path)
+
+            self._size = size + len(entry_data)
+            if self._size > self._max_size:
+                self._evict()
+
+        self._memory_put(url, {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'files': list(files),
+            'subpages': list(subpages)
+        })
+
+    def _memory_get(self, url):
+        """ Get the listing of the given url kept in memory.
+
+            Args:
+                url(str): full URL to the directory
+
+            Returns:
+                entry(dict): copy of the entry, or None if not kept
+        """
+        if not self._memory_items:
+            return None
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is None:
+                return None
+            self._memory.move_to_end(url)
+
+        entry = dict(entry)
+        entry['files'] = list(entry['files'])
+        entry['subpages'] = list(entry['subpages'])
+        return entry
+
+    def _memory_put(self, url, entry):
+        """ Keep the listing of the given url in memory, and forget
+            the least recently used ones above the limit.
+
+            Args:
+                url(str): full URL to the directory
+                entry(dict): entry with the parsed files and subpages
+        """
+        if not self._memory_items:
+            return
+        entry = dict(entry)
+        entry['files'] = list(entry['files'])
+        entry['subpages'] = list(entry['subpages'])
+        with self._lock:
+            self._memory[url] = entry
+            self._memory.move_to_end(url)
+            while len(self._memory) > self._memory_items:
+                self._memory.popitem(last=False)
+
+    def _entry_path(self, url):
+        """ Get the path to the cache entry file of the given url.
+
+            Args:
+                url(str): full URL to the directory
+
+            Returns:
+                entry_path(str): path to the entry file
+        """
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self._cache_dir, f'{key}.json')
+
+    def _list_entries(self):
+        """ List all cache entry files, with their size and last use time.
+
+            Returns:
+                entries(list): list of (last_use, size, path) tuples
+        """
+        entries = list()
+        try:
+            names = os.listdir(self._cache_dir)
+        except OSError:
+            return entries
+
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self._cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _get_size(self):
+        """ Get the total size of the cache entries. Directory is scanned
+            only once, later the size is tracked in memory.
+
+            Returns:
+                self._size(int): total size of entries in bytes
+        """
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._list_entries())
+        return self._size
+
+    def _evict(self):
+        """ Remove least recently used entries, until the total size
+            of the cache is below the eviction threshold.
+        """
+        threshold = self._max_size * EVICTION_RATIO
+        for _, size, path in sorted(self._list_entries()):
+            if self._size <= threshold:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._size -= size
+
+
+def default_cache_dir():
+    """ Get the default cache directory path, according to the XDG base
+        directory specification.
+
+        Returns:
+            cache_dir(str): path to the cache directory
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache'
+    )
+    return os.path.join(cache_home, 'apache-search')
+
+
+def open_cache(cache_dir, max_size=DEFAULT_MAX_SIZE):
+    """ Open the listing cache. Inside keep_caches, the same cache
+        is returned for the same directory and size cap, with
+        the recently used listings kept in memory.
+
+        Args:
+            cache_dir(str): path to the cache directory
+            max_size(int): maximum total size of entries in bytes
+
+        Returns:
+            cache(ListingCache): listing cache
+    """
+    if _KEPT_CACHES is None:
+        return ListingCache(cache_dir, max_size=max_size)
+
+    caches, memory_items = _KEPT_CACHES
+    key = (os.path.abspath(cache_dir), max_size)
+    if key not in caches:
+        caches[key] = ListingCache(cache_dir, max_size=max_size,
+                                   memory_items=memory_items)
+    return caches[key]
+
+
+@contextmanager
+def keep_caches(memory_items=DEFAULT_MEMORY_ITEMS):
+    """ Keep the caches opened inside the context by open_cache,
+        and reuse them by the later searches.
+
+        Args:
+            memory_items(int): number of listings every kept cache
+                               keeps in memory
+
+        Yields:
+            caches(dict): kept caches, by the directory and the size cap
+    """
+    global _KEPT_CACHES  # pylint: disable=global-statement
+    _KEPT_CACHES = (dict(), memory_items)
+    try:
+        yield _KEPT_CACHES[0]
+    finally:
+        _KEPT_CACHES = None
+
+
+def dump_items(items):
+    """ Convert file/directory records to the json serializable form.
+        Entries are dumped with their raw values, so their lazy values
+        are not computed by the dump.
+
+        Args:
+            items(list): list of dictionaries - file or directory data
+
+        Returns:
+            dumped_items(list): list of dictionaries with datetime
+                                converted to string; entry dates not
+                                parsed yet are kept in listing format
+    """
+    dumped_items = list()
+    for item in items:
+        if isinstance(item, (FileEntry, DirEntry)):
+            dumped_item = item.raw_values()
+        else:
+            dumped_item = dict(item)
+        if isinstance(dumped_item.get('datetime'), datetime):
+            dumped_item['datetime'] = dumped_item['datetime'].strftime(
+                DATETIME_FORMAT
+            )
+        dumped_items.append(dumped_item)
+    return dumped_items
+
+
+def load_items(dumped_items):
+    """ Convert file/directory records back from the json serializable form.
+
+        Args:
+            dumped_items(list): list of dictionaries given by dump_items
+
+        Returns:
+            items(list): list of FileEntry/DirEntry - file or directory data;
+                         records without name, stored by older versions,
+                         are skipped
+    """
+    items = list()
+    for item in dumped_items:
+        if 'name' not in item and 'dir' not in item:
+            continue
+        # Dates in listing format, without the "T" separator, are parsed
+        # by the entry on demand.
+        if 'T' in item.get('datetime', ''):
+            item['datetime'] = datetime.strptime(
+                item['datetime'], DATETIME_FORMAT
+            )
+        items.append(make_entry(item))
+    return items
+
+
+def _file_size(path):
+    """ Get size of the file, or 0 if it does not exist.
+
+        Args:
+            path(str): path to the file
+
+        Returns:
+            size(int): file size in bytes
+    """
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
@@ -2,32 +2,127 @@
 
     Functions:
         - apache_search
+        - _read_urls
+        - _search_batch
+        - _echo_batch_table
+        - _iter_single_pages
         - _create_table
+        - _download_files
+
+    Modules of the search, download and table rendering, which import
+    the HTTP and HTML parsing libraries, are imported only on the code path
+    using them, after the arguments are validated. So --help and usage
+    errors do not wait for them.
 """
-import click
+import time
+
+from collections import OrderedDict
+from itertools import chain
 
-from tabulate import tabulate
+import click
 
-from tools.apache_search.src.page_search import single_page_search_files
-from tools.apache_search.src.page_search import single_page_search_dirs
-from tools.apache_search.src.page_search import recursive_page_search
+from tools.apache_search.src.cli.options import cache_options
+from tools.apache_search.src.cli.options import filter_options
+from tools.apache_search.src.cli.options import make_cache
+from tools.apache_search.src.cli.options import make_crawl_filter
+from tools.apache_search.src.cli.options import request_options
+from tools.apache_search.src.cli.options import walk_options
+from tools.apache_search.src.cli.report import echo_aliases
+from tools.apache_search.src.cli.report import echo_failures
+from tools.apache_search.src.cli.report import echo_stats
+from tools.apache_search.src.cli.report import result_rows
+from tools.apache_search.src.cli.report import stream_table
+from tools.apache_search.src.cli.report import write_records
+from tools.apache_search.src.defaults import DEFAULT_SEGMENTS
+from tools.apache_search.src.output import BATCH_FIELDS
+from tools.apache_search.src.output import MACHINE_FORMATS
+from tools.apache_search.src.snapshot import Snapshot
+from tools.apache_search.src.stats import CrawlStats
 
 
 @click.command('apache-search')
 @click.option('--recursive', '-r', is_flag=True, default=False,
               help='Search for files in all nested directories.')
+@click.option('--snapshot', type=click.Path(dir_okay=False), default=None,
+              help='Snapshot file of the previous search with --recursive. '
+                   'Directories without subdirectories, not modified since '
+                   'then, are not fetched.')
+@cache_options
+@filter_options
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1,
+              show_default=True,
+              help='Maximum number of directories fetched at once with '
+                   '--recursive, and files downloaded at once with '
+                   '--download. Requests sent at once to a server are '
+                   'adjusted to its response times and throttling.')
+@request_options
+@walk_options
+@click.option('--keep-going', is_flag=True, default=False,
+              help='Skip directories which can not be fetched with '
+                   '--recursive, and files which can not be downloaded, '
+                   'and list them after the search.')
+@click.option('--max-rate', type=click.FloatRange(min=0.01), default=None,
+              help='Maximum number of requests per second sent to a server '
+                   'with --recursive.')
+@click.option('--parse-processes', type=click.IntRange(min=1), default=None,
+              help='Number of processes parsing the directory listings '
+                   'with --recursive, so big listings are parsed on many '
+                   'cores while --jobs threads fetch them. By default, '
+                   'listings are parsed by the fetching threads.')
+@click.option('--detect-aliases', is_flag=True, default=False,
+              help='Skip directories with the same listing as a directory '
+                   'searched before with --recursive, e.g. symbolic links '
+                   'to other directories, and list them after the search. '
+                   'Separate copies of a directory are skipped too.')
+@click.option('--download', 'download_dir',
+              type=click.Path(file_okay=False), default=None,
+              help='Download the found files into the directory, keeping '
+                   'their paths below URL. Files already downloaded are '
+                   'skipped, and interrupted downloads are resumed.')
+@click.option('--segments', type=click.IntRange(min=1),
+              default=DEFAULT_SEGMENTS, show_default=True,
+              help='Maximum number of parts of a big file downloaded '
+                   'at once with --download.')
+@click.option('--stats', 'show_stats', is_flag=True, default=False,
+              help='Show statistics of the search on stderr: time of every '
+                   'phase, requests, bytes received, status codes and '
+                   'the slowest directories.')
+@click.option('--format', 'output_format',
+              type=click.Choice(('table',) + MACHINE_FORMATS),
+              default='table', show_default=True,
+              help='Output format: table, JSON Lines, CSV, TSV, or full '
+                   'URLs terminated with NUL character. Machine formats '
+                   'are written record by record, without the section '
+                   'headers; --display-url limits jsonl, csv and tsv '
+                   'records to the url field.')
 @click.option('--dirs', '-d', is_flag=True, default=False,
               help='Show directories only.')
 @click.option('--files', '-f', is_flag=True, default=False,
               help='Show files only.')
 @click.option('--display-url', '-u', is_flag=True, required=False,
               default=False, help='Show URLs only.')
-@click.argument('URL')
-def apache_search(url, display_url, files, dirs, recursive):
+@click.option('--url-file', type=click.File('r'), default=None,
+              help='File with the URLs to search, one per line, or - for '
+                   'stdin. Empty lines and lines starting with # are '
+                   'skipped.')
+@click.argument('URLS', nargs=-1)
+def apache_search(urls, url_file, display_url, files, dirs, output_format,
+                  show_stats, segments, download_dir, detect_aliases,
+                  parse_processes, max_rate, keep_going, max_memory, order,
+                  retries, timeout, jobs, exclude_dirs, include_dirs,
+                  max_depth, max_size, min_size, newer_than, regex, names,
+                  cache_dir, cache_size, no_cache, snapshot, recursive):
     """ Get html code from the Apache directory server (httpd),
         and search for files and directories.
 
         URL argument must be a full path to the directory we want to parse.
+        Many URLs can be given, also with --url-file. Then every directory
+        is fetched at most once, results are labelled by the most nested
+        URL containing them, and roots nested in other roots are walked
+        as a part of the outer root.
+
+        Parsed listings are cached on disk, and later runs ask the server
+        only if they were modified.
 
         \b
         Examples:
@@ -41,8 +136,45 @@ def apache_search(url, display_url, files, dirs, recursive):
                         apache-search http://<page>/directory -r
             - full file urls from all nested directories:
                         apache-search http://<page>/directory -r -u
+            - files from all nested directories, 8 directories at once:
+                        apache-search http://<page>/directory -r -j 8
+            - tarballs from all nested directories, without old releases:
+                        apache-search http://<page>/directory -r \\
+                            --name '*.tar.gz' --exclude-dir old
+            - files from all nested directories, skipping directories
+              which can not be fetched:
+                        apache-search http://<page>/directory -r \\
+                            --keep-going --timeout 10 --retries 5
+            - tarball urls from all nested directories, downloaded
+              by wget:
+                        apache-search http://<page>/directory -r \\
+                            --name '*.tar.gz' --format urls0 \\
+                            | xargs -0 wget
+            - tarballs from all nested directories, downloaded 4 at once:
+                        apache-search http://<page>/directory -r \\
+                            --name '*.tar.gz' --download mirror -j 4
+            - files from all nested directories as JSON Lines:
+                        apache-search http://<page>/directory -r \\
+                            --format jsonl
+            - files from all nested directories, with time of every phase
+              and the slowest directories:
+                        apache-search http://<page>/directory -r --stats
+            - files from all nested directories, skipping directories
+              without subdirectories not modified since the previous
+              search:
+                        apache-search http://<page>/directory -r \\
+                            --snapshot directory.json
+            - files from all nested directories of the listed URLs:
+                        apache-search -r --url-file urls.txt
     """
-    click.echo(f'>>>> Displaying content of: {url}')
+    urls = _read_urls(urls, url_file)
+    if not urls:
+        raise click.UsageError('Missing argument "URL", or --url-file.')
+
+    table_format = output_format == 'table'
+    if table_format:
+        for url in urls:
+            click.echo(f'>>>> Displaying content of: {url}')
 
     if files and dirs:
         raise click.ClickException(
@@ -55,18 +187,101 @@ def apache_search(url, display_url, files, dirs, recursive):
             'together. --recursive option displays only files.'
         )
 
+    if snapshot and not recursive:
+        raise click.ClickException(
+            'Option: --snapshot can be used only with --recursive.'
+        )
+
+    if (detect_aliases or parse_processes or order or max_memory) \
+            and not recursive:
+        raise click.ClickException(
+            'Options: --detect-aliases, --parse-processes, --order and '
+            '--max-memory can be used only with --recursive.'
+        )
+
+    if snapshot and max_memory:
+        raise click.ClickException(
+            'Options: --snapshot and --max-memory can not be used together. '
+            '--snapshot keeps the whole tree in memory.'
+        )
+
+    if download_dir and (dirs or not table_format):
+        raise click.ClickException(
+            'Options: --download and (--dirs or --format) can not be used '
+            'together.'
+        )
+
+    if (max_depth is not None or include_dirs or exclude_dirs) \
+            and not recursive:
+        raise click.ClickException(
+            'Options: --max-depth, --include-dir and --exclude-dir can be '
+            'used only with --recursive.'
+        )
+
+    if len(urls) > 1 and (snapshot or download_dir):
+        raise click.ClickException(
+            'Options: --snapshot and --download can be used only with '
+            'a single URL.'
+        )
+
+    if len(urls) > 1 and max_memory:
+        raise click.ClickException(
+            'Option: --max-memory can be used only with a single URL. '
+            'The search of several URLs keeps listings of all visited '
+            'directories in memory.'
+        )
+
+    crawl_filter = make_crawl_filter(names, regex, newer_than, min_size,
+                                     max_size, max_depth, include_dirs,
+                                     exclude_dirs)
+    cache = make_cache(no_cache, cache_dir, cache_size)
+
+    stats = CrawlStats() if show_stats else None
+
     file_headers = ['Name', 'Datetime', 'Size']
     dir_headers = ['Dir', 'Datetime']
 
     if display_url:
         file_headers = ['Url']
         dir_headers = ['Url']
+    record_fields = ('url',) if display_url else None
+    output_phase = 'download' if download_dir else 'render'
+    failures = list()
+    aliases = list()
+    url = urls[0]
 
-    if not recursive:
-        file_list = single_page_search_files(url)
-        dir_list = single_page_search_dirs(url)
+    if len(urls) > 1:
+        _search_batch(urls, recursive, files, dirs, output_format,
+                      display_url, crawl_filter, cache, stats, jobs,
+                      max_rate, timeout, retries, keep_going, failures,
+                      detect_aliases, aliases, parse_processes, order,
+                      max_memory)
 
-        if not files and not dirs:
+    elif not recursive:
+        from tools.apache_search.src.page_search import single_page_search
+
+        search_start = time.perf_counter()
+        file_list, dir_list = single_page_search(url, cache=cache,
+                                                 timeout=timeout,
+                                                 retries=retries,
+                                                 stats=stats)
+        if crawl_filter is not None:
+            file_list = list(filter(crawl_filter.match_file, file_list))
+        render_start = time.perf_counter()
+
+        if download_dir:
+            _download_files(file_list, url, download_dir, jobs, segments,
+                            timeout, retries, keep_going, failures)
+
+        elif not table_format:
+            items = list()
+            if not dirs:
+                items = file_list
+            if not files:
+                items = chain(items, dir_list)
+            write_records(items, output_format, record_fields)
+
+        elif not files and not dirs:
             files_table = _create_table(file_list, file_headers)
             click.echo('>>>> FILES')
             click.echo(files_table)
@@ -89,12 +304,234 @@ def apache_search(url, display_url, files, dirs, recursive):
             click.echo('>>>> DIRECTORIES')
             click.echo(dir_table)
             click.echo()
+
+        if stats is not None:
+            stats.add_time('search', render_start - search_start)
+            stats.add_time(output_phase, time.perf_counter() - render_start)
     else:
-        files_list = recursive_page_search(url)
-        files_table = _create_table(files_list, file_headers)
-        click.echo('>>>> FILES')
-        click.echo(files_table)
-        click.echo()
+        from tools.apache_search.src.page_search import \
+            iter_recursive_page_search
+
+        previous_snapshot = None
+        if snapshot:
+            previous_snapshot = Snapshot.load(snapshot)
+
+        files_iter = iter_recursive_page_search(
+            url, jobs=jobs, cache=cache, snapshot=previous_snapshot,
+            crawl_filter=crawl_filter, max_rate=max_rate, timeout=timeout,
+            retries=retries, keep_going=keep_going, failures=failures,
+            stats=stats, detect_aliases=detect_aliases, aliases=aliases,
+            parse_processes=parse_processes, order=order,
+            max_memory=max_memory
+        )
+        if stats is not None:
+            files_iter = stats.iter_phase('search', files_iter)
+        output_start = time.perf_counter()
+        if download_dir:
+            _download_files(files_iter, url, download_dir, jobs, segments,
+                            timeout, retries, keep_going, failures)
+        elif table_format:
+            click.echo('>>>> FILES')
+            for line in stream_table(files_iter, file_headers):
+                click.echo(line)
+            click.echo()
+        else:
+            write_records(files_iter, output_format, record_fields)
+        if stats is not None:
+            stats.add_time(output_phase, time.perf_counter() - output_start
+                           - stats.phases['search'])
+
+        if snapshot:
+            previous_snapshot.save(snapshot)
+
+    # Machine formats keep stdout for the records only.
+    if aliases:
+        echo_aliases(aliases, err=not table_format)
+
+    if failures:
+        echo_failures(failures, err=not table_format)
+
+    if stats is not None:
+        echo_stats(stats)
+
+    if failures:
+        if download_dir:
+            raise click.ClickException(
+                f'{len(failures)} directories or files could not be fetched.'
+            )
+        raise click.ClickException(
+            f'{len(failures)} directories could not be fetched.'
+        )
+
+
+def _read_urls(urls, url_file):
+    """ Get the distinct URLs from the arguments and the URL file,
+        in the given order.
+
+        Args:
+            urls(tuple): URL arguments
+            url_file(file): file with one URL per line, or None
+
+        Returns:
+            urls(list): distinct URLs
+    """
+    all_urls = list(urls)
+    if url_file is not None:
+        for line in url_file:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                all_urls.append(line)
+    return list(OrderedDict.fromkeys(all_urls))
+
+
+def _search_batch(urls, recursive, files, dirs, output_format, display_url,
+                  crawl_filter, cache, stats, jobs, max_rate, timeout,
+                  retries, keep_going, failures, detect_aliases, aliases,
+                  parse_processes, order, max_memory):
+    """ Search all URLs with the shared session, and show the results
+        labelled by the URL.
+
+        Args:
+            urls(list): full URLs to the searched directories
+            recursive(bool): if True, all nested directories are searched
+            files(bool): if True, only files are shown
+            dirs(bool): if True, only directories are shown
+            output_format(str): table, or one of output.MACHINE_FORMATS
+            display_url(bool): if True, only URLs are shown
+            crawl_filter(CrawlFilter): filter of files and directories
+            cache(ListingCache): cache of parsed listings
+            stats(CrawlStats): statistics of the search
+            jobs(int): number of directories fetched at once
+            max_rate(float): maximum number of requests per second
+            timeout(float): connect and read timeout, in seconds
+            retries(int): number of retries after transient errors
+            keep_going(bool): if True, failed directories are added
+                              to failures, instead of stopping the search
+            failures(list): list of (url, error) tuples, extended with
+                            failed directories
+            detect_aliases(bool): if True, aliases of searched directories
+                                  are skipped
+            aliases(list): list of (url, original_url) tuples, extended
+                           with skipped aliases
+            parse_processes(int): number of processes parsing the pages
+                                  with recursive, or None
+            order(str): order of walking the directories with recursive,
+                        or None
+            max_memory(int): memory of the directories waiting to be
+                             searched with recursive, or None
+
+        Raises:
+            OSError: if the directory can not be fetched, and keep_going
+                     is False
+    """
+    if recursive:
+        from tools.apache_search.src.page_search import \
+            iter_batch_page_search
+
+        labelled_items = iter_batch_page_search(
+            urls, jobs=jobs, cache=cache, crawl_filter=crawl_filter,
+            max_rate=max_rate, timeout=timeout, retries=retries,
+            keep_going=keep_going, failures=failures, stats=stats,
+            detect_aliases=detect_aliases, aliases=aliases,
+            parse_processes=parse_processes, order=order,
+            max_memory=max_memory
+        )
+    else:
+        labelled_items = _iter_single_pages(
+            urls, files, dirs, crawl_filter, cache, stats, jobs, timeout,
+            retries, keep_going, failures
+        )
+    items = (dict(item, root=root) for root, item in labelled_items)
+    if stats is not None:
+        items = stats.iter_phase('search', items)
+    output_start = time.perf_counter()
+
+    if output_format != 'table':
+        fields = ('root', 'url') if display_url else BATCH_FIELDS
+        write_records(items, output_format, fields)
+    else:
+        _echo_batch_table(items, recursive, files, dirs, display_url)
+
+    if stats is not None:
+        stats.add_time('render', time.perf_counter() - output_start
+                       - stats.phases['search'])
+
+
+def _echo_batch_table(items, recursive, files, dirs, display_url):
+    """ Show the files and directories of the batch search in a single
+        table, with the searched URL in the first column.
+
+        Args:
+            items(iterable): file or directory data dicts, with root key
+            recursive(bool): if True, all nested directories were searched
+            files(bool): if True, only files are shown
+            dirs(bool): if True, only directories are shown
+            display_url(bool): if True, only URLs are shown
+    """
+    headers = ['Root', 'Name', 'Datetime', 'Size']
+    if display_url:
+        headers = ['Root', 'Url']
+    elif dirs:
+        headers = ['Root', 'Dir', 'Datetime']
+    elif not files and not recursive:
+        headers = ['Root', 'Name', 'Dir', 'Datetime', 'Size']
+    click.echo('>>>> DIRECTORIES' if dirs else '>>>> FILES')
+    for line in stream_table(items, headers):
+        click.echo(line)
+    click.echo()
+
+
+def _iter_single_pages(urls, files, dirs, crawl_filter, cache, stats, jobs,
+                       timeout, retries, keep_going, failures):
+    """ Generate files and directories of every URL, without walking
+        the nested directories.
+
+        Args:
+            urls(list): full URLs to the searched directories
+            files(bool): if True, only files are generated
+            dirs(bool): if True, only directories are generated
+            crawl_filter(CrawlFilter): filter of files
+            cache(ListingCache): cache of parsed listings
+            stats(CrawlStats): statistics of the search
+            jobs(int): connection pool size of the shared session
+            timeout(float): connect and read timeout, in seconds
+            retries(int): number of retries after transient errors
+            keep_going(bool): if True, failed directories are added
+                              to failures, instead of stopping the search
+            failures(list): list of (url, error) tuples, extended with
+                            failed directories
+
+        Yields:
+            item(tuple): (url, item) tuple - searched URL and the file
+                         or directory data
+
+        Raises:
+            OSError: if the directory can not be fetched, and keep_going
+                     is False
+    """
+    from tools.apache_search.src.page_search import single_page_search
+    from tools.apache_search.src.session import create_session
+
+    with create_session(pool_size=jobs) as session:
+        for url in urls:
+            try:
+                file_list, dir_list = single_page_search(
+                    url, session=session, cache=cache, timeout=timeout,
+                    retries=retries, stats=stats
+                )
+            except OSError as error:
+                if not keep_going:
+                    raise
+                failures.append((url, str(error)))
+                continue
+            if crawl_filter is not None:
+                file_list = filter(crawl_filter.match_file, file_list)
+            if not dirs:
+                for item in file_list:
+                    yield url, item
+            if not files:
+                for item in dir_list:
+                    yield url, item
 
 
 def _create_table(data_list, headers):
@@ -107,6 +544,8 @@ def _create_table(data_list, headers):
         Returns:
             new_table(tabulate): created table, ready to print
     """
+    from tabulate import tabulate
+
     list_table = list()
     for row in data_list:
         row_data = list()
@@ -119,3 +558,38 @@ def _create_table(data_list, headers):
         list_table.append(row_data)
     new_table = tabulate(list_table, headers=headers)
     return new_table
+
+
+def _download_files(files_iter, url, download_dir, jobs, segments, timeout,
+                    retries, keep_going, failures):
+    """ Download the files, and show the result of every file as soon
+        as its download finishes.
+
+        Args:
+            files_iter(iterable): file data dicts
+            url(str): full URL to the searched directory
+            download_dir(str): local directory of the downloaded files
+            jobs(int): number of files downloaded at once
+            segments(int): number of parts of a big file downloaded at once
+            timeout(float): connect and read timeout, in seconds
+            retries(int): number of retries after transient errors
+            keep_going(bool): if True, failed files are added to failures,
+                              instead of stopping the downloads
+            failures(list): list of (url, error) tuples, extended with
+                            failed files
+
+        Raises:
+            click.ClickException: if the file can not be downloaded,
+                                  and keep_going is False
+    """
+    from tools.apache_search.src.download import Downloader
+
+    with Downloader(download_dir, url, jobs=jobs, segments=segments,
+                    timeout=timeout, retries=retries) as downloader:
+        results = downloader.download_all(files_iter)
+        click.echo('>>>> DOWNLOADS')
+        for line in stream_table(
+                result_rows(results, keep_going, failures),
+                ['Path', 'Size', 'Status']):
+            click.echo(line)
+        click.echo()
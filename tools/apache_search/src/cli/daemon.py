@@ -0,0 +1,73 @@
+""" Module consist of daemon command for apache-search script.
+    The daemon module, with the HTTP libraries, is imported only when
+    the command runs.
+
+    Functions:
+        - daemon
+"""
+import signal
+
+import click
+
+from tools.apache_search.src.cache import DEFAULT_MEMORY_ITEMS
+from tools.apache_search.src.ipc import default_socket_path
+
+
+@click.command('daemon')
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False),
+              default=None,
+              help='Path to the Unix socket.  [default: $APACHE_SEARCH_SOCKET'
+                   ', or apache-search.sock in $XDG_RUNTIME_DIR or in the '
+                   'private apache-search-<uid> directory of the temporary '
+                   'directory]')
+@click.option('--memory-listings', type=click.IntRange(min=0),
+              default=DEFAULT_MEMORY_ITEMS, show_default=True,
+              help='Number of parsed listings kept in memory, for every '
+                   'cache directory.')
+def daemon(socket_path, memory_listings):
+    """ Run the daemon serving the commands sent by apache-search-client.
+
+        The client takes the same arguments as apache-search, and prints
+        the output of the command run by the daemon. The daemon keeps
+        the application imported, the connections to the servers open,
+        and the recently used listings in memory, so repeated searches
+        take milliseconds. Without the running daemon, or if the socket
+        is not owned by the current user, the client runs the command
+        itself.
+
+        Commands are run one at a time, in the working directory of the
+        client, with the environment of the daemon. Standard input is not
+        forwarded, so --url-file - can not be used through the client.
+
+        \b
+        Examples:
+            - daemon on the default socket:
+                apache-search daemon &
+                apache-search-client https://test/url -r -f
+            - daemon on the given socket:
+                apache-search daemon --socket /tmp/search.sock &
+                APACHE_SEARCH_SOCKET=/tmp/search.sock \\
+                    apache-search-client https://test/url -r -f
+    """
+    from tools.apache_search.src.daemon import Daemon
+
+    ctx = click.get_current_context()
+    if ctx.find_object(Daemon) is not None:
+        raise click.ClickException(
+            'Daemon can not be started through the client.'
+        )
+
+    try:
+        socket_path = socket_path or default_socket_path()
+        server = Daemon(ctx.find_root().command, socket_path,
+                        memory_items=memory_listings)
+        server.listen()
+    except (FileExistsError, PermissionError) as error:
+        raise click.ClickException(str(error))
+
+    signal.signal(signal.SIGTERM, lambda *_: server.stop())
+    click.echo(f'>>>> Listening on: {socket_path}', err=True)
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,188 @@
+""" Module consist of index and query commands for apache-search script.
+    The table module is imported only when the index summary is shown.
+
+    Functions:
+        - index
+        - query
+"""
+import os
+
+import click
+
+from tools.apache_search.src.cli.options import cache_options
+from tools.apache_search.src.cli.options import dir_filter_options
+from tools.apache_search.src.cli.options import file_filter_options
+from tools.apache_search.src.cli.options import make_cache
+from tools.apache_search.src.cli.options import make_crawl_filter
+from tools.apache_search.src.cli.options import request_options
+from tools.apache_search.src.cli.report import echo_failures
+from tools.apache_search.src.cli.report import echo_stats
+from tools.apache_search.src.cli.report import stream_table
+from tools.apache_search.src.cli.report import write_records
+from tools.apache_search.src.index import SORT_KEYS
+from tools.apache_search.src.index import ListingIndex
+from tools.apache_search.src.index import default_index_path
+from tools.apache_search.src.output import MACHINE_FORMATS
+from tools.apache_search.src.stats import CrawlStats
+from tools.apache_search.src.urls import normalize_url
+
+
+DB_OPTION = click.option(
+    '--db', type=click.Path(dir_okay=False), default=None,
+    help='Index database file.  [default: ~/.cache/apache-search/'
+         'index.sqlite]'
+)
+
+
+def _open_index(db):
+    """ Open the index database, creating its directory if needed.
+
+        Args:
+            db(str): path to the database file, or None for default
+
+        Returns:
+            index(ListingIndex): opened index
+    """
+    db = db or default_index_path()
+    db_dir = os.path.dirname(os.path.abspath(db))
+    os.makedirs(db_dir, exist_ok=True)
+    return ListingIndex(db)
+
+
+@click.command('index')
+@DB_OPTION
+@cache_options
+@dir_filter_options
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1,
+              show_default=True,
+              help='Maximum number of directories fetched at once.')
+@request_options
+@click.option('--keep-going', is_flag=True, default=False,
+              help='Skip directories which can not be fetched, and list '
+                   'them after the crawl. The index is not changed then.')
+@click.option('--max-rate', type=click.FloatRange(min=0.01), default=None,
+              help='Maximum number of requests per second sent to a server.')
+@click.option('--stats', 'show_stats', is_flag=True, default=False,
+              help='Show statistics of the crawl on stderr.')
+@click.argument('URL')
+def index(url, show_stats, max_rate, keep_going, retries, timeout, jobs,
+          exclude_dirs, include_dirs, max_depth, cache_dir, cache_size,
+          no_cache, db):
+    """ Crawl the Apache directory server tree, and store its files
+        and directories in the local index, for the query command.
+
+        The next run for the same URL skips directories without
+        subdirectories, which modification date has not changed since
+        then; all other directories are requested again, conditionally
+        with the listing cache, and only changed records are updated.
+
+        \b
+        Examples:
+            - index of the whole tree, 8 directories at once:
+                        apache-search index http://<page>/directory -j 8
+            - index in the given database file:
+                        apache-search index http://<page>/directory \\
+                            --db mirror.sqlite
+    """
+    stats = CrawlStats() if show_stats else None
+    failures = list()
+    with _open_index(db) as listing_index:
+        walked, written = listing_index.refresh(
+            url, failures=failures, jobs=jobs,
+            cache=make_cache(no_cache, cache_dir, cache_size),
+            crawl_filter=make_crawl_filter(None, None, None, None, None,
+                                           max_depth, include_dirs,
+                                           exclude_dirs),
+            max_rate=max_rate, timeout=timeout, retries=retries,
+            keep_going=keep_going, stats=stats
+        )
+        roots = {root: (directories, entries)
+                 for root, directories, entries in listing_index.roots()}
+
+    from tabulate import tabulate
+
+    directories, entries = roots.get(normalize_url(url), (0, 0))
+    click.echo(f'>>>> Indexed: {url}')
+    click.echo(tabulate([
+        ['Directories walked', walked],
+        ['Directories written', written],
+        ['Directories indexed', directories],
+        ['Files and directories indexed', entries],
+    ]))
+    click.echo()
+
+    if failures:
+        echo_failures(failures)
+
+    if stats is not None:
+        echo_stats(stats)
+
+    if failures:
+        raise click.ClickException(
+            f'{len(failures)} directories could not be fetched, '
+            f'the index is not updated.'
+        )
+
+
+@click.command('query')
+@DB_OPTION
+@click.option('--root', default=None,
+              help='Query only the tree indexed from the given URL.')
+@file_filter_options
+@click.option('--path', 'paths', multiple=True, metavar='PATTERN',
+              help='Select results with paths relative to the indexed URL '
+                   'matching the glob pattern. Can be given multiple '
+                   'times.')
+@click.option('--sort', type=click.Choice(SORT_KEYS), default='path',
+              show_default=True, help='Sort the results by the given key.')
+@click.option('--reverse', is_flag=True, default=False,
+              help='Sort in descending order.')
+@click.option('--limit', '-n', type=click.IntRange(min=1), default=None,
+              help='Show at most the given number of results.')
+@click.option('--format', 'output_format',
+              type=click.Choice(('table',) + MACHINE_FORMATS),
+              default='table', show_default=True,
+              help='Output format: table, JSON Lines, CSV, TSV, or full '
+                   'URLs terminated with NUL character.')
+@click.option('--dirs', '-d', is_flag=True, default=False,
+              help='Show directories only.')
+@click.option('--all', 'show_all', is_flag=True, default=False,
+              help='Show directories together with files.')
+@click.option('--display-url', '-u', is_flag=True, default=False,
+              help='Show URLs only.')
+def query(display_url, show_all, dirs, output_format, limit, reverse, sort,
+          paths, max_size, min_size, newer_than, regex, names, root, db):
+    """ Search the local index built by the index command, without
+        sending any request.
+
+        \b
+        Examples:
+            - the newest tarballs:
+                        apache-search query --name '*.tar.gz' \\
+                            --sort datetime --reverse -n 10
+            - files larger than 1G:
+                        apache-search query --min-size 1G --sort size
+            - files below the given path, as JSON Lines:
+                        apache-search query --path 'releases/*' \\
+                            --format jsonl
+    """
+    if dirs and show_all:
+        raise click.ClickException(
+            'Options: --dirs and --all can not be used together.'
+        )
+
+    with _open_index(db) as listing_index:
+        results = listing_index.query(
+            root=root, files=not (dirs or show_all), dirs=dirs, names=names,
+            regex=regex, newer_than=newer_than, min_size=min_size,
+            max_size=max_size, paths=paths, sort=sort, reverse=reverse,
+            limit=limit
+        )
+        if output_format != 'table':
+            write_records(results, output_format,
+                          ('url',) if display_url else None)
+            return
+
+        headers = ['Url'] if display_url else ['Url', 'Datetime', 'Size']
+        for line in stream_table(results, headers):
+            click.echo(line)
@@ -0,0 +1,67 @@
+""" Module consist of the command group of apache-search script.
+
+    Classes:
+        - DefaultGroup
+
+    Functions:
+        - main
+"""
+import click
+
+from tools.apache_search.src.cli.apache_search import apache_search
+from tools.apache_search.src.cli.daemon import daemon
+from tools.apache_search.src.cli.index import index
+from tools.apache_search.src.cli.index import query
+from tools.apache_search.src.cli.sync import sync
+from tools.apache_search.src.cli.watch import watch
+
+
+class DefaultGroup(click.Group):
+    """ Command group running the default command, when the first
+        argument is not a command name, so the group can be used
+        the same way as the default command alone.
+    """
+    def __init__(self, *args, default_command=None, **kwargs):
+        """ Constructor method for DefaultGroup class.
+
+            Args:
+                args: click.Group arguments
+                default_command(str): name of the default command
+                kwargs: click.Group keyword arguments
+        """
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx, args):
+        """ Insert the default command name before the arguments, unless
+            they start with a command name or the help option.
+
+            Args:
+                ctx(click.Context): group context
+                args(list): command line arguments
+
+            Returns:
+                args(list): arguments left for the command
+        """
+        if not args or (args[0] not in self.commands
+                        and args[0] not in ctx.help_option_names):
+            args = [self.default_command] + list(args)
+        return super().parse_args(ctx, args)
+
+
+@click.group('apache-search', cls=DefaultGroup, default_command='search')
+def main():
+    """ Search the Apache directory server (httpd), mirror its files,
+        watch its changes and query the local index of its tree.
+        The daemon serves repeated commands sent by apache-search-client.
+
+        Without the command name, search command is run.
+    """
+
+
+main.add_command(apache_search, 'search')
+main.add_command(sync)
+main.add_command(index)
+main.add_command(query)
+main.add_command(daemon)
+main.add_command(watch)
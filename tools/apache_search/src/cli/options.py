@@ -0,0 +1,284 @@
+""" Module consist of options shared by apache-search commands.
+
+    Functions:
+        - cache_options
+        - filter_options
+        - file_filter_options
+        - dir_filter_options
+        - request_options
+        - walk_options
+        - make_cache
+        - make_crawl_filter
+        - _apply_options
+        - _parse_size_option
+        - _check_regex_option
+"""
+import re
+
+import click
+
+from tools.apache_search.src.cache import default_cache_dir
+from tools.apache_search.src.cache import open_cache
+from tools.apache_search.src.defaults import DEFAULT_RETRIES
+from tools.apache_search.src.defaults import DEFAULT_TIMEOUT
+from tools.apache_search.src.entry import parse_size
+from tools.apache_search.src.filters import CrawlFilter
+from tools.apache_search.src.frontier import ORDERS
+
+
+def _parse_size_option(ctx, param, value):
+    """ Convert the size option value to the number of bytes.
+
+        Args:
+            ctx(click.Context): command context
+            param(click.Parameter): size option
+            value(str): size in format: X (bytes), XK (kilobytes),
+                        XM (megabytes), XG (gigabytes)
+
+        Returns:
+            size(int): size in bytes, or None if the option is not given
+
+        Raises:
+            click.BadParameter: if the size format is not valid
+    """
+    if value is None:
+        return None
+    size = parse_size(value.upper())
+    if size is None:
+        raise click.BadParameter(
+            f'{value} is not a valid size, use e.g. 120, 10K, 2.5M, 1G.'
+        )
+    return size
+
+
+def _check_regex_option(ctx, param, value):
+    """ Check if the regex option value is a valid regular expression.
+
+        Args:
+            ctx(click.Context): command context
+            param(click.Parameter): regex option
+            value(str): regular expression
+
+        Returns:
+            value(str): the same regular expression
+
+        Raises:
+            click.BadParameter: if the regular expression is not valid
+    """
+    if value is not None:
+        try:
+            re.compile(value)
+        except re.error as error:
+            raise click.BadParameter(f'{value} is not valid: {error}')
+    return value
+
+
+CACHE_OPTIONS = (
+    click.option('--no-cache', is_flag=True, default=False,
+                 help='Do not use the listing cache.'),
+    click.option('--cache-size', type=click.IntRange(min=1), default=256,
+                 show_default=True,
+                 help='Maximum size of the listing cache, in megabytes.'),
+    click.option('--cache-dir', type=click.Path(file_okay=False),
+                 default=None,
+                 help='Directory of the listing cache.  '
+                      '[default: ~/.cache/apache-search]'),
+)
+
+FILE_FILTER_OPTIONS = (
+    click.option('--name', 'names', multiple=True, metavar='PATTERN',
+                 help='Select files with names matching the glob pattern. '
+                      'Can be given multiple times.'),
+    click.option('--regex', default=None, callback=_check_regex_option,
+                 help='Select files with names matching the regular '
+                      'expression.'),
+    click.option('--newer-than', type=click.DateTime(
+                     formats=['%Y-%m-%d', '%Y-%m-%d %H:%M']
+                 ), default=None,
+                 help='Select files modified after the given date.'),
+    click.option('--min-size', default=None, callback=_parse_size_option,
+                 help='Select files of at least the given size, e.g. 10K, '
+                      '2.5M.'),
+    click.option('--max-size', default=None, callback=_parse_size_option,
+                 help='Select files of at most the given size, e.g. 10K, '
+                      '2.5M.'),
+)
+
+DIR_FILTER_OPTIONS = (
+    click.option('--max-depth', type=click.IntRange(min=0), default=None,
+                 help='Do not walk directories deeper than the given level '
+                      'below URL.'),
+    click.option('--include-dir', 'include_dirs', multiple=True,
+                 metavar='PATTERN',
+                 help='Walk only the directories matching the glob '
+                      'pattern. Pattern with slashes is matched against '
+                      'the path relative to URL, other against the '
+                      'directory name. Can be given multiple times.'),
+    click.option('--exclude-dir', 'exclude_dirs', multiple=True,
+                 metavar='PATTERN',
+                 help='Do not walk the directories matching the glob '
+                      'pattern. Can be given multiple times.'),
+)
+
+REQUEST_OPTIONS = (
+    click.option('--timeout', type=click.FloatRange(min=0.1),
+                 default=DEFAULT_TIMEOUT, show_default=True,
+                 help='Connect and read timeout of every request, '
+                      'in seconds.'),
+    click.option('--retries', type=click.IntRange(min=0),
+                 default=DEFAULT_RETRIES, show_default=True,
+                 help='Number of retries after connection errors, '
+                      'timeouts and server errors.'),
+)
+
+WALK_OPTIONS = (
+    click.option('--order', type=click.Choice(ORDERS), default=None,
+                 help='Order of walking the directories: breadth-first '
+                      '(level by level) or depth-first (subtree by '
+                      'subtree, keeping fewer directories waiting).  '
+                      '[default: dfs for a single job, bfs for more]'),
+    click.option('--max-memory', default=None, callback=_parse_size_option,
+                 help='Memory of the directories waiting to be walked, '
+                      'e.g. 512M. Above it, they are spilled to the '
+                      'temporary files, in TMPDIR. Only these directories '
+                      'are limited; URLs of the walked directories are '
+                      'kept in memory.'),
+)
+
+
+def _apply_options(command, options):
+    """ Add the options to the command, in the given order.
+
+        Args:
+            command(callable): command function
+            options(tuple): click option decorators
+
+        Returns:
+            command(callable): the same function with the options added
+    """
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+def cache_options(command):
+    """ Add the listing cache options: --no-cache, --cache-size
+        and --cache-dir.
+
+        Args:
+            command(callable): command function
+
+        Returns:
+            command(callable): the same function with the options added
+    """
+    return _apply_options(command, CACHE_OPTIONS)
+
+
+def filter_options(command):
+    """ Add the file and directory filter options: --name, --regex,
+        --newer-than, --min-size, --max-size, --max-depth, --include-dir
+        and --exclude-dir.
+
+        Args:
+            command(callable): command function
+
+        Returns:
+            command(callable): the same function with the options added
+    """
+    return _apply_options(command, FILE_FILTER_OPTIONS + DIR_FILTER_OPTIONS)
+
+
+def file_filter_options(command):
+    """ Add the file filter options: --name, --regex, --newer-than,
+        --min-size and --max-size.
+
+        Args:
+            command(callable): command function
+
+        Returns:
+            command(callable): the same function with the options added
+    """
+    return _apply_options(command, FILE_FILTER_OPTIONS)
+
+
+def dir_filter_options(command):
+    """ Add the directory filter options: --max-depth, --include-dir
+        and --exclude-dir.
+
+        Args:
+            command(callable): command function
+
+        Returns:
+            command(callable): the same function with the options added
+    """
+    return _apply_options(command, DIR_FILTER_OPTIONS)
+
+
+def request_options(command):
+    """ Add the request options: --timeout and --retries.
+
+        Args:
+            command(callable): command function
+
+        Returns:
+            command(callable): the same function with the options added
+    """
+    return _apply_options(command, REQUEST_OPTIONS)
+
+
+def walk_options(command):
+    """ Add the walk options: --order and --max-memory.
+
+        Args:
+            command(callable): command function
+
+        Returns:
+            command(callable): the same function with the options added
+    """
+    return _apply_options(command, WALK_OPTIONS)
+
+
+def make_cache(no_cache, cache_dir, cache_size):
+    """ Create the listing cache from the cache options.
+
+        Args:
+            no_cache(bool): if True, the cache is not used
+            cache_dir(str): directory of the cache, or None for default
+            cache_size(int): maximum size of the cache, in megabytes
+
+        Returns:
+            cache(ListingCache): listing cache, or None if not used
+    """
+    if no_cache:
+        return None
+    return open_cache(cache_dir or default_cache_dir(),
+                      max_size=cache_size * 1024 * 1024)
+
+
+def make_crawl_filter(names, regex, newer_than, min_size, max_size,
+                      max_depth, include_dirs, exclude_dirs):
+    """ Create the crawl filter from the filter options.
+
+        Args:
+            names(tuple): glob patterns of file names
+            regex(str): regular expression of file names
+            newer_than(datetime.datetime): minimum modification date
+            min_size(int): minimum file size in bytes
+            max_size(int): maximum file size in bytes
+            max_depth(int): maximum depth of walked directories
+            include_dirs(tuple): glob patterns of walked directories
+            exclude_dirs(tuple): glob patterns of skipped directories
+
+        Returns:
+            crawl_filter(CrawlFilter): crawl filter, or None if no filter
+                                       option is given
+    """
+    if not any([names, regex, newer_than, min_size is not None,
+                max_size is not None, max_depth is not None, include_dirs,
+                exclude_dirs]):
+        return None
+    return CrawlFilter(
+        names=names, regex=regex, newer_than=newer_than,
+        min_size=min_size, max_size=max_size, max_depth=max_depth,
+        include_dirs=include_dirs, exclude_dirs=exclude_dirs
+    )
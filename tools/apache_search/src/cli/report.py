@@ -0,0 +1,213 @@
+""" Module consist of reports printed by apache-search commands.
+
+    Table and download modules are imported by the functions using them,
+    as the commands import this module before their arguments are parsed.
+
+    Functions:
+        - stream_table
+        - write_records
+        - result_rows
+        - echo_aliases
+        - echo_failures
+        - echo_stats
+        - _format_row
+        - _row_values
+"""
+import itertools
+
+import click
+
+from tools.apache_search.src.output import format_records
+
+
+# Number of the first rows buffered by stream_table to size the columns.
+TABLE_BATCH_ROWS = 200
+
+
+def stream_table(data_iter, headers):
+    """ Create a table for given data and headers, line by line,
+        as the data arrives. Column widths are sized by the first
+        TABLE_BATCH_ROWS rows, printed when they all arrive. Values
+        are never cut: a later row with a longer value widens its
+        column for itself and the rows after it, so they are aligned
+        with each other, but not with the rows printed before.
+
+        Args:
+            data_iter(iterable): dicts, which keys have to cover headers
+            headers(list): list of headers for the table
+
+        Yields:
+            line(str): next line of the table, ready to print
+    """
+    data_iter = iter(data_iter)
+    batch = [_row_values(row, headers)
+             for row in itertools.islice(data_iter, TABLE_BATCH_ROWS)]
+    widths = [len(header) for header in headers]
+    for row_data in batch:
+        widths = [max(width, len(value))
+                  for width, value in zip(widths, row_data)]
+
+    yield _format_row(headers, widths)
+    yield _format_row(['-' * width for width in widths], widths)
+    for row_data in batch:
+        yield _format_row(row_data, widths)
+    del batch
+
+    for row in data_iter:
+        row_data = _row_values(row, headers)
+        widths = [max(width, len(value))
+                  for width, value in zip(widths, row_data)]
+        yield _format_row(row_data, widths)
+
+
+def _row_values(row, headers):
+    """ Get the table values of the row, as text.
+
+        Args:
+            row(dict): row data, keyed by the lowercase headers
+            headers(list): list of headers for the table
+
+        Returns:
+            row_data(list): list of string values; empty for missing ones
+    """
+    values = (row.get(header.lower()) for header in headers)
+    return ['' if value is None else str(value) for value in values]
+
+
+def _format_row(row_data, widths):
+    """ Format single table row, with values padded to column widths.
+
+        Args:
+            row_data(list): list of string values
+            widths(list): list of column widths
+
+        Returns:
+            line(str): formatted table row
+    """
+    return '  '.join(
+        value.ljust(width) for value, width in zip(row_data, widths)
+    ).rstrip()
+
+
+def write_records(items, output_format, fields=None):
+    """ Write files and directories to stdout in the machine format,
+        record by record.
+
+        Args:
+            items(iterable): file or directory data dicts
+            output_format(str): one of output.MACHINE_FORMATS
+            fields(tuple): record fields written; all fields if not given
+    """
+    stdout = click.get_text_stream('stdout')
+    if fields is None:
+        records = format_records(items, output_format)
+    else:
+        records = format_records(items, output_format, fields)
+    for record in records:
+        stdout.write(record)
+    stdout.flush()
+
+
+def result_rows(results, keep_going, failures):
+    """ Convert download and sync results to table rows, recording
+        failed files.
+
+        Args:
+            results(iterable): DownloadResult objects
+            keep_going(bool): if True, failed files are added to failures,
+                              instead of stopping the downloads
+            failures(list): list of (url, error) tuples, extended with
+                            failed files; local path is used for files
+                            which could not be deleted
+
+        Yields:
+            row(dict): row with keys: path, size, status
+
+        Raises:
+            click.ClickException: if the file can not be downloaded
+                                  or deleted, and keep_going is False
+    """
+    from tools.apache_search.src.download import FAILED
+
+    for result in results:
+        if result.status == FAILED:
+            if result.url is None:
+                message = f'Can not delete: {result.path}. {result.error}'
+            else:
+                message = f'Can not download: {result.url}. {result.error}'
+            if not keep_going:
+                raise click.ClickException(message)
+            failures.append((result.url or result.path, result.error))
+        yield {'path': result.path, 'size': result.size,
+               'status': result.status}
+
+
+def echo_failures(failures, err=False):
+    """ Print the table of directories and files which failed.
+
+        Args:
+            failures(list): list of (url, error) tuples
+            err(bool): if True, the table is printed on stderr
+    """
+    failed_urls = ({'url': failed_url, 'error': error}
+                   for failed_url, error in failures)
+    click.echo('>>>> FAILED', err=err)
+    for line in stream_table(failed_urls, ['Url', 'Error']):
+        click.echo(line, err=err)
+    click.echo(err=err)
+
+
+def echo_aliases(aliases, err=False):
+    """ Print the table of directories skipped as aliases.
+
+        Args:
+            aliases(list): list of (url, original_url) tuples
+            err(bool): if True, the table is printed on stderr
+    """
+    alias_urls = ({'url': alias_url, 'alias of': original_url}
+                  for alias_url, original_url in aliases)
+    click.echo('>>>> ALIASES', err=err)
+    for line in stream_table(alias_urls, ['Url', 'Alias of']):
+        click.echo(line, err=err)
+    click.echo(err=err)
+
+
+def echo_stats(stats):
+    """ Print statistics of the search on stderr, as tables: summary,
+        time of every phase, status codes and the slowest requests.
+
+        Args:
+            stats(CrawlStats): statistics of the search
+    """
+    from tabulate import tabulate
+
+    stats.stop()
+    elapsed = stats.elapsed
+    summary = [
+        ['Total time [s]', round(elapsed, 3)],
+        ['Requests', stats.requests],
+        ['Requests/s', round(stats.requests / elapsed, 1) if elapsed else 0],
+        ['Connection errors', stats.errors],
+        ['Bytes received', stats.bytes_received],
+        ['Rows parsed', stats.rows],
+    ]
+    phases = [[phase, round(phase_time, 3)]
+              for phase, phase_time in stats.phases.items()]
+    status_codes = sorted(stats.status_codes.items())
+    slowest = [[record.url, round(record.elapsed, 3), record.rows,
+                record.status_code]
+               for record in stats.slowest]
+
+    click.echo('>>>> STATS', err=True)
+    click.echo(tabulate(summary), err=True)
+    click.echo(err=True)
+    click.echo(tabulate(phases, headers=['Phase', 'Time [s]']), err=True)
+    click.echo(err=True)
+    click.echo(tabulate(status_codes, headers=['Status', 'Count']),
+               err=True)
+    click.echo(err=True)
+    click.echo('>>>> SLOWEST', err=True)
+    click.echo(tabulate(slowest,
+                        headers=['Url', 'Time [s]', 'Rows', 'Status']),
+               err=True)
+    click.echo(err=True)
@@ -0,0 +1,115 @@
+""" Module consist of sync command for apache-search script.
+    The sync module, with the HTTP libraries, is imported only when
+    the command runs.
+
+    Functions:
+        - sync
+"""
+import click
+
+from tools.apache_search.src.cli.options import cache_options
+from tools.apache_search.src.cli.options import filter_options
+from tools.apache_search.src.cli.options import make_cache
+from tools.apache_search.src.cli.options import make_crawl_filter
+from tools.apache_search.src.cli.options import request_options
+from tools.apache_search.src.cli.options import walk_options
+from tools.apache_search.src.cli.report import echo_failures
+from tools.apache_search.src.cli.report import echo_stats
+from tools.apache_search.src.cli.report import result_rows
+from tools.apache_search.src.cli.report import stream_table
+from tools.apache_search.src.defaults import DEFAULT_SEGMENTS
+from tools.apache_search.src.stats import CrawlStats
+
+
+@click.command('sync')
+@click.option('--delete', is_flag=True, default=False,
+              help='Delete local files and directories removed from '
+                   'the server. Only directories listed by the server '
+                   'in this sync are cleaned.')
+@click.option('--dry-run', '-n', is_flag=True, default=False,
+              help='Show files which would be downloaded or deleted, '
+                   'without changing the local directory.')
+@cache_options
+@filter_options
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1,
+              show_default=True,
+              help='Maximum number of directories fetched at once, '
+                   'and files downloaded at once.')
+@click.option('--segments', type=click.IntRange(min=1),
+              default=DEFAULT_SEGMENTS, show_default=True,
+              help='Maximum number of parts of a big file downloaded '
+                   'at once.')
+@request_options
+@walk_options
+@click.option('--keep-going', is_flag=True, default=False,
+              help='Skip directories which can not be fetched, and files '
+                   'which can not be downloaded, and list them after '
+                   'the sync.')
+@click.option('--max-rate', type=click.FloatRange(min=0.01), default=None,
+              help='Maximum number of listing requests per second sent '
+                   'to a server.')
+@click.option('--stats', 'show_stats', is_flag=True, default=False,
+              help='Show statistics of the walk on stderr.')
+@click.argument('URL')
+@click.argument('DIRECTORY', type=click.Path(file_okay=False))
+def sync(url, directory, show_stats, max_rate, keep_going, max_memory, order,
+         retries, timeout, segments, jobs, exclude_dirs, include_dirs,
+         max_depth, max_size, min_size, newer_than, regex, names, cache_dir,
+         cache_size, no_cache, dry_run, delete):
+    """ Mirror the Apache directory server tree into the local DIRECTORY,
+        transferring only new and changed files.
+
+        URL argument must be a full path to the root directory of the
+        mirror. Files are compared with their local copies by the size
+        and modification date listed by the server, so unchanged files
+        are not requested at all.
+
+        \b
+        Examples:
+            - nightly mirror of the whole tree:
+                        apache-search sync http://<page>/directory mirror
+            - mirror of tarballs, 8 directories and files at once:
+                        apache-search sync http://<page>/directory mirror \\
+                            --name '*.tar.gz' -j 8
+            - mirror removing files deleted from the server, checked
+              before the change:
+                        apache-search sync http://<page>/directory mirror \\
+                            --delete --dry-run
+    """
+    from tools.apache_search.src.sync import Syncer
+
+    click.echo(f'>>>> Syncing: {url} into: {directory}')
+
+    stats = CrawlStats() if show_stats else None
+    syncer = Syncer(
+        url, directory, jobs=jobs, segments=segments,
+        cache=make_cache(no_cache, cache_dir, cache_size),
+        crawl_filter=make_crawl_filter(names, regex, newer_than, min_size,
+                                       max_size, max_depth, include_dirs,
+                                       exclude_dirs),
+        max_rate=max_rate, timeout=timeout, retries=retries,
+        keep_going=keep_going, stats=stats, delete=delete, dry_run=dry_run,
+        order=order, max_memory=max_memory
+    )
+    failures = list()
+
+    click.echo('>>>> CHANGES')
+    for line in stream_table(result_rows(syncer.sync(), keep_going,
+                                         failures),
+                             ['Path', 'Size', 'Status']):
+        click.echo(line)
+    click.echo()
+    click.echo(f'>>>> Unchanged files: {syncer.unchanged}')
+    click.echo()
+
+    failures = syncer.failures + failures
+    if failures:
+        echo_failures(failures)
+
+    if stats is not None:
+        echo_stats(stats)
+
+    if failures:
+        raise click.ClickException(
+            f'{len(failures)} directories or files could not be synced.'
+        )
@@ -0,0 +1,119 @@
+""" Module consist of watch command for apache-search script.
+    The watch module, with the HTTP libraries, is imported only when
+    the command runs.
+
+    Functions:
+        - watch
+"""
+import click
+
+from tools.apache_search.src.cli.options import cache_options
+from tools.apache_search.src.cli.options import filter_options
+from tools.apache_search.src.cli.options import make_cache
+from tools.apache_search.src.cli.options import make_crawl_filter
+from tools.apache_search.src.cli.options import request_options
+from tools.apache_search.src.cli.options import walk_options
+from tools.apache_search.src.cli.report import echo_failures
+from tools.apache_search.src.cli.report import echo_stats
+from tools.apache_search.src.output import format_event
+from tools.apache_search.src.stats import CrawlStats
+
+
+@click.command('watch')
+@click.option('--interval', type=click.FloatRange(min=1), default=60,
+              show_default=True,
+              help='Time between the starts of the polls, in seconds.')
+@click.option('--polls', type=click.IntRange(min=1), default=None,
+              help='Stop after the given number of polls.  '
+                   '[default: watch until interrupted]')
+@click.option('--initial', is_flag=True, default=False,
+              help='Report files found by the first poll as added.')
+@cache_options
+@filter_options
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1,
+              show_default=True,
+              help='Maximum number of directories fetched at once.')
+@request_options
+@walk_options
+@click.option('--keep-going', is_flag=True, default=False,
+              help='Skip directories which can not be fetched, list them '
+                   'on stderr, and try them again by the next poll.')
+@click.option('--max-rate', type=click.FloatRange(min=0.01), default=None,
+              help='Maximum number of requests per second sent to a server.')
+@click.option('--stats', 'show_stats', is_flag=True, default=False,
+              help='Show statistics of all polls on stderr, after the '
+                   'watch.')
+@click.argument('URL')
+def watch(url, show_stats, max_rate, keep_going, max_memory, order, retries,
+          timeout, jobs, exclude_dirs, include_dirs, max_depth, max_size,
+          min_size, newer_than, regex, names, cache_dir, cache_size,
+          no_cache, initial, polls, interval):
+    """ Watch the Apache directory server tree, and write its files added,
+        modified and removed since the previous poll, as json lines.
+
+        URL argument must be a full path to the root directory of the
+        watched tree. The first poll reads the whole tree. Next polls skip
+        directories without subdirectories, which modification date,
+        listed by their parent directory, has not changed and has settled
+        (was seen at least a minute before); all other directories are
+        requested by every poll, conditionally with the listing cache,
+        so unchanged listings are not sent again. A file rewritten in
+        place, without renaming, in a skipped directory is not reported.
+
+        Every line is a json object with keys: event (added, modified
+        or removed), type, name, url, datetime, size and size_bytes.
+        Removed files have the values of their last listing.
+
+        \b
+        Examples:
+            - new tarballs, checked every 5 minutes:
+                        apache-search watch http://<page>/directory \\
+                            --interval 300 --name '*.tar.gz'
+            - all files of the tree, then its changes:
+                        apache-search watch http://<page>/directory \\
+                            --initial
+    """
+    from tools.apache_search.src.daemon import Daemon
+    from tools.apache_search.src.watch import Watcher
+
+    if click.get_current_context().find_object(Daemon) is not None:
+        raise click.ClickException(
+            'Watch can not be run through the client, as the daemon runs '
+            'one command at a time.'
+        )
+
+    if max_memory:
+        raise click.ClickException(
+            'Option: --max-memory can not be used with watch. The watch '
+            'keeps listings of the whole tree in memory.'
+        )
+
+    stats = CrawlStats() if show_stats else None
+    watcher = Watcher(
+        url, jobs=jobs, cache=make_cache(no_cache, cache_dir, cache_size),
+        crawl_filter=make_crawl_filter(names, regex, newer_than, min_size,
+                                       max_size, max_depth, include_dirs,
+                                       exclude_dirs),
+        max_rate=max_rate, timeout=timeout, retries=retries,
+        keep_going=keep_going, stats=stats, order=order,
+        max_memory=max_memory
+    )
+
+    def echo_poll_failures(poll_watcher):
+        if poll_watcher.failures:
+            echo_failures(poll_watcher.failures, err=True)
+
+    stdout = click.get_text_stream('stdout')
+    events = watcher.watch(interval, polls=polls, initial=initial,
+                           on_poll=echo_poll_failures)
+    try:
+        for event, item in events:
+            stdout.write(format_event(event, item))
+            stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        events.close()
+
+    if stats is not None:
+        echo_stats(stats)
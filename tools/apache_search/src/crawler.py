@@ -0,0 +1,422 @@
+""" Module for walking the Apache directory server tree, starting from
+    the given URL and going through all directories below.
+"""
+from functools import partial
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+from tools.apache_search.src.defaults import DEFAULT_RETRIES
+from tools.apache_search.src.defaults import DEFAULT_TIMEOUT
+from tools.apache_search.src.filters import relative_path
+from tools.apache_search.src.frontier import BFS
+from tools.apache_search.src.frontier import DFS
+from tools.apache_search.src.frontier import ITEM_SIZE
+from tools.apache_search.src.frontier import MIN_ITEMS
+from tools.apache_search.src.frontier import ORDERS
+from tools.apache_search.src.frontier import Frontier
+from tools.apache_search.src.page import Page
+from tools.apache_search.src.page import create_parser_pool
+from tools.apache_search.src.scheduler import RequestScheduler
+from tools.apache_search.src.session import create_session
+from tools.apache_search.src.snapshot import Snapshot
+from tools.apache_search.src.urls import listing_digest
+from tools.apache_search.src.urls import normalize_url
+
+
+class Crawler:
+    """ Class for walking the directory tree of the Apache directory server.
+        Pages can be fetched and parsed one by one, or by a bounded pool
+        of worker threads, which fetches sibling directories in parallel.
+
+        With the snapshot of the previous crawl, directories without
+        subdirectories, which last modification date (listed by the parent
+        directory) has not changed, are taken from the snapshot instead
+        of being fetched. The directory modification date changes only
+        when its direct entries are added, removed or renamed, so other
+        directories are fetched again, conditionally with the listing
+        cache, and changes deeper in their subtrees are found.
+
+        With the crawl filter, subpages rejected by its directory filters
+        are not walked at all.
+
+        Requests to every host are paced by the scheduler: the number
+        of requests sent at once grows up to jobs while the server
+        answers fast, and drops when it slows down or throttles.
+
+        With the statistics, every request of the walk is recorded,
+        and the time spent in every phase of loading the pages.
+
+        In the keep going mode, directories which can not be fetched
+        are recorded in the failures list, and the walk goes on without
+        their subtrees. The snapshot is not updated after such walk.
+
+        Crawlers of several roots can share the map of visited directories,
+        so every directory is fetched at most once by all of them. Visited
+        directories are walked through with the listing loaded by the
+        crawler that fetched them.
+
+        Directory URLs are normalised, and every directory is walked
+        at most once, however its URL is spelled. Aliases of directories
+        with other paths, e.g. symbolic links pointing to the parent
+        directory, can be recognised by the same listing content: with
+        alias detection, such directories are recorded in the aliases
+        list and not walked, so the walk ends even on symbolic link loops.
+        Note that directories with equal listings are taken as aliases,
+        even if they are separate copies.
+
+        Parsing of big listings is bound by the processor. With parser
+        processes, page bodies fetched by the worker threads are parsed
+        by the pool of processes, and only the parsed entries are sent
+        back, so parsing uses many cores.
+
+        Directories found, but not walked yet, wait in the frontier,
+        in the depth-first order by default when jobs is 1, and
+        in the breadth-first order otherwise. At most jobs pages are
+        loaded at once. With the memory limit, the frontier above
+        the limit is spilled to the temporary files.
+    """
+    def __init__(self, url, jobs=1, session=None, cache=None, snapshot=None,
+                 crawl_filter=None, max_rate=None, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, keep_going=False, stats=None,
+                 visited=None, detect_aliases=False, parse_processes=None,
+                 order=None, max_memory=None):
+        """ Constructor method for Crawler class.
+
+            Args:
+                url(str): full URL to the root directory of the crawl
+                jobs(int): number of pages fetched and parsed at once
+                session(requests.Session): session shared by all pages;
+                                           if not given, a new one with
+                                           connection pool sized to jobs
+                                           is created for every walk
+                cache(ListingCache): cache of parsed listings, used
+                                     by all pages
+                snapshot(Snapshot): snapshot of the previous crawl; after
+                                    the complete walk, it is updated with
+                                    the current state of the tree
+                crawl_filter(CrawlFilter): filter deciding which subpages
+                                           are walked
+                max_rate(float): maximum number of requests per second
+                                 sent to a single host
+                timeout(float): connect and read timeout of every request,
+                                in seconds
+                retries(int): number of retries of every page after
+                              transient errors
+                keep_going(bool): if True, failed directories are recorded
+                                  instead of stopping the walk
+                stats(CrawlStats): statistics updated by all pages
+                visited(dict): (files, subpages) tuples of the directories
+                               visited by other crawlers, keyed by the URL;
+                               updated with the directories of this walk.
+                               Should not be used with the snapshot
+                detect_aliases(bool): if True, directories with the same
+                                      listing as a directory walked before
+                                      are not walked
+                parse_processes(int): number of processes parsing pages;
+                                      if not given, pages are parsed
+                                      by the threads fetching them
+                order(str): walk order, frontier.BFS or frontier.DFS;
+                            if not given, depth-first for a single job,
+                            and breadth-first for more jobs
+                max_memory(int): memory of the frontier, in bytes;
+                                 the frontier above it is spilled
+                                 to disk. Not limited if not given
+
+            Raises:
+                ValueError: if jobs is lower than 1, or the order
+                            is unknown
+        """
+        if jobs < 1:
+            raise ValueError(f'Number of jobs must be at least 1, got: {jobs}')
+        if order is not None and order not in ORDERS:
+            raise ValueError(f'Unknown walk order: {order}')
+
+        self._url = normalize_url(url)
+        self._jobs = jobs
+        self._session = session
+        self._cache = cache
+        self._snapshot = snapshot
+        self._filter = crawl_filter
+        self._max_rate = max_rate
+        self._timeout = timeout
+        self._retries = retries
+        self._keep_going = keep_going
+        self._stats = stats
+        self._visited = visited
+        self._detect_aliases = detect_aliases
+        self._parse_processes = parse_processes
+        self._order = order
+        self._max_memory = max_memory
+        self._failures = list()
+        self._aliases = list()
+        self._walked = set()
+        self._digests = dict()
+
+    @property
+    def failures(self):
+        """ Get directories failed in the last walk, in the keep going
+            mode.
+
+            Returns:
+                self._failures(list): list of (url, error) tuples - full
+                                      URL to the directory and the error
+                                      message
+        """
+        return self._failures
+
+    @property
+    def aliases(self):
+        """ Get directories recognised as aliases in the last walk,
+            with alias detection.
+
+            Returns:
+                self._aliases(list): list of (url, original_url) tuples -
+                                     full URL to the alias, and to the
+                                     directory with the same listing
+        """
+        return self._aliases
+
+    def pages(self):
+        """ Walk the directory tree and yield every page, with its files
+            and subpages already loaded.
+
+            Pages are yielded in the walk order when jobs is 1,
+            and in the order they finish loading otherwise.
+
+            Yields:
+                page(Page): loaded page object
+        """
+        session = self._session
+        if session is None:
+            session = create_session(pool_size=self._jobs)
+
+        parser_pool = None
+        if self._parse_processes:
+            parser_pool = create_parser_pool(self._parse_processes)
+
+        scheduler = RequestScheduler(max_concurrency=self._jobs,
+                                     max_rate=self._max_rate)
+        new_page = partial(Page, session=session, listing_hints=dict(),
+                           cache=self._cache, scheduler=scheduler,
+                           timeout=self._timeout, retries=self._retries,
+                           stats=self._stats, parser_pool=parser_pool)
+        self._failures = list()
+        self._aliases = list()
+        self._walked = {self._url}
+        self._digests = dict()
+        if self._jobs == 1:
+            walk = self._walk_serial(new_page)
+        else:
+            walk = self._walk_concurrent(new_page)
+
+        current_snapshot = Snapshot() if self._snapshot is not None else None
+        try:
+            for page, mtime in walk:
+                if self._visited is not None \
+                        and page.url not in self._visited:
+                    self._visited[page.url] = (page.files, page.subpages)
+                if current_snapshot is not None:
+                    current_snapshot.add(page.url, mtime, page.files,
+                                         page.subpages)
+                yield page
+        finally:
+            walk.close()
+            if parser_pool is not None:
+                parser_pool.shutdown(wait=True)
+            if self._session is None:
+                session.close()
+
+        if current_snapshot is not None and not self._failures:
+            self._snapshot.replace(current_snapshot)
+
+    def _new_frontier(self):
+        """ Create the frontier of the walk, in the walk order, spilled
+            to disk above the memory limit.
+
+            Returns:
+                frontier(Frontier): empty frontier
+        """
+        order = self._order
+        if order is None:
+            order = DFS if self._jobs == 1 else BFS
+        max_items = None
+        if self._max_memory is not None:
+            max_items = max(MIN_ITEMS, self._max_memory // ITEM_SIZE)
+        return Frontier(order=order, max_items=max_items)
+
+    def _child_items(self, page):
+        """ Get the frontier items of all subpages of the given page,
+            which pass the crawl filter and were not walked yet.
+
+            Args:
+                page(Page): loaded parent page
+
+            Returns:
+                child_items(list): list of (url, mtime) tuples, where
+                                   url is the normalised directory URL,
+                                   and mtime is the directory last
+                                   modification date listed by the parent
+                                   page
+        """
+        child_items = list()
+        for subpage in page.subpages:
+            url = normalize_url(subpage['url'])
+            if url in self._walked:
+                continue
+            if self._filter is not None and not self._filter.follow_dir(
+                    relative_path(url, self._url)):
+                continue
+            self._walked.add(url)
+            child_items.append((url, subpage.get('datetime')))
+        return child_items
+
+    def _frontier_page(self, item, new_page):
+        """ Create the page object for the frontier item. Unchanged
+            directories without subdirectories are taken from
+            the snapshot, already loaded.
+
+            Args:
+                item(tuple): (url, mtime) tuple, see _child_items
+                new_page(callable): creates the page object for given url
+
+            Returns:
+                page(tuple): (page, mtime) tuple - page object and
+                             the directory last modification date
+        """
+        url, mtime = item
+        directory = None
+        if self._snapshot is not None:
+            directory = self._snapshot.get_unchanged({'url': url,
+                                                      'datetime': mtime})
+        if directory is not None:
+            page = Page.from_listing(url, directory['files'],
+                                     directory['subpages'])
+        else:
+            page = self._new_page(url, new_page)
+        return page, mtime
+
+    def _new_page(self, url, new_page):
+        """ Create the page object for the directory, already loaded
+            if the directory was visited by other crawler.
+
+            Args:
+                url(str): full URL to the directory
+                new_page(callable): creates the page object for given url
+
+            Returns:
+                page(Page): page object
+        """
+        if self._visited is not None and url in self._visited:
+            files, subpages = self._visited[url]
+            return Page.from_listing(url, files, subpages)
+        return new_page(url)
+
+    def _is_alias(self, page):
+        """ Check if the loaded page has the same listing as a page walked
+            before, with alias detection. Aliases are recorded.
+
+            Args:
+                page(Page): loaded page
+
+            Returns:
+                is_alias(bool): True if the page is an alias
+        """
+        if not self._detect_aliases or not (page.files or page.subpages) \
+                or (self._visited is not None and page.url in self._visited):
+            return False
+        digest = listing_digest(page.files, page.subpages)
+        original_url = self._digests.setdefault(digest, page.url)
+        if original_url == page.url:
+            return False
+        self._aliases.append((page.url, original_url))
+        return True
+
+    def _record_failure(self, page, error):
+        """ Record the page which could not be loaded, in the keep going
+            mode.
+
+            Args:
+                page(Page): page failed to load
+                error(OSError): loading error, connection errors included
+
+            Raises:
+                OSError: the same error, if not in the keep going mode
+        """
+        if not self._keep_going:
+            raise error
+        self._failures.append((page.url, str(error)))
+
+    def _walk_serial(self, new_page):
+        """ Walk the directory tree in the current thread, page by page.
+
+            Args:
+                new_page(callable): creates the page object for given url
+
+            Yields:
+                page(tuple): (page, mtime) tuple - loaded page object and
+                             its last modification date
+        """
+        with self._new_frontier() as frontier:
+            frontier.push((self._url, None))
+            while frontier:
+                page, mtime = self._frontier_page(frontier.pop(), new_page)
+                try:
+                    page.load()
+                except OSError as error:
+                    self._record_failure(page, error)
+                    continue
+                if self._is_alias(page):
+                    continue
+                yield page, mtime
+                for item in self._child_items(page):
+                    frontier.push(item)
+
+    def _walk_concurrent(self, new_page):
+        """ Walk the directory tree with the pool of worker threads.
+            Every subpage is added to the frontier as soon as its parent
+            is parsed, and the next pages are taken from the frontier,
+            keeping jobs pages loaded at once.
+
+            Args:
+                new_page(callable): creates the page object for given url
+
+            Yields:
+                page(tuple): (page, mtime) tuple - loaded page object and
+                             its last modification date
+        """
+        executor = ThreadPoolExecutor(max_workers=self._jobs)
+        frontier = self._new_frontier()
+        pending = dict()
+
+        def submit_pages():
+            while frontier and len(pending) < self._jobs:
+                page, mtime = self._frontier_page(frontier.pop(), new_page)
+                pending[executor.submit(page.load)] = (page, mtime)
+
+        try:
+            frontier.push((self._url, None))
+            submit_pages()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page, mtime = pending.pop(future)
+                    try:
+                        future.result()
+                    except OSError as error:
+                        self._record_failure(page, error)
+                        submit_pages()
+                        continue
+                    if self._is_alias(page):
+                        submit_pages()
+                        continue
+                    for item in self._child_items(page):
+                        frontier.push(item)
+                    submit_pages()
+                    yield page, mtime
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            frontier.close()
@@ -0,0 +1,296 @@
+""" Module for the daemon running apache-search commands sent by the client
+    over the Unix socket.
+
+    The daemon imports the application once, and keeps the HTTP sessions
+    and the listing caches open between the commands, so the repeated
+    searches are served without the interpreter startup, and with the
+    connections and listings already warm.
+
+    Classes:
+        - Daemon
+        - _FrameWriter
+
+    Functions:
+        - _exit_code
+"""
+import io
+import json
+import os
+import socket
+import sys
+
+import click
+
+from tools.apache_search.src.cache import DEFAULT_MEMORY_ITEMS
+from tools.apache_search.src.cache import keep_caches
+from tools.apache_search.src.ipc import EXIT
+from tools.apache_search.src.ipc import REQUEST
+from tools.apache_search.src.ipc import STDERR
+from tools.apache_search.src.ipc import STDOUT
+from tools.apache_search.src.ipc import is_user_socket
+from tools.apache_search.src.ipc import recv_frame
+from tools.apache_search.src.ipc import send_frame
+from tools.apache_search.src.session import keep_sessions
+
+
+BACKLOG = 128
+# Time to wait for the request after the client connects, in seconds.
+REQUEST_TIMEOUT = 10.0
+PROG_NAME = 'apache-search'
+
+
+class Daemon:
+    """ Class for the daemon listening on the Unix socket. Every connection
+        sends a single request: arguments of the command, which is run
+        in the daemon process, with its output streamed back.
+
+        Commands are run one at a time, in the working directory
+        of the client; other clients wait in the socket backlog.
+        Standard input of the client is not forwarded, and the daemon
+        environment variables are used.
+
+        The socket is accessible only by the user running the daemon.
+    """
+    def __init__(self, command, socket_path,
+                 memory_items=DEFAULT_MEMORY_ITEMS):
+        """ Constructor method for Daemon class.
+
+            Args:
+                command(click.Command): command run with the received
+                                        arguments
+                socket_path(str): path to the Unix socket
+                memory_items(int): number of listings every cache keeps
+                                   in memory
+        """
+        self._command = command
+        self._socket_path = socket_path
+        self._memory_items = memory_items
+        self._listener = None
+        self._stopped = False
+
+    def listen(self):
+        """ Start listening on the socket. The socket left by the daemon
+            which did not stop cleanly is replaced.
+
+            Raises:
+                FileExistsError: if another daemon listens on the socket
+                PermissionError: if the path is not a socket owned
+                                 by the current user
+        """
+        if os.path.lexists(self._socket_path):
+            if not is_user_socket(self._socket_path):
+                raise PermissionError(
+                    f'Not a socket of the current user: {self._socket_path}'
+                )
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(self._socket_path)
+                except OSError:
+                    os.remove(self._socket_path)
+                else:
+                    raise FileExistsError(
+                        f'Daemon is already listening on: {self._socket_path}'
+                    )
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            listener.bind(self._socket_path)
+        except OSError:
+            listener.close()
+            raise
+        finally:
+            os.umask(umask)
+        listener.listen(BACKLOG)
+        self._listener = listener
+
+    def serve(self):
+        """ Run the received commands, until the daemon is stopped.
+            The socket is removed at the end.
+
+            Raises:
+                FileExistsError: if the daemon was not listening yet,
+                                 and another daemon listens on the socket
+        """
+        if self._listener is None:
+            self.listen()
+        try:
+            with keep_sessions(), keep_caches(self._memory_items):
+                while not self._stopped:
+                    connection, _ = self._listener.accept()
+                    with connection:
+                        if self._stopped:
+                            break
+                        try:
+                            self.handle(connection)
+                        except OSError:
+                            # The client disconnected, or did not send
+                            # the request in time.
+                            continue
+        finally:
+            self._listener.close()
+            self._listener = None
+            try:
+                os.remove(self._socket_path)
+            except OSError:
+                pass
+
+    def stop(self):
+        """ Stop the daemon after the current command. Can be called
+            from another thread.
+        """
+        self._stopped = True
+        # Wake up the accept call waiting for the next connection.
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as wakeup:
+            try:
+                wakeup.connect(self._socket_path)
+            except OSError:
+                pass
+
+    def handle(self, connection):
+        """ Receive the request from the connection, run the command
+            and send back its output and exit code.
+
+            Args:
+                connection(socket.socket): connected client socket
+
+            Raises:
+                OSError: if the client disconnects, or does not send
+                         the request in time
+        """
+        connection.settimeout(REQUEST_TIMEOUT)
+        frame = recv_frame(connection)
+        connection.settimeout(None)
+        if frame is None:
+            return
+        kind, payload = frame
+        try:
+            if kind != REQUEST:
+                raise ValueError(f'Unexpected frame kind: {kind!r}')
+            request = json.loads(payload.decode('utf-8'))
+            code = self._run(request, connection)
+        except (LookupError, TypeError, ValueError) as error:
+            send_frame(connection, STDERR,
+                       f'Invalid request: {error}\n'.encode('utf-8'))
+            code = 2
+
+        send_frame(connection, EXIT, str(code).encode('ascii'))
+
+    def _run(self, request, connection):
+        """ Run the requested command in the client working directory,
+            with the standard streams sent to the client.
+
+            Args:
+                request(dict): request with the keys: args, cwd, encoding,
+                               errors
+                connection(socket.socket): connected client socket
+
+            Returns:
+                code(int): exit code of the command
+        """
+        args = [str(arg) for arg in request['args']]
+        streams = [
+            io.TextIOWrapper(
+                io.BufferedWriter(_FrameWriter(connection, kind)),
+                encoding=request.get('encoding') or 'utf-8',
+                errors=request.get('errors') or 'strict',
+                line_buffering=True
+            )
+            for kind in (STDOUT, STDERR)
+        ]
+        saved_streams = sys.stdin, sys.stdout, sys.stderr
+        saved_cwd = os.getcwd()
+        sys.stdin = io.StringIO()
+        sys.stdout, sys.stderr = streams
+        try:
+            try:
+                os.chdir(request['cwd'])
+            except OSError as error:
+                click.echo(f'Can not use the working directory: {error}',
+                           err=True)
+                return 1
+            return self._invoke(args)
+        finally:
+            for stream in streams:
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+            sys.stdin, sys.stdout, sys.stderr = saved_streams
+            os.chdir(saved_cwd)
+
+    def _invoke(self, args):
+        """ Run the command with the given arguments. Errors are shown
+            the same way as by the apache-search script.
+
+            Args:
+                args(list): command line arguments
+
+            Returns:
+                code(int): exit code of the command
+        """
+        try:
+            self._command.main(args=args, prog_name=PROG_NAME, obj=self)
+        except SystemExit as exit_error:
+            return _exit_code(exit_error.code)
+        except Exception:  # pylint: disable=broad-except
+            exc_type, exc_value, _ = sys.exc_info()
+            click.echo('>> ERR >> {}: {}'.format(exc_type.__name__,
+                                                 exc_value))
+        return 0
+
+
+class _FrameWriter(io.RawIOBase):
+    """ Binary stream sending the written bytes to the client, as frames
+        of the given kind.
+    """
+    def __init__(self, connection, kind):
+        """ Constructor method for _FrameWriter class.
+
+            Args:
+                connection(socket.socket): connected client socket
+                kind(bytes): frame kind, STDOUT or STDERR
+        """
+        super().__init__()
+        self._connection = connection
+        self._kind = kind
+
+    def writable(self):
+        """ Check if the stream is writable.
+
+            Returns:
+                writable(bool): always True
+        """
+        return True
+
+    def write(self, data):
+        """ Send the bytes to the client.
+
+            Args:
+                data(bytes): written bytes
+
+            Returns:
+                size(int): number of written bytes
+        """
+        data = bytes(data)
+        if data:
+            send_frame(self._connection, self._kind, data)
+        return len(data)
+
+
+def _exit_code(code):
+    """ Get the exit code from the SystemExit code, as the interpreter
+        does.
+
+        Args:
+            code: exit code, message or None
+
+        Returns:
+            code(int): exit code
+    """
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    click.echo(code, err=True)
+    return 1
@@ -0,0 +1,12 @@
+""" Module for the default values of the request and download options.
+
+    Values are kept apart from the modules using them, so the command line
+    reads them while defining its options, without importing the HTTP
+    and HTML parsing libraries.
+"""
+
+
+# Connect and read timeout of every request, in seconds.
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_RETRIES = 3
+DEFAULT_SEGMENTS = 4
@@ -0,0 +1,739 @@
+""" Module for downloading files found by the search.
+
+    Files are downloaded concurrently over the pooled keep-alive
+    connections. Large files are split into HTTP Range segments, fetched
+    in parallel and written at their offsets into the preallocated file.
+
+    Data is written into the "<name>.part" file, renamed when complete.
+    Progress of the segments is saved in the "<name>.part.json" file,
+    so the interrupted download is resumed by the next run, as long as
+    the server file has the same size and validator (ETag or
+    Last-Modified).
+
+    Classes:
+        - Downloader
+        - DownloadResult
+
+    Functions:
+        - local_path
+        - local_dir
+        - listing_timestamp
+"""
+import json
+import os
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from urllib.parse import unquote
+from urllib.parse import urlsplit
+
+import requests
+
+from tools.apache_search.src.defaults import DEFAULT_RETRIES
+from tools.apache_search.src.defaults import DEFAULT_SEGMENTS
+from tools.apache_search.src.defaults import DEFAULT_TIMEOUT
+from tools.apache_search.src.page import HTTPStatusError
+from tools.apache_search.src.page import TRANSIENT_ERRORS
+from tools.apache_search.src.page import backoff_delay
+from tools.apache_search.src.page import is_transient
+from tools.apache_search.src.session import create_session
+
+
+CHUNK_SIZE = 1024 * 1024
+# Files are split into segments of at least this size, so small files
+# are fetched with a single request.
+MIN_SEGMENT_SIZE = 8 * 1024 * 1024
+PART_SUFFIX = '.part'
+STATE_SUFFIX = '.part.json'
+# Segments progress is saved at most once per this time, in seconds.
+STATE_INTERVAL = 1.0
+# Files are requested without compression, so the received bytes
+# are the file content and Content-Length is the file size.
+IDENTITY_HEADERS = {'Accept-Encoding': 'identity'}
+
+DOWNLOADED = 'downloaded'
+UP_TO_DATE = 'up to date'
+FAILED = 'failed'
+
+_write_lock = threading.Lock()
+
+
+class DownloadResult:
+    """ Class for the result of a single file download."""
+    __slots__ = ('url', 'path', 'status', 'size', 'error')
+
+    def __init__(self, url, path, status, size=None, error=None):
+        """ Constructor method for DownloadResult class.
+
+            Args:
+                url(str): full URL of the file
+                path(str): local path of the file
+                status(str): DOWNLOADED, UP_TO_DATE or FAILED
+                size(int): file size in bytes, if known
+                error(str): error message, if the download failed
+        """
+        self.url = url
+        self.path = path
+        self.status = status
+        self.size = size
+        self.error = error
+
+    def __repr__(self):
+        """ Get the printable representation of the result.
+
+            Returns:
+                representation(str): class name with the result values
+        """
+        values = ', '.join(f'{name}={getattr(self, name)!r}'
+                           for name in self.__slots__)
+        return f'{type(self).__name__}({values})'
+
+
+class Downloader:
+    """ Class for downloading files into the local directory, keeping
+        their paths relative to the root URL. Should be closed after
+        use, or used as a context manager.
+
+        Files already present with the server size (and the listed
+        modification date, if known) are not downloaded again.
+        Downloaded files get the modification date from the listing.
+    """
+    def __init__(self, directory, root_url, jobs=1,
+                 segments=DEFAULT_SEGMENTS, session=None,
+                 timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES):
+        """ Constructor method for Downloader class.
+
+            Args:
+                directory(str): local directory of the downloaded files
+                root_url(str): full URL to the root directory; file paths
+                               below it are kept in the local directory
+                jobs(int): number of files downloaded at once
+                segments(int): maximum number of segments of a single
+                               file fetched at once
+                session(requests.Session): session used to send requests;
+                                           if not given, a new one with
+                                           connection pool sized to all
+                                           segments is created
+                timeout(float): connect and read timeout of every request,
+                                in seconds
+                retries(int): number of retries of every request after
+                              transient errors; segments are resumed
+                              from the last received byte
+
+            Raises:
+                ValueError: if jobs or segments is lower than 1
+        """
+        if jobs < 1 or segments < 1:
+            raise ValueError(
+                f'Number of jobs and segments must be at least 1, '
+                f'got: {jobs}, {segments}'
+            )
+
+        self._directory = directory
+        self._root_url = root_url
+        self._jobs = jobs
+        self._segments = segments
+        self._timeout = timeout
+        self._retries = retries
+        self._own_session = session is None
+        self._session = session
+        if session is None:
+            self._session = create_session(pool_size=jobs * segments)
+        self._segment_executor = ThreadPoolExecutor(
+            max_workers=jobs * segments
+        )
+
+    def __enter__(self):
+        """ Use the downloader in the context.
+
+            Returns:
+                self(Downloader): the same downloader
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """ Close the downloader after the context."""
+        self.close()
+
+    def close(self):
+        """ Stop the segment workers, and close the session if it was
+            created by the downloader.
+        """
+        self._segment_executor.shutdown(wait=True)
+        if self._own_session:
+            self._session.close()
+
+    def download_all(self, items):
+        """ Download all files, several at once. Files are taken from
+            the iterable only when there is a free job, so the search
+            producing them can go on during the downloads.
+
+            Args:
+                items(iterable): file data dicts, with url and optionally
+                                 datetime keys
+
+            Yields:
+                result(DownloadResult): result of every file, in the order
+                                        the downloads finish
+        """
+        executor = ThreadPoolExecutor(max_workers=self._jobs)
+        pending = dict()
+        try:
+            for item in items:
+                while len(pending) >= self._jobs:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del pending[future]
+                        yield future.result()
+                pending[executor.submit(self.download, item)] = item
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def download(self, item):
+        """ Download a single file, unless it is up to date.
+
+            Args:
+                item(dict): file data, with url and optionally datetime
+                            keys
+
+            Returns:
+                result(DownloadResult): result of the download; errors
+                                        are reported by the FAILED status
+        """
+        url = item['url']
+        path = None
+        size = None
+        try:
+            path = local_path(url, self._root_url, self._directory)
+            size, validator, ranges = self._probe(url)
+            mtime = item.get('datetime')
+            if _is_current(path, size, mtime):
+                return DownloadResult(url, path, UP_TO_DATE, size=size)
+
+            self._fetch_file(url, path, size, validator, ranges)
+            if mtime is not None:
+                timestamp = listing_timestamp(mtime)
+                os.utime(path, (timestamp, timestamp))
+        except (OSError, ValueError) as error:
+            return DownloadResult(url, path, FAILED, size=size,
+                                  error=str(error))
+        return DownloadResult(url, path, DOWNLOADED, size=size)
+
+    def _with_retries(self, function, *args):
+        """ Call the function, again after transient errors, up to the
+            number of retries, with the random delay growing with every
+            attempt.
+
+            Args:
+                function(callable): called function
+                args: function arguments
+
+            Returns:
+                result: function result
+        """
+        attempt = 0
+        while True:
+            try:
+                return function(*args)
+            except (HTTPStatusError,) + TRANSIENT_ERRORS as error:
+                if attempt >= self._retries or not is_transient(error):
+                    raise
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    def _probe(self, url):
+        """ Get the file size, validator and ranges support from
+            the HEAD request.
+
+            Args:
+                url(str): full URL of the file
+
+            Returns:
+                size(int): file size in bytes, or None if not sent
+                validator(str): strong ETag or Last-Modified value, used
+                                to check the file did not change between
+                                requests; None if not sent
+                ranges(bool): True if the server accepts byte ranges
+
+            Raises:
+                HTTPStatusError: if the server returns unexpected status
+        """
+        request_result = self._with_retries(self._head, url)
+        headers = request_result.headers
+
+        size = headers.get('Content-Length')
+        size = int(size) if size and size.isdigit() else None
+        validator = headers.get('ETag')
+        if not validator or validator.startswith('W/'):
+            # Weak ETags can not be used in If-Range.
+            validator = headers.get('Last-Modified')
+        ranges = headers.get('Accept-Ranges', '').lower() == 'bytes'
+        return size, validator, ranges
+
+    def _head(self, url):
+        """ Send the HEAD request for the file.
+
+            Args:
+                url(str): full URL of the file
+
+            Returns:
+                request_result(requests.Response): response
+
+            Raises:
+                HTTPStatusError: if the status code is not 200
+        """
+        request_result = self._session.head(
+            url, headers=IDENTITY_HEADERS, allow_redirects=True,
+            timeout=self._timeout
+        )
+        if request_result.status_code != 200:
+            raise HTTPStatusError(
+                f'Can not download: {url}. '
+                f'Status code: {request_result.status_code}',
+                request_result.status_code
+            )
+        return request_result
+
+    def _fetch_file(self, url, path, size, validator, ranges):
+        """ Download the file into the part file, and move it to the path.
+            Big files are fetched in segments, if the server accepts
+            ranges. Saved progress is used, if the server file has
+            the same size and validator.
+
+            Args:
+                url(str): full URL of the file
+                path(str): local path of the file
+                size(int): file size in bytes, or None if not known
+                validator(str): file validator, or None if not known
+                ranges(bool): True if the server accepts byte ranges
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        part_path = path + PART_SUFFIX
+        state_path = path + STATE_SUFFIX
+        state = _load_state(state_path)
+        if state is None or state.get('size') != size \
+                or state.get('validator') != validator \
+                or validator is None or not ranges:
+            state = None
+
+        segment_count = 1
+        if ranges and size is not None:
+            segment_count = min(self._segments, size // MIN_SEGMENT_SIZE)
+        if segment_count > 1:
+            self._fetch_segmented(url, part_path, state_path, size,
+                                  validator, segment_count, state)
+        else:
+            self._fetch_stream(url, part_path, state_path, size, validator,
+                               resume=state is not None)
+
+        os.replace(part_path, path)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+
+    def _fetch_stream(self, url, part_path, state_path, size, validator,
+                      resume):
+        """ Download the file with a single request. After transient
+            errors, the request is sent again for the missing part,
+            if the server accepts ranges.
+
+            Args:
+                url(str): full URL of the file
+                part_path(str): local path of the part file
+                state_path(str): local path of the state file
+                size(int): file size in bytes, or None if not known
+                validator(str): file validator, or None if not known
+                resume(bool): True if the existing part file can be
+                              continued
+        """
+        if not resume and os.path.exists(part_path):
+            os.remove(part_path)
+        if validator is not None:
+            _save_state(state_path, {'size': size, 'validator': validator})
+        self._with_retries(self._fetch_rest, url, part_path, size, validator)
+
+    def _fetch_rest(self, url, part_path, size, validator):
+        """ Send single request for the part of the file missing
+            in the part file, and append it.
+
+            Args:
+                url(str): full URL of the file
+                part_path(str): local path of the part file
+                size(int): file size in bytes, or None if not known
+                validator(str): file validator, or None if not known
+
+            Raises:
+                HTTPStatusError: if the server returns unexpected status
+                requests.ConnectionError: if the response is shorter
+                                          than the file size
+        """
+        offset = 0
+        if validator is not None and os.path.exists(part_path):
+            offset = os.path.getsize(part_path)
+        if size is not None and offset >= size:
+            return
+
+        headers = dict(IDENTITY_HEADERS)
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = validator
+
+        request_result = self._session.get(url, headers=headers, stream=True,
+                                           timeout=self._timeout)
+        try:
+            if request_result.status_code == 200:
+                offset = 0
+            elif request_result.status_code != 206 or not offset:
+                raise HTTPStatusError(
+                    f'Can not download: {url}. '
+                    f'Status code: {request_result.status_code}',
+                    request_result.status_code
+                )
+
+            with open(part_path, 'r+b' if offset else 'wb') as part_file:
+                part_file.seek(offset)
+                part_file.truncate()
+                for chunk in request_result.raw.stream(
+                        CHUNK_SIZE, decode_content=False):
+                    part_file.write(chunk)
+                    offset += len(chunk)
+        finally:
+            request_result.close()
+
+        if size is not None and offset < size:
+            raise requests.exceptions.ConnectionError(
+                f'Download interrupted: {url}. '
+                f'Received {offset} of {size} bytes'
+            )
+
+    def _fetch_segmented(self, url, part_path, state_path, size, validator,
+                         segment_count, state):
+        """ Download the file in segments fetched at once, written
+            at their offsets into the preallocated part file.
+
+            Args:
+                url(str): full URL of the file
+                part_path(str): local path of the part file
+                state_path(str): local path of the state file
+                size(int): file size in bytes
+                validator(str): file validator, or None if not known
+                segment_count(int): number of segments
+                state(dict): saved state of the previous download, or None
+        """
+        if state is not None and state.get('segments'):
+            segments = state['segments']
+        else:
+            segment_size = -(-size // segment_count)
+            segments = [[start, min(start + segment_size, size)]
+                        for start in range(0, size, segment_size)]
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        progress = _Progress(state_path, size, validator, segments)
+
+        fd = os.open(part_path, os.O_RDWR | os.O_CREAT
+                     | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            _preallocate(fd, size)
+            futures = [
+                self._segment_executor.submit(
+                    self._with_retries, self._fetch_segment, url, fd,
+                    validator, progress, index
+                )
+                for index, (offset, end) in enumerate(segments)
+                if offset < end
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            finally:
+                progress.aborted = True
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                progress.save()
+        finally:
+            os.close(fd)
+
+    def _fetch_segment(self, url, fd, validator, progress, index):
+        """ Send single request for the missing part of the segment,
+            and write it into the part file.
+
+            Args:
+                url(str): full URL of the file
+                fd(int): part file descriptor
+                validator(str): file validator, or None if not known
+                progress(_Progress): progress of all segments
+                index(int): segment index
+
+            Raises:
+                HTTPStatusError: if the server does not return the range,
+                                 e.g. because the file has changed
+                requests.ConnectionError: if the response is shorter
+                                          than the segment
+        """
+        offset, end = progress.segments[index]
+        if progress.aborted or offset >= end:
+            return
+
+        headers = dict(IDENTITY_HEADERS)
+        headers['Range'] = f'bytes={offset}-{end - 1}'
+        if validator is not None:
+            headers['If-Range'] = validator
+
+        request_result = self._session.get(url, headers=headers, stream=True,
+                                           timeout=self._timeout)
+        try:
+            if request_result.status_code != 206:
+                raise HTTPStatusError(
+                    f'Can not download the range of: {url}. '
+                    f'Status code: {request_result.status_code}',
+                    request_result.status_code
+                )
+
+            for chunk in request_result.raw.stream(CHUNK_SIZE,
+                                                   decode_content=False):
+                if progress.aborted:
+                    return
+                chunk = chunk[:end - offset]
+                _write_at(fd, chunk, offset)
+                offset += len(chunk)
+                progress.update(index, offset)
+                if offset >= end:
+                    break
+        finally:
+            request_result.close()
+
+        if offset < end:
+            raise requests.exceptions.ConnectionError(
+                f'Download interrupted: {url}. '
+                f'Segment received up to {offset} of {end} bytes'
+            )
+
+
+class _Progress:
+    """ Class for the progress of the segmented download, saved
+        in the state file from time to time.
+    """
+    def __init__(self, state_path, size, validator, segments):
+        """ Constructor method for _Progress class.
+
+            Args:
+                state_path(str): local path of the state file
+                size(int): file size in bytes
+                validator(str): file validator
+                segments(list): list of [offset, end] lists - next byte
+                                to download and the end of every segment
+        """
+        self.segments = segments
+        self.aborted = False
+        self._state_path = state_path
+        self._size = size
+        self._validator = validator
+        self._lock = threading.Lock()
+        self._saved = time.monotonic()
+
+    def update(self, index, offset):
+        """ Update the offset of the segment, written to the part file.
+
+            Args:
+                index(int): segment index
+                offset(int): next byte to download
+        """
+        with self._lock:
+            self.segments[index][0] = offset
+            if time.monotonic() - self._saved >= STATE_INTERVAL:
+                self._save()
+
+    def save(self):
+        """ Save the progress in the state file."""
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        """ Save the progress, with the lock held."""
+        if self._validator is None:
+            return
+        _save_state(self._state_path, {
+            'size': self._size, 'validator': self._validator,
+            'segments': self.segments
+        })
+        self._saved = time.monotonic()
+
+
+def local_path(url, root_url, directory):
+    """ Get the local path of the file, keeping its path relative
+        to the root URL.
+
+        Args:
+            url(str): full URL of the file
+            root_url(str): full URL to the root directory
+            directory(str): local directory of the downloaded files
+
+        Returns:
+            path(str): local path of the file
+
+        Raises:
+            ValueError: if the URL has no file name, or its path leads
+                        outside the directory
+    """
+    parts = _relative_parts(url, root_url)
+    if not parts:
+        raise ValueError(f'Can not save the file from: {url}')
+    return os.path.join(directory, *parts)
+
+
+def local_dir(url, root_url, directory):
+    """ Get the local path of the directory, keeping its path relative
+        to the root URL.
+
+        Args:
+            url(str): full URL to the directory
+            root_url(str): full URL to the root directory
+            directory(str): local directory of the downloaded files
+
+        Returns:
+            path(str): local path of the directory; the local directory
+                       itself for the root URL
+
+        Raises:
+            ValueError: if the URL path leads outside the directory
+    """
+    return os.path.join(directory, *_relative_parts(url, root_url))
+
+
+def _relative_parts(url, root_url):
+    """ Get the decoded names of the URL path, relative to the root URL.
+
+        Args:
+            url(str): full URL
+            root_url(str): full URL to the root directory
+
+        Returns:
+            parts(list): names of the relative path
+
+        Raises:
+            ValueError: if the path leads outside the root directory
+    """
+    root_path = urlsplit(root_url).path
+    path = urlsplit(url).path
+    if path.startswith(root_path):
+        path = path[len(root_path):]
+    parts = [unquote(part) for part in path.split('/') if part]
+    if any(part in ('.', '..') or os.sep in part for part in parts):
+        raise ValueError(f'Can not save the file from: {url}')
+    return parts
+
+
+def listing_timestamp(mtime):
+    """ Convert the listed modification date to the timestamp of the local
+        file. Listings have no time zone, so the local one is used.
+
+        Args:
+            mtime(datetime.datetime): listed modification date
+
+        Returns:
+            timestamp(float): POSIX timestamp
+    """
+    return mtime.timestamp()
+
+
+def _is_current(path, size, mtime):
+    """ Check if the local file has the server size, and the listed
+        modification date (with minute precision of the listings).
+
+        Args:
+            path(str): local path of the file
+            size(int): server file size in bytes, or None if not known
+            mtime(datetime.datetime): listed modification date, or None
+
+        Returns:
+            current(bool): True if the file does not need the download
+    """
+    if size is None or not os.path.isfile(path):
+        return False
+    file_stat = os.stat(path)
+    if file_stat.st_size != size:
+        return False
+    return mtime is None \
+        or abs(file_stat.st_mtime - listing_timestamp(mtime)) < 60
+
+
+def _load_state(state_path):
+    """ Load the saved state of the interrupted download.
+
+        Args:
+            state_path(str): local path of the state file
+
+        Returns:
+            state(dict): saved state, or None if missing or not valid
+    """
+    try:
+        with open(state_path) as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def _save_state(state_path, state):
+    """ Save the state of the download, replacing the previous one
+        at once.
+
+        Args:
+            state_path(str): local path of the state file
+            state(dict): download state
+    """
+    temp_path = f'{state_path}.tmp'
+    with open(temp_path, 'w') as state_file:
+        json.dump(state, state_file)
+    os.replace(temp_path, state_path)
+
+
+def _preallocate(fd, size):
+    """ Reserve the disk space for the whole file. Falls back to setting
+        the file size, if the space can not be reserved.
+
+        Args:
+            fd(int): file descriptor
+            size(int): file size in bytes
+    """
+    if os.fstat(fd).st_size == size:
+        return
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        os.ftruncate(fd, size)
+
+
+def _write_at(fd, data, offset):
+    """ Write the data at the offset of the file, from many threads
+        at once.
+
+        Args:
+            fd(int): file descriptor
+            data(bytes): written data
+            offset(int): file offset
+    """
+    view = memoryview(data)
+    while view:
+        if hasattr(os, 'pwrite'):
+            written = os.pwrite(fd, view, offset)
+        else:
+            with _write_lock:
+                os.lseek(fd, offset, os.SEEK_SET)
+                written = os.write(fd, view)
+        view = view[written:]
+        offset += written
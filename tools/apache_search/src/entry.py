@@ -0,0 +1,241 @@
+""" Module for compact records of files and directories found in listings.
+
+    Records are read-only mappings, with the same keys as the dictionaries
+    used before: name/dir, url, datetime, size. Values not needed by
+    the caller are not computed - datetime is parsed, url is joined
+    and the file size in bytes is converted only on the first access,
+    and kept for the next ones.
+
+    Classes:
+        - FileEntry
+        - DirEntry
+
+    Functions:
+        - make_entry
+        - parse_size
+"""
+import os
+import re
+
+from collections.abc import Mapping
+from datetime import datetime
+
+
+LISTING_DATETIME_FORMAT = '%Y-%m-%d %H:%M'
+SIZE_REGEX = re.compile(r'(\d+\.?\d*)([KMG]?)\Z')
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+class _Entry(Mapping):
+    """ Base class for the file and directory records. Only the raw
+        values from the listing are stored; the record keeps no
+        per-instance dictionary.
+    """
+    NAME_KEY = None
+    __slots__ = ('_name', '_base_url', '_url', '_datetime', '_size')
+
+    def __init__(self, name=None, base_url=None, mtime=None, size=None,
+                 url=None):
+        """ Constructor method for the entry classes.
+
+            Args:
+                name(str): file or directory name
+                base_url(str): full URL to the directory containing
+                               the item, joined with the name on demand
+                mtime(str or datetime.datetime): last modification date,
+                                                 text in listing format
+                                                 is parsed on demand
+                size(str): size in listing format: X (bytes),
+                           XK (kilobytes), XM (megabytes), XG (gigabytes)
+                url(str): full URL to the item, if already known
+        """
+        self._name = name
+        self._base_url = base_url
+        self._url = url
+        self._datetime = mtime
+        self._size = size
+
+    def __getitem__(self, key):
+        """ Get the value of the given key.
+
+            Args:
+                key(str): one of the keys: name/dir, url, datetime, size
+
+            Returns:
+                value: key value
+
+            Raises:
+                KeyError: if the key is unknown or the value is missing
+        """
+        if key == self.NAME_KEY:
+            value = self._name
+        elif key == 'url':
+            value = self.url
+        elif key == 'datetime':
+            value = self.datetime
+        elif key == 'size':
+            value = self._size
+        else:
+            value = None
+
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        """ Iterate over keys of the values found in the listing.
+
+            Yields:
+                key(str): key name
+        """
+        if self._name is not None:
+            yield self.NAME_KEY
+            if self._url is not None or self._base_url is not None:
+                yield 'url'
+        elif self._url is not None:
+            yield 'url'
+        if self._datetime is not None:
+            yield 'datetime'
+        if self._size is not None:
+            yield 'size'
+
+    def __len__(self):
+        """ Get the number of keys.
+
+            Returns:
+                length(int): number of keys
+        """
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        """ Get the printable representation of the entry.
+
+            Returns:
+                representation(str): class name with the entry values
+        """
+        return f'{type(self).__name__}({dict(self)!r})'
+
+    def __reduce__(self):
+        """ Get the pickle data of the entry, with lazy values kept raw.
+
+            Returns:
+                reduce_value(tuple): class and constructor arguments
+        """
+        return type(self), (self._name, self._base_url, self._datetime,
+                            self._size, self._url)
+
+    def raw_values(self):
+        """ Get the values of the entry as stored, without computing
+            the lazy ones: the url is not joined, and the modification
+            date is not parsed.
+
+            Returns:
+                values(dict): dictionary with keys: name/dir, url,
+                              or base_url if the url is not joined yet,
+                              datetime (text in listing format, or
+                              datetime.datetime), size; missing values
+                              are left out
+        """
+        values = {self.NAME_KEY: self._name, 'url': self._url,
+                  'datetime': self._datetime, 'size': self._size}
+        if self._url is None:
+            values['base_url'] = self._base_url
+        return {key: value for key, value in values.items()
+                if value is not None}
+
+    @property
+    def url(self):
+        """ Get the full URL to the item, joined on the first access.
+
+            Returns:
+                self._url(str): full URL, or None if the name is unknown
+        """
+        if self._url is None and self._name is not None \
+                and self._base_url is not None:
+            self._url = os.path.join(self._base_url, self._name)
+        return self._url
+
+    @property
+    def datetime(self):
+        """ Get the last modification date, parsed on the first access.
+
+            Returns:
+                self._datetime(datetime.datetime): last modification date,
+                                                   or None if not listed
+        """
+        if isinstance(self._datetime, str):
+            self._datetime = datetime.strptime(
+                self._datetime, LISTING_DATETIME_FORMAT
+            )
+        return self._datetime
+
+
+class FileEntry(_Entry):
+    """ Record of a file, with keys: name, url, datetime, size."""
+    NAME_KEY = 'name'
+    __slots__ = ('_size_bytes',)
+
+    @property
+    def size_bytes(self):
+        """ Get the file size as the number of bytes, converted
+            on the first access.
+
+            Returns:
+                self._size_bytes(int): file size in bytes, or None
+                                       if not listed
+        """
+        try:
+            return self._size_bytes
+        except AttributeError:
+            # The slot is set by the first access.
+            self._size_bytes = parse_size(self._size)
+            return self._size_bytes
+
+
+class DirEntry(_Entry):
+    """ Record of a directory, with keys: dir, url, datetime."""
+    NAME_KEY = 'dir'
+    __slots__ = ()
+
+
+def make_entry(item):
+    """ Make the entry from the dictionary with file/directory data,
+        e.g. loaded from json.
+
+        Args:
+            item(dict): dictionary with file/directory data; base_url
+                        key is used for the url, if it is missing
+
+        Returns:
+            entry(FileEntry or DirEntry): entry with the same data
+    """
+    if isinstance(item, _Entry):
+        return item
+    entry_class = DirEntry if 'dir' in item else FileEntry
+    return entry_class(
+        name=item.get(entry_class.NAME_KEY),
+        base_url=item.get('base_url'),
+        mtime=item.get('datetime'),
+        size=item.get('size'),
+        url=item.get('url')
+    )
+
+
+def parse_size(size):
+    """ Convert the size in listing format to the number of bytes.
+
+        Args:
+            size(str): size in format: X (bytes), XK (kilobytes),
+                       XM (megabytes), XG (gigabytes)
+
+        Returns:
+            size_bytes(int): size in bytes, or None if the size
+                             is missing or not recognised
+    """
+    if size is None:
+        return None
+    size_match = SIZE_REGEX.match(size)
+    if not size_match:
+        return None
+    number, unit = size_match.groups()
+    return int(float(number) * SIZE_UNITS[unit])
@@ -0,0 +1,219 @@
+""" Module for filtering files and directories during the crawl.
+
+    Classes:
+        - CrawlFilter
+
+    Functions:
+        - relative_path
+"""
+import re
+
+from fnmatch import fnmatchcase
+
+from tools.apache_search.src.entry import parse_size
+
+
+class CrawlFilter:
+    """ Class for deciding which files are reported, and which directories
+        are walked by the recursive search.
+
+        File filters (name, regex, newer_than, min_size, max_size) are
+        checked for every listed file. Directory filters (max_depth,
+        include_dirs, exclude_dirs) are checked for every subpage before
+        it is fetched, so the whole subtree of the rejected directory
+        is pruned.
+
+        Directories are described by the path relative to the crawl root,
+        without leading and trailing slashes, e.g. "releases/1.0".
+        Directory patterns are globs matched against the whole relative
+        path, or against the directory name only.
+    """
+    def __init__(self, names=None, regex=None, newer_than=None,
+                 min_size=None, max_size=None, max_depth=None,
+                 include_dirs=None, exclude_dirs=None):
+        """ Constructor method for CrawlFilter class.
+
+            Args:
+                names(list): glob patterns of the file names; file must
+                             match at least one of them
+                regex(str): regular expression searched in the file names
+                newer_than(datetime.datetime): files modified before
+                                               are skipped
+                min_size(int): smaller files are skipped, in bytes
+                max_size(int): bigger files are skipped, in bytes
+                max_depth(int): deeper directories are not walked;
+                                0 means the crawl root only
+                include_dirs(list): glob patterns of walked directories;
+                                    their whole subtrees are walked, and
+                                    other directories only on the way
+                                    to them
+                exclude_dirs(list): glob patterns of directories which
+                                    subtrees are not walked
+
+            Raises:
+                re.error: if the regex is not valid
+        """
+        self._names = list(names or [])
+        self._regex = re.compile(regex) if regex else None
+        self._newer_than = newer_than
+        self._min_size = min_size
+        self._max_size = max_size
+        self._max_depth = max_depth
+        self._include_dirs = [pattern.strip('/')
+                              for pattern in include_dirs or []]
+        self._exclude_dirs = [pattern.strip('/')
+                              for pattern in exclude_dirs or []]
+
+    @property
+    def filters_dirs(self):
+        """ Check if any directory filter is set.
+
+            Returns:
+                filters_dirs(bool): True if some directories below the crawl
+                                    root may not be walked
+        """
+        return self._max_depth is not None or bool(self._include_dirs) \
+            or bool(self._exclude_dirs)
+
+    def match_file(self, item):
+        """ Check if the file passes all file filters. Files without
+            the value needed by the filter do not pass it.
+
+            Args:
+                item(FileEntry): file data
+
+            Returns:
+                match(bool): True if the file should be reported
+        """
+        name = item.get('name')
+        if self._names or self._regex is not None:
+            if name is None:
+                return False
+            if self._names and not any(fnmatchcase(name, pattern)
+                                       for pattern in self._names):
+                return False
+            if self._regex is not None and not self._regex.search(name):
+                return False
+
+        if self._newer_than is not None:
+            mtime = item.get('datetime')
+            if mtime is None or mtime <= self._newer_than:
+                return False
+
+        if self._min_size is not None or self._max_size is not None:
+            size = parse_size(item.get('size'))
+            if size is None:
+                return False
+            if self._min_size is not None and size < self._min_size:
+                return False
+            if self._max_size is not None and size > self._max_size:
+                return False
+        return True
+
+    def follow_dir(self, path):
+        """ Check if the directory should be walked.
+
+            Args:
+                path(str): directory path relative to the crawl root
+
+            Returns:
+                follow(bool): True if the directory should be fetched
+        """
+        parts = _split_path(path)
+        if self._max_depth is not None and len(parts) > self._max_depth:
+            return False
+        if any(_match_dir(parts, pattern) for pattern in self._exclude_dirs):
+            return False
+        if not self._include_dirs:
+            return True
+        return self.match_dir(path) or any(
+            _leads_to(parts, pattern) for pattern in self._include_dirs
+        )
+
+    def match_dir(self, path):
+        """ Check if the files of the directory should be reported,
+            which means the directory, or one of its parents, matches
+            the include patterns.
+
+            Args:
+                path(str): directory path relative to the crawl root
+
+            Returns:
+                match(bool): True if the directory files should be reported
+        """
+        if not self._include_dirs:
+            return True
+        parts = _split_path(path)
+        for depth in range(1, len(parts) + 1):
+            if any(_match_dir(parts[:depth], pattern)
+                   for pattern in self._include_dirs):
+                return True
+        return False
+
+
+def relative_path(url, root_url):
+    """ Get the directory path relative to the crawl root.
+
+        Args:
+            url(str): full URL to the directory
+            root_url(str): full URL to the crawl root directory
+
+        Returns:
+            path(str): relative path without leading and trailing slashes,
+                       empty for the root itself
+    """
+    if not url.startswith(root_url):
+        return url.strip('/')
+    return url[len(root_url):].strip('/')
+
+
+def _split_path(path):
+    """ Split the relative directory path into its names.
+
+        Args:
+            path(str): relative directory path
+
+        Returns:
+            parts(list): directory names, empty for the crawl root
+    """
+    return [part for part in path.split('/') if part]
+
+
+def _match_dir(parts, pattern):
+    """ Check if the directory matches the glob pattern. Patterns with
+        slashes are matched against the whole path, others against
+        the directory name.
+
+        Args:
+            parts(list): directory names of the relative path
+            pattern(str): glob pattern
+
+        Returns:
+            match(bool): True if the directory matches the pattern
+    """
+    if not parts:
+        return False
+    if '/' in pattern:
+        return fnmatchcase('/'.join(parts), pattern)
+    return fnmatchcase(parts[-1], pattern)
+
+
+def _leads_to(parts, pattern):
+    """ Check if the directory can be the parent of the directories
+        matching the glob pattern, so it has to be walked to reach them.
+
+        Args:
+            parts(list): directory names of the relative path
+            pattern(str): glob pattern
+
+        Returns:
+            leads(bool): True if the directory can lead to the match
+    """
+    if '/' not in pattern:
+        # Directory name pattern can match at any depth.
+        return True
+    pattern_parts = pattern.split('/')
+    if len(parts) >= len(pattern_parts):
+        return False
+    return all(fnmatchcase(part, pattern_part)
+               for part, pattern_part in zip(parts, pattern_parts))
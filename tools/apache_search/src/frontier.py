@@ -0,0 +1,208 @@
+""" Module for the frontier of the crawl: directories already found,
+    but not walked yet. The frontier of a wide tree can have millions
+    of directories, so above the given number of items its part is
+    spilled to the temporary files, and read back when needed.
+
+    Classes:
+        - Frontier
+"""
+import os
+import pickle
+import shutil
+import tempfile
+
+from collections import deque
+
+
+BFS = 'bfs'
+DFS = 'dfs'
+ORDERS = (BFS, DFS)
+# Estimated memory of a single item in the frontier, in bytes: tuple
+# of the directory URL and its modification date.
+ITEM_SIZE = 512
+MIN_ITEMS = 2
+
+
+class Frontier:
+    """ Class for the directories waiting to be walked, in the given
+        order: breadth-first (queue) or depth-first (stack).
+
+        Breadth-first order walks the tree level by level, and the frontier
+        grows with the width of the tree. Depth-first order walks every
+        subtree to the end first, and the frontier grows only with the depth
+        and the number of subdirectories on the path.
+
+        At most max_items are kept in memory; when the limit is exceeded,
+        items walked last are written to a temporary file (chunk), which is
+        read back when memory items run out. Chunks are removed when read,
+        and all of them when the frontier is closed.
+    """
+    def __init__(self, order=DFS, max_items=None, spill_dir=None):
+        """ Constructor method for Frontier class.
+
+            Args:
+                order(str): walk order, one of ORDERS
+                max_items(int): maximum number of items kept in memory;
+                                not limited if not given
+                spill_dir(str): directory of the temporary files;
+                                the system default if not given
+
+            Raises:
+                ValueError: if the order is unknown, or max_items is lower
+                            than MIN_ITEMS
+        """
+        if order not in ORDERS:
+            raise ValueError(f'Unknown walk order: {order}')
+        if max_items is not None and max_items < MIN_ITEMS:
+            raise ValueError(
+                f'Maximum number of items must be at least {MIN_ITEMS}, '
+                f'got: {max_items}'
+            )
+
+        self._order = order
+        self._max_items = max_items
+        self._spill_dir = spill_dir
+        self._temp_dir = None
+        self._head = deque()
+        self._tail = list()
+        self._chunks = deque()
+        self._chunk_count = 0
+        self._spilled = 0
+
+    def __len__(self):
+        """ Get the number of items in the frontier, spilled ones included.
+
+            Returns:
+                length(int): number of items
+        """
+        return len(self._head) + len(self._tail) + self._spilled
+
+    def __enter__(self):
+        """ Enter the frontier context.
+
+            Returns:
+                self(Frontier): the same frontier
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """ Close the frontier, when leaving the context.
+
+            Args:
+                exc_info: exception type, value and traceback
+        """
+        self.close()
+
+    @property
+    def chunks_written(self):
+        """ Get the number of chunks spilled to disk since the frontier
+            was created.
+
+            Returns:
+                self._chunk_count(int): number of written chunks
+        """
+        return self._chunk_count
+
+    def push(self, item):
+        """ Add the item to the frontier.
+
+            Args:
+                item: picklable item, e.g. (url, mtime) tuple
+        """
+        # Breadth-first: items are taken from the head, then from chunks,
+        # then from the tail - new items go to the tail after chunks.
+        if self._order == BFS and (self._chunks or self._tail):
+            self._tail.append(item)
+        else:
+            self._head.append(item)
+
+        if self._max_items is not None \
+                and len(self._head) + len(self._tail) > self._max_items:
+            self._spill()
+
+    def pop(self):
+        """ Take the next item from the frontier.
+
+            Returns:
+                item: next item in the walk order
+
+            Raises:
+                IndexError: if the frontier is empty
+        """
+        if not self._head:
+            if self._chunks:
+                self._head = deque(self._read_chunk())
+                if self._tail and len(self._head) + len(self._tail) \
+                        > self._max_items:
+                    self._spill()
+            elif self._tail:
+                self._head = deque(self._tail)
+                self._tail = list()
+            else:
+                raise IndexError('pop from an empty frontier')
+
+        if self._order == BFS:
+            return self._head.popleft()
+        return self._head.pop()
+
+    def close(self):
+        """ Remove all items, and the temporary files."""
+        self._head = deque()
+        self._tail = list()
+        self._chunks = deque()
+        self._spilled = 0
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+
+    def _spill(self):
+        """ Write the items walked last into the chunk file."""
+        if self._order == BFS:
+            if self._tail:
+                items = self._tail
+                self._tail = list()
+            else:
+                keep = len(self._head) // 2
+                items = list(self._head)[keep:]
+                self._head = deque(list(self._head)[:keep])
+            self._chunks.append(self._write_chunk(items))
+        else:
+            spill = len(self._head) // 2
+            items = list(self._head)[:spill]
+            self._head = deque(list(self._head)[spill:])
+            self._chunks.append(self._write_chunk(items))
+
+    def _write_chunk(self, items):
+        """ Write the items into the new chunk file.
+
+            Args:
+                items(list): items in the frontier order
+
+            Returns:
+                path(str): path to the chunk file
+        """
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix='apache-search-',
+                                              dir=self._spill_dir)
+        path = os.path.join(self._temp_dir, f'{self._chunk_count}.chunk')
+        with open(path, 'wb') as chunk_file:
+            pickle.dump(items, chunk_file, pickle.HIGHEST_PROTOCOL)
+        self._chunk_count += 1
+        self._spilled += len(items)
+        return path
+
+    def _read_chunk(self):
+        """ Read and remove the chunk file, which items come next.
+
+            Returns:
+                items(list): items of the chunk
+        """
+        if self._order == BFS:
+            path = self._chunks.popleft()
+        else:
+            path = self._chunks.pop()
+        with open(path, 'rb') as chunk_file:
+            items = pickle.load(chunk_file)
+        os.remove(path)
+        self._spilled -= len(items)
+        return items
@@ -0,0 +1,443 @@
+""" Module for the local index of crawled directory trees, kept in the
+    SQLite database, so questions about the tree are answered without
+    the network.
+
+    Every directory of the indexed tree is stored with its last
+    modification date, as listed by the parent directory, and every
+    file and subdirectory it lists, with indexes on their relative path,
+    name, modification date and size. The index is refreshed by the
+    crawl with the snapshot loaded from the database. The directory
+    modification date changes only when its direct entries change,
+    so only directories without subdirectories, which modification
+    date has not changed, are taken from the index; all other
+    directories are fetched again, conditionally with the listing
+    cache, and only changed rows are written again. The crawler, with
+    the HTTP libraries, is imported only by the refresh, so the query
+    command starts fast.
+
+    Classes:
+        - ListingIndex
+
+    Functions:
+        - default_index_path
+"""
+import os
+import re
+import sqlite3
+
+from datetime import datetime
+from urllib.parse import unquote
+
+from tools.apache_search.src.cache import default_cache_dir
+from tools.apache_search.src.entry import LISTING_DATETIME_FORMAT
+from tools.apache_search.src.entry import DirEntry
+from tools.apache_search.src.entry import FileEntry
+from tools.apache_search.src.entry import parse_size
+from tools.apache_search.src.filters import relative_path
+from tools.apache_search.src.snapshot import Snapshot
+from tools.apache_search.src.urls import normalize_url
+
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS directories ('
+    ' id INTEGER PRIMARY KEY,'
+    ' root TEXT NOT NULL,'
+    ' url TEXT NOT NULL,'
+    ' path TEXT NOT NULL,'
+    ' datetime TEXT,'
+    ' UNIQUE (root, url))',
+    'CREATE TABLE IF NOT EXISTS entries ('
+    ' directory_id INTEGER NOT NULL REFERENCES directories (id),'
+    ' type TEXT NOT NULL,'
+    ' name TEXT NOT NULL,'
+    ' path TEXT NOT NULL,'
+    ' url TEXT NOT NULL,'
+    ' datetime TEXT,'
+    ' size TEXT,'
+    ' size_bytes INTEGER)',
+    'CREATE INDEX IF NOT EXISTS entries_directory ON entries (directory_id)',
+    'CREATE INDEX IF NOT EXISTS entries_path ON entries (path)',
+    'CREATE INDEX IF NOT EXISTS entries_name ON entries (name)',
+    'CREATE INDEX IF NOT EXISTS entries_datetime ON entries (datetime)',
+    'CREATE INDEX IF NOT EXISTS entries_size ON entries (size_bytes)',
+)
+SORT_KEYS = ('path', 'name', 'datetime', 'size')
+SORT_COLUMNS = {'path': 'e.path', 'name': 'e.name',
+                'datetime': 'e.datetime', 'size': 'e.size_bytes'}
+INDEX_FILE_NAME = 'index.sqlite'
+
+
+class ListingIndex:
+    """ Class for the SQLite index of directory trees, keyed by the root
+        URL of every indexed tree. Should be closed after use, or used
+        as a context manager.
+    """
+    def __init__(self, path):
+        """ Constructor method for ListingIndex class. The database
+            and its tables are created, if they do not exist.
+
+            Args:
+                path(str): path to the database file
+        """
+        self._connection = sqlite3.connect(path)
+        self._connection.create_function('regexp', 2, _regexp)
+        with self._connection:
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+
+    def __enter__(self):
+        """ Use the index in the context.
+
+            Returns:
+                self(ListingIndex): the same index
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """ Close the index after the context."""
+        self.close()
+
+    def close(self):
+        """ Close the database connection."""
+        self._connection.close()
+
+    def roots(self):
+        """ Get the root URLs of all indexed trees.
+
+            Returns:
+                roots(list): list of (root, directories, entries) tuples -
+                             root URL, number of its directories and
+                             number of their files and subdirectories
+        """
+        return self._connection.execute(
+            'SELECT d.root, COUNT(DISTINCT d.id), COUNT(e.directory_id) '
+            'FROM directories AS d '
+            'LEFT JOIN entries AS e ON e.directory_id = d.id '
+            'GROUP BY d.root ORDER BY d.root'
+        ).fetchall()
+
+    def refresh(self, url, failures=None, **kwargs):
+        """ Crawl the tree and write its changes into the index.
+            Directories without subdirectories, not modified since
+            the previous refresh, are not fetched; other directories are
+            fetched by every refresh, so changes deeper in their subtrees
+            are found. The index is not changed, if any directory can not
+            be fetched.
+
+            Args:
+                url(str): full URL to the root directory of the tree,
+                          stored in the normal form
+                failures(list): if given, extended with (url, error) tuples
+                                of directories which could not be fetched,
+                                in the keep going mode
+                kwargs: Crawler arguments, except snapshot
+
+            Returns:
+                counts(tuple): (walked, written) tuple - number of
+                               directories in the tree, and number
+                               of directories written into the index
+        """
+        from tools.apache_search.src.crawler import Crawler
+
+        url = normalize_url(url)
+        snapshot = self.load_snapshot(url)
+        crawler = Crawler(url, snapshot=snapshot, **kwargs)
+        walked = sum(1 for _ in crawler.pages())
+        if failures is not None:
+            failures.extend(crawler.failures)
+        if crawler.failures:
+            return walked, 0
+        return walked, self.save_snapshot(url, snapshot)
+
+    def load_snapshot(self, root):
+        """ Load the indexed tree as the snapshot, to be passed to the
+            crawler refreshing the index.
+
+            Args:
+                root(str): full URL to the root directory of the tree
+
+            Returns:
+                snapshot(Snapshot): snapshot of the tree; empty if the tree
+                                    is not indexed
+        """
+        directories = dict()
+        urls = dict()
+        for directory_id, url, mtime in self._connection.execute(
+                'SELECT id, url, datetime FROM directories WHERE root = ?',
+                (root,)):
+            if mtime is not None:
+                mtime = datetime.strptime(mtime, LISTING_DATETIME_FORMAT)
+            directories[url] = {'datetime': mtime, 'files': list(),
+                                'subpages': list()}
+            urls[directory_id] = url
+
+        for directory_id, entry_type, name, url, mtime, size in \
+                self._connection.execute(
+                    'SELECT e.directory_id, e.type, e.name, e.url, '
+                    'e.datetime, e.size FROM entries AS e '
+                    'JOIN directories AS d ON d.id = e.directory_id '
+                    'WHERE d.root = ? ORDER BY e.rowid', (root,)):
+            directory = directories[urls[directory_id]]
+            if entry_type == 'dir':
+                directory['subpages'].append(
+                    DirEntry(name=name, url=url, mtime=mtime)
+                )
+            else:
+                directory['files'].append(
+                    FileEntry(name=name, url=url, mtime=mtime, size=size)
+                )
+        return Snapshot(directories)
+
+    def save_snapshot(self, root, snapshot):
+        """ Write the tree of the snapshot into the index, in a single
+            transaction. Directories without subdirectories, with
+            the same modification date as in the index, were taken from
+            it by the crawler, so they are not written again; other
+            directories are written only if their entries have changed.
+            Directories missing in the snapshot are removed.
+
+            Args:
+                root(str): full URL to the root directory of the tree
+                snapshot(Snapshot): snapshot of the complete crawl
+
+            Returns:
+                written(int): number of directories written
+        """
+        written = 0
+        with self._connection:
+            indexed = {
+                url: (directory_id, mtime)
+                for directory_id, url, mtime in self._connection.execute(
+                    'SELECT id, url, datetime FROM directories '
+                    'WHERE root = ?', (root,)
+                )
+            }
+            for url, directory in snapshot.items():
+                mtime = _format_datetime(directory['datetime'])
+                directory_id, indexed_mtime = indexed.pop(url, (None, None))
+                if directory_id is not None:
+                    if mtime is not None and mtime == indexed_mtime \
+                            and not directory['subpages']:
+                        continue
+                    if mtime == indexed_mtime \
+                            and self._entry_rows(root, directory) \
+                            == self._indexed_rows(directory_id):
+                        continue
+                    self._delete_directory(directory_id)
+                self._insert_directory(root, url, mtime, directory)
+                written += 1
+
+            for directory_id, _ in indexed.values():
+                self._delete_directory(directory_id)
+        return written
+
+    def query(self, root=None, files=False, dirs=False, names=None,
+              regex=None, newer_than=None, min_size=None, max_size=None,
+              paths=None, sort='path', reverse=False, limit=None):
+        """ Find files and directories in the index. Glob patterns
+            are case sensitive, like in the crawl filter.
+
+            Args:
+                root(str): full URL to the root directory of the indexed
+                           tree; all trees if not given
+                files(bool): if True, only files are found
+                dirs(bool): if True, only directories are found
+                names(list): glob patterns, one of them has to match
+                             the name
+                regex(str): regular expression searched in the name
+                newer_than(datetime.datetime): minimum modification date,
+                                               exclusive
+                min_size(int): minimum size in bytes
+                max_size(int): maximum size in bytes
+                paths(list): glob patterns, one of them has to match
+                             the path relative to the root
+                sort(str): one of SORT_KEYS
+                reverse(bool): if True, sorted in descending order
+                limit(int): maximum number of results
+
+            Yields:
+                entry(FileEntry or DirEntry): found file or directory
+
+            Raises:
+                ValueError: if the sort key is unknown
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f'Unknown sort key: {sort}')
+
+        conditions = list()
+        params = list()
+        if root is not None:
+            root = normalize_url(root)
+            conditions.append('d.root = ?')
+            params.append(root)
+        if files:
+            conditions.append("e.type = 'file'")
+        if dirs:
+            conditions.append("e.type = 'dir'")
+        for column, patterns in (('e.name', names), ('e.path', paths)):
+            if patterns:
+                conditions.append('({})'.format(' OR '.join(
+                    [f'{column} GLOB ?'] * len(patterns)
+                )))
+                params.extend(_glob_pattern(pattern) for pattern in patterns)
+        if regex is not None:
+            conditions.append('e.name REGEXP ?')
+            params.append(regex)
+        if newer_than is not None:
+            conditions.append('e.datetime > ?')
+            params.append(_format_datetime(newer_than))
+        if min_size is not None:
+            conditions.append('e.size_bytes >= ?')
+            params.append(min_size)
+        if max_size is not None:
+            conditions.append('e.size_bytes <= ?')
+            params.append(max_size)
+
+        statement = (
+            'SELECT e.type, e.name, e.url, e.datetime, e.size '
+            'FROM entries AS e '
+            'JOIN directories AS d ON d.id = e.directory_id'
+        )
+        if conditions:
+            statement += ' WHERE ' + ' AND '.join(conditions)
+        order = 'DESC' if reverse else 'ASC'
+        statement += f' ORDER BY {SORT_COLUMNS[sort]} {order}, e.path'
+        if limit is not None:
+            statement += ' LIMIT ?'
+            params.append(limit)
+
+        for entry_type, name, url, mtime, size in self._connection.execute(
+                statement, params):
+            if entry_type == 'dir':
+                yield DirEntry(name=name, url=url, mtime=mtime)
+            else:
+                yield FileEntry(name=name, url=url, mtime=mtime, size=size)
+
+    def _insert_directory(self, root, url, mtime, directory):
+        """ Insert the directory, with its files and subdirectories.
+
+            Args:
+                root(str): full URL to the root directory of the tree
+                url(str): full URL to the directory
+                mtime(str): directory modification date, in listing format
+                directory(dict): directory entry of the snapshot
+        """
+        cursor = self._connection.execute(
+            'INSERT INTO directories (root, url, path, datetime) '
+            'VALUES (?, ?, ?, ?)',
+            (root, url, unquote(relative_path(url, root)), mtime)
+        )
+        directory_id = cursor.lastrowid
+        rows = [(directory_id,) + row
+                for row in self._entry_rows(root, directory)]
+        self._connection.executemany(
+            'INSERT INTO entries (directory_id, type, name, path, url, '
+            'datetime, size, size_bytes) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            rows
+        )
+
+    def _entry_rows(self, root, directory):
+        """ Get the rows of the directory files and subdirectories,
+            without the directory id.
+
+            Args:
+                root(str): full URL to the root directory of the tree
+                directory(dict): directory entry of the snapshot
+
+            Returns:
+                rows(list): list of (type, name, path, url, datetime,
+                            size, size_bytes) tuples
+        """
+        rows = list()
+        for entry_type, name_key, items in (
+                ('dir', 'dir', directory['subpages']),
+                ('file', 'name', directory['files'])):
+            for item in items:
+                item_url = item['url']
+                size = item.get('size')
+                rows.append((
+                    entry_type, item.get(name_key, ''),
+                    unquote(relative_path(item_url, root)), item_url,
+                    _format_datetime(item.get('datetime')), size,
+                    parse_size(size)
+                ))
+        return rows
+
+    def _indexed_rows(self, directory_id):
+        """ Get the indexed rows of the directory files
+            and subdirectories, in the order they were written.
+
+            Args:
+                directory_id(int): directory row id
+
+            Returns:
+                rows(list): list of tuples, see _entry_rows
+        """
+        return [tuple(row) for row in self._connection.execute(
+            'SELECT type, name, path, url, datetime, size, size_bytes '
+            'FROM entries WHERE directory_id = ? ORDER BY rowid',
+            (directory_id,)
+        )]
+
+    def _delete_directory(self, directory_id):
+        """ Delete the directory, with its files and subdirectories.
+
+            Args:
+                directory_id(int): directory row id
+        """
+        self._connection.execute(
+            'DELETE FROM entries WHERE directory_id = ?', (directory_id,)
+        )
+        self._connection.execute(
+            'DELETE FROM directories WHERE id = ?', (directory_id,)
+        )
+
+
+def default_index_path():
+    """ Get the default path of the index database, in the cache directory.
+
+        Returns:
+            path(str): path to the database file
+    """
+    return os.path.join(default_cache_dir(), INDEX_FILE_NAME)
+
+
+def _format_datetime(mtime):
+    """ Format the modification date as stored in the index, in listing
+        format, which sorts in the date order.
+
+        Args:
+            mtime(datetime.datetime): modification date, or None
+
+        Returns:
+            mtime(str): formatted date, or None
+    """
+    if mtime is None:
+        return None
+    return mtime.strftime(LISTING_DATETIME_FORMAT)
+
+
+def _glob_pattern(pattern):
+    """ Convert the fnmatch pattern to the SQLite GLOB pattern, which
+        negates the character set with ^ instead of !.
+
+        Args:
+            pattern(str): fnmatch glob pattern
+
+        Returns:
+            pattern(str): SQLite glob pattern
+    """
+    return pattern.replace('[!', '[^')
+
+
+def _regexp(pattern, value):
+    """ Implement the REGEXP operator of SQLite.
+
+        Args:
+            pattern(str): regular expression
+            value(str): searched value
+
+        Returns:
+            match(bool): True if the pattern is found in the value
+    """
+    return value is not None and re.search(pattern, value) is not None
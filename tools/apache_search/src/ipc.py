@@ -0,0 +1,172 @@
+""" Module for the messages sent between the daemon and its client,
+    over the Unix socket.
+
+    Every message is a frame: one byte of the frame kind, four bytes
+    of the payload length (big-endian), and the payload.
+        - REQUEST (client): JSON object with the command line arguments
+          (args), working directory (cwd), and the encoding and errors
+          of the client standard output
+        - STDOUT, STDERR (daemon): output of the command, as it is written
+        - EXIT (daemon): exit code of the command, ends the answer
+
+    The socket in the shared temporary directory is kept in the private
+    directory of the user, and the client connects only to the socket
+    owned by its user, so other users can neither take the socket path
+    nor receive the commands.
+
+    Only the standard library is imported, so the client starts fast.
+
+    Functions:
+        - default_socket_path
+        - is_user_socket
+        - send_frame
+        - recv_frame
+        - _private_dir
+        - _recv_exactly
+"""
+import os
+import stat
+import struct
+import tempfile
+
+
+SOCKET_ENV = 'APACHE_SEARCH_SOCKET'
+SOCKET_NAME = 'apache-search.sock'
+REQUEST = b'r'
+STDOUT = b'o'
+STDERR = b'e'
+EXIT = b'x'
+HEADER = struct.Struct('!cI')
+PRIVATE_DIR_MODE = 0o700
+
+
+def default_socket_path():
+    """ Get the path to the daemon socket: from the APACHE_SEARCH_SOCKET
+        environment variable, or in the user runtime directory,
+        or in the private directory of the user in the temporary
+        directory, created if it does not exist.
+
+        Returns:
+            socket_path(str): path to the socket
+
+        Raises:
+            PermissionError: if the private directory is not a directory
+                             accessible only by the current user
+    """
+    socket_path = os.environ.get(SOCKET_ENV)
+    if socket_path:
+        return socket_path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    private_dir = _private_dir(os.path.join(tempfile.gettempdir(),
+                                            f'apache-search-{os.getuid()}'))
+    return os.path.join(private_dir, SOCKET_NAME)
+
+
+def is_user_socket(socket_path):
+    """ Check if the path is the socket owned by the current user.
+        Symbolic links are not followed.
+
+        Args:
+            socket_path(str): path to the socket
+
+        Returns:
+            is_user_socket(bool): True if the path is the socket
+                                  of the current user
+    """
+    try:
+        status = os.lstat(socket_path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(status.st_mode) and status.st_uid == os.getuid()
+
+
+def send_frame(sock, kind, payload):
+    """ Send the frame over the socket.
+
+        Args:
+            sock(socket.socket): connected socket
+            kind(bytes): frame kind, e.g. STDOUT
+            payload(bytes): frame payload
+    """
+    sock.sendall(HEADER.pack(kind, len(payload)) + payload)
+
+
+def recv_frame(sock):
+    """ Receive the next frame from the socket.
+
+        Args:
+            sock(socket.socket): connected socket
+
+        Returns:
+            frame(tuple): (kind, payload) tuple, or None if the connection
+                          was closed before the frame
+
+        Raises:
+            ConnectionError: if the connection was closed in the middle
+                             of the frame
+    """
+    header = _recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    kind, size = HEADER.unpack(header)
+    payload = _recv_exactly(sock, size)
+    if payload is None:
+        raise ConnectionError('Connection closed in the middle of a frame.')
+    return kind, payload
+
+
+def _private_dir(path):
+    """ Create the directory accessible only by the current user,
+        or check the existing one. Symbolic links are not followed.
+
+        Args:
+            path(str): path to the directory
+
+        Returns:
+            path(str): path to the directory
+
+        Raises:
+            PermissionError: if the path is not a directory of the current
+                             user, or is accessible by other users
+    """
+    try:
+        os.mkdir(path, PRIVATE_DIR_MODE)
+    except FileExistsError:
+        pass
+    status = os.lstat(path)
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid() \
+            or stat.S_IMODE(status.st_mode) & ~PRIVATE_DIR_MODE:
+        raise PermissionError(
+            f'Not a private directory of the current user: {path}'
+        )
+    return path
+
+
+def _recv_exactly(sock, size):
+    """ Receive the given number of bytes from the socket.
+
+        Args:
+            sock(socket.socket): connected socket
+            size(int): number of bytes
+
+        Returns:
+            data(bytes): received bytes, or None if the connection was
+                         closed before the first byte
+
+        Raises:
+            ConnectionError: if the connection was closed after some
+                             of the bytes
+    """
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            if not data:
+                return None
+            raise ConnectionError(
+                'Connection closed in the middle of a frame.'
+            )
+        data.extend(chunk)
+    return bytes(data)
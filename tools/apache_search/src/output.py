@@ -0,0 +1,125 @@
+""" Module for writing the search results in machine-readable formats,
+    record by record, as they are produced.
+
+    Formats:
+        - jsonl: one json object per line, with typed values: datetime
+                 in ISO 8601 format, size in bytes as integer
+        - csv: comma separated values, with the header line
+        - tsv: tab separated values, with the header line
+        - urls0: full URLs terminated with NUL character, for xargs -0
+
+    Functions:
+        - make_record
+        - format_records
+        - format_event
+"""
+import csv
+import json
+
+from tools.apache_search.src.entry import parse_size
+
+
+MACHINE_FORMATS = ('jsonl', 'csv', 'tsv', 'urls0')
+RECORD_FIELDS = ('type', 'name', 'url', 'datetime', 'size', 'size_bytes')
+BATCH_FIELDS = ('root',) + RECORD_FIELDS
+EVENT_FIELDS = ('event',) + RECORD_FIELDS
+
+
+class _LineBuffer:
+    """ File-like object returning the written line, so the csv writer
+        formats rows without keeping them.
+    """
+    def write(self, line):
+        """ Return the line formatted by the csv writer.
+
+            Args:
+                line(str): formatted line
+
+            Returns:
+                line(str): the same line
+        """
+        return line
+
+
+def make_record(item):
+    """ Make the record with typed values from the file or directory data.
+        Values missing in the listing are None.
+
+        Args:
+            item(dict): file or directory data
+
+        Returns:
+            record(dict): record with keys: type (file or dir), name, url,
+                          datetime (ISO 8601 text), size (listed text),
+                          size_bytes (integer); and root, for results
+                          of the batch search
+    """
+    is_dir = 'dir' in item
+    mtime = item.get('datetime')
+    size = item.get('size')
+    record = {
+        'type': 'dir' if is_dir else 'file',
+        'name': item.get('dir' if is_dir else 'name'),
+        'url': item.get('url'),
+        'datetime': mtime.isoformat() if mtime is not None else None,
+        'size': size,
+        'size_bytes': parse_size(size)
+    }
+    if 'root' in item:
+        record['root'] = item['root']
+    return record
+
+
+def format_records(items, output_format, fields=RECORD_FIELDS):
+    """ Format files and directories in the given format, one by one.
+
+        Args:
+            items(iterable): file or directory data dicts
+            output_format(str): one of MACHINE_FORMATS
+            fields(tuple): record fields written, in the given order;
+                           not used by urls0
+
+        Yields:
+            text(str): formatted record, with its terminator; for csv
+                       and tsv, the header line comes first
+
+        Raises:
+            ValueError: if the format is unknown
+    """
+    if output_format == 'urls0':
+        for item in items:
+            url = item.get('url')
+            if url is not None:
+                yield f'{url}\0'
+    elif output_format == 'jsonl':
+        for item in items:
+            record = make_record(item)
+            yield json.dumps({field: record[field] for field in fields}) \
+                + '\n'
+    elif output_format in ('csv', 'tsv'):
+        delimiter = ',' if output_format == 'csv' else '\t'
+        writer = csv.writer(_LineBuffer(), delimiter=delimiter,
+                            lineterminator='\n')
+        yield writer.writerow(fields)
+        for item in items:
+            record = make_record(item)
+            yield writer.writerow([record[field] for field in fields])
+    else:
+        raise ValueError(f'Unknown output format: {output_format}')
+
+
+def format_event(event, item):
+    """ Format the change of the file as the json line.
+
+        Args:
+            event(str): change of the file, e.g. added
+            item(dict): file data
+
+        Returns:
+            text(str): json object with keys: event and the record fields,
+                       with the line terminator
+    """
+    record = make_record(item)
+    record['event'] = event
+    return json.dumps({field: record[field] for field in EVENT_FIELDS}) \
+        + '\n'
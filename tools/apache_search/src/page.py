@@ -1,30 +1,147 @@
 """ Module for getting and parsing Apache directory server URL."""
+import multiprocessing
+import random
 import re
-import os
+import sys
+import time
 
 import requests
 
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
 
 from bs4 import BeautifulSoup
 
+from tools.apache_search.src.autoindex import AutoindexParser
+from tools.apache_search.src.autoindex import classify_alts
+from tools.apache_search.src.autoindex import parse_json_listing
+from tools.apache_search.src.autoindex import parse_xml_listing
+from tools.apache_search.src.defaults import DEFAULT_RETRIES
+from tools.apache_search.src.defaults import DEFAULT_TIMEOUT
+from tools.apache_search.src.entry import DirEntry
+from tools.apache_search.src.entry import FileEntry
+from tools.apache_search.src.session import kept_session
+from tools.apache_search.src.stats import RequestRecord
+
+
+ALT_REGEX = re.compile(r'\[([A-Z ]+)\]')
+CHUNK_SIZE = 64 * 1024
+JSON_CONTENT_TYPES = ('application/json',)
+XML_CONTENT_TYPES = ('text/xml', 'application/xml')
+# Apache fancy index as preformatted text is about half the size of the
+# html table, and still has name, last modification date and size.
+APACHE_LISTING_PARAMS = {'F': '1'}
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Retries wait for the random time up to the base delay doubled with every
+# attempt ("full jitter"), so the pages failed together do not come back
+# together.
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+TRANSIENT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError
+)
+
+
+class HTTPStatusError(ConnectionError):
+    """ Exception raised when the page request returns unexpected
+        status code.
+    """
+    def __init__(self, message, status_code):
+        """ Constructor method for HTTPStatusError class.
+
+            Args:
+                message(str): error message
+                status_code(int): response status code
+        """
+        super().__init__(message)
+        self.status_code = status_code
+
 
 class Page:
     """ Class for getting and parsing data from given Apache directory
         server URL. Serves list of files and directories as attributes.
     """
-    def __init__(self, url):
+    def __init__(self, url, session=None, listing_hints=None, cache=None,
+                 scheduler=None, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, stats=None, parser_pool=None):
         """ Constructor method for Page class.
 
             Args:
                 url(str): full URL to the directory, which data
                           we want to collect
+                session(requests.Session): session used to send requests,
+                                           shared between pages to reuse
+                                           connections; if not given,
+                                           a new connection is opened
+                listing_hints(dict): query parameters of the cheapest
+                                     listing format for every host,
+                                     shared between pages; filled in when
+                                     the server flavour is detected
+                cache(ListingCache): cache of parsed listings; if given,
+                                     conditional requests are sent and
+                                     the cached listing is used when
+                                     the page was not modified
+                scheduler(RequestScheduler): scheduler pacing requests
+                                             to the page host, shared
+                                             between pages
+                timeout(float): connect and read timeout of the request,
+                                in seconds
+                retries(int): number of retries after transient errors:
+                              connection errors, timeouts and status codes
+                              429, 500, 502, 503, 504
+                stats(CrawlStats): statistics of the search, updated with
+                                   every request and the time spent
+                                   in every phase
+                parser_pool(ProcessPoolExecutor): pool of processes parsing
+                                                  the page body; if given,
+                                                  the body is read whole
+                                                  and parsed by the pool,
+                                                  so listings are parsed
+                                                  on many cores
         """
         self._url = url
+        self._session = session
+        self._listing_hints = listing_hints
+        self._cache = cache
+        self._scheduler = scheduler
+        self._timeout = timeout
+        self._retries = retries
+        self._stats = stats
+        self._parser_pool = parser_pool
         self._subpages = None
         self._files = None
         self._page_bs = None
 
+    @classmethod
+    def from_listing(cls, url, files, subpages):
+        """ Create the page with already known files and subpages lists.
+            No request is sent for such page.
+
+            Args:
+                url(str): full URL to the directory
+                files(list): list of dicts with file data
+                subpages(list): list of dicts with subpage data
+
+            Returns:
+                page(Page): loaded page object
+        """
+        page = cls(url)
+        page._files = files
+        page._subpages = subpages
+        return page
+
+    @property
+    def url(self):
+        """ Get the page URL.
+
+            Returns:
+                self._url(str): full URL to the directory
+        """
+        return self._url
+
     @property
     def subpages(self):
         """ Get the subpages list as a object attribute. Loads data only
@@ -34,7 +151,7 @@ class Page:
                 self._subpages(list): list of dicts with subpage data
         """
         if self._subpages is None:
-            self._subpages = self._get_subpages()
+            self.load()
         return self._subpages
 
     @property
@@ -46,9 +163,22 @@ class Page:
                 self._files(list): list of dicts with file data
         """
         if self._files is None:
-            self._files = self._get_files()
+            self.load()
         return self._files
 
+    def load(self):
+        """ Get and parse the page, loading both files and subpages lists.
+            Nothing is done if the page is already loaded. The parse tree
+            is released as soon as the lists are extracted.
+
+            Returns:
+                self(Page): the same page object, with data loaded
+        """
+        if self._files is None or self._subpages is None:
+            self._files, self._subpages = self._get_listing()
+            self._page_bs = None
+        return self
+
     def _get_raw_page(self):
         """ Get raw html page code from GET request.
 
@@ -59,15 +189,129 @@ class Page:
                 ConnectionError: if GET request returns exit code
                                  different than 200
         """
-        request_result = requests.get(self._url)
+        http = self._session
+        if http is None:
+            http = kept_session() or requests
+        with self._request_slot() as slot:
+            request_result = http.get(self._url, timeout=self._timeout)
+            if slot is not None:
+                slot.record(request_result)
         if not request_result.status_code == 200:
-            raise ConnectionError(
+            raise HTTPStatusError(
                 f'Can not connect to: {self._url}. '
-                f'Status code: {request_result.status_code}'
+                f'Status code: {request_result.status_code}',
+                request_result.status_code
             )
         raw_page = request_result.text
         return raw_page
 
+    def _request_slot(self):
+        """ Get the context, in which the request to the page host
+            can be sent, according to the scheduler.
+
+            Returns:
+                context(contextmanager): context giving the request slot,
+                                         or None if the scheduler is
+                                         not used
+        """
+        if self._scheduler is None:
+            return _no_slot()
+        return self._scheduler.request(self._url)
+
+    def _phase(self, phase):
+        """ Get the context, in which the code is timed as the given
+            phase of the search.
+
+            Args:
+                phase(str): phase name, see stats.PHASES
+
+            Returns:
+                context(contextmanager): timing context, or the empty one
+                                         if the statistics are not used
+        """
+        if self._stats is None:
+            return _no_slot()
+        return self._stats.phase(phase)
+
+    def _get_response(self, cached=None, slot=None):
+        """ Send GET request for the page, with the response body streamed.
+            The lightest listing format known for the host is requested.
+
+            Args:
+                cached(dict): cached listing entry; if given, its validators
+                              are sent to make the request conditional
+                slot(RequestSlot): request slot of the scheduler, recording
+                                   the response
+
+            Returns:
+                request_result(requests.Response): response, not read yet
+
+            Raises:
+                ConnectionError: if GET request returns exit code
+                                 different than 200 (or 304, for
+                                 conditional requests)
+                HTTPStatusError: subclass of ConnectionError, raised
+                                 for the unexpected status code
+        """
+        headers = dict()
+        if cached is not None:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        http = self._session
+        if http is None:
+            http = kept_session() or requests
+        request_result = http.get(
+            self._url, params=self._get_listing_params(), headers=headers,
+            stream=True, timeout=self._timeout
+        )
+        if slot is not None:
+            slot.record(request_result)
+        if request_result.status_code == 304 and headers:
+            self._update_listing_hints(request_result)
+            return request_result
+        if not request_result.status_code == 200:
+            request_result.close()
+            raise HTTPStatusError(
+                f'Can not connect to: {self._url}. '
+                f'Status code: {request_result.status_code}',
+                request_result.status_code
+            )
+        if request_result.encoding is None:
+            request_result.encoding = 'utf-8'
+        self._update_listing_hints(request_result)
+        return request_result
+
+    def _get_listing_params(self):
+        """ Get query parameters of the lightest listing format,
+            known for the page host.
+
+            Returns:
+                params(dict): query parameters, or None if not known
+        """
+        if self._listing_hints is None:
+            return None
+        return self._listing_hints.get(urlsplit(self._url).netloc)
+
+    def _update_listing_hints(self, request_result):
+        """ Detect the server flavour from the response headers,
+            and remember the lightest listing format for the page host.
+
+            Args:
+                request_result(requests.Response): page response
+        """
+        if self._listing_hints is None:
+            return
+        server = request_result.headers.get('Server', '')
+        products = re.split(r'[\s,]+', server)
+        if any(product == 'Apache' or product.startswith('Apache/')
+               for product in products):
+            self._listing_hints.setdefault(
+                urlsplit(self._url).netloc, APACHE_LISTING_PARAMS
+            )
+
     def _get_bs(self):
         """ Get BeautifulSoup object from the page raw html code.
 
@@ -79,87 +323,308 @@ class Page:
             self._page_bs = BeautifulSoup(raw_page, 'html.parser')
         return self._page_bs
 
-    def _get_files(self):
-        """ Parse html output to get a list of files.
-            Each file is described by the dictionary with given keys:
+    def _get_listing(self):
+        """ Parse the page to get lists of files and directories
+            (subpages), walking the listing only once.
+
+            The listing format is chosen by the response content type:
+            nginx json and xml listings are parsed directly, html pages
+            (Apache fancy index and nginx) are parsed straight from
+            the response stream, as it arrives. BeautifulSoup is used
+            only for the pages with layout not recognised by the
+            streaming parser.
+
+            Each file is described by the FileEntry mapping with given keys:
             - name: file name
             - url: full URL to the file
             - datetime: file last modification date in datetime.datetime format
-            - size: file size in format: X (bytes), XM (megabytes),
-                                         XG (gigabytes)
+            - size: file size in format: X (bytes), XK (kilobytes),
+                                         XM (megabytes), XG (gigabytes)
+            File size in bytes is given by its size_bytes attribute.
+
+            Each directory is described by the DirEntry mapping with given
+            keys:
+            - dir: directory name
+            - url: full URL to the directory
+            - datetime: directory last modification date in
+                        datetime.datetime format
 
             Warning: if some of the parameters are missing in the html output,
-                     they will not appear in the dictionary.
+                     they will not appear in the mapping.
+
+            If the cache is used, the request is conditional and the cached
+            listing is returned when the server answers it was not modified.
+            Listings are cached only if the server sends ETag
+            or Last-Modified header for them.
+
+            Page is fetched again after transient errors, up to the number
+            of retries, with the random delay growing with every attempt.
+
+            If the statistics are used, every attempt is recorded in them.
 
             Returns:
                 files(list): list of dictionaries - file data
+                subpages(list): list of dictionaries - directory data
+
+            Raises:
+                ConnectionError: if GET request returns unexpected status
+                                 code, also after all retries
+                requests.RequestException: if the request fails after
+                                           all retries
+        """
+        cached = None
+        if self._cache is not None:
+            cached = self._cache.get(self._url)
+
+        attempt = 0
+        while True:
+            try:
+                return self._fetch_listing(cached)
+            except (HTTPStatusError,) + TRANSIENT_ERRORS as error:
+                if attempt >= self._retries or not is_transient(error):
+                    raise
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    def _fetch_listing(self, cached):
+        """ Send single request for the page, and parse the listing.
+            See _get_listing for details.
+
+            Args:
+                cached(dict): cached listing entry, or None if not cached
+
+            Returns:
+                files(list): list of dictionaries - file data
+                subpages(list): list of dictionaries - directory data
+        """
+        if self._stats is not None:
+            return self._fetch_listing_recorded(cached)
+
+        with self._request_slot() as slot:
+            request_result = self._get_response(cached, slot)
+            try:
+                if request_result.status_code == 304:
+                    return cached['files'], cached['subpages']
+                files, subpages = self._parse_listing(request_result)
+            finally:
+                request_result.close()
+
+        self._store_listing(request_result, files, subpages)
+        return files, subpages
+
+    def _fetch_listing_recorded(self, cached):
+        """ Send single request for the page, and parse the listing,
+            recording the request and phase times in the statistics.
+            See _get_listing for details.
+
+            Args:
+                cached(dict): cached listing entry, or None if not cached
+
+            Returns:
+                files(list): list of dictionaries - file data
+                subpages(list): list of dictionaries - directory data
+        """
+        record = RequestRecord(self._url)
+        start = time.perf_counter()
+        try:
+            with self._request_slot() as slot:
+                with self._phase('request'):
+                    request_result = self._get_response(cached, slot)
+                record.status_code = request_result.status_code
+                try:
+                    if request_result.status_code == 304:
+                        files, subpages = cached['files'], cached['subpages']
+                    else:
+                        with self._phase('parse'):
+                            files, subpages = self._parse_listing(
+                                request_result
+                            )
+                finally:
+                    request_result.close()
+                    record.size = _response_size(request_result)
+                record.rows = len(files) + len(subpages)
+        except HTTPStatusError as error:
+            record.status_code = error.status_code
+            record.error = str(error)
+            raise
+        except Exception as error:
+            record.error = str(error)
+            raise
+        finally:
+            record.elapsed = time.perf_counter() - start
+            self._stats.record_request(record)
+
+        if request_result.status_code != 304:
+            self._store_listing(request_result, files, subpages)
+        return files, subpages
+
+    def _parse_listing(self, request_result):
+        """ Parse the listing from the response, in the format chosen
+            by the response content type.
+
+            Args:
+                request_result(requests.Response): page response
+
+            Returns:
+                files(list): list of dictionaries - file data
+                subpages(list): list of dictionaries - directory data
+        """
+        content_type = request_result.headers.get('Content-Type', '')
+        content_type = content_type.split(';')[0].strip().lower()
+
+        if self._parser_pool is not None:
+            future = self._parser_pool.submit(
+                parse_listing, self._url, content_type, request_result.text
+            )
+            return future.result()
+        if content_type in JSON_CONTENT_TYPES + XML_CONTENT_TYPES:
+            return self._parse_text(content_type, request_result.text)
+        return self._get_html_listing(request_result)
+
+    def _parse_text(self, content_type, text):
+        """ Parse the listing from the whole page text, in the format
+            chosen by the content type.
+
+            Args:
+                content_type(str): media type of the page, lowercase
+                text(str): page text
+
+            Returns:
+                files(list): list of dictionaries - file data
+                subpages(list): list of dictionaries - directory data
         """
-        soup_url = self._get_bs()
         files = list()
-        table_elements = soup_url.find_all('tr')
-        for table_element in table_elements:
-            td_elements = table_element.find_all('td')
-            alt_elements = self._find_alt_elements('files', td_elements)
-
-            if any(alt_elements):
-                file = self._parse_td_text_vals(td_elements)
-                if file:
-                    files.append(file)
-        return files
-
-    def _get_subpages(self):
-        """ Parse html output to get a list of directories (subpages).
-            Each directory is described by the dictionary with given keys:
-            - name: directory name
-            - url: full URL to the directory
-            - datetime: directory last modification date in
-                        datetime.datetime format
+        subpages = list()
+        if content_type in JSON_CONTENT_TYPES:
+            self._add_rows(parse_json_listing(text), files, subpages)
+        elif content_type in XML_CONTENT_TYPES:
+            self._add_rows(parse_xml_listing(text), files, subpages)
+        else:
+            parser = AutoindexParser()
+            self._add_rows(parser.feed(text), files, subpages)
+            if not parser.recognised:
+                self._page_bs = BeautifulSoup(text, 'html.parser')
+                return self._get_soup_listing()
+        return files, subpages
+
+    def _store_listing(self, request_result, files, subpages):
+        """ Store parsed listing in the cache, with the response validators.
+            Nothing is stored if the cache is not used, or the response
+            has no validators to revalidate the listing later.
 
-            Warning: if some of the parameters are missing in the html output,
-                     they will not appear in the dictionary.
+            Args:
+                request_result(requests.Response): page response
+                files(list): list of dictionaries - file data
+                subpages(list): list of dictionaries - directory data
+        """
+        if self._cache is None:
+            return
+
+        etag = request_result.headers.get('ETag')
+        last_modified = request_result.headers.get('Last-Modified')
+        if etag or last_modified:
+            self._cache.put(self._url, etag, last_modified, files, subpages)
+
+    def _get_html_listing(self, request_result):
+        """ Parse html page straight from the response stream, to get lists
+            of files and directories. Falls back to BeautifulSoup parsing,
+            if the page layout is not recognised.
+
+            Args:
+                request_result(requests.Response): page response
 
             Returns:
+                files(list): list of dictionaries - file data
                 subpages(list): list of dictionaries - directory data
-                """
-        soup_url = self._get_bs()
+        """
+        parser = AutoindexParser()
+        raw_chunks = list()
+        files = list()
         subpages = list()
-        table_elements = soup_url.find_all('tr')
-        for table_element in table_elements:
-            td_elements = table_element.find_all('td')
-            alt_elements = self._find_alt_elements('dirs', td_elements)
+        for chunk in request_result.iter_content(chunk_size=CHUNK_SIZE,
+                                                 decode_unicode=True):
+            self._add_rows(parser.feed(chunk), files, subpages)
 
-            if any(alt_elements):
-                subpage = self._parse_td_text_vals(td_elements)
-                if subpage:
-                    subpages.append(subpage)
-        return subpages
+            if parser.recognised:
+                raw_chunks = None
+            else:
+                raw_chunks.append(chunk)
 
-    def _find_alt_elements(self, target, td_elements):
-        """ Find "img alt" html elements and check if they have correct
-            string, according to the target, which is file or directory.
+        if parser.recognised:
+            return files, subpages
 
-            This is a way to check if given html table row (td elements,
-            which are table cells in a single row) contains file or directory.
+        self._page_bs = BeautifulSoup(''.join(raw_chunks), 'html.parser')
+        return self._get_soup_listing()
+
+    def _add_rows(self, rows, files, subpages):
+        """ Classify parsed listing rows, and add file/directory info
+            of every row to the files or subpages list.
 
             Args:
-                target(str): can be "files" or "dirs"
-                td_elements(BeautifulSoup): html table cells in a single row
+                rows(iterable): (alt_values, text_vals) tuples
+                files(list): list of dictionaries - file data
+                subpages(list): list of dictionaries - directory data
+        """
+        with self._phase('classify'):
+            for alt_values, text_vals in rows:
+                target = classify_alts(alt_values)
+                if target is None:
+                    continue
+
+                item = _parse_text_vals(text_vals, self._url)
+                if not item:
+                    continue
+
+                if target == 'dirs':
+                    subpages.append(item)
+                else:
+                    files.append(item)
+
+    def _get_soup_listing(self):
+        """ Parse html output with BeautifulSoup to get lists of files
+            and directories (subpages), walking the html table only once.
+            Items are described in the same way as by _get_listing.
 
             Returns:
-                alt_elements(list): list of filtered "alt" elements
+                files(list): list of dictionaries - file data
+                subpages(list): list of dictionaries - directory data
         """
-        alt_regex = re.compile(r'\[([A-Z ]+)\]')
-        alt_elements = [el.find(alt=alt_regex) for el in td_elements]
+        soup_url = self._get_bs()
+        files = list()
+        subpages = list()
+        with self._phase('classify'):
+            table_elements = soup_url.find_all('tr')
+            for table_element in table_elements:
+                td_elements = table_element.find_all('td')
+                target = self._classify_row(td_elements)
+                if target is None:
+                    continue
+
+                item = self._parse_td_text_vals(td_elements)
+                if not item:
+                    continue
+
+                if target == 'dirs':
+                    subpages.append(item)
+                else:
+                    files.append(item)
+        return files, subpages
+
+    def _classify_row(self, td_elements):
+        """ Find "img alt" html elements in a single table row and decide
+            if the row describes a file, a directory or neither of them
+            (icon header, parent directory link).
+
+            Args:
+                td_elements(BeautifulSoup): html table cells in a single row
 
-        if target == 'files':
-            alt_exclusions = ['[ICO]', '[PARENTDIR]', '[DIR]']
-            alt_elements = [el for el in alt_elements
-                            if el and el.attrs['alt']
-                            not in alt_exclusions]
-        if target == 'dirs':
-            alt_elements = [el for el in alt_elements
-                            if el and el.attrs['alt'] == '[DIR]']
-        return alt_elements
+            Returns:
+                target(str): "files", "dirs" or None if row should be skipped
+        """
+        alt_values = [el.attrs['alt'] for el in
+                      (td.find(alt=ALT_REGEX) for td in td_elements)
+                      if el and el.attrs['alt']]
+        return classify_alts(alt_values)
 
     def _parse_td_text_vals(self, td_elements):
         """ Parse html table cells from one row, to get the elements:
@@ -173,7 +638,8 @@ class Page:
             Directories can have dir and datetime elements.
 
             Datetime element is converted to the datetime.datetime object,
-            with given structure: "year-month-day hour-minutes"
+            with given structure: "year-month-day hour-minutes", on the first
+            access. Url element is also joined on the first access.
 
             Element values came from text values found in cells in row.
 
@@ -181,33 +647,145 @@ class Page:
                 td_elements(BeautifulSoup): html table cells in one row
 
             Returns:
-                item(dict): dictionary with file/directory info
+                item(FileEntry or DirEntry): entry with file/directory info,
+                                             or None if the name is not
+                                             recognised
         """
         text_vals = [text_val.text.strip() for text_val in td_elements
                      if text_val.text]
-        rules = {
-            'name': re.compile(r'[a-zA-Z0-9\-_\.></]+\.[a-zA-Z0-9\-_\.]+'),
-            'dir': re.compile(r'[a-zA-Z0-9\-_\.><]+/\Z'),
-            'datetime': re.compile(r'\d{4}\-\d{2}\-\d{2}\s\d{2}:\d{2}'),
-            'size': re.compile(r'\d+\.?\d*[GM]?\Z')
-        }
-
-        item = dict()
-        for text_element in text_vals:
-            for rule_name, rule in rules.items():
-                if rule.match(text_element):
-                    if rule_name == 'datetime':
-                        text_element = datetime.strptime(
-                            text_element,
-                            '%Y-%m-%d %H:%M'
-                        )
-                    if rule_name in ['name', 'dir']:
-                        element_url = os.path.join(
-                            self._url,
-                            text_element
-                        )
-                        item['url'] = element_url
-                    item[rule_name] = text_element
-                    del rules[rule_name]
-                    break
-        return item
+        return _parse_text_vals(text_vals, self._url)
+
+
+def parse_listing(url, content_type, text):
+    """ Parse the listing of the page, in the process of the parser pool.
+        Only the compact entries are sent back to the crawler process.
+
+        Args:
+            url(str): full URL to the directory
+            content_type(str): media type of the page, lowercase
+            text(str): page text
+
+        Returns:
+            files(list): list of FileEntry objects
+            subpages(list): list of DirEntry objects
+    """
+    return Page(url)._parse_text(content_type, text)
+
+
+def create_parser_pool(processes):
+    """ Create the pool of processes parsing the page bodies. Since Python
+        3.7, new processes are started, not forked, as the pool is used
+        by threads of the crawler.
+
+        Args:
+            processes(int): number of processes
+
+        Returns:
+            pool(ProcessPoolExecutor): pool for Page parser_pool argument
+    """
+    if sys.version_info < (3, 7):
+        return ProcessPoolExecutor(max_workers=processes)
+    return ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context('spawn')
+    )
+
+
+def is_transient(error):
+    """ Check if the request error is transient, and the request
+        should be retried.
+
+        Args:
+            error(Exception): request error
+
+        Returns:
+            transient(bool): True if the request should be retried
+    """
+    if isinstance(error, HTTPStatusError):
+        return error.status_code in RETRY_STATUSES
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+def backoff_delay(attempt):
+    """ Get the random delay before the next retry.
+
+        Args:
+            attempt(int): number of the failed attempt, starting from 0
+
+        Returns:
+            delay(float): delay in seconds
+    """
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _response_size(request_result):
+    """ Get the number of response body bytes received, as sent over
+        the network (before decompression).
+
+        Args:
+            request_result(requests.Response): read response
+
+        Returns:
+            size(int): number of bytes, or Content-Length header value
+                       if not known
+    """
+    size = getattr(request_result.raw, 'tell', lambda: None)()
+    if isinstance(size, int):
+        return size
+    try:
+        return int(request_result.headers.get('Content-Length', 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+@contextmanager
+def _no_slot():
+    """ Empty context of the request sent without the scheduler,
+        or the code not timed in the statistics.
+
+        Yields:
+            slot(None): no request slot
+    """
+    yield None
+
+
+def _parse_text_vals(text_vals, base_url):
+    """ Parse text values of the table cells from one row, to get the
+        file/directory info. See Page._parse_td_text_vals for details.
+
+        Args:
+            text_vals(list): stripped text values of the row cells
+            base_url(str): full URL to the directory containing the item
+
+        Returns:
+            item(FileEntry or DirEntry): entry with file/directory info;
+                                         directory entry if the name
+                                         matched the "dir" rule; None
+                                         if no value matched the name
+                                         rules, as the entry would have
+                                         no url
+    """
+    rules = {
+        'name': re.compile(r'[a-zA-Z0-9\-_\.></]+\.[a-zA-Z0-9\-_\.]+'),
+        'dir': re.compile(r'[a-zA-Z0-9\-_\.><]+/\Z'),
+        'datetime': re.compile(r'\d{4}\-\d{2}\-\d{2}\s\d{2}:\d{2}'),
+        'size': re.compile(r'\d+\.?\d*[KMG]?\Z')
+    }
+
+    values = dict()
+    for text_element in text_vals:
+        for rule_name, rule in rules.items():
+            if rule.match(text_element):
+                values[rule_name] = text_element
+                del rules[rule_name]
+                break
+
+    if 'dir' in values and 'name' not in values:
+        entry_class = DirEntry
+        name = values['dir']
+    elif 'name' in values:
+        entry_class = FileEntry
+        name = values['name']
+    else:
+        return None
+    return entry_class(name=name, base_url=base_url,
+                       mtime=values.get('datetime'), size=values.get('size'))
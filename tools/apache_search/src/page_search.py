@@ -1,51 +1,280 @@
 """ Module responsible for encapsulating logic to use in the cli modules."""
+from tools.apache_search.src.crawler import Crawler
+from tools.apache_search.src.defaults import DEFAULT_RETRIES
+from tools.apache_search.src.defaults import DEFAULT_TIMEOUT
+from tools.apache_search.src.filters import relative_path
 from tools.apache_search.src.page import Page
+from tools.apache_search.src.session import create_session
+from tools.apache_search.src.urls import normalize_url
 
 
-def single_page_search_files(url):
+def single_page_search(url, session=None, cache=None,
+                       timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                       stats=None):
+    """ Get lists of files and directories from the given url.
+        The page is downloaded and parsed only once.
+
+        Args:
+            url(str): full url to the page
+            session(requests.Session): session used to send the request
+            cache(ListingCache): cache of parsed listings
+            timeout(float): connect and read timeout, in seconds
+            retries(int): number of retries after transient errors
+            stats(CrawlStats): statistics updated with the request
+
+        Returns:
+            file_list(list): list of the files data
+            dir_list(list): list of the directories data
+    """
+    page = Page(url, session=session, cache=cache, timeout=timeout,
+                retries=retries, stats=stats)
+    file_list = page.files
+    dir_list = page.subpages
+    return file_list, dir_list
+
+
+def single_page_search_files(url, session=None, cache=None,
+                             timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                             stats=None):
     """ Get list of files from the given url.
 
         Args:
             url(str): full url to the page
+            session(requests.Session): session used to send the request
+            cache(ListingCache): cache of parsed listings
+            timeout(float): connect and read timeout, in seconds
+            retries(int): number of retries after transient errors
+            stats(CrawlStats): statistics updated with the request
 
         Returns:
             file_list(list): list of the files data
     """
-    page = Page(url)
+    page = Page(url, session=session, cache=cache, timeout=timeout,
+                retries=retries, stats=stats)
     file_list = page.files
     return file_list
 
 
-def single_page_search_dirs(url):
+def single_page_search_dirs(url, session=None, cache=None,
+                            timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                            stats=None):
     """ Get list of directories from the given url.
 
             Args:
                 url(str): full url to the page
+                session(requests.Session): session used to send the request
+                cache(ListingCache): cache of parsed listings
+                timeout(float): connect and read timeout, in seconds
+                retries(int): number of retries after transient errors
+                stats(CrawlStats): statistics updated with the request
 
             Returns:
                 dir_list(list): list of the directories data
         """
-    page = Page(url)
+    page = Page(url, session=session, cache=cache, timeout=timeout,
+                retries=retries, stats=stats)
     dir_list = page.subpages
     return dir_list
 
 
-def recursive_page_search(url):
+def recursive_page_search(url, **kwargs):
     """ Get list of files from given url, and all directories below.
+        See iter_recursive_page_search for arguments description.
+
+        Returns:
+            files(list): list of the files data
+    """
+    files = list(iter_recursive_page_search(url, **kwargs))
+    return files
+
+
+def iter_recursive_page_search(url, jobs=1, session=None, cache=None,
+                               snapshot=None, crawl_filter=None,
+                               max_rate=None, timeout=DEFAULT_TIMEOUT,
+                               retries=DEFAULT_RETRIES, keep_going=False,
+                               failures=None, stats=None, visited=None,
+                               reported=None, detect_aliases=False,
+                               aliases=None, parse_processes=None,
+                               order=None, max_memory=None):
+    """ Generate files from given url, and all directories below.
+        Files of every directory are yielded as soon as it is parsed,
+        so they are not gathered in memory.
 
         Args:
             url(str): full url to the page
+            jobs(int): number of directories fetched and parsed at once
+            session(requests.Session): session shared by all pages;
+                                       if not given, a new one with
+                                       connection pool sized to jobs
+                                       is used
+            cache(ListingCache): cache of parsed listings
+            snapshot(Snapshot): snapshot of the previous search; directories
+                                without subdirectories, not modified since
+                                then, are not fetched, and the snapshot
+                                is updated with the result of this search
+            crawl_filter(CrawlFilter): filter of the reported files
+                                       and walked directories
+            max_rate(float): maximum number of requests per second
+                             sent to a single host; requests sent at
+                             once are adjusted to the server condition,
+                             up to jobs
+            timeout(float): connect and read timeout of every request,
+                            in seconds
+            retries(int): number of retries of every directory after
+                          transient errors
+            keep_going(bool): if True, directories which can not be fetched
+                              are skipped, instead of stopping the search
+            failures(list): if given, extended with (url, error) tuples
+                            of the skipped directories, after the search
+            stats(CrawlStats): statistics of the search, updated with
+                               every request and the time spent in every
+                               phase; its request callback can be used
+                               to follow the search as it goes
+            visited(dict): (files, subpages) tuples of the directories
+                           already visited by other searches, keyed
+                           by the URL; such directories are not fetched
+                           again
+            reported(set): URLs of the directories which files were
+                           already yielded by other searches; their files
+                           are not yielded again. Updated with
+                           the directories of this search
+            detect_aliases(bool): if True, directories with the same listing
+                                  as a directory searched before are taken
+                                  as its aliases, and not searched
+            aliases(list): if given, extended with (url, original_url)
+                           tuples of the aliases, after the search
+            parse_processes(int): number of processes parsing the pages;
+                                  if not given, pages are parsed by
+                                  the threads fetching them
+            order(str): order of walking the directories, frontier.BFS
+                        or frontier.DFS; see Crawler for the default
+            max_memory(int): memory of the directories waiting to be
+                             searched, in bytes; above it, they are
+                             spilled to disk
+
+        Yields:
+            file(dict): file data
+    """
+    crawler = Crawler(url, jobs=jobs, session=session, cache=cache,
+                      snapshot=snapshot, crawl_filter=crawl_filter,
+                      max_rate=max_rate, timeout=timeout, retries=retries,
+                      keep_going=keep_going, stats=stats, visited=visited,
+                      detect_aliases=detect_aliases,
+                      parse_processes=parse_processes, order=order,
+                      max_memory=max_memory)
+
+    root_url = normalize_url(url)
+    for page in crawler.pages():
+        if reported is not None and page.url in reported:
+            continue
+        if crawl_filter is None:
+            yield from page.files
+        elif crawl_filter.match_dir(relative_path(page.url, root_url)):
+            yield from filter(crawl_filter.match_file, page.files)
+        else:
+            continue
+        if reported is not None:
+            reported.add(page.url)
+
+    if failures is not None:
+        failures.extend(crawler.failures)
+    if aliases is not None:
+        aliases.extend(crawler.aliases)
+
+
+def iter_batch_page_search(urls, jobs=1, session=None, crawl_filter=None,
+                           **kwargs):
+    """ Generate files from all given urls, and all directories below,
+        sharing the session and the visited directories, so every
+        directory is fetched at most once in the batch.
+
+        Roots nested in other roots are collapsed: their trees are walked
+        as part of the outer root. With directory filters, which are
+        relative to the root, nested roots are walked separately, outer
+        roots first, and only directories not visited yet are fetched.
+        Files of a visited directory are reported by the nested root,
+        if the filter of the outer root rejected the directory.
+
+        Args:
+            urls(list): full urls to the root pages
+            jobs(int): number of directories fetched and parsed at once
+            session(requests.Session): session shared by all searches;
+                                       if not given, a new one with
+                                       connection pool sized to jobs
+                                       is used
+            crawl_filter(CrawlFilter): filter of the reported files
+                                       and walked directories
+            kwargs: iter_recursive_page_search arguments, except snapshot
+
+        Yields:
+            file(tuple): (root, file) tuple - the most nested of the given
+                         urls containing the file, and the file data
+    """
+    roots = batch_roots(urls)
+    walked_roots = roots
+    if crawl_filter is None or not crawl_filter.filters_dirs:
+        walked_roots = collapse_roots(roots)
+
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_size=jobs)
+    visited = dict()
+    reported = set()
+    try:
+        for walked_root in walked_roots:
+            for item in iter_recursive_page_search(
+                    walked_root, jobs=jobs, session=session,
+                    crawl_filter=crawl_filter, visited=visited,
+                    reported=reported, **kwargs):
+                yield label_root(item['url'], roots, walked_root), item
+    finally:
+        if own_session:
+            session.close()
+
+
+def batch_roots(urls):
+    """ Get the distinct normalised root urls of the batch, with trailing
+        slashes, outer roots before the nested ones.
+
+        Args:
+            urls(list): full urls to the root pages
 
         Returns:
-            files(list): list of the files data
+            roots(list): sorted distinct urls
     """
-    pages = [Page(url)]
-    files = list()
+    roots = {normalize_url(url) for url in urls}
+    return sorted({root if root.endswith('/') else f'{root}/'
+                   for root in roots})
 
-    while pages:
-        page = pages.pop()
-        files += page.files
-        for subpage in page.subpages:
-            pages.append(Page(subpage['url']))
 
-    return files
+def collapse_roots(roots):
+    """ Remove the roots nested in other roots.
+
+        Args:
+            roots(list): root urls given by batch_roots
+
+        Returns:
+            roots(list): outer root urls, in the same order
+    """
+    outer_roots = list()
+    for root in roots:
+        if not any(root.startswith(outer_root) for outer_root in outer_roots):
+            outer_roots.append(root)
+    return outer_roots
+
+
+def label_root(url, roots, default=None):
+    """ Get the most nested root containing the url.
+
+        Args:
+            url(str): full url to the file or directory
+            roots(list): root urls given by batch_roots
+            default(str): returned if no root contains the url
+
+        Returns:
+            root(str): root url
+    """
+    containing = [root for root in roots if url.startswith(root)]
+    if not containing:
+        return default
+    return max(containing, key=len)
@@ -0,0 +1,265 @@
+""" Module for pacing requests sent to the directory servers.
+
+    Classes:
+        - RequestScheduler
+        - RequestSlot
+
+    Functions:
+        - parse_retry_after
+"""
+import threading
+import time
+
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+
+THROTTLE_STATUSES = (429, 503)
+# Requests slower than this multiple of the fastest one seen for the host
+# mean the server is getting busy, so the concurrency is lowered.
+LATENCY_TOLERANCE = 2.0
+DECREASE_FACTOR = 0.5
+SLOW_DECREASE_FACTOR = 0.9
+# Longest pause taken from the Retry-After header, in seconds.
+MAX_RETRY_AFTER = 120.0
+
+
+class RequestScheduler:
+    """ Class for limiting the number of requests sent at once to every
+        host, and adjusting the limit to the server condition:
+        - the limit grows while the responses are fast and successful;
+          by one with every response until the first slowdown, then
+          by one per the whole window of requests
+        - the limit is halved on throttling responses (429, 503)
+          and connection errors, and lowered a bit when the responses
+          get slow
+        - no request is sent before the time given by the Retry-After
+          header of the throttling response
+        - optionally, requests are spaced out to the hard rate limit
+
+        Every host starts with one request at once.
+    """
+    def __init__(self, max_concurrency=1, max_rate=None):
+        """ Constructor method for RequestScheduler class.
+
+            Args:
+                max_concurrency(int): maximum number of requests sent
+                                      at once to a single host
+                max_rate(float): maximum number of requests per second
+                                 sent to a single host; not limited
+                                 if not given
+        """
+        self._max_concurrency = max_concurrency
+        self._interval = 1.0 / max_rate if max_rate else 0.0
+        self._hosts = dict()
+        self._condition = threading.Condition()
+
+    def get_limit(self, url):
+        """ Get the current number of requests allowed at once for
+            the host of the given url.
+
+            Args:
+                url(str): full URL on the host
+
+            Returns:
+                limit(int): number of requests allowed at once
+        """
+        with self._condition:
+            host = self._get_host(urlsplit(url).netloc)
+            return int(host.limit)
+
+    @contextmanager
+    def request(self, url):
+        """ Wait until the request to the host of the given url can be
+            sent, and keep its slot taken in the context. Response of the
+            request should be recorded in the slot; exception raised
+            before that is treated as the connection error.
+
+            Args:
+                url(str): full URL of the request
+
+            Yields:
+                slot(RequestSlot): taken request slot
+        """
+        netloc = urlsplit(url).netloc
+        self._acquire(netloc)
+        slot = RequestSlot(self, netloc)
+        try:
+            yield slot
+        except Exception:
+            if not slot.recorded:
+                self._release(netloc, error=True)
+                slot.recorded = True
+            raise
+        finally:
+            if not slot.recorded:
+                self._release(netloc)
+
+    def _get_host(self, netloc):
+        """ Get the state of the given host, created with the first use.
+            Must be called with the condition lock held.
+
+            Args:
+                netloc(str): host name with the port
+
+            Returns:
+                host(_HostState): host state
+        """
+        host = self._hosts.get(netloc)
+        if host is None:
+            host = self._hosts[netloc] = _HostState()
+        return host
+
+    def _acquire(self, netloc):
+        """ Wait until the host has a free slot and the request can be
+            sent, according to Retry-After and the rate limit.
+
+            Args:
+                netloc(str): host name with the port
+        """
+        with self._condition:
+            host = self._get_host(netloc)
+            while True:
+                now = time.monotonic()
+                if host.in_flight >= int(host.limit):
+                    self._condition.wait()
+                elif now < host.not_before:
+                    self._condition.wait(host.not_before - now)
+                else:
+                    break
+            host.in_flight += 1
+            host.not_before = max(host.not_before, now) + self._interval
+
+    def _release(self, netloc, latency=None, status_code=None,
+                 retry_after=None, error=False):
+        """ Free the host slot, and adjust the host limit to the result
+            of the request.
+
+            Args:
+                netloc(str): host name with the port
+                latency(float): time to get the response, in seconds
+                status_code(int): response status code
+                retry_after(float): Retry-After header value, in seconds
+                error(bool): True if the request failed without response
+        """
+        with self._condition:
+            host = self._get_host(netloc)
+            host.in_flight -= 1
+
+            if error or status_code in THROTTLE_STATUSES:
+                host.slow_start = False
+                host.limit = max(1.0, host.limit * DECREASE_FACTOR)
+            elif latency is not None and status_code is not None \
+                    and status_code < 400:
+                self._adjust_to_latency(host, latency)
+
+            if retry_after is not None:
+                host.not_before = max(
+                    host.not_before,
+                    time.monotonic() + min(retry_after, MAX_RETRY_AFTER)
+                )
+            self._condition.notify_all()
+
+    def _adjust_to_latency(self, host, latency):
+        """ Raise the host limit after the fast response, or lower it
+            after the slow one.
+
+            Args:
+                host(_HostState): host state
+                latency(float): time to get the response, in seconds
+        """
+        if host.min_latency is None or latency < host.min_latency:
+            host.min_latency = latency
+
+        if latency > host.min_latency * LATENCY_TOLERANCE:
+            host.slow_start = False
+            host.limit = max(1.0, host.limit * SLOW_DECREASE_FACTOR)
+        elif host.slow_start:
+            host.limit += 1.0
+        else:
+            host.limit += 1.0 / host.limit
+        host.limit = min(host.limit, float(self._max_concurrency))
+
+
+class RequestSlot:
+    """ Class for the taken request slot, recording the request result
+        for the scheduler.
+    """
+    def __init__(self, scheduler, netloc):
+        """ Constructor method for RequestSlot class.
+
+            Args:
+                scheduler(RequestScheduler): scheduler of the slot
+                netloc(str): host name with the port
+        """
+        self._scheduler = scheduler
+        self._netloc = netloc
+        self._start = time.monotonic()
+        self.recorded = False
+
+    def record(self, request_result):
+        """ Record the response of the request and free the slot.
+            Only the first response is recorded.
+
+            Args:
+                request_result(requests.Response): response of the request
+        """
+        if self.recorded:
+            return
+        self.recorded = True
+
+        retry_after = None
+        if request_result.status_code in THROTTLE_STATUSES:
+            retry_after = parse_retry_after(
+                request_result.headers.get('Retry-After')
+            )
+        self._scheduler._release(
+            self._netloc,
+            latency=time.monotonic() - self._start,
+            status_code=request_result.status_code,
+            retry_after=retry_after
+        )
+
+
+class _HostState:
+    """ Class for keeping the request limits of a single host."""
+    __slots__ = ('limit', 'in_flight', 'not_before', 'min_latency',
+                 'slow_start')
+
+    def __init__(self):
+        """ Constructor method for _HostState class."""
+        self.limit = 1.0
+        self.in_flight = 0
+        self.not_before = 0.0
+        self.min_latency = None
+        self.slow_start = True
+
+
+def parse_retry_after(value):
+    """ Parse the Retry-After header value, given as the number
+        of seconds or the HTTP date.
+
+        Args:
+            value(str): Retry-After header value
+
+        Returns:
+            retry_after(float): number of seconds to wait, or None
+                                if the value is missing or not valid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_date - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,115 @@
+""" Module for creating HTTP sessions, shared by all pages of a search.
+
+    Sessions are normally closed at the end of the search. The daemon
+    keeps them open between the commands (keep_sessions), so repeated
+    searches reuse the connections already opened to the server.
+
+    Classes:
+        - KeptSession
+
+    Functions:
+        - create_session
+        - kept_session
+        - keep_sessions
+        - _mount_adapters
+"""
+import requests
+
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_POOL_CONNECTIONS = 10
+# Sessions kept open by keep_sessions, by the connection pool size;
+# None if sessions are not kept.
+_KEPT_SESSIONS = None
+
+
+class KeptSession(requests.Session):
+    """ Session kept open between the commands run by the daemon.
+        Closing it at the end of the search does nothing, connections
+        are closed only by release.
+    """
+    def close(self):
+        """ Keep the connections open."""
+
+    def release(self):
+        """ Close all connections of the session."""
+        super().close()
+
+
+def create_session(pool_size=1):
+    """ Create a requests session with a keep-alive connection pool.
+        Connections (including TCP and TLS handshakes) are reused
+        by every request sent through the session.
+
+        Inside keep_sessions, the kept session with the given pool size
+        is returned, created only by the first call.
+
+        Args:
+            pool_size(int): maximum number of connections kept open
+                            to a single host, should match the number
+                            of requests sent at once
+
+        Returns:
+            session(requests.Session): session with mounted adapters
+    """
+    if _KEPT_SESSIONS is not None:
+        if pool_size not in _KEPT_SESSIONS:
+            _KEPT_SESSIONS[pool_size] = _mount_adapters(KeptSession(),
+                                                        pool_size)
+        return _KEPT_SESSIONS[pool_size]
+    return _mount_adapters(requests.Session(), pool_size)
+
+
+def kept_session():
+    """ Get the kept session for single requests, sent without
+        the session of the search.
+
+        Returns:
+            session(KeptSession): kept session with the pool size 1,
+                                  or None if sessions are not kept
+    """
+    if _KEPT_SESSIONS is None:
+        return None
+    return create_session(pool_size=1)
+
+
+@contextmanager
+def keep_sessions():
+    """ Keep the sessions created inside the context open, and reuse
+        them by the later searches. All of them are closed when leaving
+        the context. Searches inside the context share the sessions,
+        so they should be run one at a time.
+
+        Yields:
+            sessions(dict): kept sessions, by the connection pool size
+    """
+    global _KEPT_SESSIONS  # pylint: disable=global-statement
+    _KEPT_SESSIONS = dict()
+    try:
+        yield _KEPT_SESSIONS
+    finally:
+        sessions, _KEPT_SESSIONS = _KEPT_SESSIONS, None
+        for session in sessions.values():
+            session.release()
+
+
+def _mount_adapters(session, pool_size):
+    """ Mount the adapters with the connection pool of the given size.
+
+        Args:
+            session(requests.Session): new session
+            pool_size(int): maximum number of connections kept open
+                            to a single host
+
+        Returns:
+            session(requests.Session): the same session
+    """
+    adapter = HTTPAdapter(
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=pool_size
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
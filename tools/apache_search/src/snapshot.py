@@ -0,0 +1,161 @@
+""" Module for keeping the state of the crawled directory tree between runs.
+
+    Classes:
+        - Snapshot
+"""
+import json
+import os
+import tempfile
+
+from datetime import datetime
+
+from tools.apache_search.src.cache import DATETIME_FORMAT
+from tools.apache_search.src.cache import dump_items
+from tools.apache_search.src.cache import load_items
+
+
+class Snapshot:
+    """ Class for storing listings of all directories found by the crawl,
+        keyed by the directory URL. Every directory keeps its last
+        modification date, as listed by the parent directory, to find
+        the unchanged directories in the next crawl.
+    """
+    def __init__(self, directories=None):
+        """ Constructor method for Snapshot class.
+
+            Args:
+                directories(dict): directory entries keyed by the URL,
+                                   each of them a dictionary with keys:
+                                   datetime, files, subpages
+        """
+        self._directories = directories if directories is not None else {}
+
+    def __len__(self):
+        """ Get the number of directories in the snapshot.
+
+            Returns:
+                length(int): number of directories
+        """
+        return len(self._directories)
+
+    @classmethod
+    def load(cls, path):
+        """ Load the snapshot from the json file. Missing file gives
+            an empty snapshot.
+
+            Args:
+                path(str): path to the snapshot file
+
+            Returns:
+                snapshot(Snapshot): loaded snapshot
+        """
+        try:
+            with open(path, 'r') as snapshot_file:
+                dumped_directories = json.load(snapshot_file)
+        except FileNotFoundError:
+            return cls()
+
+        directories = dict()
+        for url, directory in dumped_directories.items():
+            mtime = directory['datetime']
+            if mtime is not None:
+                mtime = datetime.strptime(mtime, DATETIME_FORMAT)
+            directories[url] = {
+                'datetime': mtime,
+                'files': load_items(directory['files']),
+                'subpages': load_items(directory['subpages'])
+            }
+        return cls(directories)
+
+    def save(self, path):
+        """ Save the snapshot to the json file. The file is replaced
+            atomically, so the previous snapshot is kept on failure.
+
+            Args:
+                path(str): path to the snapshot file
+        """
+        dumped_directories = dict()
+        for url, directory in self._directories.items():
+            mtime = directory['datetime']
+            if mtime is not None:
+                mtime = mtime.strftime(DATETIME_FORMAT)
+            dumped_directories[url] = {
+                'datetime': mtime,
+                'files': dump_items(directory['files']),
+                'subpages': dump_items(directory['subpages'])
+            }
+
+        snapshot_dir = os.path.dirname(os.path.abspath(path))
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=snapshot_dir, suffix='.tmp')
+        with os.fdopen(tmp_fd, 'w') as tmp_file:
+            json.dump(dumped_directories, tmp_file)
+        os.replace(tmp_path, path)
+
+    def get(self, url):
+        """ Get the directory entry of the given url.
+
+            Args:
+                url(str): full URL to the directory
+
+            Returns:
+                directory(dict): dictionary with keys: datetime, files,
+                                 subpages; or None if not in the snapshot
+        """
+        return self._directories.get(url)
+
+    def items(self):
+        """ Get all directory entries.
+
+            Returns:
+                items(ItemsView): (url, directory) pairs, where directory
+                                  is a dictionary with keys: datetime,
+                                  files, subpages
+        """
+        return self._directories.items()
+
+    def get_unchanged(self, subpage):
+        """ Get the directory entry of the subpage, only if its last
+            modification date is the same as in the snapshot, and it has
+            no subdirectories. The directory modification date changes
+            only when its direct entries change, so changes deeper
+            in the subtree are not seen in it.
+
+            Args:
+                subpage(dict): directory data, as listed by the parent
+
+            Returns:
+                directory(dict): directory entry, or None if the directory
+                                 is not in the snapshot, was modified,
+                                 or has subdirectories
+        """
+        mtime = subpage.get('datetime')
+        directory = self._directories.get(subpage['url'])
+        if mtime is None or directory is None:
+            return None
+        if directory['datetime'] != mtime or directory['subpages']:
+            return None
+        return directory
+
+    def add(self, url, mtime, files, subpages):
+        """ Add the directory entry to the snapshot.
+
+            Args:
+                url(str): full URL to the directory
+                mtime(datetime.datetime): directory last modification date,
+                                          as listed by the parent directory
+                files(list): list of dictionaries - file data
+                subpages(list): list of dictionaries - directory data
+        """
+        self._directories[url] = {
+            'datetime': mtime,
+            'files': files,
+            'subpages': subpages
+        }
+
+    def replace(self, snapshot):
+        """ Replace all directory entries with the ones of other snapshot.
+
+            Args:
+                snapshot(Snapshot): snapshot with new directory entries
+        """
+        self._directories = snapshot._directories
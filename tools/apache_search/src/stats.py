@@ -0,0 +1,219 @@
+""" Module for collecting statistics of the search: time spent in every
+    phase, requests sent, bytes received, response status codes and
+    the slowest pages.
+
+    Classes:
+        - CrawlStats
+        - RequestRecord
+"""
+import heapq
+import threading
+import time
+
+from collections import Counter
+from contextlib import contextmanager
+
+
+# Phases timed by the pages and the cli:
+# - request: sending the request, until the response headers arrive
+# - parse: reading and parsing the response body, classify included
+# - classify: classifying the listing rows and building the entries
+# - search: waiting for the search results, all above included
+# - render: formatting and printing the output
+# - download: downloading the files, instead of render
+PHASES = ('request', 'parse', 'classify', 'search', 'render', 'download')
+DEFAULT_SLOWEST = 10
+
+
+class RequestRecord:
+    """ Class for the result of a single request, passed to the request
+        callback of the statistics.
+    """
+    __slots__ = ('url', 'status_code', 'size', 'elapsed', 'rows', 'error')
+
+    def __init__(self, url, status_code=None, size=0, elapsed=0.0, rows=0,
+                 error=None):
+        """ Constructor method for RequestRecord class.
+
+            Args:
+                url(str): full URL of the request
+                status_code(int): response status code, or None if
+                                  the request failed without response
+                size(int): number of response body bytes received
+                elapsed(float): time of the request, with the response
+                                body read and parsed, in seconds
+                rows(int): number of files and directories listed
+                error(str): error message, if the request failed
+        """
+        self.url = url
+        self.status_code = status_code
+        self.size = size
+        self.elapsed = elapsed
+        self.rows = rows
+        self.error = error
+
+    def __repr__(self):
+        """ Get the printable representation of the record.
+
+            Returns:
+                representation(str): class name with the record values
+        """
+        values = ', '.join(f'{name}={getattr(self, name)!r}'
+                           for name in self.__slots__)
+        return f'{type(self).__name__}({values})'
+
+
+class CrawlStats:
+    """ Class for collecting statistics of the search. The same object
+        is shared by all pages of the search, and can be updated from
+        many threads at once.
+
+        Every request attempt is recorded, retries included. Phase times
+        are summed over all pages, so with many jobs they can exceed
+        the total time of the search.
+
+        Library users can pass the callback, called with the RequestRecord
+        after every request, e.g. to log or export the requests as they
+        are sent.
+    """
+    def __init__(self, on_request=None, slowest=DEFAULT_SLOWEST):
+        """ Constructor method for CrawlStats class.
+
+            Args:
+                on_request(callable): called with the RequestRecord after
+                                      every request, in the thread which
+                                      sent the request
+                slowest(int): number of the slowest requests kept
+        """
+        self._on_request = on_request
+        self._slowest_size = slowest
+        self._lock = threading.Lock()
+        self._phases = dict.fromkeys(PHASES, 0.0)
+        self._status_codes = Counter()
+        self._slowest = list()
+        self._start = time.perf_counter()
+        self._elapsed = None
+        self.requests = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.rows = 0
+
+    @property
+    def phases(self):
+        """ Get the time spent in every phase.
+
+            Returns:
+                phases(dict): phase name -> total time in seconds
+        """
+        with self._lock:
+            return dict(self._phases)
+
+    @property
+    def status_codes(self):
+        """ Get the number of responses with every status code.
+
+            Returns:
+                status_codes(collections.Counter): status code -> number
+                                                   of responses
+        """
+        with self._lock:
+            return Counter(self._status_codes)
+
+    @property
+    def slowest(self):
+        """ Get the slowest requests, the slowest first.
+
+            Returns:
+                slowest(list): list of RequestRecord objects
+        """
+        with self._lock:
+            return [record for _, _, record
+                    in sorted(self._slowest, reverse=True)]
+
+    @property
+    def elapsed(self):
+        """ Get the total time of the search, from the statistics creation
+            until stop, or until now if not stopped yet.
+
+            Returns:
+                elapsed(float): time in seconds
+        """
+        if self._elapsed is not None:
+            return self._elapsed
+        return time.perf_counter() - self._start
+
+    def stop(self):
+        """ Stop counting the total time of the search."""
+        self._elapsed = time.perf_counter() - self._start
+
+    def add_time(self, phase, elapsed):
+        """ Add the time spent in the phase.
+
+            Args:
+                phase(str): phase name
+                elapsed(float): time in seconds
+        """
+        with self._lock:
+            self._phases[phase] = self._phases.get(phase, 0.0) + elapsed
+
+    @contextmanager
+    def phase(self, phase):
+        """ Time the code run in the context, as the given phase.
+
+            Args:
+                phase(str): phase name
+
+            Yields:
+                None
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - start)
+
+    def iter_phase(self, phase, iterable):
+        """ Time getting every item of the iterable, as the given phase.
+
+            Args:
+                phase(str): phase name
+                iterable(iterable): timed iterable
+
+            Yields:
+                item: next item of the iterable
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.add_time(phase, time.perf_counter() - start)
+            yield item
+
+    def record_request(self, record):
+        """ Record the result of the request, and pass it to the callback.
+
+            Args:
+                record(RequestRecord): request result
+        """
+        with self._lock:
+            self.requests += 1
+            self.bytes_received += record.size
+            self.rows += record.rows
+            if record.status_code is None:
+                self.errors += 1
+            else:
+                self._status_codes[record.status_code] += 1
+
+            # Requests counter breaks ties, so records are never compared.
+            item = (record.elapsed, -self.requests, record)
+            if len(self._slowest) < self._slowest_size:
+                heapq.heappush(self._slowest, item)
+            elif self._slowest and item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+
+        if self._on_request is not None:
+            self._on_request(record)
@@ -0,0 +1,359 @@
+""" Module for keeping the local mirror of the Apache directory server tree
+    in sync: only new and changed files are downloaded, and local files
+    removed from the server can be deleted.
+
+    Files are compared with their local copies by the size and the
+    modification date listed by their directory, so files which have
+    not changed cost no request at all. Listed sizes are rounded
+    (e.g. 1.5K), so the local size has to be equal within the precision
+    of the listed value.
+
+    Classes:
+        - Syncer
+
+    Functions:
+        - is_synced
+"""
+import os
+import shutil
+
+from tools.apache_search.src.crawler import Crawler
+from tools.apache_search.src.defaults import DEFAULT_SEGMENTS
+from tools.apache_search.src.defaults import DEFAULT_RETRIES
+from tools.apache_search.src.defaults import DEFAULT_TIMEOUT
+from tools.apache_search.src.download import FAILED
+from tools.apache_search.src.download import PART_SUFFIX
+from tools.apache_search.src.download import STATE_SUFFIX
+from tools.apache_search.src.download import DownloadResult
+from tools.apache_search.src.download import Downloader
+from tools.apache_search.src.download import listing_timestamp
+from tools.apache_search.src.download import local_dir
+from tools.apache_search.src.download import local_path
+from tools.apache_search.src.entry import SIZE_REGEX
+from tools.apache_search.src.entry import SIZE_UNITS
+from tools.apache_search.src.entry import parse_size
+from tools.apache_search.src.filters import relative_path
+from tools.apache_search.src.session import create_session
+from tools.apache_search.src.urls import normalize_url
+
+
+TO_DOWNLOAD = 'to download'
+TO_DELETE = 'to delete'
+DELETED = 'deleted'
+
+
+class Syncer:
+    """ Class for synchronising the local directory with the directory
+        tree of the Apache directory server.
+
+        The tree is walked by the crawler, and files which local copies
+        differ from the listing are downloaded as soon as their directory
+        is parsed. Files matching the listing are only counted.
+
+        With delete, local files and directories missing in the listing
+        of their directory are removed after the downloads, together
+        with unfinished downloads of such files. Only directories listed
+        in this walk are cleaned: directories which could not be fetched,
+        were skipped by the crawl filter or are deeper than the walk are
+        never touched.
+
+        In the dry run mode, nothing is downloaded or removed; files are
+        reported with TO_DOWNLOAD and TO_DELETE statuses instead.
+    """
+    def __init__(self, url, directory, jobs=1, segments=DEFAULT_SEGMENTS,
+                 session=None, cache=None, crawl_filter=None, max_rate=None,
+                 timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 keep_going=False, stats=None, delete=False, dry_run=False,
+                 order=None, max_memory=None):
+        """ Constructor method for Syncer class.
+
+            Args:
+                url(str): full URL to the root directory of the mirror
+                directory(str): local directory of the mirror
+                jobs(int): number of directories fetched at once, and
+                           number of files downloaded at once
+                segments(int): maximum number of segments of a single
+                               file fetched at once
+                session(requests.Session): session shared by the walk
+                                           and the downloads; if not
+                                           given, a new one is created
+                                           for every sync
+                cache(ListingCache): cache of parsed listings
+                crawl_filter(CrawlFilter): filter of the synced files
+                                           and walked directories
+                max_rate(float): maximum number of listing requests
+                                 per second sent to a single host
+                timeout(float): connect and read timeout of every request,
+                                in seconds
+                retries(int): number of retries of every request after
+                              transient errors
+                keep_going(bool): if True, directories which can not be
+                                  fetched are skipped, instead of stopping
+                                  the walk
+                stats(CrawlStats): statistics of the walk
+                delete(bool): if True, local files removed from the server
+                              are deleted
+                dry_run(bool): if True, only report what would be done
+                order(str): order of walking the directories,
+                            frontier.BFS or frontier.DFS
+                max_memory(int): memory of the directories waiting
+                                 to be walked, in bytes; above it,
+                                 they are spilled to disk
+
+            Raises:
+                ValueError: if jobs or segments is lower than 1
+        """
+        if jobs < 1 or segments < 1:
+            raise ValueError(
+                f'Number of jobs and segments must be at least 1, '
+                f'got: {jobs}, {segments}'
+            )
+
+        self._url = normalize_url(url)
+        self._directory = directory
+        self._jobs = jobs
+        self._segments = segments
+        self._session = session
+        self._cache = cache
+        self._filter = crawl_filter
+        self._max_rate = max_rate
+        self._timeout = timeout
+        self._retries = retries
+        self._keep_going = keep_going
+        self._stats = stats
+        self._delete = delete
+        self._dry_run = dry_run
+        self._order = order
+        self._max_memory = max_memory
+        self._failures = list()
+        self._unchanged = 0
+
+    @property
+    def failures(self):
+        """ Get directories which could not be fetched in the last sync,
+            in the keep going mode. Files which could not be downloaded
+            or deleted are reported by the FAILED results.
+
+            Returns:
+                self._failures(list): list of (url, error) tuples - full
+                                      URL to the directory and the error
+                                      message
+        """
+        return self._failures
+
+    @property
+    def unchanged(self):
+        """ Get the number of files matching the listing in the last sync.
+
+            Returns:
+                self._unchanged(int): number of files not downloaded
+        """
+        return self._unchanged
+
+    def sync(self):
+        """ Walk the directory tree, download new and changed files,
+            and delete removed files, if requested.
+
+            Yields:
+                result(DownloadResult): result of every changed file,
+                                        in the order the downloads finish,
+                                        then of every deleted file
+        """
+        session = self._session
+        if session is None:
+            session = create_session(pool_size=self._jobs * self._segments)
+
+        crawler = Crawler(
+            self._url, jobs=self._jobs, session=session, cache=self._cache,
+            crawl_filter=self._filter, max_rate=self._max_rate,
+            timeout=self._timeout, retries=self._retries,
+            keep_going=self._keep_going, stats=self._stats,
+            order=self._order, max_memory=self._max_memory
+        )
+        self._failures = list()
+        self._unchanged = 0
+        listings = list()
+        try:
+            changed_files = self._changed_files(crawler, listings)
+            if self._dry_run:
+                yield from changed_files
+            else:
+                with Downloader(self._directory, self._url, jobs=self._jobs,
+                                segments=self._segments, session=session,
+                                timeout=self._timeout,
+                                retries=self._retries) as downloader:
+                    yield from downloader.download_all(changed_files)
+        finally:
+            if self._session is None:
+                session.close()
+
+        self._failures = crawler.failures
+        if self._delete:
+            for path, names in listings:
+                yield from self._delete_removed(path, names)
+
+    def _changed_files(self, crawler, listings):
+        """ Generate files which local copies differ from the listing,
+            as the directories are walked.
+
+            Args:
+                crawler(Crawler): crawler walking the tree
+                listings(list): with delete, extended with (path, names)
+                                tuples - local path of every synced
+                                directory, and local names of its files
+                                and subdirectories
+
+            Yields:
+                item(dict): file data, or DownloadResult with TO_DOWNLOAD
+                            status in the dry run mode
+        """
+        for page in crawler.pages():
+            if self._filter is not None and not self._filter.match_dir(
+                    relative_path(page.url, self._url)):
+                continue
+
+            for item in page.files:
+                if self._filter is not None \
+                        and not self._filter.match_file(item):
+                    continue
+                try:
+                    path = local_path(item['url'], self._url,
+                                      self._directory)
+                except ValueError:
+                    # Reported as failed by the downloader.
+                    path = None
+                if path is not None and is_synced(item, path):
+                    self._unchanged += 1
+                elif self._dry_run:
+                    yield DownloadResult(item['url'], path, TO_DOWNLOAD,
+                                         size=parse_size(item.get('size')))
+                else:
+                    yield item
+
+            if self._delete:
+                listings.append(self._local_listing(page))
+
+    def _local_listing(self, page):
+        """ Get local names of the listed files and subdirectories.
+
+            Args:
+                page(Page): loaded page
+
+            Returns:
+                listing(tuple): (path, names) tuple - local path
+                                of the directory, and set of names
+        """
+        names = set()
+        for item in page.files:
+            try:
+                names.add(os.path.basename(
+                    local_path(item['url'], self._url, self._directory)
+                ))
+            except ValueError:
+                continue
+        for subpage in page.subpages:
+            try:
+                names.add(os.path.basename(
+                    local_dir(subpage['url'], self._url, self._directory)
+                ))
+            except ValueError:
+                continue
+        return local_dir(page.url, self._url, self._directory), names
+
+    def _delete_removed(self, path, names):
+        """ Delete local files and directories, which are not listed
+            by the server directory, and unfinished downloads of such files.
+
+            Args:
+                path(str): local path of the directory
+                names(set): names listed by the server directory
+
+            Yields:
+                result(DownloadResult): result of every deleted file
+                                        or directory
+        """
+        try:
+            local_names = sorted(os.listdir(path))
+        except FileNotFoundError:
+            return
+        for name in local_names:
+            if name in names or _listed_name(name) in names:
+                continue
+            local_name = os.path.join(path, name)
+            if self._dry_run:
+                yield DownloadResult(None, local_name, TO_DELETE)
+                continue
+            try:
+                if os.path.isdir(local_name) \
+                        and not os.path.islink(local_name):
+                    shutil.rmtree(local_name)
+                else:
+                    os.remove(local_name)
+            except OSError as error:
+                yield DownloadResult(None, local_name, FAILED,
+                                     error=str(error))
+                continue
+            yield DownloadResult(None, local_name, DELETED)
+
+
+def is_synced(item, path):
+    """ Check if the local file matches the size and the modification
+        date listed by the server directory. Files with neither value
+        listed are never considered synced.
+
+        Args:
+            item(dict): file data, with size and datetime keys
+            path(str): local path of the file
+
+        Returns:
+            synced(bool): True if the file does not need the download
+    """
+    size = item.get('size')
+    mtime = item.get('datetime')
+    if (size is None and mtime is None) or not os.path.isfile(path):
+        return False
+
+    file_stat = os.stat(path)
+    if mtime is not None \
+            and abs(file_stat.st_mtime - listing_timestamp(mtime)) >= 60:
+        return False
+    if size is not None:
+        size_bytes = parse_size(size)
+        if size_bytes is None or abs(file_stat.st_size - size_bytes) \
+                > _size_precision(size):
+            return False
+    return True
+
+
+def _size_precision(size):
+    """ Get the precision of the size in listing format, e.g. 102 bytes
+        for 1.5K, 1024 bytes for 15K, 0 for the exact number of bytes.
+
+        Args:
+            size(str): size in listing format, recognised by parse_size
+
+        Returns:
+            precision(int): maximum difference of the real size, in bytes
+    """
+    number, unit = SIZE_REGEX.match(size).groups()
+    if unit == '':
+        return 0
+    if '.' in number:
+        return SIZE_UNITS[unit] // 10
+    return SIZE_UNITS[unit]
+
+
+def _listed_name(name):
+    """ Get the listed name of the local file, which is the name itself,
+        or the name of the file of the unfinished download.
+
+        Args:
+            name(str): local file name
+
+        Returns:
+            name(str): name as listed by the server directory
+    """
+    for suffix in (STATE_SUFFIX, PART_SUFFIX):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
@@ -0,0 +1,107 @@
+""" Module for normalising URLs of the listed directories, so differently
+    spelled URLs of the same directory are recognised as one.
+
+    Normalisation (RFC 3986, section 6.2.2, with the path rules
+    of the Apache directory server):
+        - scheme and host in lowercase, default port removed
+        - percent-encodings of unreserved characters and of "/" decoded,
+          other percent-encodings in uppercase
+        - "." and ".." path segments resolved, duplicate slashes collapsed
+        - fragment removed
+    Characters which are not percent-encoded are left as they are,
+    so URLs built from the listed names do not change.
+
+    Functions:
+        - normalize_url
+        - listing_digest
+        - _normalize_path
+"""
+import hashlib
+import re
+
+from urllib.parse import urlsplit
+from urllib.parse import urlunsplit
+
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+UNRESERVED_CHARS = frozenset(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~'
+)
+PERCENT_REGEX = re.compile(r'%([0-9A-Fa-f]{2})')
+SLASHES_REGEX = re.compile(r'/{2,}')
+LISTING_KEYS = ('name', 'dir', 'datetime', 'size')
+
+
+def normalize_url(url):
+    """ Get the normal form of the URL.
+
+        Args:
+            url(str): full URL
+
+        Returns:
+            url(str): normalised URL; trailing slash is kept, as it
+                      marks the directory
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port is not None and port == DEFAULT_PORTS.get(scheme):
+        netloc = netloc.rsplit(':', 1)[0]
+    path = _normalize_path(parts.path) if parts.path else '/'
+    return urlunsplit((scheme, netloc, path, parts.query, ''))
+
+
+def _normalize_path(path):
+    """ Get the normal form of the URL path.
+
+        Args:
+            path(str): URL path, starting with slash
+
+        Returns:
+            path(str): path without dot segments and duplicate slashes
+    """
+    def decode(match):
+        char = chr(int(match.group(1), 16))
+        if char in UNRESERVED_CHARS or char == '/':
+            return char
+        return match.group(0).upper()
+
+    path = SLASHES_REGEX.sub('/', PERCENT_REGEX.sub(decode, path))
+    segments = list()
+    for segment in path.split('/')[1:]:
+        if segment == '..':
+            if segments:
+                segments.pop()
+        elif segment != '.':
+            segments.append(segment)
+    last = path.rsplit('/', 1)[-1]
+    if last in ('.', '..') and segments and segments[-1]:
+        segments.append('')
+    return '/' + '/'.join(segments)
+
+
+def listing_digest(files, subpages):
+    """ Get the digest of the directory listing: names, modification
+        dates and sizes of its files and subdirectories. URLs are not
+        included, so aliases of the directory have the same digest.
+
+        Args:
+            files(list): file data dicts
+            subpages(list): subdirectory data dicts
+
+        Returns:
+            digest(str): hexadecimal SHA-1 digest
+    """
+    digest = hashlib.sha1()
+    rows = sorted(
+        '\0'.join(str(item.get(key)) for key in LISTING_KEYS)
+        for item in list(files) + list(subpages)
+    )
+    for row in rows:
+        digest.update(row.encode('utf-8', 'surrogateescape'))
+        digest.update(b'\n')
+    return digest.hexdigest()
@@ -0,0 +1,316 @@
+""" Module for watching the Apache directory server tree, and reporting
+    its files added, modified and removed since the previous poll.
+
+    Classes:
+        - Watcher
+
+    Functions:
+        - diff_files
+"""
+import time
+
+from tools.apache_search.src.crawler import Crawler
+from tools.apache_search.src.defaults import DEFAULT_RETRIES
+from tools.apache_search.src.defaults import DEFAULT_TIMEOUT
+from tools.apache_search.src.filters import relative_path
+from tools.apache_search.src.session import create_session
+from tools.apache_search.src.snapshot import Snapshot
+from tools.apache_search.src.urls import normalize_url
+
+
+ADDED = 'added'
+MODIFIED = 'modified'
+REMOVED = 'removed'
+EVENTS = (ADDED, MODIFIED, REMOVED)
+# Precision of the modification dates listed by the server, in seconds.
+MTIME_PRECISION = 60
+
+
+class Watcher:
+    """ Class for polling the directory tree of the Apache directory server,
+        and reporting its changes as events.
+
+        The state of the tree seen by the previous poll is kept in memory,
+        as the snapshot. The directory modification date changes only
+        when its direct entries are added, removed or renamed, so
+        directories without subdirectories, which modification date,
+        listed by their parent, has not changed since the previous poll,
+        are not fetched again. Other directories are fetched by every poll;
+        with the listing cache, they are requested conditionally, and
+        unchanged listings are neither sent nor parsed again.
+
+        Listed dates have minute precision: the directory is skipped only
+        after it was fetched a minute after its modification date was
+        first seen, so changes made later in the same minute are found.
+
+        Note that a file rewritten in place, without renaming, in the
+        skipped directory is reported only when the directory is fetched
+        for another change.
+
+        Files are the same, if they have the same URL; a file with other
+        modification date or size is modified. Files of removed
+        directories are removed. Removed files are reported only after
+        the poll which walked the whole tree: in the keep going mode,
+        directories which could not be fetched are tried again by the
+        next poll, and nothing is reported for them in the meantime.
+
+        With the crawl filter, only directories and files passing it
+        are watched.
+    """
+    def __init__(self, url, jobs=1, session=None, cache=None,
+                 crawl_filter=None, max_rate=None, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, keep_going=False, stats=None,
+                 order=None, max_memory=None):
+        """ Constructor method for Watcher class.
+
+            Args:
+                url(str): full URL to the root directory of the watched
+                          tree
+                jobs(int): number of directories fetched at once
+                session(requests.Session): session shared by all polls;
+                                           if not given, a new one is
+                                           created for every watch
+                cache(ListingCache): cache of parsed listings
+                crawl_filter(CrawlFilter): filter of the watched files
+                                           and walked directories
+                max_rate(float): maximum number of requests per second
+                                 sent to a single host
+                timeout(float): connect and read timeout of every request,
+                                in seconds
+                retries(int): number of retries of every request after
+                              transient errors
+                keep_going(bool): if True, directories which can not be
+                                  fetched are skipped by the poll, instead
+                                  of stopping the watch
+                stats(CrawlStats): statistics of all polls
+                order(str): order of walking the directories,
+                            frontier.BFS or frontier.DFS
+                max_memory(int): memory of the directories waiting
+                                 to be walked, in bytes; above it,
+                                 they are spilled to disk
+
+            Raises:
+                ValueError: if jobs is lower than 1
+        """
+        if jobs < 1:
+            raise ValueError(f'Number of jobs must be at least 1, got: {jobs}')
+
+        self._url = normalize_url(url)
+        self._jobs = jobs
+        self._session = session
+        self._cache = cache
+        self._filter = crawl_filter
+        self._max_rate = max_rate
+        self._timeout = timeout
+        self._retries = retries
+        self._keep_going = keep_going
+        self._stats = stats
+        self._order = order
+        self._max_memory = max_memory
+        self._snapshot = Snapshot()
+        self._first_seen = dict()
+        self._failures = list()
+
+    @property
+    def failures(self):
+        """ Get directories failed in the last poll, in the keep going
+            mode.
+
+            Returns:
+                self._failures(list): list of (url, error) tuples - full
+                                      URL to the directory and the error
+                                      message
+        """
+        return self._failures
+
+    def watch(self, interval, polls=None, initial=False, on_poll=None):
+        """ Poll the tree every interval seconds, and yield the changes
+            of its files. The first poll only reads the current state
+            of the tree, unless initial is set.
+
+            Args:
+                interval(float): time between the starts of the polls,
+                                 in seconds; the next poll starts right
+                                 after the previous one, if it took longer
+                polls(int): number of polls; if not given, the tree
+                            is watched until the generator is closed
+                initial(bool): if True, files found by the first poll
+                               are yielded as added
+                on_poll(callable): called with the watcher after every
+                                   poll, e.g. to report its failures
+
+            Yields:
+                event(tuple): (event, item) tuple - one of EVENTS,
+                              and the file data; the previous file data
+                              for removed files
+        """
+        session = self._session
+        if session is None:
+            session = create_session(pool_size=self._jobs)
+
+        count = 0
+        try:
+            while True:
+                started = time.monotonic()
+                events = self.poll(session=session)
+                if count or initial:
+                    yield from events
+                else:
+                    for _ in events:
+                        pass
+                count += 1
+                if on_poll is not None:
+                    on_poll(self)
+                if polls is not None and count >= polls:
+                    return
+                time.sleep(max(0.0, started + interval - time.monotonic()))
+        finally:
+            if self._session is None:
+                session.close()
+
+    def poll(self, session=None):
+        """ Walk the tree once, and yield the changes of its files
+            since the previous poll, as the directories are walked.
+
+            Args:
+                session(requests.Session): session used by the poll;
+                                           the session of the watcher
+                                           if not given
+
+            Yields:
+                event(tuple): (event, item) tuple, see watch
+        """
+        previous = dict(self._snapshot.items())
+        crawler = Crawler(
+            self._url, jobs=self._jobs, session=session or self._session,
+            cache=self._cache, snapshot=self._snapshot,
+            crawl_filter=self._filter, max_rate=self._max_rate,
+            timeout=self._timeout, retries=self._retries,
+            keep_going=self._keep_going, stats=self._stats,
+            order=self._order, max_memory=self._max_memory
+        )
+        self._failures = list()
+        started = time.monotonic()
+        fetched = list()
+        complete = False
+        try:
+            for page in crawler.pages():
+                directory = previous.pop(page.url, None)
+                if directory is not None \
+                        and directory['files'] is page.files:
+                    # Unchanged directory, taken from the snapshot.
+                    continue
+                fetched.append(page)
+                old_files = directory['files'] if directory else list()
+                yield from self._filter_events(
+                    page.url, diff_files(old_files, page.files)
+                )
+            complete = not crawler.failures
+        finally:
+            self._failures = crawler.failures
+            self._store_fetched(fetched, complete, started)
+
+        if not complete:
+            return
+        for url in sorted(previous):
+            self._first_seen.pop(url, None)
+            yield from self._filter_events(
+                url, ((REMOVED, item) for item in previous[url]['files'])
+            )
+
+    def _store_fetched(self, pages, complete, started):
+        """ Store the directories fetched by the poll in the snapshot.
+            Only the settled modification dates of the directories
+            without subdirectories are kept, so other directories
+            are fetched again by the next poll.
+
+            Directories of the incomplete walk, which did not replace
+            the snapshot, are stored too, so their changes are not
+            reported twice.
+
+            Args:
+                pages(list): pages fetched by the poll
+                complete(bool): True if the whole tree was walked,
+                                and the snapshot was replaced
+                started(float): time of the poll start, from
+                                time.monotonic
+        """
+        finished = time.monotonic()
+        for page in pages:
+            mtime = None
+            if complete and not page.subpages:
+                mtime = self._settled_mtime(page.url, started, finished)
+            self._snapshot.add(page.url, mtime, page.files, page.subpages)
+
+    def _settled_mtime(self, url, started, finished):
+        """ Get the modification date of the fetched directory, if it can
+            not change any more without changing its listed value: the
+            directory was fetched at least a minute after the date was
+            first seen.
+
+            Args:
+                url(str): full URL to the directory in the snapshot
+                started(float): time of the poll start
+                finished(float): time of the poll end
+
+            Returns:
+                mtime(datetime.datetime): listed modification date,
+                                          or None if it is not settled
+        """
+        mtime = self._snapshot.get(url)['datetime']
+        if mtime is None:
+            return None
+        first_seen = self._first_seen.get(url)
+        if first_seen is None or first_seen[0] != mtime:
+            self._first_seen[url] = (mtime, finished)
+            return None
+        if started < first_seen[1] + MTIME_PRECISION:
+            return None
+        del self._first_seen[url]
+        return mtime
+
+    def _filter_events(self, url, events):
+        """ Filter the events of the directory files by the crawl filter.
+
+            Args:
+                url(str): full URL to the directory
+                events(iterable): (event, item) tuples
+
+            Yields:
+                event(tuple): (event, item) tuples of the matching files
+        """
+        if self._filter is None:
+            yield from events
+        elif self._filter.match_dir(relative_path(url, self._url)):
+            for event, item in events:
+                if self._filter.match_file(item):
+                    yield event, item
+
+
+def diff_files(old_files, new_files):
+    """ Compare two listings of the same directory.
+
+        Args:
+            old_files(list): list of dictionaries - previous file data
+            new_files(list): list of dictionaries - current file data
+
+        Yields:
+            event(tuple): (event, item) tuple - one of EVENTS, and
+                          the file data: added and modified files first,
+                          in the listing order, then removed files
+    """
+    old_by_url = {item['url']: item for item in old_files}
+    new_urls = set()
+    for item in new_files:
+        url = item['url']
+        new_urls.add(url)
+        old_item = old_by_url.get(url)
+        if old_item is None:
+            yield ADDED, item
+        elif old_item.get('datetime') != item.get('datetime') \
+                or old_item.get('size') != item.get('size'):
+            yield MODIFIED, item
+
+    for item in old_files:
+        if item['url'] not in new_urls:
+            yield REMOVED, item
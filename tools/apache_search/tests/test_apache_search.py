@@ -4,9 +4,17 @@ import unittest
 from unittest import mock
 from click.testing import CliRunner
 
+from tools.apache_search.src.cache import ListingCache
 from tools.apache_search.src.cli import apache_search
+from tools.apache_search.src.download import DOWNLOADED
+from tools.apache_search.src.download import DownloadResult
+from tools.apache_search.src.download import FAILED
+from tools.apache_search.src.filters import CrawlFilter
+from tools.apache_search.src.stats import RequestRecord
 
 MODULE_PATH = 'tools.apache_search.src.cli.apache_search'
+OPTIONS_PATH = 'tools.apache_search.src.cli.options'
+PAGE_SEARCH_PATH = 'tools.apache_search.src.page_search'
 
 
 class TestApacheSearch(unittest.TestCase):
@@ -18,9 +26,8 @@ class TestApacheSearch(unittest.TestCase):
         self.test_url = 'https://test/url'
 
     @mock.patch(f'{MODULE_PATH}._create_table')
-    @mock.patch(f'{MODULE_PATH}.single_page_search_dirs')
-    @mock.patch(f'{MODULE_PATH}.single_page_search_files')
-    def test_apache_search_files(self, mock_single_files, mock_single_dirs,
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_files(self, mock_single_search,
                                  mock_create_table):
         """ Test apache_search command function.
             Case: display files only.
@@ -29,6 +36,7 @@ class TestApacheSearch(unittest.TestCase):
         mock_create_table.side_effect = [
             'CREATE_TABLE_FILES',
         ]
+        mock_single_search.return_value = (['file'], ['dir'])
 
         result = self.runner.invoke(
             apache_search.apache_search,
@@ -44,13 +52,11 @@ class TestApacheSearch(unittest.TestCase):
         for output_el in exp_output:
             self.assertTrue(output_el in result.output)
 
-        self.assertTrue(mock_single_files.called)
-        self.assertTrue(mock_single_dirs.called)
+        self.assertTrue(mock_single_search.called)
 
     @mock.patch(f'{MODULE_PATH}._create_table')
-    @mock.patch(f'{MODULE_PATH}.single_page_search_dirs')
-    @mock.patch(f'{MODULE_PATH}.single_page_search_files')
-    def test_apache_search_dirs(self, mock_single_files, mock_single_dirs,
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_dirs(self, mock_single_search,
                                 mock_create_table):
         """ Test apache_search command function.
             Case: display dirs only.
@@ -59,6 +65,7 @@ class TestApacheSearch(unittest.TestCase):
         mock_create_table.side_effect = [
             'CREATE_TABLE_DIRS',
         ]
+        mock_single_search.return_value = (['file'], ['dir'])
 
         result = self.runner.invoke(
             apache_search.apache_search,
@@ -74,13 +81,11 @@ class TestApacheSearch(unittest.TestCase):
         for output_el in exp_output:
             self.assertTrue(output_el in result.output)
 
-        self.assertTrue(mock_single_files.called)
-        self.assertTrue(mock_single_dirs.called)
+        self.assertTrue(mock_single_search.called)
 
     @mock.patch(f'{MODULE_PATH}._create_table')
-    @mock.patch(f'{MODULE_PATH}.single_page_search_dirs')
-    @mock.patch(f'{MODULE_PATH}.single_page_search_files')
-    def test_apache_search_files_dirs(self, mock_single_files, mock_single_dirs,
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_files_dirs(self, mock_single_search,
                                       mock_create_table):
         """ Test apache_search command function.
             Case: display files and dirs.
@@ -90,6 +95,7 @@ class TestApacheSearch(unittest.TestCase):
             'CREATE_TABLE_FILES',
             'CREATE_TABLE_DIRS'
         ]
+        mock_single_search.return_value = (['file'], ['dir'])
 
         result = self.runner.invoke(
             apache_search.apache_search,
@@ -107,13 +113,11 @@ class TestApacheSearch(unittest.TestCase):
         for output_el in exp_output:
             self.assertTrue(output_el in result.output)
 
-        self.assertTrue(mock_single_files.called)
-        self.assertTrue(mock_single_dirs.called)
+        self.assertTrue(mock_single_search.called)
 
     @mock.patch(f'{MODULE_PATH}._create_table')
-    @mock.patch(f'{MODULE_PATH}.single_page_search_dirs')
-    @mock.patch(f'{MODULE_PATH}.single_page_search_files')
-    def test_apache_search_urls(self, mock_single_files, mock_single_dirs,
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_urls(self, mock_single_search,
                                 mock_create_table):
         """ Test apache_search command function.
             Case: display files and dirs as urls.
@@ -123,6 +127,7 @@ class TestApacheSearch(unittest.TestCase):
             'CREATE_TABLE_FILES',
             'CREATE_TABLE_DIRS'
         ]
+        mock_single_search.return_value = (['file'], ['dir'])
 
         result = self.runner.invoke(
             apache_search.apache_search,
@@ -140,13 +145,11 @@ class TestApacheSearch(unittest.TestCase):
         for output_el in exp_output:
             self.assertTrue(output_el in result.output)
 
-        self.assertTrue(mock_single_files.called)
-        self.assertTrue(mock_single_dirs.called)
+        self.assertTrue(mock_single_search.called)
 
     @mock.patch(f'{MODULE_PATH}._create_table')
-    @mock.patch(f'{MODULE_PATH}.single_page_search_dirs')
-    @mock.patch(f'{MODULE_PATH}.single_page_search_files')
-    def test_apache_search_negative(self, mock_single_files, mock_single_dirs,
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_negative(self, mock_single_search,
                                     mock_create_table):
         """ Test apache_search command function.
             Case: ClickException due to both --files and --dirs options.
@@ -166,11 +169,537 @@ class TestApacheSearch(unittest.TestCase):
             self.assertTrue(output_el in result.output)
 
         self.assertNotEqual(result.exit_code, 0)
-        self.assertFalse(mock_single_files.called)
-        self.assertFalse(mock_single_dirs.called)
+        self.assertFalse(mock_single_search.called)
         self.assertFalse(mock_create_table.called)
 
-    @mock.patch(f'{MODULE_PATH}.tabulate')
+    @mock.patch(f'{PAGE_SEARCH_PATH}.iter_recursive_page_search')
+    def test_apache_search_recursive(self, mock_recursive_search):
+        """ Test apache_search command function.
+            Case: display files from all nested directories.
+            Command: apache-search <url> --recursive --jobs 4
+        """
+        mock_recursive_search.return_value = iter([
+            {'name': 'testfilename.txt', 'size': '200'},
+        ])
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--recursive', '--jobs', '4']
+        )
+        self.assertEqual(result.exit_code, 0)
+
+        exp_output = [
+            f'>>>> Displaying content of: {self.test_url}',
+            '>>>> FILES',
+            'Name              Datetime  Size',
+            'testfilename.txt            200'
+        ]
+        for output_el in exp_output:
+            self.assertTrue(output_el in result.output)
+
+        mock_recursive_search.assert_called_with(
+            self.test_url, jobs=4, cache=mock.ANY, snapshot=None,
+            crawl_filter=None, max_rate=None, timeout=30.0, retries=3,
+            keep_going=False, failures=[], stats=None, detect_aliases=False,
+            aliases=[], parse_processes=None, order=None, max_memory=None
+        )
+        cache = mock_recursive_search.call_args[1]['cache']
+        self.assertIsInstance(cache, ListingCache)
+
+    @mock.patch(f'{PAGE_SEARCH_PATH}.iter_recursive_page_search')
+    def test_apache_search_stats(self, mock_recursive_search):
+        """ Test apache_search command function.
+            Case: statistics of the search shown after the files.
+            Command: apache-search <url> --recursive --stats
+        """
+        def recursive_search(url, stats=None, **kwargs):
+            stats.record_request(RequestRecord(
+                'https://test/url/slow/', 200, size=300, elapsed=2.5, rows=4
+            ))
+            yield {'name': 'testfilename.txt', 'size': '200'}
+
+        mock_recursive_search.side_effect = recursive_search
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--recursive', '--no-cache', '--stats']
+        )
+        self.assertEqual(result.exit_code, 0)
+
+        exp_output = [
+            '>>>> FILES',
+            'testfilename.txt            200',
+            '>>>> STATS',
+            'Bytes received',
+            'render',
+            '>>>> SLOWEST',
+            'https://test/url/slow/'
+        ]
+        for output_el in exp_output:
+            self.assertTrue(output_el in result.output)
+        stats = mock_recursive_search.call_args[1]['stats']
+        self.assertEqual(stats.requests, 1)
+        self.assertTrue(stats.phases['search'] > 0)
+
+    @mock.patch(f'{MODULE_PATH}.Snapshot')
+    @mock.patch(f'{PAGE_SEARCH_PATH}.iter_recursive_page_search')
+    def test_apache_search_snapshot(self, mock_recursive_search,
+                                    mock_snapshot):
+        """ Test apache_search command function.
+            Case: previous snapshot loaded, and saved after the search.
+            Command: apache-search <url> --recursive --snapshot <path>
+        """
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--recursive', '--snapshot', 'snapshot.json']
+        )
+        self.assertEqual(result.exit_code, 0)
+
+        mock_snapshot.load.assert_called_with('snapshot.json')
+        mock_recursive_search.assert_called_with(
+            self.test_url, jobs=1, cache=mock.ANY,
+            snapshot=mock_snapshot.load(), crawl_filter=None, max_rate=None,
+            timeout=30.0, retries=3, keep_going=False, failures=[],
+            stats=None, detect_aliases=False, aliases=[],
+            parse_processes=None, order=None, max_memory=None
+        )
+        mock_snapshot.load().save.assert_called_with('snapshot.json')
+
+    @mock.patch(f'{PAGE_SEARCH_PATH}.iter_recursive_page_search')
+    def test_apache_search_filter(self, mock_recursive_search):
+        """ Test apache_search command function.
+            Case: files and directories filtered during the crawl.
+            Command: apache-search <url> --recursive --name <pattern>
+                     --min-size <size> --exclude-dir <pattern>
+                     --max-depth <depth>
+        """
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--recursive', '--name', '*.txt',
+             '--min-size', '2k', '--exclude-dir', 'old', '--max-depth', '2']
+        )
+        self.assertEqual(result.exit_code, 0)
+
+        crawl_filter = mock_recursive_search.call_args[1]['crawl_filter']
+        self.assertIsInstance(crawl_filter, CrawlFilter)
+        self.assertEqual(crawl_filter._names, ['*.txt'])
+        self.assertEqual(crawl_filter._min_size, 2048)
+        self.assertEqual(crawl_filter._exclude_dirs, ['old'])
+        self.assertEqual(crawl_filter._max_depth, 2)
+
+    @mock.patch(f'{MODULE_PATH}._create_table')
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_filter_files(self, mock_single_search,
+                                        mock_create_table):
+        """ Test apache_search command function.
+            Case: files of the single page filtered by name.
+            Command: apache-search <url> --files --regex <regex>
+        """
+        mock_single_search.return_value = (
+            [{'name': 'a.txt'}, {'name': 'b.log'}], []
+        )
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--files', '--regex', r'\.log$']
+        )
+        self.assertEqual(result.exit_code, 0)
+        mock_create_table.assert_called_once_with([{'name': 'b.log'}],
+                                                  mock.ANY)
+
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_filter_negative(self, mock_single_search):
+        """ Test apache_search command function.
+            Case: directory filters without --recursive, wrong size
+                  and regex values.
+        """
+        for args, message in [
+                (['--exclude-dir', 'old'], 'used only with --recursive'),
+                (['--min-size', '10X'], '10X is not a valid size'),
+                (['--regex', '('], '( is not valid')]:
+            result = self.runner.invoke(apache_search.apache_search,
+                                        [self.test_url] + args)
+
+            self.assertNotEqual(result.exit_code, 0)
+            self.assertTrue(message in result.output)
+        self.assertFalse(mock_single_search.called)
+
+    @mock.patch(f'{PAGE_SEARCH_PATH}.iter_recursive_page_search')
+    def test_apache_search_keep_going(self, mock_recursive_search):
+        """ Test apache_search command function.
+            Case: failed directories listed after the files, command fails.
+            Command: apache-search <url> --recursive --keep-going
+                     --timeout <seconds> --retries <retries>
+        """
+        def recursive_search(url, failures, **kwargs):
+            yield {'name': 'a.txt'}
+            failures.append(('https://test/url/old/', 'Read timed out.'))
+        mock_recursive_search.side_effect = recursive_search
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--recursive', '--keep-going', '--timeout', '5',
+             '--retries', '1']
+        )
+
+        self.assertEqual(result.exit_code, 1)
+        exp_output = [
+            '>>>> FAILED',
+            'https://test/url/old/  Read timed out.',
+            '1 directories could not be fetched.'
+        ]
+        for output_el in exp_output:
+            self.assertTrue(output_el in result.output)
+        call_kwargs = mock_recursive_search.call_args[1]
+        self.assertEqual(call_kwargs['timeout'], 5.0)
+        self.assertEqual(call_kwargs['retries'], 1)
+        self.assertTrue(call_kwargs['keep_going'])
+
+    @mock.patch(f'{PAGE_SEARCH_PATH}.iter_recursive_page_search')
+    def test_apache_search_detect_aliases(self, mock_recursive_search):
+        """ Test apache_search command function.
+            Case: skipped aliases listed after the files, command succeeds.
+            Command: apache-search <url> --recursive --detect-aliases
+        """
+        def recursive_search(url, aliases, **kwargs):
+            yield {'name': 'a.txt'}
+            aliases.append(('https://test/url/loop/', 'https://test/url/'))
+        mock_recursive_search.side_effect = recursive_search
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--recursive', '--detect-aliases']
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('>>>> ALIASES', result.output)
+        self.assertIn('https://test/url/loop/  https://test/url/',
+                      result.output)
+        self.assertTrue(mock_recursive_search.call_args[1]['detect_aliases'])
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--detect-aliases']
+        )
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('can be used only with --recursive', result.output)
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--parse-processes', '4']
+        )
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('can be used only with --recursive', result.output)
+
+    @mock.patch(f'{PAGE_SEARCH_PATH}.iter_recursive_page_search')
+    def test_apache_search_max_memory(self, mock_recursive_search):
+        """ Test apache_search command function.
+            Case: walk order and memory limit passed to the search,
+                  used only with --recursive and without --snapshot.
+            Command: apache-search <url> --recursive --order bfs
+                     --max-memory 64M
+        """
+        mock_recursive_search.return_value = iter([{'name': 'a.txt'}])
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--recursive', '--no-cache', '--order', 'bfs',
+             '--max-memory', '64M']
+        )
+        self.assertEqual(result.exit_code, 0)
+        call_kwargs = mock_recursive_search.call_args[1]
+        self.assertEqual(call_kwargs['order'], 'bfs')
+        self.assertEqual(call_kwargs['max_memory'], 64 * 1024 * 1024)
+
+        for args, message in [
+            (['--order', 'dfs'], 'can be used only with --recursive'),
+            (['-r', '--max-memory', '1G', '--snapshot', 'tree.json'],
+             '--snapshot and --max-memory can not be used together'),
+            (['-r', '--max-memory', 'lots'], 'is not a valid size'),
+            (['-r', '--max-memory', '1G', 'https://test/other'],
+             '--max-memory can be used only with a single URL'),
+        ]:
+            result = self.runner.invoke(apache_search.apache_search,
+                                        [self.test_url] + args)
+            self.assertNotEqual(result.exit_code, 0)
+            self.assertIn(message, result.output)
+
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_snapshot_negative(self, mock_single_search):
+        """ Test apache_search command function.
+            Case: ClickException due to --snapshot without --recursive.
+            Command: apache-search <url> --snapshot <path>
+        """
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--snapshot', 'snapshot.json']
+        )
+
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertTrue(
+            'Option: --snapshot can be used only with --recursive.'
+            in result.output
+        )
+        self.assertFalse(mock_single_search.called)
+
+    @mock.patch(f'{PAGE_SEARCH_PATH}.iter_recursive_page_search')
+    def test_apache_search_format_jsonl(self, mock_recursive_search):
+        """ Test apache_search command function.
+            Case: files written as JSON Lines, failures on stderr.
+            Command: apache-search <url> --recursive --keep-going
+                     --format jsonl
+        """
+        def recursive_search(url, failures=None, **kwargs):
+            yield {'name': 'a.txt', 'url': 'https://test/url/a.txt',
+                   'size': '2K'}
+            failures.append(('https://test/url/bad/', 'Not Found'))
+
+        mock_recursive_search.side_effect = recursive_search
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--recursive', '--keep-going', '--no-cache',
+             '--format', 'jsonl']
+        )
+        self.assertEqual(result.exit_code, 1)
+
+        lines = result.output.splitlines()
+        self.assertEqual(lines[0], (
+            '{"type": "file", "name": "a.txt", '
+            '"url": "https://test/url/a.txt", "datetime": null, '
+            '"size": "2K", "size_bytes": 2048}'
+        ))
+        self.assertNotIn('>>>> Displaying', result.output)
+        self.assertIn('>>>> FAILED', result.output)
+
+        result = CliRunner(mix_stderr=False).invoke(
+            apache_search.apache_search,
+            [self.test_url, '--recursive', '--keep-going', '--no-cache',
+             '--format', 'jsonl']
+        )
+        self.assertEqual(len(result.stdout.splitlines()), 1)
+        self.assertIn('https://test/url/bad/', result.stderr)
+
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_format_csv(self, mock_single_search):
+        """ Test apache_search command function.
+            Case: urls of files and directories written as CSV.
+            Command: apache-search <url> --format csv --display-url
+        """
+        mock_single_search.return_value = (
+            [{'name': 'a.txt', 'url': 'https://test/url/a.txt'}],
+            [{'dir': 'sub/', 'url': 'https://test/url/sub/'}]
+        )
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--no-cache', '--format', 'csv', '-u']
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output, 'url\nhttps://test/url/a.txt\n'
+                                        'https://test/url/sub/\n')
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--no-cache', '--format', 'urls0', '--dirs']
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output, 'https://test/url/sub/\0')
+
+    @mock.patch('tools.apache_search.src.download.Downloader')
+    @mock.patch(f'{PAGE_SEARCH_PATH}.iter_recursive_page_search')
+    def test_apache_search_download(self, mock_recursive_search,
+                                    mock_downloader):
+        """ Test apache_search command function.
+            Case: found files downloaded, failed file listed.
+            Command: apache-search <url> --recursive --download <dir>
+                     --keep-going --jobs 4 --segments 2
+        """
+        mock_recursive_search.return_value = iter(['file1', 'file2'])
+        downloader = mock_downloader.return_value.__enter__.return_value
+        downloader.download_all.return_value = iter([
+            DownloadResult('https://test/url/a.txt', '/mirror/a.txt',
+                           DOWNLOADED, size=120),
+            DownloadResult('https://test/url/b.txt', '/mirror/b.txt',
+                           FAILED, error='Status code: 404'),
+        ])
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--recursive', '--no-cache', '--download',
+             '/mirror', '--keep-going', '--jobs', '4', '--segments', '2']
+        )
+        self.assertEqual(result.exit_code, 1)
+
+        exp_output = [
+            '>>>> DOWNLOADS',
+            '/mirror/a.txt  120   downloaded',
+            '/mirror/b.txt        failed',
+            '>>>> FAILED',
+            'https://test/url/b.txt  Status code: 404',
+            'Error: 1 directories or files could not be fetched.'
+        ]
+        for output_el in exp_output:
+            self.assertTrue(output_el in result.output)
+        mock_downloader.assert_called_with('/mirror', self.test_url, jobs=4,
+                                           segments=2, timeout=30.0,
+                                           retries=3)
+        self.assertEqual(list(downloader.download_all.call_args[0][0]),
+                         ['file1', 'file2'])
+
+    @mock.patch('tools.apache_search.src.download.Downloader')
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_download_failed(self, mock_single_search,
+                                           mock_downloader):
+        """ Test apache_search command function.
+            Case: downloads stopped by the failed file.
+            Command: apache-search <url> --download <dir>
+        """
+        mock_single_search.return_value = (['file1'], ['dir'])
+        downloader = mock_downloader.return_value.__enter__.return_value
+        downloader.download_all.return_value = iter([
+            DownloadResult('https://test/url/b.txt', '/mirror/b.txt',
+                           FAILED, error='Status code: 404'),
+        ])
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--no-cache', '--download', '/mirror']
+        )
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('Error: Can not download: https://test/url/b.txt. '
+                      'Status code: 404', result.output)
+        downloader.download_all.assert_called_with(['file1'])
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--download', '/mirror', '--format', 'jsonl']
+        )
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('--download and (--dirs or --format)', result.output)
+
+    @mock.patch(f'{MODULE_PATH}._create_table')
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_no_cache(self, mock_single_search,
+                                    mock_create_table):
+        """ Test apache_search command function.
+            Case: listing cache disabled.
+            Command: apache-search <url> --no-cache
+        """
+        mock_single_search.return_value = (['file'], ['dir'])
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--no-cache']
+        )
+        self.assertEqual(result.exit_code, 0)
+        mock_single_search.assert_called_with(self.test_url, cache=None,
+                                              timeout=30.0, retries=3,
+                                              stats=None)
+
+    @mock.patch(f'{OPTIONS_PATH}.open_cache')
+    @mock.patch(f'{MODULE_PATH}._create_table')
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_cache_dir(self, mock_single_search,
+                                     mock_create_table, mock_cache):
+        """ Test apache_search command function.
+            Case: custom listing cache directory and size.
+            Command: apache-search <url> --cache-dir <dir> --cache-size 10
+        """
+        mock_single_search.return_value = (['file'], ['dir'])
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, '--cache-dir', '/test/cache', '--cache-size', '10']
+        )
+        self.assertEqual(result.exit_code, 0)
+        mock_cache.assert_called_with('/test/cache', max_size=10 * 1024 * 1024)
+        mock_single_search.assert_called_with(self.test_url,
+                                              cache=mock_cache(),
+                                              timeout=30.0, retries=3,
+                                              stats=None)
+
+    @mock.patch(f'{PAGE_SEARCH_PATH}.iter_batch_page_search')
+    def test_apache_search_batch(self, mock_batch_search):
+        """ Test apache_search command function.
+            Case: files of many URLs in a single table, labelled by URL.
+            Command: apache-search <url> <url2> <url> --recursive
+        """
+        test_url2 = 'https://test/other'
+        mock_batch_search.return_value = iter([
+            (f'{self.test_url}/', {'name': 'a.txt', 'size': '2K'}),
+            (f'{test_url2}/', {'name': 'b.txt', 'size': '1K'}),
+        ])
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, test_url2, self.test_url, '--recursive',
+             '--no-cache', '-j', '4']
+        )
+        self.assertEqual(result.exit_code, 0)
+
+        self.assertEqual(result.output.count('>>>> Displaying content of'),
+                         2)
+        self.assertIn('Root', result.output)
+        self.assertIn(f'{test_url2}/  b.txt', result.output)
+        self.assertEqual(mock_batch_search.call_args[0][0],
+                         [self.test_url, test_url2])
+        self.assertEqual(mock_batch_search.call_args[1]['jobs'], 4)
+
+    @mock.patch('tools.apache_search.src.session.create_session')
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_apache_search_batch_url_file(self, mock_single_search,
+                                          mock_create_session):
+        """ Test apache_search command function.
+            Case: URLs read from stdin, skipped failed URL, records
+                  labelled by URL, one session shared by all requests.
+            Command: apache-search --url-file - --keep-going --format jsonl
+        """
+        def single_search(url, **kwargs):
+            if url.endswith('bad'):
+                raise OSError('Not Found')
+            return [{'name': 'a.txt', 'url': f'{url}/a.txt'}], []
+
+        mock_single_search.side_effect = single_search
+        session = mock_create_session.return_value.__enter__.return_value
+
+        result = CliRunner(mix_stderr=False).invoke(
+            apache_search.apache_search,
+            ['--url-file', '-', '--keep-going', '--no-cache', '--format',
+             'jsonl', '-u'],
+            input='# mirrors\nhttps://test/one\n\nhttps://test/bad\n'
+                  'https://test/two\n'
+        )
+        self.assertEqual(result.exit_code, 1)
+
+        self.assertEqual(result.stdout.splitlines(), [
+            '{"root": "https://test/one", "url": "https://test/one/a.txt"}',
+            '{"root": "https://test/two", "url": "https://test/two/a.txt"}',
+        ])
+        self.assertIn('https://test/bad', result.stderr)
+        self.assertEqual(mock_single_search.call_count, 3)
+        for call in mock_single_search.call_args_list:
+            self.assertIs(call[1]['session'], session)
+
+    def test_apache_search_batch_negative(self):
+        """ Test apache_search command function.
+            Case: no URL given, --snapshot with many URLs.
+            Command: apache-search
+                     apache-search <url> <url2> -r --snapshot <file>
+        """
+        result = self.runner.invoke(apache_search.apache_search, [])
+        self.assertEqual(result.exit_code, 2)
+        self.assertIn('Missing argument', result.output)
+
+        result = self.runner.invoke(
+            apache_search.apache_search,
+            [self.test_url, 'https://test/other', '-r', '--snapshot',
+             'tree.json']
+        )
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('can be used only with a single URL', result.output)
+
+    @mock.patch('tabulate.tabulate')
     def test_create_table(self, mock_tabulate):
         """ Test _create_table function."""
         test_data_list = [
@@ -0,0 +1,176 @@
+""" Test module for autoindex module."""
+import unittest
+
+from tools.apache_search.src.autoindex import AutoindexParser
+from tools.apache_search.src.autoindex import classify_alts
+from tools.apache_search.src.autoindex import parse_json_listing
+from tools.apache_search.src.autoindex import parse_xml_listing
+
+
+TEST_ROWS = (
+    '<tr><th valign="top"><img src="/icons/blank.gif" alt="[ICO]"></th>'
+    '<th><a href="?C=N;O=D">Name</a></th></tr>\n'
+    '<tr><td valign="top"><img src="/icons/folder.gif" alt="[DIR]"></td>'
+    '<td><a href="sub/">sub/</a></td>'
+    '<td align="right">2019-03-16 11:46  </td>'
+    '<td align="right">  - </td><td>&nbsp;</td></tr>\n'
+    '<tr><td valign="top"><img src="/icons/text.gif" alt="[TXT]"></td>'
+    '<td><a href="a%20b.txt">a&amp;b.txt</a></td>'
+    '<td align="right">2019-03-14 09:00  </td>'
+    '<td align="right">120 </td><td>&nbsp;</td></tr>\n'
+)
+
+EXP_ROWS = [
+    (['[DIR]'], ['sub/', '2019-03-16 11:46', '-', '']),
+    (['[TXT]'], ['a&b.txt', '2019-03-14 09:00', '120', '']),
+]
+
+TEST_APACHE_PRE = (
+    '<h1>Index of /pub</h1>\n'
+    '<pre><img src="/icons/blank.gif" alt="Icon "> '
+    '<a href="?C=N;O=D">Name</a>                    '
+    '<a href="?C=M;O=A">Last modified</a>      '
+    '<a href="?C=S;O=A">Size</a>  <a href="?C=D;O=A">Description</a>'
+    '<hr><img src="/icons/back.gif" alt="[PARENTDIR]"> '
+    '<a href="/">Parent Directory</a>                             -   \n'
+    '<img src="/icons/folder.gif" alt="[DIR]"> <a href="sub/">sub/</a>'
+    '                    2019-03-16 11:46    -   \n'
+    '<img src="/icons/text.gif" alt="[TXT]"> <a href="a.txt">a&amp;b.txt</a>'
+    '               2019-03-14 09:00  120   \n'
+    '<hr></pre>\n</body></html>\n'
+)
+
+EXP_APACHE_PRE_ROWS = [
+    (['[PARENTDIR]'], ['Parent Directory', '-']),
+    (['[DIR]'], ['sub/', '2019-03-16 11:46', '-']),
+    (['[TXT]'], ['a&b.txt', '2019-03-14 09:00', '120']),
+]
+
+TEST_NGINX_PRE = (
+    '<html>\n<head><title>Index of /pub/</title></head>\n<body>\n'
+    '<h1>Index of /pub/</h1><hr><pre><a href="../">../</a>\n'
+    '<a href="sub/">sub/</a>                    16-Mar-2019 11:46'
+    '                   -\n'
+    '<a href="file.txt">file.txt</a>                14-Mar-2019 09:00'
+    '                 120\n'
+    '</pre><hr></body>\n</html>\n'
+)
+
+EXP_NGINX_PRE_ROWS = [
+    (['[PARENTDIR]'], ['../', '']),
+    (['[DIR]'], ['sub/', '2019-03-16 11:46', '-']),
+    (['[   ]'], ['file.txt', '2019-03-14 09:00', '120']),
+]
+
+
+class TestAutoindexParser(unittest.TestCase):
+    """ Test suite for AutoindexParser class."""
+
+    def test_feed(self):
+        """ Test feed method.
+            Case: whole table given at once.
+        """
+        parser = AutoindexParser()
+        result = parser.feed(f'<table>{TEST_ROWS}</table>')
+
+        self.assertEqual(result, EXP_ROWS)
+        self.assertTrue(parser.recognised)
+
+    def test_feed_chunks(self):
+        """ Test feed method.
+            Case: table split into small chunks, also inside the tags.
+        """
+        parser = AutoindexParser()
+        page = f'<html><body><table>{TEST_ROWS}</table></body></html>'
+        result = list()
+        for position in range(0, len(page), 7):
+            result += parser.feed(page[position:position + 7])
+
+        self.assertEqual(result, EXP_ROWS)
+
+    def test_feed_not_recognised(self):
+        """ Test feed method.
+            Case: page without table rows, buffer is not growing.
+        """
+        parser = AutoindexParser()
+        result = parser.feed('<p><a href="file.txt">file.txt</a></p>' * 100)
+
+        self.assertEqual(result, [])
+        self.assertFalse(parser.recognised)
+        self.assertTrue(len(parser._buffer) <= len('<pre'))
+
+    def test_feed_header_only(self):
+        """ Test feed method.
+            Case: rows without table cells are skipped.
+        """
+        parser = AutoindexParser()
+        result = parser.feed('<table><tr><th>Name</th></tr></table>')
+
+        self.assertEqual(result, [])
+        self.assertFalse(parser.recognised)
+
+    def test_feed_apache_pre(self):
+        """ Test feed method.
+            Case: Apache fancy index as preformatted text, split into
+                  small chunks.
+        """
+        parser = AutoindexParser()
+        result = list()
+        for position in range(0, len(TEST_APACHE_PRE), 5):
+            result += parser.feed(TEST_APACHE_PRE[position:position + 5])
+
+        self.assertEqual(result, EXP_APACHE_PRE_ROWS)
+        self.assertTrue(parser.recognised)
+
+    def test_feed_nginx_pre(self):
+        """ Test feed method.
+            Case: nginx html listing, alt values made from links.
+        """
+        parser = AutoindexParser()
+        result = parser.feed(TEST_NGINX_PRE)
+
+        self.assertEqual(result, EXP_NGINX_PRE_ROWS)
+        self.assertTrue(parser.recognised)
+
+
+class TestAutoindexFunctions(unittest.TestCase):
+    """ Test suite for autoindex module functions."""
+
+    def test_classify_alts(self):
+        """ Test classify_alts function."""
+        self.assertEqual(classify_alts(['[DIR]']), 'dirs')
+        self.assertEqual(classify_alts(['[   ]']), 'files')
+        self.assertEqual(classify_alts(['[TXT]']), 'files')
+        self.assertIsNone(classify_alts(['[PARENTDIR]']))
+        self.assertIsNone(classify_alts(['[ICO]']))
+        self.assertIsNone(classify_alts([]))
+
+    def test_parse_json_listing(self):
+        """ Test parse_json_listing function."""
+        text = (
+            '[{"name": "sub", "type": "directory",'
+            ' "mtime": "Sat, 16 Mar 2019 11:46:00 GMT"},'
+            ' {"name": "file.txt", "type": "file",'
+            ' "mtime": "Thu, 14 Mar 2019 09:00:00 GMT", "size": 120}]'
+        )
+        result = parse_json_listing(text)
+
+        self.assertEqual(result, [
+            (['[DIR]'], ['sub/', '2019-03-16 11:46']),
+            (['[   ]'], ['file.txt', '2019-03-14 09:00', '120']),
+        ])
+
+    def test_parse_xml_listing(self):
+        """ Test parse_xml_listing function."""
+        text = (
+            '<?xml version="1.0"?>\n<list>\n'
+            '<directory mtime="2019-03-16T11:46:00Z">sub</directory>\n'
+            '<file mtime="2019-03-14T09:00:00Z" size="120">file.txt</file>\n'
+            '</list>\n'
+        )
+        result = parse_xml_listing(text)
+
+        self.assertEqual(result, [
+            (['[DIR]'], ['sub/', '2019-03-16 11:46']),
+            (['[   ]'], ['file.txt', '2019-03-14 09:00', '120']),
+        ])
@@ -0,0 +1,225 @@
+""" Test module for cache module."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from datetime import datetime
+from unittest import mock
+
+from tools.apache_search.src import cache
+from tools.apache_search.src.cache import ListingCache
+from tools.apache_search.src.entry import DirEntry
+from tools.apache_search.src.entry import FileEntry
+
+
+MODULE_PATH = 'tools.apache_search.src.cache'
+
+
+class TestListingCache(unittest.TestCase):
+    """ Test suite for ListingCache class."""
+
+    def setUp(self):
+        """ Setup method for ListingCache class tests."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+        self.test_url = 'https://test/url/'
+        self.files = [{
+            'name': 'file.txt', 'url': 'https://test/url/file.txt',
+            'datetime': datetime(2019, 3, 16, 11, 46), 'size': '120'
+        }]
+        self.subpages = [{
+            'dir': 'sub/', 'url': 'https://test/url/sub/',
+            'datetime': datetime(2019, 3, 15, 10, 1)
+        }]
+
+    def tearDown(self):
+        """ Teardown method for ListingCache class tests."""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_get_not_cached(self):
+        """ Test get method.
+            Case: url not cached, cache directory not created.
+        """
+        listing_cache = ListingCache(self.cache_dir)
+
+        self.assertIsNone(listing_cache.get(self.test_url))
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_put_get(self):
+        """ Test put and get methods.
+            Case: stored listing is read back with the validators.
+        """
+        listing_cache = ListingCache(self.cache_dir)
+        listing_cache.put(self.test_url, '"abc"', 'Sat, 16 Mar 2019',
+                          self.files, self.subpages)
+
+        result = ListingCache(self.cache_dir).get(self.test_url)
+
+        self.assertEqual(result['etag'], '"abc"')
+        self.assertEqual(result['last_modified'], 'Sat, 16 Mar 2019')
+        self.assertEqual(result['files'], self.files)
+        self.assertEqual(result['subpages'], self.subpages)
+
+    def test_put_overwrite(self):
+        """ Test put method.
+            Case: entry of the same url is replaced, size tracked.
+        """
+        listing_cache = ListingCache(self.cache_dir)
+        listing_cache.put(self.test_url, '"abc"', None, self.files, [])
+        listing_cache.put(self.test_url, '"def"', None, [], [])
+
+        self.assertEqual(listing_cache.get(self.test_url)['etag'], '"def"')
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        self.assertEqual(
+            listing_cache._size,
+            sum(size for _, size, _ in listing_cache._list_entries())
+        )
+
+    def test_put_evict(self):
+        """ Test put method.
+            Case: least recently used entries evicted over the size cap.
+        """
+        listing_cache = ListingCache(self.cache_dir)
+        for index in range(3):
+            listing_cache.put(f'{self.test_url}{index}/', None, 'date',
+                              self.files, self.subpages)
+            entry_path = listing_cache._entry_path(f'{self.test_url}{index}/')
+            os.utime(entry_path, (index, index))
+        entry_size = listing_cache._size // 3
+
+        listing_cache._max_size = entry_size * 3 + entry_size // 2
+        listing_cache.put(f'{self.test_url}3/', None, 'date',
+                          self.files, self.subpages)
+
+        self.assertIsNone(listing_cache.get(f'{self.test_url}0/'))
+        self.assertIsNotNone(listing_cache.get(f'{self.test_url}1/'))
+        self.assertIsNotNone(listing_cache.get(f'{self.test_url}3/'))
+        self.assertTrue(listing_cache._size <= listing_cache._max_size)
+
+    def test_get_broken_entry(self):
+        """ Test get method.
+            Case: broken entry file is treated as not cached.
+        """
+        listing_cache = ListingCache(self.cache_dir)
+        os.makedirs(self.cache_dir)
+        with open(listing_cache._entry_path(self.test_url), 'w') as entry:
+            entry.write('{broken')
+
+        self.assertIsNone(listing_cache.get(self.test_url))
+
+    def test_get_memory(self):
+        """ Test get method.
+            Case: recently used listings kept in memory, not read from
+                  disk; the least recently used one is forgotten.
+        """
+        listing_cache = ListingCache(self.cache_dir, memory_items=2)
+        for name in ('a', 'b', 'c'):
+            listing_cache.put(f'{self.test_url}{name}/', '"abc"', None,
+                              self.files, self.subpages)
+        shutil.rmtree(self.cache_dir)
+
+        result = listing_cache.get(f'{self.test_url}c/')
+        result['files'].append('other')
+
+        self.assertEqual(result['etag'], '"abc"')
+        self.assertEqual(result['subpages'], self.subpages)
+        self.assertEqual(listing_cache.get(f'{self.test_url}c/')['files'],
+                         self.files)
+        self.assertIsNotNone(listing_cache.get(f'{self.test_url}b/'))
+        self.assertIsNone(listing_cache.get(f'{self.test_url}a/'))
+
+
+class TestCacheFunctions(unittest.TestCase):
+    """ Test suite for cache module functions."""
+
+    @mock.patch.dict(f'{MODULE_PATH}.os.environ', {'XDG_CACHE_HOME': '/xdg'})
+    def test_default_cache_dir_xdg(self):
+        """ Test default_cache_dir function.
+            Case: XDG_CACHE_HOME environment variable set.
+        """
+        self.assertEqual(cache.default_cache_dir(), '/xdg/apache-search')
+
+    @mock.patch(f'{MODULE_PATH}.os.path.expanduser')
+    @mock.patch.dict(f'{MODULE_PATH}.os.environ', {'XDG_CACHE_HOME': ''})
+    def test_default_cache_dir_home(self, mock_expanduser):
+        """ Test default_cache_dir function.
+            Case: cache directory in the user home directory.
+        """
+        mock_expanduser.return_value = '/home/user'
+        self.assertEqual(cache.default_cache_dir(),
+                         '/home/user/.cache/apache-search')
+
+    def test_open_cache(self):
+        """ Test open_cache and keep_caches functions.
+            Case: inside keep_caches the same cache is opened again,
+                  with listings in memory; outside a new one every time.
+        """
+        with cache.keep_caches(memory_items=5) as caches:
+            listing_cache = cache.open_cache('/test/cache', max_size=10)
+            self.assertIs(cache.open_cache('/test/cache', max_size=10),
+                          listing_cache)
+            self.assertIsNot(cache.open_cache('/test/cache', max_size=20),
+                             listing_cache)
+            self.assertEqual(listing_cache._memory_items, 5)
+            self.assertEqual(len(caches), 2)
+
+        result = cache.open_cache('/test/cache', max_size=10)
+        self.assertIsNot(result, listing_cache)
+        self.assertEqual(result._memory_items, 0)
+
+    def test_dump_load_items(self):
+        """ Test dump_items and load_items functions."""
+        items = [
+            {'name': 'file.txt', 'datetime': datetime(2019, 3, 16, 11, 46)},
+            {'name': 'other.txt'}
+        ]
+        dumped_items = cache.dump_items(items)
+
+        self.assertEqual(dumped_items[0]['datetime'], '2019-03-16T11:46:00')
+        self.assertEqual(cache.load_items(dumped_items), items)
+
+    @mock.patch('tools.apache_search.src.entry.datetime')
+    def test_dump_items_entries(self, mock_datetime):
+        """ Test dump_items and load_items functions.
+            Case: entries dumped with their raw values, lazy values
+                  computed only after the load.
+        """
+        mock_datetime.strptime.side_effect = datetime.strptime
+        items = [
+            FileEntry(name='file.txt', base_url='https://test/url/',
+                      mtime='2019-03-16 11:46', size='1K'),
+            DirEntry(name='sub/', base_url='https://test/url/',
+                     mtime=datetime(2019, 3, 15, 10, 1)),
+        ]
+
+        dumped_items = cache.dump_items(items)
+
+        self.assertEqual(dumped_items, [
+            {'name': 'file.txt', 'base_url': 'https://test/url/',
+             'datetime': '2019-03-16 11:46', 'size': '1K'},
+            {'dir': 'sub/', 'base_url': 'https://test/url/',
+             'datetime': '2019-03-15T10:01:00'},
+        ])
+        mock_datetime.strptime.assert_not_called()
+        self.assertIsNone(items[0]._url)
+
+        loaded_items = cache.load_items(dumped_items)
+        self.assertEqual(loaded_items, [
+            {'name': 'file.txt', 'url': 'https://test/url/file.txt',
+             'datetime': datetime(2019, 3, 16, 11, 46), 'size': '1K'},
+            {'dir': 'sub/', 'url': 'https://test/url/sub/',
+             'datetime': datetime(2019, 3, 15, 10, 1)},
+        ])
+        self.assertEqual(loaded_items[0].size_bytes, 1024)
+
+    def test_load_items_no_name(self):
+        """ Test load_items function.
+            Case: record without name, stored by older versions, skipped.
+        """
+        dumped_items = [{'datetime': '2019-01-01T10:00:00', 'size': '5'},
+                        {'name': 'file.txt', 'url': 'https://test/file.txt'}]
+
+        self.assertEqual(cache.load_items(dumped_items), [
+            {'name': 'file.txt', 'url': 'https://test/file.txt'}
+        ])
@@ -0,0 +1,133 @@
+""" Test module for client module."""
+import io
+import json
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+from unittest import mock
+
+from tools.apache_search import client
+from tools.apache_search.src import ipc
+
+
+MODULE_PATH = 'tools.apache_search.client'
+IPC_PATH = 'tools.apache_search.src.ipc'
+
+
+class TestClient(unittest.TestCase):
+    """ Test suite for client module."""
+
+    @mock.patch(f'{MODULE_PATH}.sys')
+    def test_forward(self, mock_sys):
+        """ Test _forward function.
+            Case: request sent, output written as it comes, exit code
+                  of the command returned.
+        """
+        mock_sys.stdout = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+        mock_sys.stderr = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+        connection, daemon = socket.socketpair()
+        with connection, daemon:
+            ipc.send_frame(daemon, ipc.STDOUT, b'files\n')
+            ipc.send_frame(daemon, ipc.STDERR, b'stats\n')
+            ipc.send_frame(daemon, ipc.EXIT, b'3')
+
+            result = client._forward(connection, ['https://test/url', '-r'])
+            _, payload = ipc.recv_frame(daemon)
+
+        self.assertEqual(result, 3)
+        self.assertEqual(mock_sys.stdout.buffer.getvalue(), b'files\n')
+        self.assertEqual(mock_sys.stderr.buffer.getvalue(), b'stats\n')
+        request = json.loads(payload.decode('utf-8'))
+        self.assertEqual(request['args'], ['https://test/url', '-r'])
+        self.assertEqual(request['encoding'], 'utf-8')
+
+    @mock.patch(f'{MODULE_PATH}.sys')
+    def test_forward_closed(self, mock_sys):
+        """ Test _forward function.
+            Case: daemon closed the connection before the exit code.
+        """
+        mock_sys.stdout.encoding = 'utf-8'
+        mock_sys.stdout.errors = 'strict'
+        connection, daemon = socket.socketpair()
+        with connection:
+            daemon.close()
+            result = client._forward(connection, [])
+
+        self.assertEqual(result, 1)
+        mock_sys.stderr.write.assert_called_with(
+            '>> ERR >> Daemon closed the connection.\n'
+        )
+
+    @mock.patch('tools.apache_search.shell.run')
+    @mock.patch(f'{MODULE_PATH}._connect', return_value=None)
+    def test_run_without_daemon(self, mock_connect, mock_run):
+        """ Test run function.
+            Case: daemon not running, command run in this process.
+        """
+        client.run()
+
+        self.assertTrue(mock_connect.called)
+        self.assertTrue(mock_run.called)
+
+    @mock.patch('tools.apache_search.shell.run')
+    @mock.patch(f'{MODULE_PATH}._connect')
+    @mock.patch(f'{MODULE_PATH}.default_socket_path')
+    def test_run_not_private(self, mock_socket_path, mock_connect, mock_run):
+        """ Test run function.
+            Case: private socket directory taken by other user, command
+                  run in this process.
+        """
+        mock_socket_path.side_effect = PermissionError(
+            'Not a private directory of the current user: /tmp/test'
+        )
+
+        client.run()
+
+        self.assertFalse(mock_connect.called)
+        self.assertTrue(mock_run.called)
+
+    @mock.patch(f'{MODULE_PATH}.sys')
+    @mock.patch(f'{MODULE_PATH}._forward', return_value=2)
+    @mock.patch(f'{MODULE_PATH}._connect')
+    def test_run(self, mock_connect, mock_forward, mock_sys):
+        """ Test run function.
+            Case: command run by the daemon, its exit code used.
+        """
+        mock_sys.argv = ['apache-search-client', 'https://test/url']
+
+        client.run()
+
+        mock_forward.assert_called_with(mock_connect.return_value,
+                                        ['https://test/url'])
+        mock_sys.exit.assert_called_with(2)
+
+    def test_connect_no_daemon(self):
+        """ Test _connect function.
+            Case: nothing listens on the socket.
+        """
+        self.assertIsNone(client._connect('/not/existing/search.sock'))
+
+    def test_connect_not_user_socket(self):
+        """ Test _connect function.
+            Case: socket owned by other user, or not a socket, at the path.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        socket_path = os.path.join(tmp_dir, 'search.sock')
+        file_path = os.path.join(tmp_dir, 'search.txt')
+        open(file_path, 'w').close()
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(socket_path)
+            listener.listen(1)
+            connection = client._connect(socket_path)
+            self.assertIsNotNone(connection)
+            connection.close()
+
+            with mock.patch(f'{IPC_PATH}.os.getuid',
+                            return_value=os.getuid() + 1):
+                self.assertIsNone(client._connect(socket_path))
+        self.assertIsNone(client._connect(file_path))
@@ -0,0 +1,391 @@
+""" Test module for Crawler class."""
+import unittest
+from unittest import mock
+
+from datetime import datetime
+
+from tools.apache_search.src.crawler import Crawler
+from tools.apache_search.src.filters import CrawlFilter
+from tools.apache_search.src.snapshot import Snapshot
+
+
+MODULE_PATH = 'tools.apache_search.src.crawler'
+
+TEST_TREE = {
+    'https://test/url/': ['a/', 'b/'],
+    'https://test/url/a/': ['c/'],
+    'https://test/url/b/': [],
+    'https://test/url/a/c/': [],
+}
+
+FAILED_URLS = list()
+
+TEST_MTIME = datetime(2019, 3, 16, 11, 46)
+
+
+class FakePage:
+    """ Page replacement serving directories from TEST_TREE."""
+    created = list()
+
+    @classmethod
+    def from_listing(cls, url, files, subpages):
+        """ Create loaded page, without counting it as fetched."""
+        page = cls(url)
+        FakePage.created.remove(url)
+        page.files = files
+        page.subpages = subpages
+        return page
+    def __init__(self, url, session=None, listing_hints=None, cache=None,
+                 scheduler=None, timeout=None, retries=None, stats=None,
+                 parser_pool=None):
+        self.url = url
+        self.cache = cache
+        self.session = session
+        self.listing_hints = listing_hints
+        self.scheduler = scheduler
+        self.timeout = timeout
+        self.retries = retries
+        self.stats = stats
+        self.parser_pool = parser_pool
+        self.files = [{'url': f'{url}file.txt'}]
+        self.subpages = [{'url': f'{url}{name}', 'datetime': TEST_MTIME}
+                         for name in TEST_TREE[url]]
+        self.loaded = False
+        FakePage.created.append(url)
+
+    def load(self):
+        """ Mark page as loaded, or fail for the urls in FAILED_URLS."""
+        if self.url in FAILED_URLS:
+            raise ConnectionError(f'Can not connect to: {self.url}')
+        self.loaded = True
+        return self
+
+
+class TestCrawler(unittest.TestCase):
+    """ Test suite for Crawler class."""
+
+    def setUp(self):
+        """ Setup method for Crawler class tests."""
+        self.test_url = 'https://test/url/'
+        FakePage.created = list()
+
+    def test_init(self):
+        """ Init method test for Crawler class."""
+        crawler = Crawler(self.test_url, jobs=4)
+
+        self.assertEqual(crawler._url, self.test_url)
+        self.assertEqual(crawler._jobs, 4)
+        self.assertEqual(crawler._session, None)
+        self.assertEqual(crawler._cache, None)
+        self.assertEqual(crawler._snapshot, None)
+
+    def test_init_wrong_jobs(self):
+        """ Init method test for Crawler class.
+            Case: ValueError raised due to number of jobs lower than 1.
+        """
+        with self.assertRaises(ValueError):
+            Crawler(self.test_url, jobs=0)
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_serial(self, mock_create_session):
+        """ Test pages method.
+            Case: single job, pages yielded in the walk order.
+        """
+        crawler = Crawler(self.test_url)
+        pages = list(crawler.pages())
+
+        self.assertEqual(
+            [page.url for page in pages],
+            ['https://test/url/', 'https://test/url/b/',
+             'https://test/url/a/', 'https://test/url/a/c/']
+        )
+        self.assertTrue(all(page.loaded for page in pages))
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_order(self, mock_create_session):
+        """ Test pages method.
+            Case: breadth-first and depth-first walk, with the frontier
+                  spilled to disk above the memory limit.
+        """
+        walks = {
+            'bfs': ['https://test/url/', 'https://test/url/a/',
+                    'https://test/url/b/', 'https://test/url/a/c/'],
+            'dfs': ['https://test/url/', 'https://test/url/b/',
+                    'https://test/url/a/', 'https://test/url/a/c/'],
+        }
+        for order, urls in walks.items():
+            for max_memory in [None, 1]:
+                crawler = Crawler(self.test_url, order=order,
+                                  max_memory=max_memory)
+                self.assertEqual([page.url for page in crawler.pages()],
+                                 urls, (order, max_memory))
+
+        pages = list(Crawler(self.test_url, jobs=3, max_memory=1).pages())
+        self.assertEqual(sorted(page.url for page in pages), sorted(TEST_TREE))
+
+        with self.assertRaises(ValueError):
+            Crawler(self.test_url, order='random')
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_concurrent(self, mock_create_session):
+        """ Test pages method.
+            Case: many jobs, the same pages as for the single job,
+                  all of them sharing one session with pool sized to jobs.
+        """
+        crawler = Crawler(self.test_url, jobs=3)
+        pages = list(crawler.pages())
+
+        self.assertEqual(
+            sorted(page.url for page in pages), sorted(TEST_TREE)
+        )
+        self.assertTrue(all(page.loaded for page in pages))
+        mock_create_session.assert_called_once_with(pool_size=3)
+        self.assertTrue(all(page.session == mock_create_session()
+                            for page in pages))
+        self.assertTrue(mock_create_session().close.called)
+        self.assertTrue(all(page.scheduler is pages[0].scheduler
+                            for page in pages))
+        self.assertEqual(pages[0].scheduler._max_concurrency, 3)
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_stats(self, mock_create_session):
+        """ Test pages method.
+            Case: statistics shared by all pages.
+        """
+        stats = mock.MagicMock(name='stats')
+        crawler = Crawler(self.test_url, jobs=2, stats=stats)
+        pages = list(crawler.pages())
+
+        self.assertTrue(all(page.stats is stats for page in pages))
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_custom_session(self, mock_create_session):
+        """ Test pages method.
+            Case: session given by the caller is used and not closed.
+        """
+        mock_session = mock.MagicMock(name='mock_session')
+        mock_cache = mock.MagicMock(name='mock_cache')
+        crawler = Crawler(self.test_url, jobs=2, session=mock_session,
+                          cache=mock_cache)
+        pages = list(crawler.pages())
+
+        self.assertTrue(all(page.session == mock_session for page in pages))
+        self.assertTrue(all(page.cache == mock_cache for page in pages))
+        self.assertTrue(all(page.listing_hints is pages[0].listing_hints
+                            for page in pages))
+        self.assertFalse(mock_create_session.called)
+        self.assertFalse(mock_session.close.called)
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page')
+    def test_pages_concurrent_error(self, mock_page, mock_create_session):
+        """ Test pages method.
+            Case: exception raised by the worker is passed to the caller.
+        """
+        mock_page().load.side_effect = ConnectionError('test error')
+        crawler = Crawler(self.test_url, jobs=2)
+
+        with self.assertRaises(ConnectionError):
+            list(crawler.pages())
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_snapshot(self, mock_create_session):
+        """ Test pages method.
+            Case: snapshot of the previous crawl, unchanged subtree
+                  taken from it, and snapshot updated after the walk.
+        """
+        snapshot = Snapshot()
+        for jobs in [1, 3]:
+            FakePage.created = list()
+            snapshot.add('https://test/url/a/', TEST_MTIME,
+                         [{'url': 'https://test/url/a/old.txt'}], [])
+            snapshot.add('https://test/url/b/', datetime(2019, 1, 1),
+                         [{'url': 'https://test/url/b/old.txt'}], [])
+
+            crawler = Crawler(self.test_url, jobs=jobs, snapshot=snapshot)
+            pages = list(crawler.pages())
+
+            self.assertEqual(
+                sorted(FakePage.created),
+                ['https://test/url/', 'https://test/url/b/']
+            )
+            self.assertEqual(
+                sorted(file['url'] for page in pages for file in page.files),
+                ['https://test/url/a/old.txt', 'https://test/url/b/file.txt',
+                 'https://test/url/file.txt']
+            )
+            self.assertEqual(len(snapshot), 3)
+            self.assertEqual(snapshot.get('https://test/url/')['datetime'],
+                             None)
+            self.assertEqual(snapshot.get('https://test/url/b/')['datetime'],
+                             TEST_MTIME)
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_snapshot_subdirectories(self, mock_create_session):
+        """ Test pages method.
+            Case: unchanged directory with subdirectories fetched again,
+                  so the change below it is found; unchanged directory
+                  without subdirectories taken from the snapshot.
+        """
+        snapshot = Snapshot()
+        snapshot.add('https://test/url/a/', TEST_MTIME,
+                     [{'url': 'https://test/url/a/old.txt'}],
+                     [{'url': 'https://test/url/a/c/',
+                       'datetime': datetime(2019, 1, 1)}])
+        snapshot.add('https://test/url/a/c/', datetime(2019, 1, 1),
+                     [{'url': 'https://test/url/a/c/old.txt'}], [])
+        snapshot.add('https://test/url/b/', TEST_MTIME,
+                     [{'url': 'https://test/url/b/old.txt'}], [])
+
+        crawler = Crawler(self.test_url, snapshot=snapshot)
+        pages = list(crawler.pages())
+
+        self.assertEqual(
+            sorted(FakePage.created),
+            ['https://test/url/', 'https://test/url/a/',
+             'https://test/url/a/c/']
+        )
+        self.assertEqual(
+            sorted(file['url'] for page in pages for file in page.files),
+            ['https://test/url/a/c/file.txt', 'https://test/url/a/file.txt',
+             'https://test/url/b/old.txt', 'https://test/url/file.txt']
+        )
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_snapshot_interrupted(self, mock_create_session):
+        """ Test pages method.
+            Case: walk not completed, snapshot is not changed.
+        """
+        snapshot = Snapshot()
+        snapshot.add('https://test/url/old/', None, [], [])
+
+        crawler = Crawler(self.test_url, snapshot=snapshot)
+        pages = crawler.pages()
+        next(pages)
+        pages.close()
+
+        self.assertEqual(len(snapshot), 1)
+        self.assertIsNotNone(snapshot.get('https://test/url/old/'))
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_filter(self, mock_create_session):
+        """ Test pages method.
+            Case: subtrees rejected by the crawl filter are not fetched.
+        """
+        for jobs in [1, 3]:
+            FakePage.created = list()
+            crawl_filter = CrawlFilter(exclude_dirs=['c'])
+            crawler = Crawler(self.test_url, jobs=jobs,
+                              crawl_filter=crawl_filter)
+            pages = list(crawler.pages())
+
+            self.assertEqual(
+                sorted(page.url for page in pages),
+                ['https://test/url/', 'https://test/url/a/',
+                 'https://test/url/b/']
+            )
+            self.assertEqual(len(FakePage.created), 3)
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_visited(self, mock_create_session):
+        """ Test pages method.
+            Case: directories visited by the crawler of the nested root
+                  walked through without fetching, with their listings.
+        """
+        for jobs in [1, 3]:
+            FakePage.created = list()
+            visited = dict()
+            list(Crawler('https://test/url/a/', jobs=jobs,
+                         visited=visited).pages())
+            self.assertEqual(sorted(visited),
+                             ['https://test/url/a/', 'https://test/url/a/c/'])
+
+            FakePage.created = list()
+            pages = list(Crawler(self.test_url, jobs=jobs,
+                                 visited=visited).pages())
+
+            self.assertEqual(sorted(page.url for page in pages),
+                             sorted(TEST_TREE))
+            self.assertEqual(sorted(FakePage.created),
+                             ['https://test/url/', 'https://test/url/b/'])
+            self.assertEqual(
+                sorted(page.url for page in pages if page.files),
+                sorted(TEST_TREE)
+            )
+            self.assertEqual(len(visited), 4)
+
+    @mock.patch.dict(TEST_TREE, {
+        'https://test/url/b/': ['./', '%2E%2E/a//', 'link/'],
+        'https://test/url/b/link/': ['a/', 'b/'],
+    })
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_aliases(self, mock_create_session):
+        """ Test pages method.
+            Case: differently spelled URLs of walked directories skipped,
+                  link to the root with the same listing recognised
+                  as its alias and not walked.
+        """
+        for jobs in [1, 3]:
+            FakePage.created = list()
+            crawler = Crawler('HTTPS://test//url/./', jobs=jobs,
+                              detect_aliases=True)
+            pages = list(crawler.pages())
+
+            self.assertEqual(sorted(page.url for page in pages), [
+                'https://test/url/', 'https://test/url/a/',
+                'https://test/url/a/c/', 'https://test/url/b/'
+            ])
+            self.assertEqual(crawler.aliases, [
+                ('https://test/url/b/link/', 'https://test/url/')
+            ])
+            self.assertEqual(len(FakePage.created), 5)
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_keep_going(self, mock_create_session):
+        """ Test pages method.
+            Case: failed directory recorded, walk goes on without its
+                  subtree, snapshot not updated.
+        """
+        for jobs in [1, 3]:
+            FAILED_URLS.append('https://test/url/a/')
+            snapshot = Snapshot()
+            crawler = Crawler(self.test_url, jobs=jobs, snapshot=snapshot,
+                              keep_going=True, timeout=5, retries=1)
+            try:
+                pages = list(crawler.pages())
+            finally:
+                FAILED_URLS.clear()
+
+            self.assertEqual(sorted(page.url for page in pages),
+                             ['https://test/url/', 'https://test/url/b/'])
+            self.assertEqual(crawler.failures, [(
+                'https://test/url/a/',
+                'Can not connect to: https://test/url/a/'
+            )])
+            self.assertEqual((pages[0].timeout, pages[0].retries), (5, 1))
+            self.assertEqual(len(snapshot), 0)
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.Page', FakePage)
+    def test_pages_failure(self, mock_create_session):
+        """ Test pages method.
+            Case: failed directory stops the walk, if not keep going.
+        """
+        FAILED_URLS.append('https://test/url/b/')
+        try:
+            with self.assertRaises(ConnectionError):
+                list(Crawler(self.test_url).pages())
+        finally:
+            FAILED_URLS.clear()
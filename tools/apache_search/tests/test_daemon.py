@@ -0,0 +1,184 @@
+""" Test module for daemon module."""
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from unittest import mock
+
+import click
+
+from tools.apache_search.src import ipc
+from tools.apache_search.src.cache import open_cache
+from tools.apache_search.src.daemon import Daemon
+from tools.apache_search.src.session import kept_session
+
+
+@click.command()
+@click.option('--code', type=int, default=0)
+@click.option('--fail', is_flag=True, default=False)
+@click.argument('words', nargs=-1)
+def echo_command(code, fail, words):
+    """ Command echoing its arguments and the working directory."""
+    if fail:
+        raise RuntimeError('test error')
+    click.echo(' '.join(words))
+    click.echo(os.getcwd(), err=True)
+    click.echo(type(kept_session()).__name__)
+    click.echo(type(open_cache('cache')).__name__)
+    click.get_current_context().exit(code)
+
+
+class TestDaemon(unittest.TestCase):
+    """ Test suite for Daemon class."""
+
+    def setUp(self):
+        """ Setup method for Daemon class tests."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tmp_dir, 'search.sock')
+        self.daemon = Daemon(echo_command, self.socket_path)
+
+    def tearDown(self):
+        """ Teardown method for Daemon class tests."""
+        shutil.rmtree(self.tmp_dir)
+
+    def _request(self, connection, request):
+        """ Send the request, and receive the answer until the exit code.
+
+            Args:
+                connection(socket.socket): socket connected to the daemon
+                request(dict): request sent to the daemon
+
+            Returns:
+                answer(dict): joined payloads, by the frame kind
+        """
+        ipc.send_frame(connection, ipc.REQUEST,
+                       json.dumps(request).encode('utf-8'))
+        answer = {ipc.STDOUT: b'', ipc.STDERR: b'', ipc.EXIT: b''}
+        while True:
+            kind, payload = ipc.recv_frame(connection)
+            answer[kind] += payload
+            if kind == ipc.EXIT:
+                return answer
+
+    def _handle(self, request):
+        """ Handle the request sent over the socket pair.
+
+            Args:
+                request(dict): request sent to the daemon
+
+            Returns:
+                answer(dict): joined payloads, by the frame kind
+        """
+        client, connection = socket.socketpair()
+        with client, connection:
+            handler = threading.Thread(target=self.daemon.handle,
+                                       args=(connection,))
+            handler.start()
+            answer = self._request(client, request)
+            handler.join()
+        return answer
+
+    def test_handle(self):
+        """ Test handle method.
+            Case: command output and exit code sent back, run in the
+                  working directory of the client.
+        """
+        cwd = os.getcwd()
+        answer = self._handle({'args': ['--code', '3', 'a', 'b'],
+                               'cwd': self.tmp_dir, 'encoding': 'utf-8',
+                               'errors': 'strict'})
+
+        self.assertEqual(answer[ipc.STDOUT],
+                         b'a b\nNoneType\nListingCache\n')
+        self.assertEqual(answer[ipc.STDERR].decode().strip(),
+                         os.path.realpath(self.tmp_dir))
+        self.assertEqual(answer[ipc.EXIT], b'3')
+        self.assertEqual(os.getcwd(), cwd)
+
+    def test_handle_errors(self):
+        """ Test handle method.
+            Case: usage error, command exception, and invalid request.
+        """
+        answer = self._handle({'args': ['--bogus'], 'cwd': self.tmp_dir})
+        self.assertIn(b'no such option: --bogus', answer[ipc.STDERR])
+        self.assertEqual(answer[ipc.EXIT], b'2')
+
+        answer = self._handle({'args': ['--fail'], 'cwd': self.tmp_dir})
+        self.assertEqual(answer[ipc.STDOUT],
+                         b'>> ERR >> RuntimeError: test error\n')
+        self.assertEqual(answer[ipc.EXIT], b'0')
+
+        answer = self._handle({'cwd': self.tmp_dir})
+        self.assertIn(b'Invalid request', answer[ipc.STDERR])
+        self.assertEqual(answer[ipc.EXIT], b'2')
+
+        answer = self._handle({'args': [], 'cwd': '/not/existing/dir'})
+        self.assertIn(b'Can not use the working directory',
+                      answer[ipc.STDERR])
+        self.assertEqual(answer[ipc.EXIT], b'1')
+
+    def test_serve(self):
+        """ Test serve and stop methods.
+            Case: commands served one after another with the sessions
+                  and caches kept, socket removed after the stop.
+        """
+        self.daemon.listen()
+        server = threading.Thread(target=self.daemon.serve)
+        server.start()
+        try:
+            for _ in range(2):
+                with socket.socket(socket.AF_UNIX,
+                                   socket.SOCK_STREAM) as client:
+                    client.connect(self.socket_path)
+                    answer = self._request(
+                        client, {'args': ['x'], 'cwd': self.tmp_dir}
+                    )
+                self.assertEqual(answer[ipc.STDOUT],
+                                 b'x\nKeptSession\nListingCache\n')
+                self.assertEqual(answer[ipc.EXIT], b'0')
+            self.assertEqual(os.stat(self.socket_path).st_mode & 0o777,
+                             0o600)
+        finally:
+            self.daemon.stop()
+            server.join()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_listen(self):
+        """ Test listen method.
+            Case: socket left by the stopped daemon replaced, socket
+                  of the running daemon kept.
+        """
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.socket_path)
+        stale.close()
+
+        self.daemon.listen()
+        try:
+            with self.assertRaises(FileExistsError):
+                Daemon(echo_command, self.socket_path).listen()
+        finally:
+            self.daemon._listener.close()
+
+    def test_listen_not_user_socket(self):
+        """ Test listen method.
+            Case: file, or socket of other user, at the path not replaced.
+        """
+        open(self.socket_path, 'w').close()
+        with self.assertRaises(PermissionError):
+            self.daemon.listen()
+        self.assertTrue(os.path.isfile(self.socket_path))
+
+        os.remove(self.socket_path)
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.socket_path)
+        stale.close()
+        with mock.patch('tools.apache_search.src.ipc.os.getuid',
+                        return_value=os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                self.daemon.listen()
+        self.assertTrue(os.path.exists(self.socket_path))
+        self.assertIsNone(self.daemon._listener)
@@ -0,0 +1,97 @@
+""" Test module for daemon command module."""
+import unittest
+
+from unittest import mock
+from click.testing import CliRunner
+
+from tools.apache_search.src.cli import daemon
+from tools.apache_search.src.cli import main
+from tools.apache_search.src.daemon import Daemon
+
+MODULE_PATH = 'tools.apache_search.src.cli.daemon'
+
+
+class TestDaemonCommand(unittest.TestCase):
+    """ Test suite for daemon command module."""
+
+    def setUp(self):
+        """ Setup method for TestDaemonCommand test suite."""
+        self.runner = CliRunner(mix_stderr=False)
+
+    @mock.patch(f'{MODULE_PATH}.signal')
+    @mock.patch.object(Daemon, 'serve', autospec=True)
+    @mock.patch.object(Daemon, 'listen')
+    def test_daemon(self, mock_listen, mock_serve, mock_signal):
+        """ Test daemon command function.
+            Case: daemon serving the main command group on the socket.
+            Command: apache-search daemon --socket <path>
+        """
+        mock_serve.side_effect = KeyboardInterrupt
+
+        result = self.runner.invoke(
+            main.main, ['daemon', '--socket', '/test/search.sock',
+                        '--memory-listings', '50']
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('Listening on: /test/search.sock', result.stderr)
+        self.assertTrue(mock_listen.called)
+        server = mock_serve.call_args[0][0]
+        self.assertIs(server._command, main.main)
+        self.assertEqual(server._socket_path, '/test/search.sock')
+        self.assertEqual(server._memory_items, 50)
+        mock_signal.signal.assert_called_with(mock_signal.SIGTERM,
+                                              mock.ANY)
+
+    @mock.patch(f'{MODULE_PATH}.default_socket_path',
+                return_value='/test/search.sock')
+    @mock.patch.object(Daemon, 'serve')
+    @mock.patch.object(Daemon, 'listen')
+    def test_daemon_already_running(self, mock_listen, mock_serve, _):
+        """ Test daemon command function.
+            Case: another daemon listens on the socket.
+            Command: apache-search daemon
+        """
+        mock_listen.side_effect = FileExistsError(
+            'Daemon is already listening on: /test/search.sock'
+        )
+
+        result = self.runner.invoke(daemon.daemon, [])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('already listening', result.stderr)
+        self.assertFalse(mock_serve.called)
+
+    @mock.patch(f'{MODULE_PATH}.default_socket_path')
+    @mock.patch.object(Daemon, 'serve')
+    @mock.patch.object(Daemon, 'listen')
+    def test_daemon_not_private(self, mock_listen, mock_serve,
+                                mock_socket_path):
+        """ Test daemon command function.
+            Case: private socket directory taken by other user.
+            Command: apache-search daemon
+        """
+        mock_socket_path.side_effect = PermissionError(
+            'Not a private directory of the current user: /tmp/test'
+        )
+
+        result = self.runner.invoke(daemon.daemon, [])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('Not a private directory', result.stderr)
+        self.assertFalse(mock_listen.called)
+        self.assertFalse(mock_serve.called)
+
+    @mock.patch.object(Daemon, 'listen')
+    def test_daemon_through_client(self, mock_listen):
+        """ Test daemon command function.
+            Case: daemon command sent to the running daemon.
+            Command: apache-search-client daemon
+        """
+        result = self.runner.invoke(daemon.daemon, [],
+                                    obj=Daemon(main.main, '/test/sock'))
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('can not be started through the client',
+                      result.stderr)
+        self.assertFalse(mock_listen.called)
@@ -0,0 +1,290 @@
+""" Test module for download module."""
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from socketserver import ThreadingMixIn
+from unittest import mock
+
+from tools.apache_search.src.download import DOWNLOADED
+from tools.apache_search.src.download import Downloader
+from tools.apache_search.src.download import FAILED
+from tools.apache_search.src.download import UP_TO_DATE
+from tools.apache_search.src.download import listing_timestamp
+from tools.apache_search.src.download import local_path
+from tools.apache_search.src.page import parse_listing
+
+
+MODULE_PATH = 'tools.apache_search.src.download'
+
+TEST_FILES = {
+    '/pub/big.bin': bytes(range(256)) * 40 + b'tail',
+    '/pub/sub/small.txt': b'small file\n',
+}
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """ Request handler serving TEST_FILES, with byte ranges."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        """ Send the file headers."""
+        self._send(body=False)
+
+    def do_GET(self):
+        """ Send the file, or its range."""
+        self._send(body=True)
+
+    def _send(self, body):
+        """ Send the response, for the range if requested and If-Range
+            matches the file ETag.
+        """
+        server = self.server
+        server.requests.append((self.command, self.path,
+                                self.headers.get('Range')))
+        data = server.files.get(self.path)
+        if data is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        etag = '"{}"'.format(hashlib.md5(data).hexdigest())
+        start, end = 0, len(data)
+        range_header = self.headers.get('Range')
+        if range_header and server.ranges \
+                and self.headers.get('If-Range', etag) == etag:
+            start, stop = re.match(r'bytes=(\d+)-(\d*)',
+                                   range_header).groups()
+            start = int(start)
+            end = int(stop) + 1 if stop else len(data)
+            self.send_response(206)
+            self.send_header('Content-Range',
+                             f'bytes {start}-{end - 1}/{len(data)}')
+        else:
+            self.send_response(200)
+        if server.ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(end - start))
+        self.end_headers()
+        if body:
+            self.wfile.write(data[start:end])
+
+    def log_message(self, *args):
+        """ Do not log the requests."""
+
+
+class _RangeServer(ThreadingMixIn, HTTPServer):
+    """ HTTP server recording the requests."""
+    daemon_threads = True
+
+
+class TestDownloader(unittest.TestCase):
+    """ Test suite for Downloader class."""
+
+    def setUp(self):
+        """ Setup method for Downloader class tests."""
+        self.server = _RangeServer(('127.0.0.1', 0), _RangeHandler)
+        self.server.files = dict(TEST_FILES)
+        self.server.ranges = True
+        self.server.requests = list()
+        threading.Thread(target=self.server.serve_forever,
+                         kwargs={'poll_interval': 0.05}, daemon=True).start()
+        self.root_url = 'http://127.0.0.1:{}/pub/'.format(
+            self.server.server_address[1]
+        )
+        self.directory = tempfile.mkdtemp()
+        patcher = mock.patch(f'{MODULE_PATH}.MIN_SEGMENT_SIZE', 1024)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """ Teardown method for Downloader class tests."""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def _read(self, name):
+        """ Read the downloaded file."""
+        with open(os.path.join(self.directory, name), 'rb') as local_file:
+            return local_file.read()
+
+    def test_download_all(self):
+        """ Test download_all method.
+            Case: big file in segments, small file with single request,
+                  both skipped by the next download.
+        """
+        items = [
+            {'url': f'{self.root_url}big.bin',
+             'datetime': datetime(2019, 3, 16, 11, 46)},
+            {'url': f'{self.root_url}sub/small.txt'},
+        ]
+        with Downloader(self.directory, self.root_url, jobs=2,
+                        segments=4) as downloader:
+            results = list(downloader.download_all(items))
+            self.assertEqual(sorted(result.status for result in results),
+                             [DOWNLOADED, DOWNLOADED])
+            self.assertEqual(self._read('big.bin'),
+                             TEST_FILES['/pub/big.bin'])
+            self.assertEqual(self._read(os.path.join('sub', 'small.txt')),
+                             TEST_FILES['/pub/sub/small.txt'])
+            self.assertEqual(
+                os.path.getmtime(os.path.join(self.directory, 'big.bin')),
+                listing_timestamp(datetime(2019, 3, 16, 11, 46))
+            )
+            self.assertEqual(sorted(os.listdir(self.directory)),
+                             ['big.bin', 'sub'])
+
+            ranges = sorted(request[2] for request in self.server.requests
+                            if request[:2] == ('GET', '/pub/big.bin'))
+            self.assertEqual(ranges, ['bytes=0-2560', 'bytes=2561-5121',
+                                      'bytes=5122-7682', 'bytes=7683-10243'])
+
+            self.server.requests = list()
+            results = list(downloader.download_all(items))
+            self.assertEqual([result.status for result in results],
+                             [UP_TO_DATE, UP_TO_DATE])
+            self.assertEqual({request[0] for request in self.server.requests},
+                             {'HEAD'})
+
+    def test_download_resume(self):
+        """ Test download method.
+            Case: interrupted segmented download resumed from the state.
+        """
+        data = TEST_FILES['/pub/big.bin']
+        path = os.path.join(self.directory, 'big.bin')
+        with open(f'{path}.part', 'wb') as part_file:
+            part_file.write(data[:3000])
+            part_file.truncate(len(data))
+        with open(f'{path}.part.json', 'w') as state_file:
+            json.dump({
+                'size': len(data),
+                'validator': '"{}"'.format(hashlib.md5(data).hexdigest()),
+                'segments': [[3000, 5122], [5122, 5122], [9000, 10244]]
+            }, state_file)
+        with open(f'{path}.part', 'r+b') as part_file:
+            part_file.seek(5122)
+            part_file.write(data[5122:9000])
+
+        with Downloader(self.directory, self.root_url) as downloader:
+            result = downloader.download({'url': f'{self.root_url}big.bin'})
+
+        self.assertEqual(result.status, DOWNLOADED)
+        self.assertEqual(self._read('big.bin'), data)
+        self.assertEqual(sorted(request[2] for request in self.server.requests
+                                if request[0] == 'GET'),
+                         ['bytes=3000-5121', 'bytes=9000-10243'])
+        self.assertEqual(os.listdir(self.directory), ['big.bin'])
+
+    def test_download_state_changed(self):
+        """ Test download method.
+            Case: file changed since the saved state, downloaded again.
+        """
+        path = os.path.join(self.directory, 'big.bin')
+        with open(f'{path}.part', 'wb') as part_file:
+            part_file.write(b'old')
+        with open(f'{path}.part.json', 'w') as state_file:
+            json.dump({'size': 3, 'validator': '"old"',
+                       'segments': [[3, 3]]}, state_file)
+
+        with Downloader(self.directory, self.root_url) as downloader:
+            result = downloader.download({'url': f'{self.root_url}big.bin'})
+
+        self.assertEqual(result.status, DOWNLOADED)
+        self.assertEqual(self._read('big.bin'), TEST_FILES['/pub/big.bin'])
+
+    def test_download_no_ranges(self):
+        """ Test download method.
+            Case: server without ranges, file downloaded in one request.
+        """
+        self.server.ranges = False
+
+        with Downloader(self.directory, self.root_url) as downloader:
+            result = downloader.download({'url': f'{self.root_url}big.bin'})
+
+        self.assertEqual(result.status, DOWNLOADED)
+        self.assertEqual(result.size, len(TEST_FILES['/pub/big.bin']))
+        self.assertEqual(self._read('big.bin'), TEST_FILES['/pub/big.bin'])
+        self.assertEqual(self.server.requests[1:],
+                         [('GET', '/pub/big.bin', None)])
+
+    def test_download_failed(self):
+        """ Test download method.
+            Case: file not found, reported in the result.
+        """
+        with Downloader(self.directory, self.root_url) as downloader:
+            result = downloader.download(
+                {'url': f'{self.root_url}missing.txt'}
+            )
+
+        self.assertEqual(result.status, FAILED)
+        self.assertIn('Status code: 404', result.error)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_download_all_listing_without_name(self):
+        """ Test download_all method.
+            Case: files of the listing with a name not recognised,
+                  e.g. with spaces; other files downloaded.
+        """
+        listing = json.dumps([
+            {'name': 'small.txt', 'type': 'file', 'size': 11,
+             'mtime': 'Sat, 16 Mar 2019 11:46:00 GMT'},
+            {'name': 'my file.txt', 'type': 'file', 'size': 5,
+             'mtime': 'Sat, 16 Mar 2019 11:46:00 GMT'},
+        ])
+        files, _ = parse_listing(f'{self.root_url}sub/', 'application/json',
+                                 listing)
+
+        with Downloader(self.directory, self.root_url) as downloader:
+            results = list(downloader.download_all(files))
+
+        self.assertEqual([result.status for result in results], [DOWNLOADED])
+        self.assertEqual(self._read(os.path.join('sub', 'small.txt')),
+                         TEST_FILES['/pub/sub/small.txt'])
+
+    def test_init_wrong_jobs(self):
+        """ Test Downloader constructor.
+            Case: jobs lower than 1.
+        """
+        with self.assertRaises(ValueError):
+            Downloader(self.directory, self.root_url, jobs=0)
+
+
+class TestLocalPath(unittest.TestCase):
+    """ Test suite for local_path function."""
+
+    def test_local_path(self):
+        """ Test local_path function."""
+        root_url = 'https://test/pub/'
+
+        self.assertEqual(
+            local_path('https://test/pub/a/file%201.txt', root_url, 'dir'),
+            os.path.join('dir', 'a', 'file 1.txt')
+        )
+        self.assertEqual(
+            local_path('https://test/pub/file.txt', 'https://test/pub',
+                       'dir'),
+            os.path.join('dir', 'file.txt')
+        )
+        self.assertEqual(
+            local_path('https://other/file.txt', root_url, 'dir'),
+            os.path.join('dir', 'file.txt')
+        )
+
+    def test_local_path_negative(self):
+        """ Test local_path function.
+            Case: paths outside the directory, or without file name.
+        """
+        for url in ('https://test/pub/../etc/passwd',
+                    'https://test/pub/a/%2E%2E/b', 'https://test/pub/'):
+            with self.assertRaises(ValueError):
+                local_path(url, 'https://test/pub/', 'dir')
@@ -0,0 +1,130 @@
+""" Test module for entry module."""
+import pickle
+import unittest
+
+from datetime import datetime
+from unittest import mock
+
+from tools.apache_search.src import entry
+from tools.apache_search.src.entry import DirEntry
+from tools.apache_search.src.entry import FileEntry
+
+
+MODULE_PATH = 'tools.apache_search.src.entry'
+
+
+class TestEntry(unittest.TestCase):
+    """ Test suite for FileEntry and DirEntry classes."""
+
+    def setUp(self):
+        """ Setup method for entry classes tests."""
+        self.base_url = 'https://test/url/'
+        self.file_entry = FileEntry(name='file.txt', base_url=self.base_url,
+                                    mtime='2019-03-16 11:46', size='1.5M')
+        self.dir_entry = DirEntry(name='sub/', base_url=self.base_url,
+                                  mtime='2019-03-15 10:01')
+
+    def test_mapping(self):
+        """ Test mapping interface of the entries."""
+        self.assertEqual(self.file_entry, {
+            'name': 'file.txt', 'url': 'https://test/url/file.txt',
+            'datetime': datetime(2019, 3, 16, 11, 46), 'size': '1.5M'
+        })
+        self.assertEqual(dict(self.dir_entry), {
+            'dir': 'sub/', 'url': 'https://test/url/sub/',
+            'datetime': datetime(2019, 3, 15, 10, 1)
+        })
+        self.assertNotIn('size', self.dir_entry)
+        self.assertIsNone(self.dir_entry.get('name'))
+        with self.assertRaises(KeyError):
+            self.file_entry['dir']
+
+    def test_missing_values(self):
+        """ Test mapping interface of the entries.
+            Case: values not found in the listing have no keys.
+        """
+        file_entry = FileEntry(size='120')
+
+        self.assertEqual(dict(file_entry), {'size': '120'})
+        self.assertEqual(len(file_entry), 1)
+        self.assertFalse(FileEntry())
+
+    @mock.patch(f'{MODULE_PATH}.datetime')
+    def test_lazy_datetime(self, mock_datetime):
+        """ Test datetime property.
+            Case: datetime parsed only on the first access.
+        """
+        self.assertEqual(self.file_entry['name'], 'file.txt')
+        mock_datetime.strptime.assert_not_called()
+
+        self.file_entry['datetime']
+        self.file_entry['datetime']
+        mock_datetime.strptime.assert_called_once_with('2019-03-16 11:46',
+                                                       '%Y-%m-%d %H:%M')
+
+    def test_size_bytes(self):
+        """ Test size_bytes property."""
+        self.assertEqual(self.file_entry.size_bytes, 1572864)
+        self.assertEqual(FileEntry(size='512').size_bytes, 512)
+        self.assertIsNone(FileEntry().size_bytes)
+
+    @mock.patch(f'{MODULE_PATH}.parse_size', return_value=1572864)
+    def test_size_bytes_cached(self, mock_parse_size):
+        """ Test size_bytes property.
+            Case: size converted only on the first access.
+        """
+        self.assertEqual(self.file_entry.size_bytes, 1572864)
+        self.assertEqual(self.file_entry.size_bytes, 1572864)
+        mock_parse_size.assert_called_once_with('1.5M')
+
+    @mock.patch(f'{MODULE_PATH}.datetime')
+    def test_raw_values(self, mock_datetime):
+        """ Test raw_values method.
+            Case: lazy values not computed.
+        """
+        self.assertEqual(self.file_entry.raw_values(), {
+            'name': 'file.txt', 'base_url': self.base_url,
+            'datetime': '2019-03-16 11:46', 'size': '1.5M'
+        })
+        self.assertIsNone(self.file_entry._url)
+        mock_datetime.strptime.assert_not_called()
+
+        self.assertEqual(FileEntry(size='120').raw_values(), {'size': '120'})
+
+    def test_no_instance_dict(self):
+        """ Test entries are kept without per-instance dictionary."""
+        self.assertFalse(hasattr(self.file_entry, '__dict__'))
+        self.assertFalse(hasattr(self.dir_entry, '__dict__'))
+
+    def test_pickle(self):
+        """ Test entries pickling."""
+        result = pickle.loads(pickle.dumps(self.file_entry))
+
+        self.assertIsInstance(result, FileEntry)
+        self.assertEqual(result, self.file_entry)
+
+
+class TestEntryFunctions(unittest.TestCase):
+    """ Test suite for entry module functions."""
+
+    def test_make_entry(self):
+        """ Test make_entry function."""
+        mtime = datetime(2019, 3, 16, 11, 46)
+        file_entry = entry.make_entry({'name': 'a.txt', 'url': 'https://a.txt',
+                                       'datetime': mtime, 'size': '1K'})
+        dir_entry = entry.make_entry({'dir': 'b/', 'url': 'https://b/'})
+
+        self.assertIsInstance(file_entry, FileEntry)
+        self.assertEqual(file_entry.size_bytes, 1024)
+        self.assertEqual(file_entry['datetime'], mtime)
+        self.assertIsInstance(dir_entry, DirEntry)
+        self.assertEqual(dir_entry, {'dir': 'b/', 'url': 'https://b/'})
+
+    def test_parse_size(self):
+        """ Test parse_size function."""
+        self.assertEqual(entry.parse_size('120'), 120)
+        self.assertEqual(entry.parse_size('4.0K'), 4096)
+        self.assertEqual(entry.parse_size('2M'), 2 * 1024 ** 2)
+        self.assertEqual(entry.parse_size('2.5G'), int(2.5 * 1024 ** 3))
+        self.assertIsNone(entry.parse_size('-'))
+        self.assertIsNone(entry.parse_size(None))
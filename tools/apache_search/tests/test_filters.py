@@ -0,0 +1,134 @@
+""" Test module for filters module."""
+import re
+import unittest
+
+from datetime import datetime
+
+from tools.apache_search.src import filters
+from tools.apache_search.src.entry import FileEntry
+from tools.apache_search.src.filters import CrawlFilter
+
+
+class TestCrawlFilter(unittest.TestCase):
+    """ Test suite for CrawlFilter class."""
+
+    def setUp(self):
+        """ Setup method for CrawlFilter class tests."""
+        self.file_entry = FileEntry(name='release-1.0.tar.gz',
+                                    base_url='https://test/url/',
+                                    mtime='2019-03-16 11:46', size='2.5M')
+
+    def test_match_file_no_filters(self):
+        """ Test match_file method.
+            Case: no filters, every file matches.
+        """
+        self.assertTrue(CrawlFilter().match_file(self.file_entry))
+        self.assertTrue(CrawlFilter().match_file(FileEntry()))
+
+    def test_match_file_name(self):
+        """ Test match_file method.
+            Case: name glob patterns and regex.
+        """
+        self.assertTrue(CrawlFilter(names=['*.zip', '*.tar.gz'])
+                        .match_file(self.file_entry))
+        self.assertFalse(CrawlFilter(names=['*.zip'])
+                         .match_file(self.file_entry))
+        self.assertTrue(CrawlFilter(regex=r'-\d+\.\d+')
+                        .match_file(self.file_entry))
+        self.assertFalse(CrawlFilter(regex=r'^\d')
+                         .match_file(self.file_entry))
+        self.assertFalse(CrawlFilter(names=['*']).match_file(FileEntry()))
+
+    def test_match_file_newer_than(self):
+        """ Test match_file method.
+            Case: last modification date filter.
+        """
+        self.assertTrue(CrawlFilter(newer_than=datetime(2019, 3, 1))
+                        .match_file(self.file_entry))
+        self.assertFalse(CrawlFilter(newer_than=datetime(2019, 4, 1))
+                         .match_file(self.file_entry))
+        self.assertFalse(CrawlFilter(newer_than=datetime(2019, 3, 1))
+                         .match_file(FileEntry(name='a.txt')))
+
+    def test_match_file_size(self):
+        """ Test match_file method.
+            Case: minimum and maximum size filters.
+        """
+        self.assertTrue(CrawlFilter(min_size=1024, max_size=3 * 1024 ** 2)
+                        .match_file(self.file_entry))
+        self.assertFalse(CrawlFilter(min_size=3 * 1024 ** 2)
+                         .match_file(self.file_entry))
+        self.assertFalse(CrawlFilter(max_size=1024)
+                         .match_file(self.file_entry))
+        self.assertFalse(CrawlFilter(min_size=1)
+                         .match_file({'name': 'a.txt'}))
+
+    def test_wrong_regex(self):
+        """ Test constructor.
+            Case: regex not valid.
+        """
+        with self.assertRaises(re.error):
+            CrawlFilter(regex='(')
+
+    def test_follow_dir_max_depth(self):
+        """ Test follow_dir method.
+            Case: maximum depth.
+        """
+        crawl_filter = CrawlFilter(max_depth=1)
+
+        self.assertTrue(crawl_filter.follow_dir('a'))
+        self.assertFalse(crawl_filter.follow_dir('a/b'))
+        self.assertFalse(CrawlFilter(max_depth=0).follow_dir('a'))
+
+    def test_follow_dir_exclude(self):
+        """ Test follow_dir method.
+            Case: excluded directory names and paths.
+        """
+        crawl_filter = CrawlFilter(exclude_dirs=['old', 'archive*/', 'a/b'])
+
+        self.assertTrue(crawl_filter.follow_dir('a'))
+        self.assertTrue(crawl_filter.follow_dir('c/b'))
+        self.assertFalse(crawl_filter.follow_dir('a/b'))
+        self.assertFalse(crawl_filter.follow_dir('c/old'))
+        self.assertFalse(crawl_filter.follow_dir('archive-2019'))
+
+    def test_follow_dir_include(self):
+        """ Test follow_dir and match_dir methods.
+            Case: included paths, walked with their parents.
+        """
+        crawl_filter = CrawlFilter(include_dirs=['releases/*'])
+
+        self.assertTrue(crawl_filter.follow_dir('releases'))
+        self.assertTrue(crawl_filter.follow_dir('releases/1.0'))
+        self.assertTrue(crawl_filter.follow_dir('releases/1.0/bin'))
+        self.assertFalse(crawl_filter.follow_dir('nightly'))
+
+        self.assertFalse(crawl_filter.match_dir(''))
+        self.assertFalse(crawl_filter.match_dir('releases'))
+        self.assertTrue(crawl_filter.match_dir('releases/1.0/bin'))
+
+    def test_follow_dir_include_name(self):
+        """ Test follow_dir and match_dir methods.
+            Case: included directory names, matching at any depth.
+        """
+        crawl_filter = CrawlFilter(include_dirs=['bin'])
+
+        self.assertTrue(crawl_filter.follow_dir('a/b'))
+        self.assertFalse(crawl_filter.match_dir('a/b'))
+        self.assertTrue(crawl_filter.match_dir('a/bin/x'))
+        self.assertTrue(CrawlFilter().match_dir(''))
+
+
+class TestFiltersFunctions(unittest.TestCase):
+    """ Test suite for filters module functions."""
+
+    def test_relative_path(self):
+        """ Test relative_path function."""
+        self.assertEqual(
+            filters.relative_path('https://test/url/a/b/', 'https://test/url'),
+            'a/b'
+        )
+        self.assertEqual(
+            filters.relative_path('https://test/url/', 'https://test/url/'),
+            ''
+        )
@@ -0,0 +1,85 @@
+""" Test module for Frontier class."""
+import os
+import unittest
+
+from tools.apache_search.src.frontier import BFS
+from tools.apache_search.src.frontier import DFS
+from tools.apache_search.src.frontier import Frontier
+
+
+class TestFrontier(unittest.TestCase):
+    """ Test suite for Frontier class."""
+
+    def _walk(self, frontier, pushes):
+        """ Push and pop the items: every number pushes that many new
+            items, then one item is popped.
+        """
+        popped = list()
+        item = 0
+        for count in pushes:
+            for _ in range(count):
+                frontier.push(item)
+                item += 1
+            popped.append(frontier.pop())
+        while frontier:
+            popped.append(frontier.pop())
+        return popped
+
+    def test_bfs(self):
+        """ Test push and pop methods.
+            Case: breadth-first order kept with items spilled to disk.
+        """
+        pushes = [1, 5, 0, 7, 3, 0, 0, 9, 1]
+        with Frontier(order=BFS, max_items=2) as frontier:
+            self.assertEqual(self._walk(frontier, pushes), list(range(26)))
+            self.assertGreater(frontier.chunks_written, 0)
+
+    def test_dfs(self):
+        """ Test push and pop methods.
+            Case: depth-first order kept with items spilled to disk.
+        """
+        pushes = [1, 5, 0, 7, 3, 0, 0, 9, 1]
+        with Frontier(order=DFS) as frontier:
+            expected = self._walk(frontier, pushes)
+        with Frontier(order=DFS, max_items=3) as frontier:
+            self.assertEqual(self._walk(frontier, pushes), expected)
+            self.assertGreater(frontier.chunks_written, 0)
+        self.assertEqual(expected[:3], [0, 5, 4])
+
+    def test_len(self):
+        """ Test __len__ method.
+            Case: spilled items counted.
+        """
+        frontier = Frontier(order=BFS, max_items=2)
+        for item in range(5):
+            frontier.push(item)
+        self.assertEqual(len(frontier), 5)
+        self.assertEqual(frontier.pop(), 0)
+        self.assertEqual(len(frontier), 4)
+        frontier.close()
+
+    def test_close(self):
+        """ Test close method.
+            Case: temporary files removed, frontier empty.
+        """
+        frontier = Frontier(order=DFS, max_items=2)
+        for item in range(10):
+            frontier.push((f'https://test/url/{item}/', None))
+        temp_dir = frontier._temp_dir
+        self.assertTrue(os.listdir(temp_dir))
+
+        frontier.close()
+
+        self.assertFalse(os.path.exists(temp_dir))
+        self.assertEqual(len(frontier), 0)
+        with self.assertRaises(IndexError):
+            frontier.pop()
+
+    def test_init_negative(self):
+        """ Test Frontier constructor.
+            Case: unknown order, too low maximum number of items.
+        """
+        with self.assertRaises(ValueError):
+            Frontier(order='random')
+        with self.assertRaises(ValueError):
+            Frontier(max_items=1)
@@ -0,0 +1,243 @@
+""" Test module for index module."""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from datetime import datetime
+from unittest import mock
+
+from tools.apache_search.src.entry import DirEntry
+from tools.apache_search.src.entry import FileEntry
+from tools.apache_search.src.index import ListingIndex
+from tools.apache_search.src.page import parse_listing
+from tools.apache_search.src.snapshot import Snapshot
+
+
+MODULE_PATH = 'tools.apache_search.src.index'
+CRAWLER_PATH = 'tools.apache_search.src.crawler'
+ROOT = 'https://test/pub/'
+TEST_MTIME = '2019-03-16 11:46'
+NEW_MTIME = '2019-03-16 12:00'
+
+
+class FakePage:
+    """ Page replacement serving directories from FakePage.tree:
+        (files, subpages) tuples keyed by the URL.
+    """
+    tree = dict()
+    fetched = list()
+
+    @classmethod
+    def from_listing(cls, url, files, subpages):
+        """ Create loaded page, without counting it as fetched."""
+        page = cls.__new__(cls)
+        page.url = url
+        page.files = files
+        page.subpages = subpages
+        return page
+
+    def __init__(self, url, **_):
+        self.url = url
+        self.files = None
+        self.subpages = None
+
+    def load(self):
+        """ Load the page from the tree."""
+        if self.files is None:
+            FakePage.fetched.append(self.url)
+            self.files, self.subpages = FakePage.tree[self.url]
+        return self
+
+
+class TestListingIndex(unittest.TestCase):
+    """ Test suite for ListingIndex class."""
+
+    def setUp(self):
+        """ Setup method for ListingIndex class tests."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.index = ListingIndex(os.path.join(self.tmp_dir, 'index.sqlite'))
+        self.snapshot = Snapshot()
+        self.snapshot.add(ROOT, None, [
+            FileEntry(name='big.iso', base_url=ROOT,
+                      mtime='2019-03-16 11:46', size='2.5G'),
+            FileEntry(name='a.tar.gz', base_url=ROOT,
+                      mtime='2019-03-10 08:00', size='120'),
+        ], [
+            DirEntry(name='sub/', base_url=ROOT, mtime='2019-03-15 10:01'),
+        ])
+        self.snapshot.add(f'{ROOT}sub/', datetime(2019, 3, 15, 10, 1), [
+            FileEntry(name='b%201.tar.gz', base_url=f'{ROOT}sub/',
+                      mtime='2019-03-18 09:30', size='1.5K'),
+        ], [])
+
+    def tearDown(self):
+        """ Teardown method for ListingIndex class tests."""
+        self.index.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def _urls(self, results):
+        """ Get URLs of the query results."""
+        return [result['url'][len(ROOT):] for result in results]
+
+    def test_save_load_snapshot(self):
+        """ Test save_snapshot and load_snapshot methods."""
+        self.assertEqual(self.index.save_snapshot(ROOT, self.snapshot), 2)
+
+        snapshot = self.index.load_snapshot(ROOT)
+
+        self.assertEqual(len(snapshot), 2)
+        sub = snapshot.get(f'{ROOT}sub/')
+        self.assertEqual(sub['datetime'], datetime(2019, 3, 15, 10, 1))
+        self.assertEqual(dict(sub['files'][0]), {
+            'name': 'b%201.tar.gz', 'url': f'{ROOT}sub/b%201.tar.gz',
+            'datetime': datetime(2019, 3, 18, 9, 30), 'size': '1.5K'
+        })
+        self.assertEqual(dict(snapshot.get(ROOT)['subpages'][0])['dir'],
+                         'sub/')
+        self.assertEqual(len(self.index.load_snapshot('https://other/')), 0)
+        self.assertEqual(self.index.roots(), [(ROOT, 2, 4)])
+
+    def test_save_snapshot_changed(self):
+        """ Test save_snapshot method.
+            Case: unchanged directories not written, changed and new
+                  ones written, removed one deleted.
+        """
+        self.index.save_snapshot(ROOT, self.snapshot)
+        snapshot = self.index.load_snapshot(ROOT)
+        snapshot.add(f'{ROOT}new/', datetime(2019, 4, 1, 0, 0), [], [])
+
+        self.assertEqual(self.index.save_snapshot(ROOT, snapshot), 1)
+
+        new_snapshot = Snapshot()
+        new_snapshot.add(ROOT, None, [], [])
+        self.assertEqual(self.index.save_snapshot(ROOT, new_snapshot), 1)
+        self.assertEqual(self.index.roots(), [(ROOT, 1, 0)])
+
+    def test_save_snapshot_name_not_recognised(self):
+        """ Test save_snapshot method.
+            Case: listing with a name not recognised, e.g. with spaces;
+                  other files written.
+        """
+        listing = json.dumps([
+            {'name': 'a.tar.gz', 'type': 'file', 'size': 120,
+             'mtime': 'Sun, 10 Mar 2019 08:00:00 GMT'},
+            {'name': 'my file.txt', 'type': 'file', 'size': 5,
+             'mtime': 'Sun, 10 Mar 2019 08:00:00 GMT'},
+        ])
+        files, subpages = parse_listing(ROOT, 'application/json', listing)
+        snapshot = Snapshot()
+        snapshot.add(ROOT, None, files, subpages)
+
+        self.assertEqual(self.index.save_snapshot(ROOT, snapshot), 1)
+        self.assertEqual(self._urls(self.index.query()), ['a.tar.gz'])
+
+    def test_query(self):
+        """ Test query method.
+            Case: filters, sort, reverse order and limit.
+        """
+        self.index.save_snapshot(ROOT, self.snapshot)
+
+        self.assertEqual(self._urls(self.index.query()), [
+            'a.tar.gz', 'big.iso', 'sub/', 'sub/b%201.tar.gz'
+        ])
+        self.assertEqual(
+            self._urls(self.index.query(files=True, names=['*.tar.gz'],
+                                        sort='datetime', reverse=True)),
+            ['sub/b%201.tar.gz', 'a.tar.gz']
+        )
+        self.assertEqual(
+            self._urls(self.index.query(min_size=1024 ** 3)), ['big.iso']
+        )
+        self.assertEqual(
+            self._urls(self.index.query(files=True, sort='size', limit=2)),
+            ['a.tar.gz', 'sub/b%201.tar.gz']
+        )
+        self.assertEqual(
+            self._urls(self.index.query(paths=['sub/b 1*'])),
+            ['sub/b%201.tar.gz']
+        )
+        self.assertEqual(
+            self._urls(self.index.query(regex=r'^[ab]', max_size=1000,
+                                        newer_than=datetime(2019, 3, 1))),
+            ['a.tar.gz']
+        )
+        self.assertEqual(self._urls(self.index.query(dirs=True)), ['sub/'])
+        self.assertEqual(
+            self._urls(self.index.query(names=['[!a]*'], files=True)),
+            ['big.iso', 'sub/b%201.tar.gz']
+        )
+        self.assertEqual(list(self.index.query(root='https://other/')), [])
+
+    def test_query_unknown_sort(self):
+        """ Test query method.
+            Case: unknown sort key.
+        """
+        with self.assertRaises(ValueError):
+            list(self.index.query(sort='owner'))
+
+    @mock.patch('tools.apache_search.src.crawler.Crawler')
+    def test_refresh(self, mock_crawler):
+        """ Test refresh method.
+            Case: index written after the complete crawl, not changed
+                  after the crawl with failures.
+        """
+        crawler = mock_crawler.return_value
+
+        def pages():
+            """ Walk the tree, replacing the snapshot."""
+            mock_crawler.call_args[1]['snapshot'].replace(self.snapshot)
+            yield from ['page1', 'page2']
+
+        crawler.pages.side_effect = pages
+        crawler.failures = list()
+
+        self.assertEqual(self.index.refresh(ROOT, jobs=2), (2, 2))
+        mock_crawler.assert_called_with(ROOT, snapshot=mock.ANY, jobs=2)
+
+        crawler.pages.side_effect = lambda: iter(['page1'])
+        crawler.failures = [(f'{ROOT}sub/', 'Refused')]
+        failures = list()
+
+        self.assertEqual(self.index.refresh(ROOT, failures=failures),
+                         (1, 0))
+        self.assertEqual(failures, [(f'{ROOT}sub/', 'Refused')])
+        self.assertEqual(self.index.roots(), [(ROOT, 2, 4)])
+
+    @mock.patch(f'{CRAWLER_PATH}.create_session')
+    @mock.patch(f'{CRAWLER_PATH}.Page', FakePage)
+    def test_refresh_deep_change(self, _):
+        """ Test refresh method.
+            Case: file added two levels below the unchanged directory
+                  found; unchanged directory without subdirectories
+                  not fetched.
+        """
+        FakePage.tree = {
+            ROOT: ([], [
+                DirEntry(name='a/', base_url=ROOT, mtime=TEST_MTIME),
+                DirEntry(name='c/', base_url=ROOT, mtime=TEST_MTIME),
+            ]),
+            f'{ROOT}a/': ([], [
+                DirEntry(name='b/', base_url=f'{ROOT}a/', mtime=TEST_MTIME),
+            ]),
+            f'{ROOT}a/b/': ([], []),
+            f'{ROOT}c/': ([], []),
+        }
+        FakePage.fetched = list()
+        self.assertEqual(self.index.refresh(ROOT), (4, 4))
+
+        FakePage.tree[f'{ROOT}a/'] = ([], [
+            DirEntry(name='b/', base_url=f'{ROOT}a/', mtime=NEW_MTIME),
+        ])
+        FakePage.tree[f'{ROOT}a/b/'] = ([
+            FileEntry(name='new.txt', base_url=f'{ROOT}a/b/',
+                      mtime=NEW_MTIME, size='1K'),
+        ], [])
+        FakePage.fetched = list()
+
+        self.assertEqual(self.index.refresh(ROOT), (4, 2))
+        self.assertEqual(sorted(FakePage.fetched),
+                         [ROOT, f'{ROOT}a/', f'{ROOT}a/b/'])
+        self.assertEqual(self._urls(self.index.query(files=True)),
+                         ['a/b/new.txt'])
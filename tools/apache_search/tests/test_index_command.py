@@ -0,0 +1,125 @@
+""" Test module for index command module."""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest import mock
+from click.testing import CliRunner
+
+from tools.apache_search.src.cli import index
+from tools.apache_search.src.entry import FileEntry
+from tools.apache_search.src.index import ListingIndex
+from tools.apache_search.src.snapshot import Snapshot
+
+MODULE_PATH = 'tools.apache_search.src.cli.index'
+
+
+class TestIndex(unittest.TestCase):
+    """ Test suite for index command module."""
+
+    def setUp(self):
+        """ Setup method for TestIndex test suite."""
+        self.runner = CliRunner()
+        self.test_url = 'https://test/url/'
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db = os.path.join(self.tmp_dir, 'db', 'index.sqlite')
+
+    def tearDown(self):
+        """ Teardown method for TestIndex test suite."""
+        shutil.rmtree(self.tmp_dir)
+
+    @mock.patch(f'{MODULE_PATH}.ListingIndex.refresh')
+    def test_index(self, mock_refresh):
+        """ Test index command function.
+            Command: apache-search index <url> --db <db> -j 4 --no-cache
+        """
+        mock_refresh.return_value = (10, 3)
+
+        result = self.runner.invoke(
+            index.index,
+            [self.test_url, '--db', self.db, '-j', '4', '--no-cache']
+        )
+        self.assertEqual(result.exit_code, 0)
+
+        exp_output = [
+            '>>>> Indexed: https://test/url/',
+            'Directories walked             10',
+            'Directories written             3',
+        ]
+        for output_el in exp_output:
+            self.assertTrue(output_el in result.output)
+        mock_refresh.assert_called_with(
+            self.test_url, failures=[], jobs=4, cache=None, crawl_filter=None,
+            max_rate=None, timeout=30.0, retries=3, keep_going=False,
+            stats=None
+        )
+
+    @mock.patch(f'{MODULE_PATH}.ListingIndex.refresh')
+    def test_index_failed(self, mock_refresh):
+        """ Test index command function.
+            Case: failed directory, index not updated.
+            Command: apache-search index <url> --db <db> --keep-going
+        """
+        def refresh(url, failures, **kwargs):
+            """ Record the failed directory."""
+            failures.append(('https://test/url/bad/', 'Refused'))
+            return 2, 0
+
+        mock_refresh.side_effect = refresh
+
+        result = self.runner.invoke(
+            index.index,
+            [self.test_url, '--db', self.db, '--keep-going', '--no-cache']
+        )
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('https://test/url/bad/  Refused', result.output)
+        self.assertIn('Error: 1 directories could not be fetched, '
+                      'the index is not updated.', result.output)
+
+    def test_query(self):
+        """ Test query command function.
+            Command: apache-search query --db <db> --name '*.txt'
+                     --sort size --reverse
+        """
+        snapshot = Snapshot()
+        snapshot.add(self.test_url, None, [
+            FileEntry(name='a.txt', base_url=self.test_url,
+                      mtime='2019-03-16 11:46', size='10'),
+            FileEntry(name='b.txt', base_url=self.test_url,
+                      mtime='2019-03-16 11:46', size='2K'),
+            FileEntry(name='c.bin', base_url=self.test_url, size='1M'),
+        ], [])
+        os.makedirs(os.path.dirname(self.db))
+        with ListingIndex(self.db) as listing_index:
+            listing_index.save_snapshot(self.test_url, snapshot)
+
+        result = self.runner.invoke(
+            index.query,
+            ['--db', self.db, '--name', '*.txt', '--sort', 'size',
+             '--reverse']
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output.splitlines()[2:], [
+            'https://test/url/b.txt  2019-03-16 11:46:00  2K',
+            'https://test/url/a.txt  2019-03-16 11:46:00  10',
+        ])
+
+        result = self.runner.invoke(
+            index.query, ['--db', self.db, '--format', 'jsonl', '-n', '1']
+        )
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(json.loads(result.output)['name'], 'a.txt')
+
+    def test_query_dirs_all(self):
+        """ Test query command function.
+            Case: --dirs and --all used together.
+            Command: apache-search query --dirs --all
+        """
+        result = self.runner.invoke(index.query,
+                                    ['--db', self.db, '--dirs', '--all'])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('Options: --dirs and --all can not be used together.',
+                      result.output)
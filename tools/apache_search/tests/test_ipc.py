@@ -0,0 +1,139 @@
+""" Test module for ipc module."""
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import unittest
+
+from unittest import mock
+
+from tools.apache_search.src import ipc
+
+
+MODULE_PATH = 'tools.apache_search.src.ipc'
+
+
+class TestIpc(unittest.TestCase):
+    """ Test suite for ipc module."""
+
+    def setUp(self):
+        """ Setup method for TestIpc test suite."""
+        self.sender, self.receiver = socket.socketpair()
+
+    def tearDown(self):
+        """ Teardown method for TestIpc test suite."""
+        self.sender.close()
+        self.receiver.close()
+
+    def test_send_recv_frame(self):
+        """ Test send_frame and recv_frame functions.
+            Case: frames received in order, None after the connection
+                  is closed.
+        """
+        ipc.send_frame(self.sender, ipc.STDOUT, b'output\n')
+        ipc.send_frame(self.sender, ipc.EXIT, b'')
+        self.sender.close()
+
+        self.assertEqual(ipc.recv_frame(self.receiver),
+                         (ipc.STDOUT, b'output\n'))
+        self.assertEqual(ipc.recv_frame(self.receiver), (ipc.EXIT, b''))
+        self.assertIsNone(ipc.recv_frame(self.receiver))
+
+    def test_recv_frame_truncated(self):
+        """ Test recv_frame function.
+            Case: connection closed in the middle of the frame.
+        """
+        self.sender.sendall(ipc.HEADER.pack(ipc.STDOUT, 10) + b'out')
+        self.sender.close()
+
+        with self.assertRaises(ConnectionError):
+            ipc.recv_frame(self.receiver)
+
+    @mock.patch.dict(f'{MODULE_PATH}.os.environ',
+                     {'APACHE_SEARCH_SOCKET': '/test/search.sock',
+                      'XDG_RUNTIME_DIR': '/run/user/1000'})
+    def test_default_socket_path_env(self):
+        """ Test default_socket_path function.
+            Case: APACHE_SEARCH_SOCKET environment variable set.
+        """
+        self.assertEqual(ipc.default_socket_path(), '/test/search.sock')
+
+    @mock.patch.dict(f'{MODULE_PATH}.os.environ',
+                     {'APACHE_SEARCH_SOCKET': '',
+                      'XDG_RUNTIME_DIR': '/run/user/1000'})
+    def test_default_socket_path_runtime_dir(self):
+        """ Test default_socket_path function.
+            Case: socket in the user runtime directory.
+        """
+        self.assertEqual(ipc.default_socket_path(),
+                         '/run/user/1000/apache-search.sock')
+
+    @mock.patch.dict(f'{MODULE_PATH}.os.environ',
+                     {'APACHE_SEARCH_SOCKET': '', 'XDG_RUNTIME_DIR': ''})
+    def test_default_socket_path_temp_dir(self):
+        """ Test default_socket_path function.
+            Case: socket in the private directory of the user, created
+                  in the temporary directory.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        private_dir = os.path.join(tmp_dir, f'apache-search-{os.getuid()}')
+
+        with mock.patch(f'{MODULE_PATH}.tempfile.gettempdir',
+                        return_value=tmp_dir):
+            self.assertEqual(ipc.default_socket_path(),
+                             os.path.join(private_dir, 'apache-search.sock'))
+            self.assertEqual(ipc.default_socket_path(),
+                             os.path.join(private_dir, 'apache-search.sock'))
+        self.assertEqual(stat.S_IMODE(os.stat(private_dir).st_mode), 0o700)
+
+    @mock.patch.dict(f'{MODULE_PATH}.os.environ',
+                     {'APACHE_SEARCH_SOCKET': '', 'XDG_RUNTIME_DIR': ''})
+    def test_default_socket_path_not_private(self):
+        """ Test default_socket_path function.
+            Case: directory in the temporary directory owned by other
+                  user, accessible by other users, or not a directory.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        uid = os.getuid()
+        private_dir = os.path.join(tmp_dir, f'apache-search-{uid}')
+
+        with mock.patch(f'{MODULE_PATH}.tempfile.gettempdir',
+                        return_value=tmp_dir):
+            with mock.patch(f'{MODULE_PATH}.os.getuid',
+                            return_value=uid + 1):
+                os.mkdir(os.path.join(tmp_dir, f'apache-search-{uid + 1}'),
+                         0o700)
+                with self.assertRaises(PermissionError):
+                    ipc.default_socket_path()
+
+            os.mkdir(private_dir, 0o700)
+            os.chmod(private_dir, 0o755)
+            with self.assertRaises(PermissionError):
+                ipc.default_socket_path()
+
+            os.rmdir(private_dir)
+            open(private_dir, 'w').close()
+            with self.assertRaises(PermissionError):
+                ipc.default_socket_path()
+
+    def test_is_user_socket(self):
+        """ Test is_user_socket function.
+            Case: only the socket owned by the current user accepted.
+        """
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        socket_path = os.path.join(tmp_dir, 'search.sock')
+        file_path = os.path.join(tmp_dir, 'search.txt')
+        open(file_path, 'w').close()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(socket_path)
+
+        self.assertTrue(ipc.is_user_socket(socket_path))
+        self.assertFalse(ipc.is_user_socket(file_path))
+        self.assertFalse(ipc.is_user_socket(os.path.join(tmp_dir, 'none')))
+        with mock.patch(f'{MODULE_PATH}.os.getuid',
+                        return_value=os.getuid() + 1):
+            self.assertFalse(ipc.is_user_socket(socket_path))
@@ -0,0 +1,49 @@
+""" Test module for main module."""
+import unittest
+
+from unittest import mock
+from click.testing import CliRunner
+
+from tools.apache_search.src.cli import main
+
+APACHE_SEARCH_PATH = 'tools.apache_search.src.cli.apache_search'
+PAGE_SEARCH_PATH = 'tools.apache_search.src.page_search'
+
+
+class TestMain(unittest.TestCase):
+    """ Test suite for main module."""
+
+    def setUp(self):
+        """ Setup method for TestMain test suite."""
+        self.runner = CliRunner()
+        self.test_url = 'https://test/url'
+
+    @mock.patch(f'{APACHE_SEARCH_PATH}._create_table')
+    @mock.patch(f'{PAGE_SEARCH_PATH}.single_page_search')
+    def test_main_default_command(self, mock_single_search,
+                                  mock_create_table):
+        """ Test main command group.
+            Case: search command run without its name, and with it.
+            Command: apache-search <url> -f
+        """
+        mock_single_search.return_value = (['file'], ['dir'])
+
+        for args in ([self.test_url, '-f', '--no-cache'],
+                     ['search', self.test_url, '-f', '--no-cache']):
+            result = self.runner.invoke(main.main, args)
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('>>>> FILES', result.output)
+            mock_single_search.assert_called_with(self.test_url, cache=None,
+                                                  timeout=30.0, retries=3,
+                                                  stats=None)
+
+    def test_main_help(self):
+        """ Test main command group.
+            Case: group help lists the commands.
+            Command: apache-search --help
+        """
+        result = self.runner.invoke(main.main, ['--help'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn('search', result.output)
+        self.assertIn('sync', result.output)
@@ -0,0 +1,68 @@
+""" Test module for the benchmark mirror module."""
+import unittest
+
+from tools.apache_search.benchmarks.mirror import MirrorServer
+from tools.apache_search.benchmarks.mirror import MirrorTree
+from tools.apache_search.src.page import Page
+from tools.apache_search.src.page_search import recursive_page_search
+
+
+class TestMirrorTree(unittest.TestCase):
+    """ Test suite for MirrorTree class."""
+
+    def setUp(self):
+        """ Setup method for MirrorTree class tests."""
+        self.tree = MirrorTree(breadth=2, depth=2, entries=3)
+
+    def test_counts(self):
+        """ Test pages, files and rows properties."""
+        self.assertEqual(self.tree.pages, 7)
+        self.assertEqual(self.tree.files, 21)
+        self.assertEqual(self.tree.rows, 27)
+
+    def test_listing(self):
+        """ Test listing method."""
+        dirs, files = self.tree.listing('/dir-1/')
+
+        self.assertEqual(dirs, ['dir-0/', 'dir-1/'])
+        self.assertEqual(files, [('file-0.tar.gz', '120'),
+                                 ('file-1.tar.gz', '4.0K'),
+                                 ('file-2.tar.gz', '56K')])
+        self.assertEqual(self.tree.listing('/dir-1/dir-0/')[0], [])
+        self.assertIsNone(self.tree.listing('/dir-2/'))
+        self.assertIsNone(self.tree.listing('/dir-0/dir-0/dir-0/'))
+        self.assertIsNone(self.tree.listing('/other/'))
+
+
+class TestMirrorServer(unittest.TestCase):
+    """ Test suite for MirrorServer class, with the real page parsing."""
+
+    def test_page(self):
+        """ Test the page served as html table, and as preformatted text
+            after the Apache server is detected.
+        """
+        tree = MirrorTree(breadth=2, depth=1, entries=5)
+        with MirrorServer(tree) as server:
+            listing_hints = dict()
+            for _ in range(2):
+                page = Page(server.url, listing_hints=listing_hints)
+
+                self.assertEqual(
+                    [subpage['dir'] for subpage in page.subpages],
+                    ['dir-0/', 'dir-1/']
+                )
+                self.assertEqual(len(page.files), 5)
+                self.assertEqual(page.files[1].size_bytes, 4096)
+                self.assertEqual(page.files[1]['url'],
+                                 f'{server.url}file-1.tar.gz')
+            self.assertEqual(listing_hints, {server.url[7:-1]: {'F': '1'}})
+            self.assertEqual(server.requests, 2)
+
+    def test_recursive_page_search(self):
+        """ Test recursive_page_search over the whole tree."""
+        tree = MirrorTree(breadth=2, depth=2, entries=3)
+        with MirrorServer(tree) as server:
+            files = recursive_page_search(server.url, jobs=2)
+
+            self.assertEqual(len(files), tree.files)
+            self.assertEqual(server.requests, tree.pages)
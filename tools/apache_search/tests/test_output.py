@@ -0,0 +1,118 @@
+""" Test module for output module."""
+import csv
+import json
+import unittest
+
+from datetime import datetime
+
+from tools.apache_search.src.entry import DirEntry
+from tools.apache_search.src.entry import FileEntry
+from tools.apache_search.src.output import format_event
+from tools.apache_search.src.output import format_records
+from tools.apache_search.src.output import make_record
+
+
+class TestOutput(unittest.TestCase):
+    """ Test suite for output module."""
+
+    def setUp(self):
+        """ Setup method for output module tests."""
+        self.items = [
+            FileEntry(name='file, 1.txt', base_url='https://test/url/',
+                      mtime='2019-03-16 11:46', size='1.5K'),
+            DirEntry(name='sub/', base_url='https://test/url/',
+                     mtime='2019-03-15 10:01'),
+            {'name': 'cached.txt', 'url': 'https://test/url/cached.txt',
+             'datetime': datetime(2019, 3, 14, 9, 0)},
+        ]
+
+    def test_make_record(self):
+        """ Test make_record function."""
+        self.assertEqual(make_record(self.items[0]), {
+            'type': 'file', 'name': 'file, 1.txt',
+            'url': 'https://test/url/file, 1.txt',
+            'datetime': '2019-03-16T11:46:00', 'size': '1.5K',
+            'size_bytes': 1536
+        })
+        self.assertEqual(make_record(self.items[1]), {
+            'type': 'dir', 'name': 'sub/', 'url': 'https://test/url/sub/',
+            'datetime': '2019-03-15T10:01:00', 'size': None,
+            'size_bytes': None
+        })
+
+    def test_format_records_jsonl(self):
+        """ Test format_records function.
+            Case: JSON Lines, one object per record.
+        """
+        lines = list(format_records(self.items, 'jsonl'))
+
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(all(line.endswith('\n') for line in lines))
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(records[0]['size_bytes'], 1536)
+        self.assertEqual(records[2], {
+            'type': 'file', 'name': 'cached.txt',
+            'url': 'https://test/url/cached.txt',
+            'datetime': '2019-03-14T09:00:00', 'size': None,
+            'size_bytes': None
+        })
+
+    def test_format_records_fields(self):
+        """ Test format_records function.
+            Case: selected fields only.
+        """
+        lines = list(format_records(self.items[:1], 'jsonl', ('url',)))
+
+        self.assertEqual(lines, ['{"url": "https://test/url/file, 1.txt"}\n'])
+
+    def test_format_records_csv(self):
+        """ Test format_records function.
+            Case: CSV with the header line, values quoted when needed.
+        """
+        text = ''.join(format_records(self.items, 'csv'))
+
+        self.assertEqual(text.splitlines()[0],
+                         'type,name,url,datetime,size,size_bytes')
+        rows = list(csv.reader(text.splitlines()))
+        self.assertEqual(rows[1], [
+            'file', 'file, 1.txt', 'https://test/url/file, 1.txt',
+            '2019-03-16T11:46:00', '1.5K', '1536'
+        ])
+        self.assertEqual(rows[2][4:], ['', ''])
+
+    def test_format_records_tsv(self):
+        """ Test format_records function.
+            Case: TSV with the header line.
+        """
+        lines = list(format_records(self.items[1:2], 'tsv', ('name', 'url')))
+
+        self.assertEqual(lines, ['name\turl\n',
+                                 'sub/\thttps://test/url/sub/\n'])
+
+    def test_format_records_urls0(self):
+        """ Test format_records function.
+            Case: URLs terminated with NUL character.
+        """
+        text = ''.join(format_records(self.items + [{'size': '1'}], 'urls0'))
+
+        self.assertEqual(text, 'https://test/url/file, 1.txt\0'
+                               'https://test/url/sub/\0'
+                               'https://test/url/cached.txt\0')
+
+    def test_format_records_unknown(self):
+        """ Test format_records function.
+            Case: unknown format.
+        """
+        with self.assertRaises(ValueError):
+            list(format_records(self.items, 'xml'))
+
+    def test_format_event(self):
+        """ Test format_event function."""
+        line = format_event('modified', self.items[0])
+
+        self.assertTrue(line.endswith('\n'))
+        self.assertEqual(list(json.loads(line)), [
+            'event', 'type', 'name', 'url', 'datetime', 'size', 'size_bytes'
+        ])
+        self.assertEqual(json.loads(line)['event'], 'modified')
+        self.assertEqual(json.loads(line)['size_bytes'], 1536)
@@ -2,10 +2,53 @@
 import unittest
 from unittest import mock
 
+import requests
+
+from datetime import datetime
+
+from tools.apache_search.src.entry import DirEntry
+from tools.apache_search.src.entry import FileEntry
+from tools.apache_search.src.page import HTTPStatusError
 from tools.apache_search.src.page import Page
+from tools.apache_search.src.page import create_parser_pool
+from tools.apache_search.src.page import parse_listing
+from tools.apache_search.src.stats import CrawlStats
 
 
 MODULE_PATH = 'tools.apache_search.src.page'
+ENTRY_MODULE_PATH = 'tools.apache_search.src.entry'
+
+TEST_APACHE_PAGE = """<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 3.2 Final//EN">
+<html>
+ <head>
+  <title>Index of /pub</title>
+ </head>
+ <body>
+<h1>Index of /pub</h1>
+  <table>
+   <tr><th valign="top"><img src="/icons/blank.gif" alt="[ICO]"></th>\
+<th><a href="?C=N;O=D">Name</a></th><th><a href="?C=M;O=A">Last modified</a>\
+</th><th><a href="?C=S;O=A">Size</a></th></tr>
+   <tr><th colspan="5"><hr></th></tr>
+<tr><td valign="top"><img src="/icons/back.gif" alt="[PARENTDIR]"></td>\
+<td><a href="/">Parent Directory</a></td><td>&nbsp;</td>\
+<td align="right">  - </td><td>&nbsp;</td></tr>
+<tr><td valign="top"><img src="/icons/folder.gif" alt="[DIR]"></td>\
+<td><a href="sub/">sub/</a></td><td align="right">2019-03-16 11:46  </td>\
+<td align="right">  - </td><td>&nbsp;</td></tr>
+<tr><td valign="top"><img src="/icons/compressed.gif" alt="[   ]"></td>\
+<td><a href="file-1.0.tar.gz">file-1.0.tar.gz</a></td>\
+<td align="right">2019-03-15 10:01  </td><td align="right">2.5M</td>\
+<td>&nbsp;</td></tr>
+<tr><td valign="top"><img src="/icons/text.gif" alt="[TXT]"></td>\
+<td><a href="README.txt">README.txt</a></td>\
+<td align="right">2019-03-14 09:00  </td><td align="right">120 </td>\
+<td>&nbsp;</td></tr>
+   <tr><th colspan="5"><hr></th></tr>
+</table>
+<address>Apache/2.4.29 (Ubuntu) Server at localhost Port 80</address>
+</body></html>
+"""
 
 
 class TestPage(unittest.TestCase):
@@ -13,6 +56,7 @@ class TestPage(unittest.TestCase):
     def setUp(self):
         """ Setup method for the Page class tests."""
         self.mock_page = mock.MagicMock(spec=Page, name='mock_page')
+        self.mock_page._timeout = 30.0
 
     def tearDown(self):
         """ Teardown method for Page class tests."""
@@ -24,45 +68,67 @@ class TestPage(unittest.TestCase):
         test_page = Page(custom_url)
 
         self.assertEqual(test_page._url, custom_url)
+        self.assertEqual(test_page._session, None)
+        self.assertEqual(test_page._listing_hints, None)
+        self.assertEqual(test_page._cache, None)
+        self.assertEqual(test_page._scheduler, None)
+        self.assertEqual(test_page._timeout, 30.0)
+        self.assertEqual(test_page._retries, 3)
         self.assertEqual(test_page._subpages, None)
         self.assertEqual(test_page._files, None)
         self.assertEqual(test_page._page_bs, None)
 
-    @mock.patch(f'{MODULE_PATH}.Page._get_subpages')
-    def test_subpages(self, mock_get_subpages):
+    @mock.patch(f'{MODULE_PATH}.Page._get_listing')
+    def test_subpages(self, mock_get_listing):
         """ Test subpages property method.
             Variable self._subpages is None.
         """
+        mock_get_listing.return_value = ('files', 'subpages')
         test_page = Page('http://custom_url')
-        self.assertEqual(test_page.subpages, mock_get_subpages())
+        self.assertEqual(test_page.subpages, 'subpages')
+        self.assertEqual(test_page._files, 'files')
 
-    @mock.patch(f'{MODULE_PATH}.Page._get_subpages')
-    def test_subpages_not_none(self, mock_get_subpages):
+    @mock.patch(f'{MODULE_PATH}.Page._get_listing')
+    def test_subpages_not_none(self, mock_get_listing):
         """ Test subpages property method.
             Variable self._subpages is not None.
         """
         test_page = Page('http://custom_url')
         test_page._subpages = 'custom_subpages'
         self.assertEqual(test_page.subpages, 'custom_subpages')
-        self.assertFalse(mock_get_subpages.called)
+        self.assertFalse(mock_get_listing.called)
 
-    @mock.patch(f'{MODULE_PATH}.Page._get_files')
-    def test_files(self, mock_get_files):
+    @mock.patch(f'{MODULE_PATH}.Page._get_listing')
+    def test_files(self, mock_get_listing):
         """ Test files property method.
             Variable self._files is None.
         """
+        mock_get_listing.return_value = ('files', 'subpages')
         test_page = Page('http://custom_url')
-        self.assertEqual(test_page.files, mock_get_files())
+        self.assertEqual(test_page.files, 'files')
+        self.assertEqual(test_page._subpages, 'subpages')
 
-    @mock.patch(f'{MODULE_PATH}.Page._get_files')
-    def test_files_not_none(self, mock_get_files):
+    @mock.patch(f'{MODULE_PATH}.Page._get_listing')
+    def test_files_not_none(self, mock_get_listing):
         """ Test files property method.
             Variable self._files is not None.
         """
         test_page = Page('http://custom_url')
         test_page._files = 'custom_files'
         self.assertEqual(test_page.files, 'custom_files')
-        self.assertFalse(mock_get_files.called)
+        self.assertFalse(mock_get_listing.called)
+
+    @mock.patch(f'{MODULE_PATH}.Page._get_listing')
+    def test_files_and_subpages_single_parse(self, mock_get_listing):
+        """ Test files and subpages property methods.
+            Case: both lists come from a single listing parse.
+        """
+        mock_get_listing.return_value = ('files', 'subpages')
+        test_page = Page('http://custom_url')
+
+        self.assertEqual(test_page.files, 'files')
+        self.assertEqual(test_page.subpages, 'subpages')
+        self.assertEqual(mock_get_listing.call_count, 1)
 
     @mock.patch(f'{MODULE_PATH}.requests')
     def test_get_raw_page_positive(self, mock_requests):
@@ -71,6 +137,7 @@ class TestPage(unittest.TestCase):
         """
         test_url = 'https://test/url/'
         self.mock_page._url = test_url
+        self.mock_page._session = None
 
         exp_result = 'request_text_result'
         mock_requests_get = mock.MagicMock(name='mock_requests_get')
@@ -83,6 +150,24 @@ class TestPage(unittest.TestCase):
         self.assertEqual(result, exp_result)
         self.assertTrue(mock_requests.get.called)
 
+    @mock.patch(f'{MODULE_PATH}.requests')
+    def test_get_raw_page_session(self, mock_requests):
+        """ Test _get_raw_page method.
+            Case: request sent through the shared session.
+        """
+        test_url = 'https://test/url/'
+        self.mock_page._url = test_url
+        mock_session = mock.MagicMock(name='mock_session')
+        self.mock_page._session = mock_session
+        mock_session.get.return_value.status_code = 200
+        mock_session.get.return_value.text = 'request_text_result'
+
+        result = Page._get_raw_page(self.mock_page)
+
+        self.assertEqual(result, 'request_text_result')
+        mock_session.get.assert_called_with(test_url, timeout=30.0)
+        self.assertFalse(mock_requests.get.called)
+
     @mock.patch(f'{MODULE_PATH}.requests')
     def test_get_raw_page_connection_error(self, mock_requests):
         """" Test _get_raw_page method.
@@ -91,6 +176,7 @@ class TestPage(unittest.TestCase):
         test_url = 'https://test/url/'
         self.mock_page._url = test_url
 
+        self.mock_page._session = None
         mock_requests_get = mock.MagicMock(name='mock_requests_get')
         mock_requests_get.status_code = 404
         mock_requests.get.return_value = mock_requests_get
@@ -98,6 +184,113 @@ class TestPage(unittest.TestCase):
         with self.assertRaises(ConnectionError):
             Page._get_raw_page(self.mock_page)
 
+    def test_get_response(self):
+        """ Test _get_response method.
+            Case: positive, response body streamed.
+        """
+        test_url = 'https://test/url/'
+        self.mock_page._url = test_url
+        mock_session = mock.MagicMock(name='mock_session')
+        self.mock_page._session = mock_session
+        self.mock_page._get_listing_params.return_value = {'F': '1'}
+        mock_result = mock_session.get.return_value
+        mock_result.status_code = 200
+        mock_result.encoding = None
+
+        result = Page._get_response(self.mock_page)
+
+        self.assertEqual(result, mock_result)
+        mock_session.get.assert_called_with(
+            test_url, params={'F': '1'}, headers={}, stream=True,
+            timeout=30.0
+        )
+        self.assertEqual(mock_result.encoding, 'utf-8')
+        self.mock_page._update_listing_hints.assert_called_with(mock_result)
+
+    def test_get_response_slot(self):
+        """ Test _get_response method.
+            Case: response recorded in the scheduler request slot.
+        """
+        self.mock_page._url = 'https://test/url/'
+        mock_session = mock.MagicMock(name='mock_session')
+        self.mock_page._session = mock_session
+        mock_session.get.return_value.status_code = 503
+        mock_slot = mock.MagicMock(name='mock_slot')
+
+        with self.assertRaises(ConnectionError):
+            Page._get_response(self.mock_page, None, mock_slot)
+        mock_slot.record.assert_called_with(mock_session.get.return_value)
+
+    def test_get_response_not_modified(self):
+        """ Test _get_response method.
+            Case: conditional request, page not modified.
+        """
+        test_url = 'https://test/url/'
+        self.mock_page._url = test_url
+        mock_session = mock.MagicMock(name='mock_session')
+        self.mock_page._session = mock_session
+        self.mock_page._get_listing_params.return_value = None
+        mock_result = mock_session.get.return_value
+        mock_result.status_code = 304
+        cached = {'etag': '"abc"', 'last_modified': 'Sat, 16 Mar 2019'}
+
+        result = Page._get_response(self.mock_page, cached)
+
+        self.assertEqual(result, mock_result)
+        mock_session.get.assert_called_with(
+            test_url, params=None, stream=True, timeout=30.0,
+            headers={'If-None-Match': '"abc"',
+                     'If-Modified-Since': 'Sat, 16 Mar 2019'}
+        )
+        self.assertFalse(mock_result.close.called)
+        self.mock_page._update_listing_hints.assert_called_with(mock_result)
+
+    def test_get_response_connection_error(self):
+        """ Test _get_response method.
+            Case: negative, Connection Error raised.
+        """
+        self.mock_page._url = 'https://test/url/'
+        mock_session = mock.MagicMock(name='mock_session')
+        self.mock_page._session = mock_session
+        mock_session.get.return_value.status_code = 404
+
+        with self.assertRaises(ConnectionError):
+            Page._get_response(self.mock_page)
+        self.assertTrue(mock_session.get.return_value.close.called)
+
+    def test_listing_hints(self):
+        """ Test _update_listing_hints and _get_listing_params methods.
+            Case: Apache server detected, fancy index format remembered
+                  for the host.
+        """
+        listing_hints = dict()
+        test_page = Page('https://test/url/', listing_hints=listing_hints)
+        self.assertIsNone(test_page._get_listing_params())
+
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.headers = {'Server': 'Apache/2.4.29 (Ubuntu)'}
+        test_page._update_listing_hints(mock_result)
+
+        other_page = Page('https://test/url/sub/', listing_hints=listing_hints)
+        self.assertEqual(other_page._get_listing_params(), {'F': '1'})
+        self.assertEqual(listing_hints, {'test': {'F': '1'}})
+
+    def test_listing_hints_other_server(self):
+        """ Test _update_listing_hints method.
+            Case: server different than Apache, or hints not used.
+        """
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.headers = {'Server': 'nginx/1.14.0'}
+
+        listing_hints = dict()
+        test_page = Page('https://test/url/', listing_hints=listing_hints)
+        test_page._update_listing_hints(mock_result)
+        self.assertEqual(listing_hints, dict())
+
+        test_page = Page('https://test/url/')
+        test_page._update_listing_hints(mock_result)
+        self.assertIsNone(test_page._get_listing_params())
+
     @mock.patch(f'{MODULE_PATH}.BeautifulSoup')
     def test_get_bs(self, mock_bs):
         """ Test _get_bs method.
@@ -121,91 +314,430 @@ class TestPage(unittest.TestCase):
         self.assertFalse(mock_bs.called)
         self.assertFalse(self.mock_page._get_raw_page.called)
 
-    def test_get_files(self):
-        """ Test _get_files method."""
-        mock_bs = mock.MagicMock(name='mock_bs')
-        mock_table_element = mock.MagicMock(name='mock_table_element')
-        mock_table_element.find_all.return_value = 'table_el_find_all'
-        mock_bs.find_all.return_value = [mock_table_element]
-        self.mock_page._get_bs.return_value = mock_bs
-        self.mock_page._find_alt_elements.return_value = [True]
-        self.mock_page._parse_td_text_vals.return_value = 'file_value'
+    def test_load(self):
+        """ Test load method."""
+        self.mock_page._files = None
+        self.mock_page._subpages = None
+        self.mock_page._page_bs = 'page_bs'
+        self.mock_page._get_listing.return_value = ('files', 'subpages')
+
+        result = Page.load(self.mock_page)
+        self.assertEqual(result, self.mock_page)
+        self.assertEqual(self.mock_page._files, 'files')
+        self.assertEqual(self.mock_page._subpages, 'subpages')
+        self.assertIsNone(self.mock_page._page_bs)
+
+    def test_load_loaded(self):
+        """ Test load method.
+            Case: page already loaded, nothing is fetched.
+        """
+        test_page = Page.from_listing('https://test/url/', ['file'], [])
 
-        result = Page._get_files(self.mock_page)
-        self.assertEqual(result, ['file_value'])
+        with mock.patch.object(test_page, '_get_listing') as mock_listing:
+            result = test_page.load()
 
-    def test_get_subpages(self):
-        """ Test _get_subpages method."""
-        mock_bs = mock.MagicMock(name='mock_bs')
-        mock_table_element = mock.MagicMock(name='mock_table_element')
-        mock_table_element.find_all.return_value = 'table_el_find_all'
-        mock_bs.find_all.return_value = [mock_table_element]
-        self.mock_page._get_bs.return_value = mock_bs
-        self.mock_page._find_alt_elements.return_value = [True]
-        self.mock_page._parse_td_text_vals.return_value = 'subpage_value'
+        self.assertEqual(result, test_page)
+        self.assertFalse(mock_listing.called)
+
+    def test_from_listing(self):
+        """ Test from_listing method."""
+        test_page = Page.from_listing(
+            'https://test/url/', ['file'], ['subpage']
+        )
 
-        result = Page._get_subpages(self.mock_page)
-        self.assertEqual(result, ['subpage_value'])
+        self.assertEqual(test_page.url, 'https://test/url/')
+        self.assertEqual(test_page.files, ['file'])
+        self.assertEqual(test_page.subpages, ['subpage'])
 
-    @mock.patch(f'{MODULE_PATH}.re.compile')
-    def test_find_alt_elements_files(self, mock_compile):
-        """ Test _find_alt_elements method.
-            Case: target - files.
+    def test_get_listing(self):
+        """ Test _get_listing method.
+            Case: fancy index table parsed from the stream, giving the same
+                  result as BeautifulSoup parsing.
         """
-        target = 'files'
+        test_page = Page('https://test/url/')
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.headers = {'Content-Type': 'text/html;charset=UTF-8'}
+        mock_result.iter_content.return_value = iter(
+            TEST_APACHE_PAGE[pos:pos + 50]
+            for pos in range(0, len(TEST_APACHE_PAGE), 50)
+        )
+
+        with mock.patch.object(test_page, '_get_response',
+                               return_value=mock_result):
+            result = test_page._get_listing()
+        self.assertTrue(mock_result.close.called)
+        self.assertIsNone(test_page._page_bs)
+
+        with mock.patch.object(test_page, '_get_raw_page',
+                               return_value=TEST_APACHE_PAGE):
+            exp_result = test_page._get_soup_listing()
 
-        alt_element_ico = mock.MagicMock(name='alt_ico')
-        alt_element_ico.attrs = {'alt': '[ICO]'}
-        alt_element_ico.find.return_value = alt_element_ico
+        self.assertEqual(result, exp_result)
+        self.assertEqual(
+            [file['name'] for file in result[0]],
+            ['file-1.0.tar.gz', 'README.txt']
+        )
+        self.assertEqual([subpage['dir'] for subpage in result[1]], ['sub/'])
+
+    def test_get_listing_parser_pool(self):
+        """ Test _get_listing method.
+            Case: page body parsed by the pool of processes, giving
+                  the same entries as the stream parsing.
+        """
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.headers = {'Content-Type': 'text/html'}
+        mock_result.text = TEST_APACHE_PAGE
+        mock_result.iter_content.return_value = iter([TEST_APACHE_PAGE])
+
+        exp_result = Page('https://test/url/')._parse_listing(mock_result)
+        mock_result.iter_content.reset_mock()
+
+        pool = create_parser_pool(1)
+        try:
+            test_page = Page('https://test/url/', parser_pool=pool)
+            with mock.patch.object(test_page, '_get_response',
+                                   return_value=mock_result):
+                result = test_page._get_listing()
+        finally:
+            pool.shutdown()
+
+        self.assertEqual(result, exp_result)
+        self.assertIsInstance(result[0][0], FileEntry)
+        self.assertIsInstance(result[1][0], DirEntry)
+        self.assertFalse(mock_result.iter_content.called)
 
-        alt_element_parentdir = mock.MagicMock(name='alt_parentdir')
-        alt_element_parentdir.attrs = {'alt': '[PARENTDIR]'}
-        alt_element_parentdir.find.return_value = alt_element_parentdir
+    def test_parse_listing(self):
+        """ Test parse_listing function.
+            Case: html table, and page not recognised by the stream parser.
+        """
+        files, subpages = parse_listing('https://test/url/', 'text/html',
+                                        TEST_APACHE_PAGE)
+        self.assertEqual([file['url'] for file in files], [
+            'https://test/url/file-1.0.tar.gz', 'https://test/url/README.txt'
+        ])
+        self.assertEqual(subpages[0]['datetime'],
+                         datetime(2019, 3, 16, 11, 46))
+
+        result = parse_listing('https://test/url/', 'text/html',
+                               '<html><p>Not a listing</p></html>')
+        self.assertEqual(result, ([], []))
+
+    def test_get_listing_cached(self):
+        """ Test _get_listing method.
+            Case: page not modified, listing taken from the cache.
+        """
+        mock_cache = mock.MagicMock(name='mock_cache')
+        mock_cache.get.return_value = {
+            'etag': '"abc"', 'last_modified': None,
+            'files': ['file'], 'subpages': ['subpage']
+        }
+        test_page = Page('https://test/url/', cache=mock_cache)
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.status_code = 304
+
+        with mock.patch.object(test_page, '_get_response',
+                               return_value=mock_result) as mock_response:
+            result = test_page._get_listing()
+
+        self.assertEqual(result, (['file'], ['subpage']))
+        mock_response.assert_called_with(mock_cache.get.return_value, None)
+        self.assertFalse(mock_cache.put.called)
+        self.assertTrue(mock_result.close.called)
+
+    @mock.patch(f'{MODULE_PATH}.time.sleep')
+    def test_get_listing_retry(self, mock_sleep):
+        """ Test _get_listing method.
+            Case: transient errors, page fetched again after the delay.
+        """
+        test_page = Page('https://test/url/', retries=2)
+        side_effect = [
+            requests.exceptions.ReadTimeout('Timeout'),
+            HTTPStatusError('Service Unavailable', 503),
+            (['file'], ['subpage'])
+        ]
 
-        alt_element_dir = mock.MagicMock(name='alt_dir')
-        alt_element_dir.attrs = {'alt': '[DIR]'}
-        alt_element_dir.find.return_value = alt_element_dir
+        with mock.patch.object(test_page, '_fetch_listing',
+                               side_effect=side_effect) as mock_fetch:
+            result = test_page._get_listing()
 
-        alt_element_blank = mock.MagicMock(name='alt_blank')
-        alt_element_blank.attrs = {'alt': '[   ]'}
-        alt_element_blank.find.return_value = alt_element_blank
+        self.assertEqual(result, (['file'], ['subpage']))
+        self.assertEqual(mock_fetch.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertTrue(mock_sleep.call_args_list[0][0][0] <= 0.5)
+        self.assertTrue(mock_sleep.call_args_list[1][0][0] <= 1.0)
 
-        td_elements = [
-            alt_element_ico,
-            alt_element_parentdir,
-            alt_element_dir,
-            alt_element_blank
+    @mock.patch(f'{MODULE_PATH}.time.sleep')
+    def test_get_listing_retry_negative(self, mock_sleep):
+        """ Test _get_listing method.
+            Case: error not transient, or retries exhausted.
+        """
+        test_page = Page('https://test/url/', retries=1)
+
+        with mock.patch.object(test_page, '_fetch_listing',
+                               side_effect=HTTPStatusError('Not Found', 404)):
+            with self.assertRaises(ConnectionError):
+                test_page._get_listing()
+        self.assertFalse(mock_sleep.called)
+
+        with mock.patch.object(
+                test_page, '_fetch_listing',
+                side_effect=requests.exceptions.ConnectionError('Refused')
+        ) as mock_fetch:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                test_page._get_listing()
+        self.assertEqual(mock_fetch.call_count, 2)
+
+    def test_get_listing_scheduler(self):
+        """ Test _get_listing method.
+            Case: request sent in the slot of the scheduler, kept until
+                  the listing is parsed.
+        """
+        mock_scheduler = mock.MagicMock(name='mock_scheduler')
+        mock_context = mock_scheduler.request.return_value
+        mock_slot = mock_context.__enter__.return_value
+        test_page = Page('https://test/url/', scheduler=mock_scheduler)
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.headers = {'Content-Type': 'text/html'}
+        mock_result.iter_content.return_value = iter([TEST_APACHE_PAGE])
+
+        with mock.patch.object(test_page, '_get_response',
+                               return_value=mock_result) as mock_response:
+            test_page._get_listing()
+
+        mock_scheduler.request.assert_called_with('https://test/url/')
+        mock_response.assert_called_with(None, mock_slot)
+        self.assertTrue(mock_context.__exit__.called)
+
+    def test_get_listing_stored(self):
+        """ Test _get_listing method.
+            Case: page modified, new listing stored in the cache.
+        """
+        mock_cache = mock.MagicMock(name='mock_cache')
+        mock_cache.get.return_value = None
+        test_page = Page('https://test/url/', cache=mock_cache)
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.status_code = 200
+        mock_result.headers = {'Content-Type': 'text/html', 'ETag': '"abc"'}
+        mock_result.iter_content.return_value = iter([TEST_APACHE_PAGE])
+
+        with mock.patch.object(test_page, '_get_response',
+                               return_value=mock_result):
+            files, subpages = test_page._get_listing()
+
+        mock_cache.put.assert_called_with(
+            'https://test/url/', '"abc"', None, files, subpages
+        )
+
+    def test_get_listing_stats(self):
+        """ Test _get_listing method.
+            Case: request and phase times recorded in the statistics.
+        """
+        stats = CrawlStats()
+        test_page = Page('https://test/url/', stats=stats)
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.status_code = 200
+        mock_result.headers = {'Content-Type': 'text/html'}
+        mock_result.raw.tell.return_value = 1500
+        mock_result.iter_content.return_value = iter([TEST_APACHE_PAGE])
+
+        with mock.patch.object(test_page, '_get_response',
+                               return_value=mock_result):
+            test_page._get_listing()
+
+        self.assertEqual(stats.requests, 1)
+        self.assertEqual(stats.bytes_received, 1500)
+        self.assertEqual(stats.status_codes, {200: 1})
+        record = stats.slowest[0]
+        self.assertEqual((record.url, record.rows, record.error),
+                         ('https://test/url/', 3, None))
+        phases = stats.phases
+        self.assertTrue(phases['parse'] > 0)
+        self.assertTrue(phases['parse'] >= phases['classify'] > 0)
+
+    @mock.patch(f'{MODULE_PATH}.time.sleep')
+    def test_get_listing_stats_error(self, mock_sleep):
+        """ Test _get_listing method.
+            Case: failed attempts recorded in the statistics.
+        """
+        stats = CrawlStats()
+        test_page = Page('https://test/url/', stats=stats, retries=1)
+        side_effect = [
+            requests.exceptions.ConnectionError('Refused'),
+            HTTPStatusError('Not Found', 404)
         ]
 
-        result = Page._find_alt_elements(self.mock_page, target, td_elements)
-        self.assertEqual(result, [alt_element_blank])
-        self.assertTrue(mock_compile.called)
+        with mock.patch.object(test_page, '_get_response',
+                               side_effect=side_effect):
+            with self.assertRaises(HTTPStatusError):
+                test_page._get_listing()
 
-    @mock.patch(f'{MODULE_PATH}.re.compile')
-    def test_find_alt_elements_dirs(self, mock_compile):
-        """ Test _find_alt_elements method.
-            Case: target - dirs.
+        self.assertEqual(stats.requests, 2)
+        self.assertEqual(stats.errors, 1)
+        self.assertEqual(stats.status_codes, {404: 1})
+        self.assertEqual(sorted(record.error for record in stats.slowest),
+                         ['Not Found', 'Refused'])
+
+    def test_store_listing_no_validators(self):
+        """ Test _store_listing method.
+            Case: response without validators is not cached.
         """
-        target = 'dirs'
+        mock_cache = mock.MagicMock(name='mock_cache')
+        self.mock_page._cache = mock_cache
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.headers = {'Content-Type': 'text/html'}
+
+        Page._store_listing(self.mock_page, mock_result, [], [])
+        self.assertFalse(mock_cache.put.called)
 
-        alt_element_dir = mock.MagicMock(name='alt_dir')
-        alt_element_dir.attrs = {'alt': '[DIR]'}
-        alt_element_dir.find.return_value = alt_element_dir
+    def test_get_listing_json(self):
+        """ Test _get_listing method.
+            Case: nginx json listing.
+        """
+        test_page = Page('https://test/url/')
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.headers = {'Content-Type': 'application/json'}
+        mock_result.text = (
+            '[{"name": "sub", "type": "directory",'
+            ' "mtime": "Sat, 16 Mar 2019 11:46:00 GMT"},'
+            ' {"name": "file.txt", "type": "file",'
+            ' "mtime": "Fri, 15 Mar 2019 10:01:00 GMT", "size": 120}]'
+        )
+
+        with mock.patch.object(test_page, '_get_response',
+                               return_value=mock_result):
+            result = test_page._get_listing()
+
+        exp_result = (
+            [{'name': 'file.txt', 'url': 'https://test/url/file.txt',
+              'datetime': datetime(2019, 3, 15, 10, 1), 'size': '120'}],
+            [{'dir': 'sub/', 'url': 'https://test/url/sub/',
+              'datetime': datetime(2019, 3, 16, 11, 46)}]
+        )
+        self.assertEqual(result, exp_result)
 
-        alt_element_blank = mock.MagicMock(name='alt_blank')
-        alt_element_blank.attrs = {'alt': '[   ]'}
-        alt_element_blank.find.return_value = alt_element_blank
+    def test_get_listing_xml(self):
+        """ Test _get_listing method.
+            Case: nginx xml listing.
+        """
+        test_page = Page('https://test/url/')
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.headers = {'Content-Type': 'text/xml'}
+        mock_result.text = (
+            '<?xml version="1.0"?>\n<list>'
+            '<directory mtime="2019-03-16T11:46:00Z">sub</directory>'
+            '<file mtime="2019-03-15T10:01:00Z" size="120">file.txt</file>'
+            '</list>'
+        )
+
+        with mock.patch.object(test_page, '_get_response',
+                               return_value=mock_result):
+            result = test_page._get_listing()
+
+        exp_result = (
+            [{'name': 'file.txt', 'url': 'https://test/url/file.txt',
+              'datetime': datetime(2019, 3, 15, 10, 1), 'size': '120'}],
+            [{'dir': 'sub/', 'url': 'https://test/url/sub/',
+              'datetime': datetime(2019, 3, 16, 11, 46)}]
+        )
+        self.assertEqual(result, exp_result)
 
-        td_elements = [
-            alt_element_blank,
-            alt_element_dir
+    @mock.patch(f'{MODULE_PATH}.BeautifulSoup')
+    def test_get_html_listing_fallback(self, mock_bs):
+        """ Test _get_html_listing method.
+            Case: layout not recognised, BeautifulSoup parsing used.
+        """
+        self.mock_page._url = 'https://test/url/'
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.iter_content.return_value = iter(
+            ['<html><body>', '<p>Not a listing</p></body></html>']
+        )
+        self.mock_page._get_soup_listing.return_value = 'soup_listing'
+
+        result = Page._get_html_listing(self.mock_page, mock_result)
+
+        self.assertEqual(result, 'soup_listing')
+        mock_bs.assert_called_with(
+            '<html><body><p>Not a listing</p></body></html>',
+            'html.parser'
+        )
+        self.assertEqual(self.mock_page._page_bs, mock_bs())
+
+    def test_add_rows(self):
+        """ Test _add_rows method."""
+        self.mock_page._url = 'https://test/url/'
+        rows = [
+            (['[PARENTDIR]'], ['Parent Directory', '-']),
+            (['[DIR]'], ['sub/', '2019-03-16 11:46', '-']),
+            (['[TXT]'], ['file.txt', '2019-03-14 09:00', '120']),
+            (['[TXT]'], ['not matching file name']),
+            (['[TXT]'], ['my file.txt', '2019-01-01 10:00', '5']),
+        ]
+        files = list()
+        subpages = list()
+
+        Page._add_rows(self.mock_page, rows, files, subpages)
+
+        self.assertEqual([file['name'] for file in files], ['file.txt'])
+        self.assertEqual([subpage['dir'] for subpage in subpages], ['sub/'])
+
+    def test_get_soup_listing(self):
+        """ Test _get_soup_listing method."""
+        mock_bs = mock.MagicMock(name='mock_bs')
+        mock_table_element = mock.MagicMock(name='mock_table_element')
+        mock_table_element.find_all.return_value = 'table_el_find_all'
+        mock_bs.find_all.return_value = [mock_table_element] * 4
+        self.mock_page._get_bs.return_value = mock_bs
+        self.mock_page._classify_row.side_effect = [
+            'files', 'dirs', None, 'files'
+        ]
+        self.mock_page._parse_td_text_vals.side_effect = [
+            'file_value', 'subpage_value', {}
         ]
 
-        result = Page._find_alt_elements(self.mock_page, target, td_elements)
-        self.assertEqual(result, [alt_element_dir])
-        self.assertTrue(mock_compile.called)
+        result = Page._get_soup_listing(self.mock_page)
+        self.assertEqual(result, (['file_value'], ['subpage_value']))
+        self.assertEqual(mock_bs.find_all.call_count, 1)
+        self.assertEqual(self.mock_page._parse_td_text_vals.call_count, 3)
+
+    @staticmethod
+    def _td_with_alt(alt):
+        """ Create a mocked table cell with an "img alt" element."""
+        td_element = mock.MagicMock(name=f'td_{alt}')
+        if alt is None:
+            td_element.find.return_value = None
+        else:
+            td_element.find.return_value.attrs = {'alt': alt}
+        return td_element
+
+    def test_classify_row_files(self):
+        """ Test _classify_row method.
+            Case: file row.
+        """
+        td_elements = [self._td_with_alt('[   ]'), self._td_with_alt(None)]
+
+        result = Page._classify_row(self.mock_page, td_elements)
+        self.assertEqual(result, 'files')
+
+    def test_classify_row_dirs(self):
+        """ Test _classify_row method.
+            Case: directory row.
+        """
+        td_elements = [self._td_with_alt('[DIR]'), self._td_with_alt(None)]
+
+        result = Page._classify_row(self.mock_page, td_elements)
+        self.assertEqual(result, 'dirs')
+
+    def test_classify_row_skipped(self):
+        """ Test _classify_row method.
+            Case: icon header, parent directory and rows without icons.
+        """
+        for alt in ['[ICO]', '[PARENTDIR]', None]:
+            td_elements = [self._td_with_alt(alt)]
+
+            result = Page._classify_row(self.mock_page, td_elements)
+            self.assertIsNone(result)
 
-    @mock.patch(f'{MODULE_PATH}.datetime')
+    @mock.patch(f'{ENTRY_MODULE_PATH}.datetime')
     def test_parse_td_text_vals_file(self, mock_datetime):
         """ Test _parse_td_text_vals method.
             Case: file element.
@@ -237,8 +769,9 @@ class TestPage(unittest.TestCase):
 
         result = Page._parse_td_text_vals(self.mock_page, td_elements)
         self.assertEqual(result, exp_result)
+        self.assertIsInstance(result, FileEntry)
 
-    @mock.patch(f'{MODULE_PATH}.datetime')
+    @mock.patch(f'{ENTRY_MODULE_PATH}.datetime')
     def test_parse_td_text_vals_dir(self, mock_datetime):
         """ Test _parse_td_text_vals method.
             Case: dir element.
@@ -265,3 +798,19 @@ class TestPage(unittest.TestCase):
 
         result = Page._parse_td_text_vals(self.mock_page, td_elements)
         self.assertEqual(result, exp_result)
+        self.assertIsInstance(result, DirEntry)
+
+    def test_parse_td_text_vals_no_name(self):
+        """ Test _parse_td_text_vals method.
+            Case: name not matching the name rules, e.g. with spaces;
+                  row without url skipped.
+        """
+        td_elements = list()
+        for text in ['my file.txt', '2019-01-01 10:00', '5']:
+            td_element = mock.MagicMock(name='text_val')
+            td_element.text = text
+            td_elements.append(td_element)
+        self.mock_page._url = 'https://test/url/'
+
+        self.assertIsNone(Page._parse_td_text_vals(self.mock_page,
+                                                   td_elements))
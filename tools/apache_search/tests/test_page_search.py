@@ -3,6 +3,7 @@ import unittest
 from unittest import mock
 
 from tools.apache_search.src import page_search
+from tools.apache_search.src.filters import CrawlFilter
 
 MODULE_PATH = 'tools.apache_search.src.page_search'
 
@@ -10,6 +11,20 @@ MODULE_PATH = 'tools.apache_search.src.page_search'
 class TestPageSearch(unittest.TestCase):
     """ Test suite for page_search module."""
 
+    @mock.patch(f'{MODULE_PATH}.Page')
+    def test_single_page_search(self, mock_page):
+        """ Test single_page_search function."""
+        mock_page().files = ['file1', 'file2']
+        mock_page().subpages = ['dir1']
+        mock_page.reset_mock()
+        test_url = 'https://test/url'
+
+        result = page_search.single_page_search(test_url)
+        self.assertEqual(result, (['file1', 'file2'], ['dir1']))
+        mock_page.assert_called_once_with(test_url, session=None, cache=None,
+                                          timeout=30.0, retries=3,
+                                          stats=None)
+
     @mock.patch(f'{MODULE_PATH}.Page')
     def test_single_page_search_files(self, mock_page):
         """ Test single_page_search_files function."""
@@ -27,3 +42,201 @@ class TestPageSearch(unittest.TestCase):
 
         result = page_search.single_page_search_dirs(test_url)
         self.assertEqual(result, ['dir1', 'dir2'])
+
+    @mock.patch(f'{MODULE_PATH}.Crawler')
+    def test_recursive_page_search(self, mock_crawler):
+        """ Test recursive_page_search function."""
+        mock_page_1 = mock.MagicMock(name='mock_page_1')
+        mock_page_1.files = ['file1', 'file2']
+        mock_page_2 = mock.MagicMock(name='mock_page_2')
+        mock_page_2.files = ['file3']
+        mock_crawler().pages.return_value = [mock_page_1, mock_page_2]
+        test_url = 'https://test/url'
+
+        result = page_search.recursive_page_search(test_url, jobs=4)
+        self.assertEqual(result, ['file1', 'file2', 'file3'])
+        mock_crawler.assert_called_with(
+            test_url, jobs=4, session=None, cache=None, snapshot=None,
+            crawl_filter=None, max_rate=None, timeout=30.0, retries=3,
+            keep_going=False, stats=None, visited=None,
+            detect_aliases=False, parse_processes=None, order=None,
+            max_memory=None
+        )
+
+    @mock.patch(f'{MODULE_PATH}.Crawler')
+    def test_iter_recursive_page_search(self, mock_crawler):
+        """ Test iter_recursive_page_search function.
+            Case: files yielded page by page, as the pages are loaded.
+        """
+        mock_page_1 = mock.MagicMock(name='mock_page_1')
+        mock_page_1.files = ['file1', 'file2']
+        mock_page_2 = mock.MagicMock(name='mock_page_2')
+        mock_page_2.files = ['file3']
+        mock_crawler().pages.return_value = iter([mock_page_1, mock_page_2])
+        test_url = 'https://test/url'
+
+        result = page_search.iter_recursive_page_search(test_url)
+        self.assertEqual(next(result), 'file1')
+        self.assertEqual(list(result), ['file2', 'file3'])
+
+    @mock.patch(f'{MODULE_PATH}.Crawler')
+    def test_iter_recursive_page_search_filter(self, mock_crawler):
+        """ Test iter_recursive_page_search function.
+            Case: files filtered by the crawl filter.
+        """
+        mock_page_1 = mock.MagicMock(name='mock_page_1')
+        mock_page_1.url = 'https://test/url/'
+        mock_page_1.files = [{'name': 'a.txt'}, {'name': 'b.log'}]
+        mock_page_2 = mock.MagicMock(name='mock_page_2')
+        mock_page_2.url = 'https://test/url/old/'
+        mock_page_2.files = [{'name': 'c.txt'}]
+        mock_crawler().pages.return_value = iter([mock_page_1, mock_page_2])
+        crawl_filter = CrawlFilter(names=['*.txt'], include_dirs=['new'])
+        test_url = 'https://test/url/'
+
+        result = page_search.recursive_page_search(
+            test_url, crawl_filter=crawl_filter
+        )
+        self.assertEqual(result, [])
+
+        mock_page_2.url = 'https://test/url/new/'
+        mock_crawler().pages.return_value = iter([mock_page_1, mock_page_2])
+        result = page_search.recursive_page_search(
+            test_url, crawl_filter=crawl_filter
+        )
+        self.assertEqual(result, [{'name': 'c.txt'}])
+        mock_crawler.assert_called_with(
+            test_url, jobs=1, session=None, cache=None, snapshot=None,
+            crawl_filter=crawl_filter, max_rate=None, timeout=30.0,
+            retries=3, keep_going=False, stats=None, visited=None,
+            detect_aliases=False, parse_processes=None, order=None,
+            max_memory=None
+        )
+
+    @mock.patch(f'{MODULE_PATH}.Crawler')
+    def test_iter_recursive_page_search_failures(self, mock_crawler):
+        """ Test iter_recursive_page_search function.
+            Case: keep going, failed directories given after the search.
+        """
+        mock_crawler().pages.return_value = iter([])
+        mock_crawler().failures = [('https://test/url/a/', 'Timeout')]
+        failures = list()
+
+        result = page_search.recursive_page_search(
+            'https://test/url', keep_going=True, failures=failures
+        )
+
+        self.assertEqual(result, [])
+        self.assertEqual(failures, [('https://test/url/a/', 'Timeout')])
+        self.assertTrue(mock_crawler.call_args[1]['keep_going'])
+
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    @mock.patch(f'{MODULE_PATH}.iter_recursive_page_search')
+    def test_iter_batch_page_search(self, mock_search, mock_create_session):
+        """ Test iter_batch_page_search function.
+            Case: nested and repeated roots collapsed, files labelled
+                  by the most nested root, session shared.
+        """
+        mock_search.return_value = iter([
+            {'url': 'https://test/url/a.txt'},
+            {'url': 'https://test/url/sub/b.txt'},
+        ])
+        urls = ['https://test/url/sub', 'https://test/url/',
+                'https://test/url']
+
+        result = list(page_search.iter_batch_page_search(urls, jobs=4,
+                                                         timeout=5.0))
+
+        self.assertEqual(result, [
+            ('https://test/url/', {'url': 'https://test/url/a.txt'}),
+            ('https://test/url/sub/', {'url': 'https://test/url/sub/b.txt'}),
+        ])
+        mock_search.assert_called_once_with(
+            'https://test/url/', jobs=4, session=mock_create_session(),
+            crawl_filter=None, visited={}, reported=set(), timeout=5.0
+        )
+        mock_create_session.assert_any_call(pool_size=4)
+        self.assertTrue(mock_create_session().close.called)
+
+    @mock.patch(f'{MODULE_PATH}.iter_recursive_page_search')
+    def test_iter_batch_page_search_dir_filter(self, mock_search):
+        """ Test iter_batch_page_search function.
+            Case: with directory filter, nested roots walked after
+                  the outer ones, sharing visited directories.
+        """
+        mock_search.side_effect = [iter([]), iter([])]
+        crawl_filter = CrawlFilter(max_depth=1)
+        session = mock.MagicMock(name='session')
+
+        list(page_search.iter_batch_page_search(
+            ['https://test/url/sub/', 'https://test/url/'], session=session,
+            crawl_filter=crawl_filter
+        ))
+
+        self.assertEqual([call[0][0] for call in mock_search.call_args_list],
+                         ['https://test/url/', 'https://test/url/sub/'])
+        visited = [call[1]['visited'] for call in mock_search.call_args_list]
+        self.assertIs(visited[0], visited[1])
+        reported = [call[1]['reported']
+                    for call in mock_search.call_args_list]
+        self.assertIs(reported[0], reported[1])
+        self.assertFalse(session.close.called)
+
+    @mock.patch('tools.apache_search.src.crawler.Page')
+    def test_iter_batch_page_search_nested_include(self, mock_page):
+        """ Test iter_batch_page_search function.
+            Case: directory walked, but rejected by the include pattern
+                  of the outer root; its files reported by the nested
+                  root, which pattern matches it.
+        """
+        tree = {
+            'https://test/url/': ['sub/'],
+            'https://test/url/sub/': ['pkg/'],
+            'https://test/url/sub/pkg/': ['lib/'],
+            'https://test/url/sub/pkg/lib/': [],
+        }
+        fetched = list()
+
+        def new_page(url, **_):
+            fetched.append(url)
+            page = mock.MagicMock(name=url)
+            page.url = url
+            page.files = [{'name': 'file.txt', 'url': f'{url}file.txt'}]
+            page.subpages = [{'url': f'{url}{name}'} for name in tree[url]]
+            return page
+
+        mock_page.side_effect = new_page
+        mock_page.from_listing.side_effect = \
+            lambda url, files, subpages: mock.MagicMock(
+                url=url, files=files, subpages=subpages
+            )
+        crawl_filter = CrawlFilter(include_dirs=['pkg/*',
+                                                 'sub/pkg/lib/none'])
+
+        result = list(page_search.iter_batch_page_search(
+            ['https://test/url/', 'https://test/url/sub/'],
+            session=mock.MagicMock(name='session'), crawl_filter=crawl_filter
+        ))
+
+        self.assertEqual(result, [
+            ('https://test/url/sub/',
+             {'name': 'file.txt', 'url': 'https://test/url/sub/pkg/lib/'
+                                         'file.txt'}),
+        ])
+        self.assertEqual(sorted(fetched), sorted(tree))
+
+    def test_label_root(self):
+        """ Test label_root function."""
+        roots = ['https://test/a/', 'https://test/a/b/']
+
+        self.assertEqual(
+            page_search.label_root('https://test/a/b/c.txt', roots),
+            'https://test/a/b/'
+        )
+        self.assertEqual(
+            page_search.label_root('https://test/a/c.txt', roots),
+            'https://test/a/'
+        )
+        self.assertEqual(
+            page_search.label_root('https://other/c.txt', roots, 'x'), 'x'
+        )
@@ -0,0 +1,95 @@
+""" Test module for report module."""
+import unittest
+
+from unittest import mock
+
+import click
+
+from tools.apache_search.src.cli import report
+from tools.apache_search.src.download import DOWNLOADED
+from tools.apache_search.src.download import DownloadResult
+from tools.apache_search.src.download import FAILED
+
+MODULE_PATH = 'tools.apache_search.src.cli.report'
+
+
+class TestReport(unittest.TestCase):
+    """ Test suite for report module."""
+
+    def test_stream_table(self):
+        """ Test stream_table function.
+            Case: columns sized by the longest values, rows of different
+                  widths aligned, missing values empty.
+        """
+        test_data = iter([
+            {'name': 'a.txt', 'size': '200'},
+            {'name': 'longfilename.txt', 'size': '1.5K'},
+            {'name': 'b.txt'}
+        ])
+        test_headers = ['Name', 'Size']
+
+        result = list(report.stream_table(test_data, test_headers))
+
+        self.assertEqual(result, [
+            'Name              Size',
+            '----------------  ----',
+            'a.txt             200',
+            'longfilename.txt  1.5K',
+            'b.txt'
+        ])
+
+    @mock.patch(f'{MODULE_PATH}.TABLE_BATCH_ROWS', 1)
+    def test_stream_table_after_batch(self):
+        """ Test stream_table function.
+            Case: rows after the first batch keep the column widths,
+                  longer values not cut, but widening their column
+                  for the next rows.
+        """
+        test_data = iter([
+            {'name': 'a-file.txt', 'size': '200'},
+            {'name': 'longfilename.txt', 'size': '1.5K'},
+            {'name': 'b.txt', 'size': '10'}
+        ])
+        test_headers = ['Name', 'Size']
+
+        result = list(report.stream_table(test_data, test_headers))
+
+        self.assertEqual(result, [
+            'Name        Size',
+            '----------  ----',
+            'a-file.txt  200',
+            'longfilename.txt  1.5K',
+            'b.txt             10'
+        ])
+
+    def test_result_rows(self):
+        """ Test result_rows function.
+            Case: failed download and deletion recorded in keep going mode.
+        """
+        results = [
+            DownloadResult('https://test/a.txt', 'dir/a.txt', DOWNLOADED,
+                           size=10),
+            DownloadResult('https://test/b.txt', 'dir/b.txt', FAILED,
+                           error='Status code: 404'),
+            DownloadResult(None, 'dir/old', FAILED, error='Permission'),
+        ]
+        failures = list()
+
+        rows = list(report.result_rows(results, True, failures))
+
+        self.assertEqual(rows[0], {'path': 'dir/a.txt', 'size': 10,
+                                   'status': DOWNLOADED})
+        self.assertEqual(failures, [('https://test/b.txt', 'Status code: 404'),
+                                    ('dir/old', 'Permission')])
+
+    def test_result_rows_failed(self):
+        """ Test result_rows function.
+            Case: failed deletion stops the sync.
+        """
+        results = [DownloadResult(None, 'dir/old', FAILED, error='Busy')]
+
+        with self.assertRaises(click.ClickException) as context:
+            list(report.result_rows(results, False, list()))
+
+        self.assertEqual(context.exception.message,
+                         'Can not delete: dir/old. Busy')
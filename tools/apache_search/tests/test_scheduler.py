@@ -0,0 +1,157 @@
+""" Test module for scheduler module."""
+import threading
+import unittest
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from unittest import mock
+
+from tools.apache_search.src import scheduler
+from tools.apache_search.src.scheduler import RequestScheduler
+
+
+MODULE_PATH = 'tools.apache_search.src.scheduler'
+
+
+class TestRequestScheduler(unittest.TestCase):
+    """ Test suite for RequestScheduler class."""
+
+    def setUp(self):
+        """ Setup method for RequestScheduler class tests."""
+        self.test_url = 'https://test/url/'
+        self.scheduler = RequestScheduler(max_concurrency=4)
+
+    def _send(self, status_code=200, latency=0.1, headers=None):
+        """ Send the fake request through the scheduler.
+
+            Args:
+                status_code(int): response status code
+                latency(float): response time in seconds
+                headers(dict): response headers
+        """
+        mock_result = mock.MagicMock(name='mock_result')
+        mock_result.status_code = status_code
+        mock_result.headers = headers or {}
+        with mock.patch(f'{MODULE_PATH}.time.monotonic') as mock_monotonic:
+            mock_monotonic.return_value = 100.0
+            with self.scheduler.request(self.test_url) as slot:
+                mock_monotonic.return_value = 100.0 + latency
+                slot.record(mock_result)
+
+    def test_increase(self):
+        """ Test request method.
+            Case: fast responses, limit raised up to the maximum.
+        """
+        self.assertEqual(self.scheduler.get_limit(self.test_url), 1)
+        self._send()
+        self.assertEqual(self.scheduler.get_limit(self.test_url), 2)
+        for _ in range(10):
+            self._send()
+        self.assertEqual(self.scheduler.get_limit(self.test_url), 4)
+
+    def test_decrease_throttled(self):
+        """ Test request method.
+            Case: throttling response, limit halved.
+        """
+        for _ in range(3):
+            self._send()
+        self.assertEqual(self.scheduler.get_limit(self.test_url), 4)
+
+        self._send(status_code=429)
+        self.assertEqual(self.scheduler.get_limit(self.test_url), 2)
+
+        self._send()
+        self.assertEqual(self.scheduler.get_limit(self.test_url), 2)
+
+    def test_decrease_slow(self):
+        """ Test request method.
+            Case: response much slower than the fastest one, limit lowered.
+        """
+        for _ in range(3):
+            self._send()
+        self._send(latency=1.0)
+
+        self.assertEqual(self.scheduler.get_limit(self.test_url), 3)
+
+    def test_decrease_error(self):
+        """ Test request method.
+            Case: exception raised in the slot, limit halved.
+        """
+        for _ in range(3):
+            self._send()
+
+        with self.assertRaises(ConnectionError):
+            with self.scheduler.request(self.test_url):
+                raise ConnectionError('Timeout')
+
+        self.assertEqual(self.scheduler.get_limit(self.test_url), 2)
+        host = self.scheduler._hosts['test']
+        self.assertEqual(host.in_flight, 0)
+
+    def test_retry_after(self):
+        """ Test request method.
+            Case: next request waits for the time from Retry-After.
+        """
+        self._send(status_code=503, headers={'Retry-After': '5'})
+        host = self.scheduler._hosts['test']
+
+        self.assertAlmostEqual(host.not_before, 105.1)
+
+    def test_max_rate(self):
+        """ Test request method.
+            Case: requests spaced out to the rate limit.
+        """
+        rate_scheduler = RequestScheduler(max_concurrency=4, max_rate=2)
+
+        with mock.patch(f'{MODULE_PATH}.time.monotonic') as mock_monotonic:
+            mock_monotonic.return_value = 100.0
+            with rate_scheduler.request(self.test_url):
+                pass
+
+        self.assertEqual(rate_scheduler._hosts['test'].not_before, 100.5)
+
+    def test_limit_blocks(self):
+        """ Test request method.
+            Case: request over the limit waits for the free slot.
+        """
+        entered = list()
+
+        def send_second():
+            with self.scheduler.request(self.test_url):
+                entered.append('second')
+
+        with self.scheduler.request(self.test_url):
+            thread = threading.Thread(target=send_second)
+            thread.start()
+            thread.join(0.1)
+            self.assertEqual(entered, [])
+        thread.join(1)
+
+        self.assertEqual(entered, ['second'])
+
+    def test_hosts_separated(self):
+        """ Test request method.
+            Case: limits kept for every host separately.
+        """
+        for _ in range(3):
+            self._send()
+
+        self.assertEqual(self.scheduler.get_limit(self.test_url), 4)
+        self.assertEqual(self.scheduler.get_limit('https://other/url/'), 1)
+
+
+class TestSchedulerFunctions(unittest.TestCase):
+    """ Test suite for scheduler module functions."""
+
+    def test_parse_retry_after(self):
+        """ Test parse_retry_after function."""
+        self.assertEqual(scheduler.parse_retry_after('120'), 120.0)
+        self.assertIsNone(scheduler.parse_retry_after(None))
+        self.assertIsNone(scheduler.parse_retry_after('soon'))
+
+        retry_date = datetime.now(timezone.utc) + timedelta(seconds=60)
+        result = scheduler.parse_retry_after(
+            retry_date.strftime('%a, %d %b %Y %H:%M:%S GMT')
+        )
+        self.assertTrue(50 < result <= 60)
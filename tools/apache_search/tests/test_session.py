@@ -0,0 +1,59 @@
+""" Test module for session module."""
+import unittest
+from unittest import mock
+
+from tools.apache_search.src import session
+
+
+MODULE_PATH = 'tools.apache_search.src.session'
+
+
+class TestSession(unittest.TestCase):
+    """ Test suite for session module."""
+
+    @mock.patch(f'{MODULE_PATH}.HTTPAdapter')
+    @mock.patch(f'{MODULE_PATH}.requests')
+    def test_create_session(self, mock_requests, mock_adapter):
+        """ Test create_session function."""
+        result = session.create_session(pool_size=8)
+
+        self.assertEqual(result, mock_requests.Session())
+        mock_adapter.assert_called_with(
+            pool_connections=session.DEFAULT_POOL_CONNECTIONS,
+            pool_maxsize=8
+        )
+        result.mount.assert_any_call('http://', mock_adapter())
+        result.mount.assert_any_call('https://', mock_adapter())
+
+    def test_create_session_pool_size(self):
+        """ Test create_session function.
+            Case: real session, adapters share the connection pool size.
+        """
+        result = session.create_session(pool_size=4)
+
+        for prefix in ['http://', 'https://']:
+            adapter = result.get_adapter(f'{prefix}test/url')
+            self.assertEqual(adapter._pool_maxsize, 4)
+        result.close()
+
+    @mock.patch(f'{MODULE_PATH}.KeptSession.release')
+    def test_keep_sessions(self, mock_release):
+        """ Test keep_sessions, create_session and kept_session functions.
+            Case: sessions with the same pool size reused inside
+                  the context, and closed only when leaving it.
+        """
+        self.assertIsNone(session.kept_session())
+        with session.keep_sessions() as sessions:
+            result = session.create_session(pool_size=4)
+            result.close()
+
+            self.assertIsInstance(result, session.KeptSession)
+            self.assertIs(session.create_session(pool_size=4), result)
+            self.assertIs(session.kept_session(),
+                          session.create_session(pool_size=1))
+            self.assertEqual(sorted(sessions), [1, 4])
+            self.assertFalse(mock_release.called)
+
+        self.assertEqual(mock_release.call_count, 2)
+        self.assertIsNone(session.kept_session())
+        self.assertIsNot(session.create_session(pool_size=4), result)
@@ -0,0 +1,97 @@
+""" Test module for shell module: startup of the apache-search script."""
+import os
+import subprocess
+import sys
+import unittest
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))
+)))
+# Modules which must not be imported before the command needs them.
+HEAVY_MODULES = (
+    'bs4',
+    'concurrent.futures',
+    'multiprocessing',
+    'requests',
+    'tabulate',
+    'urllib3',
+    'tools.apache_search.src.crawler',
+    'tools.apache_search.src.daemon',
+    'tools.apache_search.src.download',
+    'tools.apache_search.src.page',
+    'tools.apache_search.src.session',
+    'tools.apache_search.src.watch',
+)
+# Import time of the script, in seconds: about 3 times the time measured
+# with click as the only third party module, and below the time with
+# the HTTP and HTML parsing libraries imported. Checked only with
+# the TIMING_ENV environment variable set, as it depends on the machine.
+TIMING_ENV = 'APACHE_SEARCH_TIMING_TESTS'
+IMPORT_BUDGET = 0.15
+IMPORT_RUNS = 5
+RUN_SCRIPT = '''
+import sys
+from tools.apache_search.shell import run
+sys.argv = ['apache-search'] + sys.argv[1:]
+try:
+    run()
+except SystemExit:
+    pass
+print(','.join(name for name in {heavy!r} if name in sys.modules),
+      file=sys.stderr)
+'''
+
+
+def _run_python(*args):
+    """ Run the Python interpreter in the repository root directory.
+
+        Args:
+            args: interpreter arguments
+
+        Returns:
+            result(subprocess.CompletedProcess): finished process,
+                                                 with captured output
+    """
+    return subprocess.run([sys.executable] + list(args), cwd=ROOT_DIR,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+
+
+class TestStartup(unittest.TestCase):
+    """ Test suite for the startup of the apache-search script."""
+
+    def test_heavy_modules(self):
+        """ Test run function.
+            Case: help and usage errors shown without importing
+                  the HTTP, HTML parsing and table libraries.
+        """
+        script = RUN_SCRIPT.format(heavy=HEAVY_MODULES)
+        for args in (['--help'], ['search', '--help'], ['sync', '--help'],
+                     ['index', '--help'], ['query', '--help'],
+                     ['daemon', '--help'], ['watch', '--help'],
+                     ['https://test/url', '--recursive', '--files']):
+            result = _run_python('-c', script, *args)
+
+            loaded = result.stderr.splitlines()[-1]
+            self.assertEqual(loaded, '', f'Imported by {args}: {loaded}')
+
+    @unittest.skipUnless(os.environ.get(TIMING_ENV),
+                         f'Timing test, enabled by {TIMING_ENV}=1')
+    @unittest.skipIf(sys.version_info < (3, 7),
+                     '-X importtime requires Python 3.7')
+    def test_import_time(self):
+        """ Test shell module import.
+            Case: import time within the budget, the best of a few runs.
+        """
+        times = list()
+        for _ in range(IMPORT_RUNS):
+            result = _run_python('-X', 'importtime', '-c',
+                                 'import tools.apache_search.shell')
+            for line in result.stderr.splitlines():
+                fields = line.split('|')
+                if fields[-1].strip() == 'tools.apache_search.shell':
+                    times.append(int(fields[1]) / 1000000)
+
+        self.assertEqual(len(times), IMPORT_RUNS)
+        self.assertLess(min(times), IMPORT_BUDGET)
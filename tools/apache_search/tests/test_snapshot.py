@@ -0,0 +1,102 @@
+""" Test module for Snapshot class."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from datetime import datetime
+
+from tools.apache_search.src.snapshot import Snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    """ Test suite for Snapshot class."""
+
+    def setUp(self):
+        """ Setup method for Snapshot class tests."""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.snapshot_path = os.path.join(self.tmp_dir, 'snapshot.json')
+        self.test_url = 'https://test/url/sub/'
+        self.mtime = datetime(2019, 3, 16, 11, 46)
+        self.files = [{
+            'name': 'file.txt', 'url': 'https://test/url/sub/file.txt',
+            'datetime': datetime(2019, 3, 15, 10, 1), 'size': '120'
+        }]
+
+    def tearDown(self):
+        """ Teardown method for Snapshot class tests."""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_load_missing(self):
+        """ Test load method.
+            Case: snapshot file does not exist.
+        """
+        snapshot = Snapshot.load(self.snapshot_path)
+        self.assertEqual(len(snapshot), 0)
+
+    def test_save_load(self):
+        """ Test save and load methods."""
+        snapshot = Snapshot()
+        snapshot.add(self.test_url, self.mtime, self.files, [])
+        snapshot.add('https://test/url/', None, [], [])
+        snapshot.save(self.snapshot_path)
+
+        result = Snapshot.load(self.snapshot_path)
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result.get(self.test_url), {
+            'datetime': self.mtime, 'files': self.files, 'subpages': []
+        })
+        self.assertEqual(result.get('https://test/url/')['datetime'], None)
+        self.assertEqual(os.listdir(self.tmp_dir), ['snapshot.json'])
+
+    def test_get_unchanged(self):
+        """ Test get_unchanged method."""
+        snapshot = Snapshot()
+        snapshot.add(self.test_url, self.mtime, self.files, [])
+
+        unchanged = {'url': self.test_url, 'datetime': self.mtime}
+        modified = {'url': self.test_url, 'datetime': datetime(2019, 4, 1)}
+        no_datetime = {'url': self.test_url}
+        unknown = {'url': 'https://test/url/other/', 'datetime': self.mtime}
+
+        self.assertEqual(snapshot.get_unchanged(unchanged)['files'],
+                         self.files)
+        self.assertIsNone(snapshot.get_unchanged(modified))
+        self.assertIsNone(snapshot.get_unchanged(no_datetime))
+        self.assertIsNone(snapshot.get_unchanged(unknown))
+
+    def test_get_unchanged_subdirectories(self):
+        """ Test get_unchanged method.
+            Case: unchanged directory with subdirectories not taken,
+                  as changes deeper in its subtree do not change its date.
+        """
+        snapshot = Snapshot()
+        snapshot.add(self.test_url, self.mtime, self.files,
+                     [{'url': f'{self.test_url}sub/', 'datetime': self.mtime}])
+
+        self.assertIsNone(snapshot.get_unchanged(
+            {'url': self.test_url, 'datetime': self.mtime}
+        ))
+
+    def test_replace(self):
+        """ Test replace method."""
+        snapshot = Snapshot()
+        snapshot.add(self.test_url, self.mtime, self.files, [])
+        new_snapshot = Snapshot()
+        new_snapshot.add('https://test/url/', None, [], [])
+
+        snapshot.replace(new_snapshot)
+
+        self.assertIsNone(snapshot.get(self.test_url))
+        self.assertIsNotNone(snapshot.get('https://test/url/'))
+
+    def test_items(self):
+        """ Test items method."""
+        snapshot = Snapshot()
+        snapshot.add(self.test_url, self.mtime, self.files, [])
+
+        self.assertEqual(list(snapshot.items()), [
+            (self.test_url, {'datetime': self.mtime, 'files': self.files,
+                             'subpages': []})
+        ])
@@ -0,0 +1,98 @@
+""" Test module for stats module."""
+import unittest
+from unittest import mock
+
+from tools.apache_search.src.stats import CrawlStats
+from tools.apache_search.src.stats import RequestRecord
+
+
+MODULE_PATH = 'tools.apache_search.src.stats'
+
+
+class TestCrawlStats(unittest.TestCase):
+    """ Test suite for CrawlStats class."""
+
+    def test_record_request(self):
+        """ Test record_request method."""
+        on_request = mock.MagicMock(name='on_request')
+        stats = CrawlStats(on_request=on_request, slowest=2)
+        records = [
+            RequestRecord('https://test/a/', 200, size=100, elapsed=0.3,
+                          rows=5),
+            RequestRecord('https://test/b/', 404, size=10, elapsed=0.1,
+                          error='Not Found'),
+            RequestRecord('https://test/c/', elapsed=0.5, error='Refused'),
+            RequestRecord('https://test/d/', 200, size=50, elapsed=0.2,
+                          rows=2),
+        ]
+        for record in records:
+            stats.record_request(record)
+
+        self.assertEqual(stats.requests, 4)
+        self.assertEqual(stats.errors, 1)
+        self.assertEqual(stats.bytes_received, 160)
+        self.assertEqual(stats.rows, 7)
+        self.assertEqual(stats.status_codes, {200: 2, 404: 1})
+        self.assertEqual(stats.slowest, [records[2], records[0]])
+        self.assertEqual(on_request.call_args_list,
+                         [mock.call(record) for record in records])
+
+    def test_record_request_same_time(self):
+        """ Test record_request method.
+            Case: requests with the same time, the earlier ones kept.
+        """
+        stats = CrawlStats(slowest=2)
+        records = [RequestRecord(f'https://test/{index}/', 200, elapsed=0.1)
+                   for index in range(3)]
+        for record in records:
+            stats.record_request(record)
+
+        self.assertEqual(stats.slowest, records[:2])
+
+    def test_phase(self):
+        """ Test phase and add_time methods."""
+        stats = CrawlStats()
+        with mock.patch(f'{MODULE_PATH}.time.perf_counter') as mock_counter:
+            mock_counter.side_effect = [10.0, 10.5]
+            with stats.phase('parse'):
+                pass
+        stats.add_time('parse', 0.25)
+        stats.add_time('custom', 1.0)
+
+        phases = stats.phases
+        self.assertEqual(phases['parse'], 0.75)
+        self.assertEqual(phases['custom'], 1.0)
+        self.assertEqual(phases['request'], 0.0)
+
+    def test_phase_error(self):
+        """ Test phase method.
+            Case: time counted also when the code fails.
+        """
+        stats = CrawlStats()
+        with mock.patch(f'{MODULE_PATH}.time.perf_counter') as mock_counter:
+            mock_counter.side_effect = [10.0, 12.0]
+            with self.assertRaises(ValueError):
+                with stats.phase('request'):
+                    raise ValueError('test')
+
+        self.assertEqual(stats.phases['request'], 2.0)
+
+    def test_iter_phase(self):
+        """ Test iter_phase method."""
+        stats = CrawlStats()
+        with mock.patch(f'{MODULE_PATH}.time.perf_counter') as mock_counter:
+            mock_counter.side_effect = [1.0, 2.0, 5.0, 5.5, 6.0, 6.25]
+            result = list(stats.iter_phase('search', ['a', 'b']))
+
+        self.assertEqual(result, ['a', 'b'])
+        self.assertEqual(stats.phases['search'], 1.75)
+
+    def test_elapsed(self):
+        """ Test elapsed property and stop method."""
+        with mock.patch(f'{MODULE_PATH}.time.perf_counter') as mock_counter:
+            mock_counter.side_effect = [100.0, 101.0, 103.0]
+            stats = CrawlStats()
+            self.assertEqual(stats.elapsed, 1.0)
+            stats.stop()
+
+        self.assertEqual(stats.elapsed, 3.0)
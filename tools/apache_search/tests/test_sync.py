@@ -0,0 +1,291 @@
+""" Test module for sync module."""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit
+
+from tools.apache_search.benchmarks.mirror import SERVER_HEADER
+from tools.apache_search.benchmarks.mirror import TABLE_HEAD
+from tools.apache_search.benchmarks.mirror import TABLE_ROW
+from tools.apache_search.benchmarks.mirror import TABLE_TAIL
+from tools.apache_search.src.download import DOWNLOADED
+from tools.apache_search.src.download import listing_timestamp
+from tools.apache_search.src.filters import CrawlFilter
+from tools.apache_search.src.sync import DELETED
+from tools.apache_search.src.sync import TO_DELETE
+from tools.apache_search.src.sync import TO_DOWNLOAD
+from tools.apache_search.src.sync import Syncer
+from tools.apache_search.src.sync import is_synced
+
+
+MTIME = datetime(2019, 3, 16, 11, 46)
+
+TEST_FILES = {
+    '/pub/a.txt': b'file a\n',
+    '/pub/sub/b.txt': b'file b\n',
+    '/pub/sub/deep/c.txt': b'file c\n',
+    '/pub/old/d.txt': b'file d\n',
+}
+
+
+class _SyncHandler(BaseHTTPRequestHandler):
+    """ Request handler serving TEST_FILES, and listings of their
+        directories.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def version_string(self):
+        """ Get the Server header value."""
+        return SERVER_HEADER
+
+    def do_HEAD(self):
+        """ Send the file headers."""
+        self._send(body=False)
+
+    def do_GET(self):
+        """ Send the file, or the directory listing."""
+        self._send(body=True)
+
+    def _send(self, body):
+        """ Send the response."""
+        path = urlsplit(self.path).path
+        self.server.requests.append((self.command, path))
+        if path.endswith('/'):
+            data = self._listing(path)
+        else:
+            data = self.server.files.get(path)
+        if data is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if body:
+            self.wfile.write(data)
+
+    def _listing(self, path):
+        """ Render the listing of the directory, or None if it has no
+            files.
+        """
+        dirs = set()
+        rows = list()
+        for file_path, data in sorted(self.server.files.items()):
+            if not file_path.startswith(path):
+                continue
+            name = file_path[len(path):]
+            if '/' in name:
+                dirs.add(name.split('/')[0])
+                continue
+            rows.append(TABLE_ROW.format(icon='text', alt='[TXT]', name=name,
+                                         mtime='2019-03-16 11:46',
+                                         size=len(data)))
+        if not rows and not dirs:
+            return None
+        rows = [TABLE_ROW.format(icon='folder', alt='[DIR]', name=f'{name}/',
+                                 mtime='2019-03-16 11:46', size='-')
+                for name in sorted(dirs)] + rows
+        return ''.join([TABLE_HEAD.format(path=path)] + rows
+                       + [TABLE_TAIL]).encode('utf-8')
+
+    def log_message(self, *args):
+        """ Do not log the requests."""
+
+
+class _SyncServer(ThreadingMixIn, HTTPServer):
+    """ HTTP server recording the requests."""
+    daemon_threads = True
+
+
+class TestSyncer(unittest.TestCase):
+    """ Test suite for Syncer class."""
+
+    def setUp(self):
+        """ Setup method for Syncer class tests."""
+        self.server = _SyncServer(('127.0.0.1', 0), _SyncHandler)
+        self.server.files = dict(TEST_FILES)
+        self.server.requests = list()
+        threading.Thread(target=self.server.serve_forever,
+                         kwargs={'poll_interval': 0.05}, daemon=True).start()
+        self.root_url = 'http://127.0.0.1:{}/pub/'.format(
+            self.server.server_address[1]
+        )
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """ Teardown method for Syncer class tests."""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def _local(self, *names):
+        """ Get the local path in the mirror directory."""
+        return os.path.join(self.directory, *names)
+
+    def _write(self, data, *names):
+        """ Write the local file in the mirror directory."""
+        path = self._local(*names)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as local_file:
+            local_file.write(data)
+
+    def test_sync(self):
+        """ Test sync method.
+            Case: all files downloaded by the first sync, only listings
+                  fetched by the next one, changed file downloaded again.
+        """
+        syncer = Syncer(self.root_url, self.directory, jobs=2)
+
+        results = list(syncer.sync())
+        self.assertEqual(sorted(result.path for result in results), [
+            self._local('a.txt'), self._local('old', 'd.txt'),
+            self._local('sub', 'b.txt'), self._local('sub', 'deep', 'c.txt')
+        ])
+        self.assertEqual({result.status for result in results}, {DOWNLOADED})
+        self.assertEqual(syncer.unchanged, 0)
+        with open(self._local('sub', 'b.txt'), 'rb') as local_file:
+            self.assertEqual(local_file.read(), b'file b\n')
+
+        self.server.requests = list()
+        self.assertEqual(list(syncer.sync()), [])
+        self.assertEqual(syncer.unchanged, 4)
+        self.assertTrue(all(path.endswith('/')
+                            for _, path in self.server.requests))
+
+        self.server.files['/pub/sub/b.txt'] = b'file b, changed\n'
+        results = list(syncer.sync())
+        self.assertEqual([(result.path, result.status) for result in results],
+                         [(self._local('sub', 'b.txt'), DOWNLOADED)])
+        self.assertEqual(syncer.unchanged, 3)
+
+    def test_sync_filter(self):
+        """ Test sync method.
+            Case: files and directories rejected by the filter not synced.
+        """
+        syncer = Syncer(self.root_url, self.directory,
+                        crawl_filter=CrawlFilter(names=['*.txt'],
+                                                 exclude_dirs=['deep']))
+
+        results = list(syncer.sync())
+
+        self.assertEqual(len(results), 3)
+        self.assertFalse(os.path.exists(self._local('sub', 'deep')))
+
+    def test_sync_delete(self):
+        """ Test sync method.
+            Case: files removed from the server deleted, first in the dry
+                  run, unfinished download of the listed file kept.
+        """
+        for path, data in TEST_FILES.items():
+            self._write(data, *path.split('/')[2:])
+            timestamp = listing_timestamp(MTIME)
+            os.utime(self._local(*path.split('/')[2:]),
+                     (timestamp, timestamp))
+        self._write(b'removed', 'sub', 'removed.txt')
+        self._write(b'part', 'sub', 'gone.bin.part')
+        self._write(b'part', 'a.txt.part')
+        del self.server.files['/pub/old/d.txt']
+
+        syncer = Syncer(self.root_url, self.directory, delete=True,
+                        dry_run=True)
+        results = list(syncer.sync())
+        self.assertEqual(sorted((result.path, result.status)
+                                for result in results), [
+            (self._local('old'), TO_DELETE),
+            (self._local('sub', 'gone.bin.part'), TO_DELETE),
+            (self._local('sub', 'removed.txt'), TO_DELETE),
+        ])
+        self.assertTrue(os.path.exists(self._local('old', 'd.txt')))
+
+        syncer = Syncer(self.root_url, self.directory, delete=True)
+        results = list(syncer.sync())
+        self.assertEqual({result.status for result in results}, {DELETED})
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ['a.txt', 'a.txt.part', 'sub'])
+        self.assertEqual(sorted(os.listdir(self._local('sub'))),
+                         ['b.txt', 'deep'])
+
+    def test_sync_name_not_recognised(self):
+        """ Test sync method.
+            Case: file with a name not recognised by the listing parser,
+                  e.g. with spaces, skipped; other files synced.
+        """
+        self.server.files['/pub/sub/my file.txt'] = b'spaces\n'
+        syncer = Syncer(self.root_url, self.directory, delete=True)
+
+        results = list(syncer.sync())
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual({result.status for result in results}, {DOWNLOADED})
+        self.assertEqual(sorted(os.listdir(self._local('sub'))),
+                         ['b.txt', 'deep'])
+
+    def test_sync_dry_run(self):
+        """ Test sync method.
+            Case: new files reported, nothing downloaded.
+        """
+        syncer = Syncer(self.root_url, self.directory, dry_run=True)
+
+        results = list(syncer.sync())
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual({result.status for result in results},
+                         {TO_DOWNLOAD})
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_init_wrong_jobs(self):
+        """ Test Syncer constructor.
+            Case: jobs lower than 1.
+        """
+        with self.assertRaises(ValueError):
+            Syncer(self.root_url, self.directory, jobs=0)
+
+
+class TestIsSynced(unittest.TestCase):
+    """ Test suite for is_synced function."""
+
+    def setUp(self):
+        """ Setup method for is_synced function tests."""
+        handle, self.path = tempfile.mkstemp()
+        with os.fdopen(handle, 'wb') as local_file:
+            local_file.write(b'x' * 1500)
+        timestamp = listing_timestamp(MTIME)
+        os.utime(self.path, (timestamp, timestamp))
+
+    def tearDown(self):
+        """ Teardown method for is_synced function tests."""
+        os.remove(self.path)
+
+    def test_is_synced(self):
+        """ Test is_synced function.
+            Case: sizes within the precision of the listed value.
+        """
+        for size in ('1500', '1.5K', '1K', '2K', None):
+            self.assertTrue(is_synced({'size': size, 'datetime': MTIME},
+                                      self.path), size)
+        self.assertTrue(is_synced({'size': '1500'}, self.path))
+
+    def test_is_synced_negative(self):
+        """ Test is_synced function.
+            Case: different size or date, values not listed, missing file.
+        """
+        items = [
+            {'size': '1501', 'datetime': MTIME},
+            {'size': '1.3K', 'datetime': MTIME},
+            {'size': '3K', 'datetime': MTIME},
+            {'size': '1500', 'datetime': datetime(2019, 3, 16, 11, 48)},
+            {'size': '-', 'datetime': MTIME},
+            {'name': 'file'},
+        ]
+        for item in items:
+            self.assertFalse(is_synced(item, self.path), item)
+        self.assertFalse(is_synced({'size': '1500'}, f'{self.path}.missing'))
@@ -0,0 +1,86 @@
+""" Test module for sync command module."""
+import unittest
+
+from unittest import mock
+from click.testing import CliRunner
+
+from tools.apache_search.src.cli import sync
+from tools.apache_search.src.download import DOWNLOADED
+from tools.apache_search.src.download import DownloadResult
+from tools.apache_search.src.download import FAILED
+from tools.apache_search.src.sync import DELETED
+
+SYNC_PATH = 'tools.apache_search.src.sync'
+
+
+class TestSync(unittest.TestCase):
+    """ Test suite for sync command module."""
+
+    def setUp(self):
+        """ Setup method for TestSync test suite."""
+        self.runner = CliRunner()
+        self.test_url = 'https://test/url/'
+
+    @mock.patch(f'{SYNC_PATH}.Syncer')
+    def test_sync(self, mock_syncer):
+        """ Test sync command function.
+            Command: apache-search sync <url> <dir> --delete -j 4 --no-cache
+        """
+        syncer = mock_syncer.return_value
+        syncer.sync.return_value = iter([
+            DownloadResult('https://test/url/a.txt', '/mirror/a.txt',
+                           DOWNLOADED, size=120),
+            DownloadResult(None, '/mirror/old', DELETED),
+        ])
+        syncer.unchanged = 7
+        syncer.failures = list()
+
+        result = self.runner.invoke(
+            sync.sync,
+            [self.test_url, '/mirror', '--delete', '-j', '4', '--no-cache']
+        )
+        self.assertEqual(result.exit_code, 0)
+
+        exp_output = [
+            '>>>> Syncing: https://test/url/ into: /mirror',
+            '/mirror/a.txt  120   downloaded',
+            '/mirror/old          deleted',
+            '>>>> Unchanged files: 7',
+        ]
+        for output_el in exp_output:
+            self.assertTrue(output_el in result.output)
+        mock_syncer.assert_called_with(
+            self.test_url, '/mirror', jobs=4, segments=4, cache=None,
+            crawl_filter=None, max_rate=None, timeout=30.0, retries=3,
+            keep_going=False, stats=None, delete=True, dry_run=False,
+            order=None, max_memory=None
+        )
+
+    @mock.patch(f'{SYNC_PATH}.Syncer')
+    def test_sync_failed(self, mock_syncer):
+        """ Test sync command function.
+            Case: failed directory and file listed.
+            Command: apache-search sync <url> <dir> --keep-going --no-cache
+        """
+        syncer = mock_syncer.return_value
+        syncer.sync.return_value = iter([
+            DownloadResult('https://test/url/b.txt', '/mirror/b.txt',
+                           FAILED, error='Status code: 404'),
+        ])
+        syncer.unchanged = 0
+        syncer.failures = [('https://test/url/bad/', 'Refused')]
+
+        result = self.runner.invoke(
+            sync.sync,
+            [self.test_url, '/mirror', '--keep-going', '--no-cache']
+        )
+        self.assertEqual(result.exit_code, 1)
+
+        exp_output = [
+            '>>>> FAILED',
+            'https://test/url/bad/   Refused',
+            'https://test/url/b.txt  Status code: 404',
+            'Error: 2 directories or files could not be synced.'
+        ]
+        for output_el in exp_output:
+            self.assertTrue(output_el in result.output)
@@ -0,0 +1,74 @@
+""" Test module for urls module."""
+import unittest
+
+from datetime import datetime
+
+from tools.apache_search.src.entry import DirEntry
+from tools.apache_search.src.entry import FileEntry
+from tools.apache_search.src.urls import listing_digest
+from tools.apache_search.src.urls import normalize_url
+
+
+class TestUrls(unittest.TestCase):
+    """ Test suite for urls module."""
+
+    def test_normalize_url(self):
+        """ Test normalize_url function.
+            Case: different spellings of the same directory.
+        """
+        test_urls = [
+            'https://test/url/sub/',
+            'HTTPS://Test:443/url/sub/',
+            'https://test//url///sub/',
+            'https://test/url/./sub/',
+            'https://test/url/other/../sub/',
+            'https://test/url%2Fsub/',
+            'https://test/%75rl/sub/#top',
+        ]
+        for url in test_urls:
+            self.assertEqual(normalize_url(url), 'https://test/url/sub/', url)
+
+    def test_normalize_url_kept(self):
+        """ Test normalize_url function.
+            Case: reserved and not encoded characters, trailing slash,
+                  query and not default port kept.
+        """
+        test_urls = {
+            'https://test/url': 'https://test/url',
+            'https://test': 'https://test/',
+            'https://test/a%3fb/%e2%82%ac': 'https://test/a%3Fb/%E2%82%AC',
+            'https://test/a b/': 'https://test/a b/',
+            'http://test:8080/url/..': 'http://test:8080/',
+            'https://test/url/.': 'https://test/url/',
+            'https://test/../url/?C=M': 'https://test/url/?C=M',
+        }
+        for url, normal_url in test_urls.items():
+            self.assertEqual(normalize_url(url), normal_url, url)
+            self.assertEqual(normalize_url(normal_url), normal_url, url)
+
+    def test_listing_digest(self):
+        """ Test listing_digest function.
+            Case: same listing under other URL and in other order has
+                  the same digest, changed file has other digest.
+        """
+        mtime = datetime(2019, 3, 16, 11, 46)
+        files = [FileEntry(name='a.txt', base_url='https://test/url/',
+                           mtime=mtime, size='2K'),
+                 FileEntry(name='b.txt', base_url='https://test/url/',
+                           mtime=mtime, size='1K')]
+        subpages = [DirEntry(name='sub/', base_url='https://test/url/',
+                             mtime=mtime)]
+        alias_files = [{'name': 'b.txt', 'url': 'https://test/link/b.txt',
+                        'datetime': mtime, 'size': '1K'},
+                       {'name': 'a.txt', 'url': 'https://test/link/a.txt',
+                        'datetime': mtime, 'size': '2K'}]
+        alias_subpages = [{'dir': 'sub/', 'url': 'https://test/link/sub/',
+                           'datetime': mtime}]
+
+        digest = listing_digest(files, subpages)
+
+        self.assertEqual(listing_digest(alias_files, alias_subpages), digest)
+        alias_files[0]['size'] = '3K'
+        self.assertNotEqual(listing_digest(alias_files, alias_subpages),
+                            digest)
+        self.assertNotEqual(listing_digest(files, []), digest)
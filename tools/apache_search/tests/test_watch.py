@@ -0,0 +1,309 @@
+""" Test module for watch module."""
+import json
+import unittest
+from unittest import mock
+
+from datetime import datetime
+
+from tools.apache_search.src.filters import CrawlFilter
+from tools.apache_search.src.page import parse_listing
+from tools.apache_search.src.watch import ADDED
+from tools.apache_search.src.watch import MODIFIED
+from tools.apache_search.src.watch import REMOVED
+from tools.apache_search.src.watch import Watcher
+from tools.apache_search.src.watch import diff_files
+
+
+MODULE_PATH = 'tools.apache_search.src.watch'
+CRAWLER_PATH = 'tools.apache_search.src.crawler'
+
+TEST_MTIME = datetime(2019, 3, 16, 11, 46)
+NEW_MTIME = datetime(2019, 3, 16, 12, 0)
+
+
+def _file(url, size='1K', mtime=TEST_MTIME):
+    """ Create the file data of the test tree."""
+    return {'name': url.rsplit('/', 1)[-1], 'url': url, 'datetime': mtime,
+            'size': size}
+
+
+class FakePage:
+    """ Page replacement serving directories from FakePage.tree:
+        (files, subpages) tuples keyed by the URL.
+    """
+    tree = dict()
+    fetched = list()
+    failed = list()
+
+    @classmethod
+    def from_listing(cls, url, files, subpages):
+        """ Create loaded page, without counting it as fetched."""
+        page = cls.__new__(cls)
+        page.url = url
+        page.files = files
+        page.subpages = subpages
+        return page
+
+    def __init__(self, url, **_):
+        self.url = url
+        self.files = None
+        self.subpages = None
+
+    def load(self):
+        """ Load the page from the tree, or fail for the failed urls."""
+        if self.files is not None:
+            return self
+        if self.url in FakePage.failed:
+            raise ConnectionError(f'Can not connect to: {self.url}')
+        FakePage.fetched.append(self.url)
+        files, subpages = FakePage.tree[self.url]
+        self.files = list(files)
+        self.subpages = list(subpages)
+        return self
+
+
+@mock.patch(f'{CRAWLER_PATH}.create_session')
+@mock.patch(f'{CRAWLER_PATH}.Page', FakePage)
+class TestWatcher(unittest.TestCase):
+    """ Test suite for Watcher class."""
+
+    def setUp(self):
+        """ Setup method for Watcher class tests."""
+        self.test_url = 'https://test/url/'
+        FakePage.fetched = list()
+        FakePage.failed = list()
+        FakePage.tree = {
+            'https://test/url/': (
+                [_file('https://test/url/root.txt')],
+                [{'url': 'https://test/url/a/', 'datetime': TEST_MTIME},
+                 {'url': 'https://test/url/b/', 'datetime': TEST_MTIME}]
+            ),
+            'https://test/url/a/': (
+                [_file('https://test/url/a/a.txt')],
+                [{'url': 'https://test/url/a/c/', 'datetime': TEST_MTIME}]
+            ),
+            'https://test/url/a/c/': (
+                [_file('https://test/url/a/c/c.txt')], []
+            ),
+            'https://test/url/b/': (
+                [_file('https://test/url/b/b.txt')], []
+            ),
+        }
+
+    def _poll(self, watcher):
+        """ Poll the tree, counting only the fetches of this poll."""
+        FakePage.fetched = list()
+        return sorted((event, item['url'])
+                      for event, item in watcher.poll())
+
+    def test_init_wrong_jobs(self, *_):
+        """ Init method test for Watcher class.
+            Case: jobs lower than 1.
+        """
+        with self.assertRaises(ValueError):
+            Watcher(self.test_url, jobs=0)
+
+    @mock.patch(f'{MODULE_PATH}.time')
+    def test_poll(self, mock_time, *_):
+        """ Test poll method.
+            Case: all files added by the first poll, and their changes
+                  reported by the next one.
+        """
+        mock_time.monotonic.return_value = 1000.0
+        watcher = Watcher(self.test_url)
+        self.assertEqual(self._poll(watcher), [
+            (ADDED, 'https://test/url/a/a.txt'),
+            (ADDED, 'https://test/url/a/c/c.txt'),
+            (ADDED, 'https://test/url/b/b.txt'),
+            (ADDED, 'https://test/url/root.txt'),
+        ])
+
+        FakePage.tree['https://test/url/a/c/'] = (
+            [_file('https://test/url/a/c/c.txt', size='2K'),
+             _file('https://test/url/a/c/new.txt', mtime=NEW_MTIME)], []
+        )
+        files, _ = FakePage.tree['https://test/url/a/']
+        FakePage.tree['https://test/url/a/'] = (
+            files, [{'url': 'https://test/url/a/c/', 'datetime': NEW_MTIME}]
+        )
+        FakePage.tree['https://test/url/'] = (
+            [], FakePage.tree['https://test/url/'][1]
+        )
+
+        self.assertEqual(self._poll(watcher), [
+            (ADDED, 'https://test/url/a/c/new.txt'),
+            (MODIFIED, 'https://test/url/a/c/c.txt'),
+            (REMOVED, 'https://test/url/root.txt'),
+        ])
+        self.assertEqual(self._poll(watcher), [])
+
+    def test_poll_removed_directory(self, *_):
+        """ Test poll method.
+            Case: files of the removed directory reported after the walk.
+        """
+        watcher = Watcher(self.test_url)
+        self._poll(watcher)
+
+        files, _ = FakePage.tree['https://test/url/a/']
+        FakePage.tree['https://test/url/a/'] = (files, [])
+
+        self.assertEqual(self._poll(watcher), [
+            (REMOVED, 'https://test/url/a/c/c.txt'),
+        ])
+        self.assertIsNone(watcher._snapshot.get('https://test/url/a/c/'))
+
+    @mock.patch(f'{MODULE_PATH}.time')
+    def test_poll_skipped_directories(self, mock_time, *_):
+        """ Test poll method.
+            Case: directory without subdirectories skipped, after its
+                  modification date has settled; other directories
+                  fetched by every poll.
+        """
+        mock_time.monotonic.side_effect = [0.0, 10.0, 20.0, 30.0, 100.0,
+                                           110.0, 200.0, 210.0]
+        watcher = Watcher(self.test_url)
+        self._poll(watcher)
+        self.assertEqual(len(FakePage.fetched), 4)
+
+        # Poll started 10 seconds after the dates were seen.
+        self._poll(watcher)
+        self.assertEqual(len(FakePage.fetched), 4)
+
+        # Poll started 90 seconds after: dates settled.
+        self._poll(watcher)
+        self.assertEqual(len(FakePage.fetched), 4)
+
+        self._poll(watcher)
+        self.assertEqual(sorted(FakePage.fetched),
+                         ['https://test/url/', 'https://test/url/a/'])
+
+    @mock.patch(f'{MODULE_PATH}.time')
+    def test_poll_name_not_recognised(self, mock_time, *_):
+        """ Test poll method.
+            Case: file with a name not recognised by the listing parser,
+                  e.g. with spaces, skipped; other changes reported.
+        """
+        mock_time.monotonic.return_value = 1000.0
+        watcher = Watcher(self.test_url)
+        self._poll(watcher)
+
+        listing = json.dumps([
+            {'name': 'my file.txt', 'type': 'file', 'size': 5,
+             'mtime': 'Sat, 16 Mar 2019 12:00:00 GMT'},
+            {'name': 'new.txt', 'type': 'file', 'size': 5,
+             'mtime': 'Sat, 16 Mar 2019 12:00:00 GMT'},
+        ])
+        FakePage.tree['https://test/url/b/'] = parse_listing(
+            'https://test/url/b/', 'application/json', listing
+        )
+
+        self.assertEqual(self._poll(watcher), [
+            (ADDED, 'https://test/url/b/new.txt'),
+            (REMOVED, 'https://test/url/b/b.txt'),
+        ])
+
+    @mock.patch(f'{MODULE_PATH}.time')
+    def test_poll_keep_going(self, mock_time, *_):
+        """ Test poll method.
+            Case: failed directory skipped, its files not removed;
+                  changes of the walked directories reported once.
+        """
+        mock_time.monotonic.return_value = 1000.0
+        watcher = Watcher(self.test_url, keep_going=True)
+        self._poll(watcher)
+
+        FakePage.failed = ['https://test/url/a/']
+        FakePage.tree['https://test/url/b/'] = ([], [])
+
+        self.assertEqual(self._poll(watcher), [
+            (REMOVED, 'https://test/url/b/b.txt'),
+        ])
+        self.assertEqual(watcher.failures, [
+            ('https://test/url/a/', 'Can not connect to: https://test/url/a/')
+        ])
+
+        FakePage.failed = list()
+        self.assertEqual(self._poll(watcher), [])
+        self.assertEqual(watcher.failures, [])
+
+    @mock.patch(f'{MODULE_PATH}.time')
+    def test_poll_filter(self, mock_time, *_):
+        """ Test poll method.
+            Case: only files and directories passing the filter reported.
+        """
+        mock_time.monotonic.return_value = 1000.0
+        watcher = Watcher(self.test_url, crawl_filter=CrawlFilter(
+            names=['c.*', 'b.*'], exclude_dirs=['b']
+        ))
+
+        self.assertEqual(self._poll(watcher), [
+            (ADDED, 'https://test/url/a/c/c.txt'),
+        ])
+        self.assertNotIn('https://test/url/b/', FakePage.fetched)
+
+    @mock.patch(f'{MODULE_PATH}.time')
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    def test_watch(self, mock_create_session, mock_time, *_):
+        """ Test watch method.
+            Case: first poll not reported, polls started every interval,
+                  session closed after the watch.
+        """
+        mock_time.monotonic.side_effect = [0.0, 0.0, 10.0, 10.0,
+                                           60.0, 60.0, 65.0]
+        polled = list()
+
+        def change_tree(poll_watcher):
+            polled.append(poll_watcher)
+            FakePage.tree['https://test/url/b/'] = ([], [])
+
+        watcher = Watcher(self.test_url)
+        events = [(event, item['url']) for event, item in
+                  watcher.watch(60, polls=2, on_poll=change_tree)]
+
+        self.assertEqual(events, [(REMOVED, 'https://test/url/b/b.txt')])
+        self.assertEqual(polled, [watcher, watcher])
+        mock_time.sleep.assert_called_once_with(50.0)
+        self.assertTrue(mock_create_session.return_value.close.called)
+
+    @mock.patch(f'{MODULE_PATH}.time')
+    @mock.patch(f'{MODULE_PATH}.create_session')
+    def test_watch_initial(self, mock_create_session, mock_time, *_):
+        """ Test watch method.
+            Case: files of the first poll reported as added, next poll
+                  started right after the poll longer than the interval.
+        """
+        mock_time.monotonic.side_effect = [0.0, 0.0, 90.0, 90.0,
+                                           90.0, 90.0, 95.0]
+        watcher = Watcher(self.test_url)
+
+        events = list(watcher.watch(60, polls=2, initial=True))
+
+        self.assertEqual(len(events), 4)
+        self.assertTrue(all(event == ADDED for event, _ in events))
+        mock_time.sleep.assert_called_once_with(0.0)
+
+
+class TestDiffFiles(unittest.TestCase):
+    """ Test suite for diff_files function."""
+
+    def test_diff_files(self):
+        """ Test diff_files function.
+            Case: added, modified (date or size) and removed files.
+        """
+        old_files = [_file('https://test/url/same.txt'),
+                     _file('https://test/url/date.txt'),
+                     _file('https://test/url/size.txt'),
+                     _file('https://test/url/old.txt')]
+        new_files = [_file('https://test/url/new.txt'),
+                     _file('https://test/url/size.txt', size='2K'),
+                     _file('https://test/url/date.txt', mtime=NEW_MTIME),
+                     _file('https://test/url/same.txt')]
+
+        self.assertEqual(
+            [(event, item['url'])
+             for event, item in diff_files(old_files, new_files)],
+            [(ADDED, 'https://test/url/new.txt'),
+             (MODIFIED, 'https://test/url/size.txt'),
+             (MODIFIED, 'https://test/url/date.txt'),
+             (REMOVED, 'https://test/url/old.txt')]
+        )
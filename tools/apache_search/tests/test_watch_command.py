@@ -0,0 +1,138 @@
+""" Test module for watch command module."""
+import json
+import unittest
+
+from datetime import datetime
+from unittest import mock
+from click.testing import CliRunner
+
+from tools.apache_search.src.cli import main
+from tools.apache_search.src.cli import watch
+from tools.apache_search.src.daemon import Daemon
+from tools.apache_search.src.watch import ADDED
+from tools.apache_search.src.watch import REMOVED
+
+WATCH_PATH = 'tools.apache_search.src.watch'
+
+
+def _events(events, interrupted=False):
+    """ Generate the events of the watch, interrupted by Ctrl-C
+        at the end if requested.
+    """
+    yield from events
+    if interrupted:
+        raise KeyboardInterrupt
+
+
+class TestWatchCommand(unittest.TestCase):
+    """ Test suite for watch command module."""
+
+    def setUp(self):
+        """ Setup method for TestWatchCommand test suite."""
+        self.runner = CliRunner(mix_stderr=False)
+        self.test_url = 'https://test/url/'
+        self.test_file = {'name': 'a.tar.gz',
+                          'url': 'https://test/url/a.tar.gz',
+                          'datetime': datetime(2019, 3, 16, 11, 46),
+                          'size': '1.5K'}
+
+    @mock.patch(f'{WATCH_PATH}.Watcher')
+    def test_watch(self, mock_watcher):
+        """ Test watch command function.
+            Case: events written as json lines until Ctrl-C.
+            Command: apache-search watch <url> --interval 300 --name
+                     '*.tar.gz' -j 4 --no-cache
+        """
+        mock_watcher.return_value.watch.return_value = _events(
+            [(ADDED, self.test_file), (REMOVED, self.test_file)],
+            interrupted=True
+        )
+
+        result = self.runner.invoke(
+            watch.watch, [self.test_url, '--interval', '300', '--name',
+                          '*.tar.gz', '-j', '4', '--no-cache']
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        self.assertEqual(records[0], {
+            'event': 'added', 'type': 'file', 'name': 'a.tar.gz',
+            'url': 'https://test/url/a.tar.gz',
+            'datetime': '2019-03-16T11:46:00', 'size': '1.5K',
+            'size_bytes': 1536
+        })
+        self.assertEqual(records[1]['event'], 'removed')
+        self.assertEqual(len(records), 2)
+
+        _, kwargs = mock_watcher.call_args
+        self.assertEqual(kwargs['jobs'], 4)
+        self.assertIsNone(kwargs['cache'])
+        self.assertEqual(kwargs['crawl_filter']._names, ['*.tar.gz'])
+        mock_watcher.return_value.watch.assert_called_with(
+            300, polls=None, initial=False, on_poll=mock.ANY
+        )
+
+    @mock.patch(f'{WATCH_PATH}.Watcher')
+    def test_watch_failures(self, mock_watcher):
+        """ Test watch command function.
+            Case: failed directories of every poll listed on stderr.
+            Command: apache-search watch <url> --polls 1 --initial
+                     --keep-going --no-cache
+        """
+        watcher = mock_watcher.return_value
+        watcher.failures = [('https://test/url/bad/', 'Refused')]
+
+        def watch_events(interval, polls, initial, on_poll):
+            yield ADDED, self.test_file
+            on_poll(watcher)
+
+        watcher.watch.side_effect = watch_events
+
+        result = self.runner.invoke(
+            watch.watch, [self.test_url, '--polls', '1', '--initial',
+                          '--keep-going', '--no-cache']
+        )
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(len(result.stdout.splitlines()), 1)
+        self.assertIn('>>>> FAILED', result.stderr)
+        self.assertIn('https://test/url/bad/  Refused', result.stderr)
+        self.assertTrue(mock_watcher.call_args[1]['keep_going'])
+
+    @mock.patch(f'{WATCH_PATH}.Watcher')
+    def test_watch_max_memory(self, mock_watcher):
+        """ Test watch command function.
+            Case: memory limit of the frontier, while the watch keeps
+                  the whole tree in memory.
+            Command: apache-search watch <url> --max-memory 64M
+        """
+        result = self.runner.invoke(watch.watch,
+                                    [self.test_url, '--max-memory', '64M'])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('--max-memory can not be used with watch',
+                      result.stderr)
+        self.assertFalse(mock_watcher.called)
+
+    def test_watch_wrong_interval(self):
+        """ Test watch command function.
+            Case: interval shorter than a second.
+            Command: apache-search watch <url> --interval 0.5
+        """
+        result = self.runner.invoke(watch.watch,
+                                    [self.test_url, '--interval', '0.5'])
+
+        self.assertEqual(result.exit_code, 2)
+
+    @mock.patch(f'{WATCH_PATH}.Watcher')
+    def test_watch_through_client(self, mock_watcher):
+        """ Test watch command function.
+            Case: watch command sent to the running daemon.
+            Command: apache-search-client watch <url>
+        """
+        result = self.runner.invoke(watch.watch, [self.test_url],
+                                    obj=Daemon(main.main, '/test/sock'))
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('can not be run through the client', result.stderr)
+        self.assertFalse(mock_watcher.called)